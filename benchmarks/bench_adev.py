@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:41:09 2026
+
+@author: daniele
+
+Summary :
+    Benchmark of the ADEV/MDEV engine (plot/adev.py) on synthetic clock
+    corrections: random walk phase sampled every 10 seconds for many
+    satellites, with random gaps. When allantools is installed, the results
+    on a gap-free series are compared with allantools.oadev and
+    allantools.mdev.
+
+    Usage :
+        python bench_adev.py [--days d] [--sats n] [--processes p]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plot"))
+
+import adev
+
+
+def synthetic_series(num_sats, num_samples, tau0, gap_ratio, rng) :
+    """
+    Summary :
+        Generate random walk phase series with random gaps.
+
+    Returns :
+        Dictionary {sat : (time, phase)}.
+    """
+    series = {}
+    for sat in range(1, num_sats + 1) :
+        time_s = np.arange(num_samples) * tau0
+        phase = np.cumsum(rng.normal(size = num_samples)) * 1e-10 + \
+                rng.normal(size = num_samples) * 1e-11
+
+        keep = rng.random(num_samples) >= gap_ratio
+
+        series[sat] = (time_s[keep], phase[keep])
+
+    return series
+
+def compare_allantools(taus, tau0, rng) :
+    """
+    Summary :
+        Compare the engine with allantools on a gap-free series.
+    """
+    try :
+        import allantools as at
+    except ImportError :
+        print("allantools not installed: comparison skipped")
+        return
+
+    num_samples = 20000
+    time_s = np.arange(num_samples) * tau0
+    phase = np.cumsum(rng.normal(size = num_samples)) * 1e-10
+
+    for name, func in (("oadev", at.oadev), ("mdev", at.mdev)) :
+        t_ref, d_ref, _, n_ref = func(phase, rate = 1 / tau0, data_type = "phase", taus = taus)
+        t_out, d_out, _, n_out = adev.multi_dev({0 : (time_s, phase)}, taus, tau0, name)[0]
+
+        if not (np.allclose(t_ref, t_out) and np.array_equal(n_ref, n_out)) :
+            raise Exception(f"{name}: different averaging times")
+
+        print(f"{name:>6} vs allantools: max relative difference " + \
+              f"{np.max(np.abs(d_out / d_ref - 1)):.2e}")
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "ADEV/MDEV engine benchmark")
+    parser.add_argument("--days", type = float, default = 30, \
+                        help = "length of the series in days")
+    parser.add_argument("--sats", type = int, default = 64, \
+                        help = "number of satellites")
+    parser.add_argument("--processes", type = int, default = os.cpu_count(), \
+                        help = "number of processes")
+    parser.add_argument("--gaps", type = float, default = 0.05, \
+                        help = "fraction of missing epochs")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    tau0 = 10.0
+    taus = np.logspace(1, 5, 40)[:-3]
+
+    compare_allantools(taus, tau0, rng)
+
+    num_samples = int(args.days * 86400 / tau0)
+    series = synthetic_series(args.sats, num_samples, tau0, args.gaps, rng)
+
+    print(f"\n{args.sats} satellites, {num_samples} epochs, {100 * args.gaps:.0f}% gaps")
+
+    for kind in ("oadev", "mdev") :
+        for processes in sorted(set([1, args.processes])) :
+            t0 = time.perf_counter()
+            adev.multi_dev(series, taus, tau0, kind, processes = processes)
+
+            print(f"{kind:>6}, {processes:2d} processes: {time.perf_counter() - t0:7.2f} s")
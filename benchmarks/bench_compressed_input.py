@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+
+@author: daniele
+
+Summary :
+    Benchmark comparing two ways of loading compressed receiver files:
+
+        1) decompress the whole file to a temporary file and parse it
+        2) parse the file directly through streaming decompression
+
+    Usage :
+        python bench_compressed_input.py <input file> <rx> [<type>]
+
+    where <rx> and <type> have the same meaning as in process_cnav.parse_data.
+"""
+
+import os
+import sys
+import time
+import gzip
+import bz2
+import lzma
+import shutil
+import zipfile
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import data_loading as dl
+
+
+def get_loader(_rx, _type = None) :
+    """
+    Summary :
+        Return the loading function associated to a receiver type.
+
+    Arguments :
+        _rx - receiver type ("sep", "nov", "jav")
+        _type - Septentrio input format ("bin", "hexa", "txt")
+
+    Returns :
+        Function loading a file and returning a dataframe.
+    """
+    if _rx == "sep" :
+        if _type == "bin" :
+            return dl.load_from_binary_Septentrio
+        else :
+            return lambda filename : dl.load_from_parsed_Septentrio(filename, _type)
+    elif _rx == "nov" :
+        return dl.load_from_Novatel
+    elif _rx == "jav" :
+        return dl.load_from_Javad
+    else :
+        raise Exception("Unsupported Receiver format")
+
+def compress(filename, ext, out_dir) :
+    """
+    Summary :
+        Compress a file using the format specified by its extension.
+
+    Arguments :
+        filename - file to compress
+        ext - compression format (".gz", ".bz2", ".xz", ".zip")
+        out_dir - directory where the compressed file is written
+
+    Returns :
+        The pathname of the compressed file.
+    """
+    out_name = os.path.join(out_dir, os.path.basename(filename) + ext)
+
+    if ext == ".zip" :
+        with zipfile.ZipFile(out_name, "w", zipfile.ZIP_DEFLATED) as archive :
+            archive.write(filename, os.path.basename(filename))
+    else :
+        openers = {".gz" : gzip.open, ".bz2" : bz2.open, ".xz" : lzma.open}
+
+        with open(filename, "rb") as fin, openers[ext](out_name, "wb") as fout :
+            shutil.copyfileobj(fin, fout, 1 << 20)
+
+    return out_name
+
+def decompress_then_parse(filename, loader, tmp_dir) :
+    """
+    Summary :
+        Reference approach: the file is first fully decompressed to disk and
+        then parsed.
+    """
+    tmp_name = os.path.join(tmp_dir, "decompressed" + \
+                            os.path.splitext(os.path.splitext(filename)[0])[1])
+
+    with dl.open_file(filename, parallel = False) as fin, open(tmp_name, "wb") as fout :
+        shutil.copyfileobj(fin, fout, 1 << 20)
+
+    df = loader(tmp_name)
+    os.remove(tmp_name)
+
+    return df
+
+def run_benchmark(filename, _rx, _type = None, repeat = 3) :
+    """
+    Summary :
+        Run the benchmark and print the results.
+
+    Arguments :
+        filename - uncompressed input file
+        _rx - receiver type
+        _type - Septentrio input format
+        repeat - number of repetitions, the best time is reported
+    """
+    loader = get_loader(_rx, _type)
+
+    def best_time(fun) :
+        times = []
+        for ii in range(repeat) :
+            t0 = time.perf_counter()
+            fun()
+            times.append(time.perf_counter() - t0)
+        return min(times)
+
+    t_plain = best_time(lambda : loader(filename))
+
+    print(f"Input file: {filename} ({os.path.getsize(filename) / 1e6:.1f} MB)")
+    print(f"{'format':>8} {'ratio':>7} {'decomp+parse [s]':>17} {'stream [s]':>11} " + \
+          f"{'stream mt [s]':>14}")
+    print(f"{'none':>8} {1.0:7.2f} {t_plain:17.3f} {t_plain:11.3f} {t_plain:14.3f}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir :
+        for ext in [".gz", ".bz2", ".xz", ".zip"] :
+            comp_name = compress(filename, ext, tmp_dir)
+            ratio = os.path.getsize(filename) / os.path.getsize(comp_name)
+
+            t_two_steps = best_time(lambda : decompress_then_parse(comp_name, loader, tmp_dir))
+
+            # streaming decompression, single thread
+            dl.parallel_decompression = False
+            t_stream = best_time(lambda : loader(comp_name))
+
+            # streaming decompression, multi-threaded when available
+            dl.parallel_decompression = True
+            t_stream_mt = best_time(lambda : loader(comp_name))
+
+            print(f"{ext:>8} {ratio:7.2f} {t_two_steps:17.3f} {t_stream:11.3f} " + \
+                  f"{t_stream_mt:14.3f}")
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 3 :
+        print(__doc__)
+        sys.exit(1)
+
+    filename = sys.argv[1]
+    _rx = sys.argv[2]
+    _type = sys.argv[3] if len(sys.argv) > 3 else None
+
+    run_benchmark(filename, _rx, _type)
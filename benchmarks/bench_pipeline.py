@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:40:12 2026
+
+@author: daniele
+
+Summary :
+    End-to-end throughput benchmark of the HAS decoding pipeline.
+    A synthetic HAS stream is generated with has_generator, written in all the
+    supported receiver formats and then processed stage by stage:
+
+        load      - loading of each receiver format (data_loading)
+        unpack    - header extraction and page grouping by ToW
+        decode    - Reed-Solomon decoding (has_decoder.update)
+        interpret - bit-level interpretation of the MT1 messages
+        write     - conversion of the corrections into CSV lines
+
+    The results can be saved as a JSON baseline and later compared against
+    it. The script exits with a non-zero code if a stage is slower than the
+    baseline by more than the given tolerance.
+
+    baseline_pipeline.json is the reference baseline committed with the
+    benchmark (600 s stream, 3 repetitions, single-core x86_64 machine,
+    Python 3.11). Times are machine dependent: the baseline should be
+    regenerated with --save on the machine used for the comparisons.
+
+    Usage :
+        python bench_pipeline.py [--duration s] [--repeat n]
+                                 [--save baseline.json]
+                                 [--compare baseline.json] [--tolerance 0.25]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import platform
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import has_decoder as hd
+import has_generator as hg
+
+from bench_compressed_input import get_loader
+
+
+def best_time(fun, repeat) :
+    """
+    Summary :
+        Execute a function several times and return the best execution time
+        together with the output of the last run.
+    """
+    times = []
+    for ii in range(repeat) :
+        t0 = time.perf_counter()
+        out = fun()
+        times.append(time.perf_counter() - t0)
+
+    return min(times), out
+
+def unpack_pages(df) :
+    """
+    Summary :
+        Replicate the page filtering and grouping performed by parse_data.
+
+    Arguments :
+        df - dataframe in the format produced by the loaders
+
+    Returns :
+        List of tuples (tow, page_block, msg_type, msg_id, msg_size, crc_flags)
+    """
+    HAS_Header = ( (df["word 1"].values & 0x3FFFF) << 6 ) + \
+                 (df["word 2"].values >> 26)
+
+    non_dummy = np.argwhere((HAS_Header != 0xAF3BC3) & \
+                            (df["CRCPassed"].values == 1)).flatten()
+
+    df_valid = df.iloc[non_dummy].copy()
+    HAS_Header = HAS_Header[non_dummy]
+
+    df_valid["Message_Type"] = ( HAS_Header >> 18 ) & 0x3
+    df_valid["Message_ID"] = ( HAS_Header >> 13 ) & 0x1F
+    df_valid["Message_Size"] = (( HAS_Header >> 8 ) & 0x1F) + 1
+
+    crc_passed = (df_valid["CRCPassed"].values == 1)
+
+    blocks = []
+    for tow in np.unique(df_valid['TOW']) :
+        tow_ind = np.argwhere(df_valid['TOW'].values == tow).flatten()
+
+        page_block = []
+        for ii in tow_ind :
+            page = np.array([df_valid["word %d" % kk].iloc[ii] for kk in range(1, 17)], \
+                            dtype=np.uint32)
+            page_block.append(page)
+
+        ref_ind = tow_ind[0]
+        blocks.append((tow, page_block, df_valid['Message_Type'].iloc[ref_ind], \
+                       df_valid['Message_ID'].iloc[ref_ind], \
+                       df_valid['Message_Size'].iloc[ref_ind], crc_passed[tow_ind]))
+
+    return blocks
+
+def decode_pages(blocks) :
+    """
+    Summary :
+        Decode the HAS messages from the unpacked pages.
+
+    Returns :
+        List of tuples (tow, decoded message)
+    """
+    decoder = hd.has_decoder()
+
+    messages = []
+    for tow, page_block, msg_type, msg_id, msg_size, crc_flags in blocks :
+        msg = decoder.update(tow, page_block, msg_type, msg_id, msg_size, crc_flags)
+
+        if msg is not None :
+            messages.append((tow, msg))
+
+    return messages
+
+def interpret_messages(messages) :
+    """
+    Summary :
+        Interpret the decoded MT1 messages.
+
+    Returns :
+        List of correction objects
+    """
+    decoder = hd.has_decoder()
+    masks = None
+
+    corrections = []
+    for tow, msg in messages :
+        header = decoder.interpret_mt1_header(msg.flatten()[0:4])
+
+        info = {'ToW' : int(tow), 'WN' : 0, 'ToH' : header['TOH'], \
+                'IOD' : header['IOD Set ID']}
+
+        body = msg.flatten()[4:]
+        byte_offset = 0
+        bit_offset = 0
+
+        if header["Mask"] == 1 :
+            masks, byte_offset, bit_offset = decoder.interpret_mt1_mask(body)
+
+        if masks is None :
+            continue
+
+        if header['Orbit Corr'] == 1 :
+            cors, byte_offset, bit_offset = decoder.interpret_mt1_orbit_corrections(body, \
+                                                byte_offset, bit_offset, masks, info)
+            corrections.extend(cors)
+
+        if header['Clock Full-set'] == 1 :
+            cors, byte_offset, bit_offset = decoder.interpret_mt1_full_clock_corrections(body, \
+                                                byte_offset, bit_offset, masks, info)
+            corrections.extend(cors)
+
+        if header['Clock Subset'] == 1 :
+            cors, byte_offset, bit_offset = decoder.interpret_mt1_subset_clock_corrections(body, \
+                                                byte_offset, bit_offset, masks, info)
+            corrections.extend(cors)
+
+        if header['Code Bias'] == 1 :
+            cors, byte_offset, bit_offset = decoder.interpret_mt1_code_biases(body, \
+                                                byte_offset, bit_offset, masks, info)
+            corrections.extend(cors)
+
+        if header['Phase Bias'] == 1 :
+            cors, byte_offset, bit_offset = decoder.interpret_mt1_phase_biases(body, \
+                                                byte_offset, bit_offset, masks, info)
+            corrections.extend(cors)
+
+    return corrections
+
+def write_corrections(corrections) :
+    """
+    Summary :
+        Convert the corrections into the CSV lines written by parse_data.
+
+    Returns :
+        Total number of characters produced.
+    """
+    num_chars = 0
+    for cor in corrections :
+        if cor.is_empty() :
+            continue
+
+        num_chars += len(cor.__str__() + '\n')
+
+    return num_chars
+
+def run_benchmark(duration, repeat) :
+    """
+    Summary :
+        Run all the benchmark stages on a synthetic stream.
+
+    Arguments :
+        duration - duration of the synthetic stream in seconds
+        repeat - number of repetitions, the best time is reported
+
+    Returns :
+        Dictionary with the results of each stage.
+    """
+    results = {}
+
+    generator = hg.has_stream_generator()
+    df = generator.generate(duration)
+
+    with tempfile.TemporaryDirectory() as tmp_dir :
+        files = hg.write_all_formats(df, os.path.join(tmp_dir, "synthetic"))
+
+        for fmt, (filename, _rx, _type) in files.items() :
+            loader = get_loader(_rx, _type)
+            elapsed, df_fmt = best_time(lambda : loader(filename), repeat)
+
+            results["load_" + fmt] = {"time" : elapsed, "items" : len(df_fmt), \
+                                      "unit" : "records"}
+
+    elapsed, blocks = best_time(lambda : unpack_pages(df), repeat)
+    results["unpack"] = {"time" : elapsed, "items" : len(df), "unit" : "records"}
+
+    elapsed, messages = best_time(lambda : decode_pages(blocks), repeat)
+    results["decode"] = {"time" : elapsed, "items" : len(messages), "unit" : "messages"}
+
+    elapsed, corrections = best_time(lambda : interpret_messages(messages), repeat)
+    results["interpret"] = {"time" : elapsed, "items" : len(messages), "unit" : "messages"}
+
+    elapsed, num_chars = best_time(lambda : write_corrections(corrections), repeat)
+    results["write"] = {"time" : elapsed, "items" : len(corrections), "unit" : "corrections"}
+
+    return results
+
+def compare_results(results, baseline, tolerance) :
+    """
+    Summary :
+        Compare the results with a baseline.
+
+    Arguments :
+        results - dictionary with the current results
+        baseline - dictionary with the baseline results
+        tolerance - relative slowdown accepted before flagging a regression
+
+    Returns :
+        List of the stages that regressed.
+    """
+    regressions = []
+
+    print(f"\n{'stage':>18} {'baseline [s]':>13} {'current [s]':>12} {'ratio':>7}")
+    for stage, res in results.items() :
+        if stage not in baseline :
+            continue
+
+        ratio = res["time"] / baseline[stage]["time"]
+        flag = ""
+        if ratio > 1 + tolerance :
+            regressions.append(stage)
+            flag = "  REGRESSION"
+
+        print(f"{stage:>18} {baseline[stage]['time']:13.4f} {res['time']:12.4f} " + \
+              f"{ratio:7.2f}{flag}")
+
+    return regressions
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "HAS pipeline benchmark")
+    parser.add_argument("--duration", type = int, default = 600, \
+                        help = "duration of the synthetic stream in seconds")
+    parser.add_argument("--repeat", type = int, default = 3, \
+                        help = "number of repetitions per stage")
+    parser.add_argument("--save", help = "save the results as a JSON baseline")
+    parser.add_argument("--compare", help = "compare the results with a JSON baseline")
+    parser.add_argument("--tolerance", type = float, default = 0.25, \
+                        help = "relative slowdown accepted before flagging a regression")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.duration, args.repeat)
+
+    print(f"{'stage':>18} {'time [s]':>10} {'throughput':>24}")
+    for stage, res in results.items() :
+        rate = res["items"] / res["time"] if res["time"] > 0 else float("inf")
+        print(f"{stage:>18} {res['time']:10.4f} {rate:12.1f} {res['unit'] + '/s':>11}")
+
+    if args.save is not None :
+        with open(args.save, "w") as fout :
+            json.dump({"duration" : args.duration, \
+                       "python" : platform.python_version(), \
+                       "machine" : platform.machine(), \
+                       "results" : results}, fout, indent = 2)
+
+    if args.compare is not None :
+        with open(args.compare) as fin :
+            baseline = json.load(fin)["results"]
+
+        if len(compare_results(results, baseline, args.tolerance)) > 0 :
+            sys.exit(1)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:22:37 2026
+
+@author: daniele
+
+Summary :
+    Benchmark of the SP3 and RINEX clock writers (has_products.py): a day of
+    synthetic HAS corrections (orbits every 30 seconds, clocks every 10
+    seconds) for all the GPS and Galileo satellites, with synthetic broadcast
+    ephemerides renewed every 2 hours, converted into SP3 and clock products
+    at several epoch rates.
+
+    Usage :
+        python bench_products.py [--hours h] [--rates r1 r2 ...] [--keep]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import timefun as tf
+import rinex_nav as rn
+import has_orbits as ho
+import has_products as hp
+
+# first epoch of the data (GPS week and time of week)
+WEEK = 2400
+TOW0 = 345600
+
+# satellites of each GNSS and IOD range
+satellites = {rn.GPS_ID : (32, 256), rn.GAL_ID : (36, 1024)}
+
+
+def iod_of(gnss, prn, t) :
+    """
+    Summary :
+        IOD of the ephemeris of a satellite, renewed every 2 hours.
+    """
+    return (prn * 7 + gnss + (t - TOW0) // 7200) % satellites[gnss][1]
+
+def synthetic_nav(hours) :
+    """
+    Summary :
+        Generate broadcast ephemerides of all the satellites every 2 hours.
+
+    Returns :
+        rinex_nav.ephemeris_store.
+    """
+    records = []
+    for tow in range(TOW0, TOW0 + int(hours * 3600) + 7200, 7200) :
+        for gnss, (num_sats, _) in satellites.items() :
+            for prn in range(1, num_sats + 1) :
+                sqrtA = 5153.6 if gnss == rn.GPS_ID else 5440.6
+
+                # the parameters are propagated to the time of ephemeris: the
+                # orbits of consecutive ephemerides are continuous
+                dt = tow - TOW0
+                n = np.sqrt(ho.MU[gnss] / sqrtA**6) + 4.5e-9
+
+                records.append({"gnssID" : gnss, "PRN" : prn, "IOD" : iod_of(gnss, prn, tow), \
+                                "af0" : 1e-5 * prn + 1e-12 * dt, "af1" : 1e-12, "af2" : 0.0, \
+                                "Crs" : 20.0, "delta_n" : 4.5e-9, "M0" : 0.3 * prn + n * dt, \
+                                "Cuc" : 1e-6, "e" : 0.01, "Cus" : 5e-6, "sqrtA" : sqrtA, \
+                                "toe" : float(tow), "Cic" : 1e-7, \
+                                "OMEGA0" : 0.2 * prn - 8e-9 * dt, \
+                                "Cis" : -5e-8, "i0" : 0.96 + 1e-10 * dt, "Crc" : 250.0, \
+                                "omega" : 0.8, "OMEGA_DOT" : -8e-9, "IDOT" : 1e-10, "week" : WEEK, \
+                                "data_sources" : rn.GAL_INAV if gnss == rn.GAL_ID else np.nan, \
+                                "t_oe" : WEEK * tf.WEEK_SECONDS + float(tow), \
+                                "t_oc" : WEEK * tf.WEEK_SECONDS + float(tow)})
+
+    nav = rn.ephemeris_store()
+    nav.add(pd.DataFrame(records))
+
+    return nav
+
+def synthetic_corrections(basename, hours, rng, clock_interval = 10) :
+    """
+    Summary :
+        Write the orbit and clock correction files of the decoder
+        (<basename>_has_orb.csv, <basename>_has_clk.csv), with orbit
+        corrections every 30 seconds and clock corrections every
+        clock_interval seconds.
+    """
+    orb_tow = np.arange(TOW0, TOW0 + hours * 3600, 30)
+    clk_tow = np.arange(TOW0, TOW0 + hours * 3600, clock_interval)
+
+    for tows, suffix, validity in ((orb_tow, "orb", 300), (clk_tow, "clk", 60)) :
+        frames = []
+        for gnss, (num_sats, _) in satellites.items() :
+            prn = np.tile(np.arange(1, num_sats + 1), len(tows))
+            tow = np.repeat(tows, num_sats)
+
+            df = pd.DataFrame({"ToW" : tow, "WN" : WEEK, "ToH" : tow % 3600, "IOD" : 1, \
+                               "gnssIOD" : iod_of(gnss, prn, tow), "validity" : validity, \
+                               "gnssID" : gnss, "PRN" : prn})
+
+            if suffix == "orb" :
+                for col in ("delta_radial", "delta_in_track", "delta_cross_track") :
+                    df[col] = np.round(rng.normal(size = len(df)) * 0.1, 4)
+            else :
+                df["multiplier"] = 1.0
+                df["delta_clock_c0"] = np.round(rng.normal(size = len(df)) * 0.2, 4)
+                df["status"] = 0
+
+            frames.append(df)
+
+        pd.concat(frames).sort_values("ToW", kind = "stable").to_csv( \
+            f"{basename}_has_{suffix}.csv", index = False)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "SP3 / RINEX clock writers benchmark")
+    parser.add_argument("--hours", type = float, default = 24, \
+                        help = "length of the data in hours")
+    parser.add_argument("--rates", type = float, nargs = "+", default = [30, 5], \
+                        help = "epoch rates in seconds")
+    parser.add_argument("--keep", action = "store_true", \
+                        help = "keep the files produced")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix = "bench_products_")
+    basename = os.path.join(work_dir, "syn")
+
+    rng = np.random.default_rng(0)
+
+    nav = synthetic_nav(args.hours)
+    synthetic_corrections(basename, args.hours, rng)
+
+    print(f"{len(nav)} ephemerides, {args.hours:g} hours of corrections in {work_dir}")
+
+    for rate in args.rates :
+        sp3_name = f"{basename}_{rate:g}s.sp3"
+        clk_name = f"{basename}_{rate:g}s.clk"
+
+        t0 = time.perf_counter()
+        num_epochs = hp.products_from_csv(nav, basename, rate, sp3 = sp3_name, clk = clk_name)
+        elapsed = time.perf_counter() - t0
+
+        size = (os.path.getsize(sp3_name) + os.path.getsize(clk_name)) / 2**20
+
+        print(f"{rate:5g} s: {num_epochs:6d} epochs, {size:7.1f} MB in {elapsed:6.2f} s")
+
+    if not args.keep :
+        shutil.rmtree(work_dir)
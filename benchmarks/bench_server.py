@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:12:40 2026
+
+@author: daniele
+
+Summary :
+    Local load test of the HAS correction server (has_server).
+    A synthetic HAS stream is generated with has_generator and decoded at an
+    accelerated real-time rate while many local clients, running in a separate
+    process, are connected:
+
+        long-poll clients - wait for each new message with /wait and measure
+                            the delay between the notification by the decoder
+                            and the reception of the event
+        query clients     - continuously request the clock corrections of all
+                            the satellites with /corrections/clock
+
+    Usage :
+        python bench_server.py [--duration s] [--speed x] [--clients n]
+                               [--queries n]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import process_cnav as pc
+import has_generator as hg
+import has_server as hs
+import has_correction_store as hcs
+
+
+async def http_get(reader, writer, path) :
+    """
+    Summary :
+        Send a GET request on a persistent connection and read the response.
+
+    Returns :
+        HTTP status and body of the response.
+    """
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+
+    length = 0
+    while True :
+        line = await reader.readline()
+
+        if line in (b"\r\n", b"") :
+            break
+
+        key, _, val = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length" :
+            length = int(val)
+
+    body = await reader.readexactly(length)
+
+    return status, body
+
+async def poll_client(port, done, latencies, counts) :
+    """
+    Summary :
+        Long-poll client: wait for each new message and record the delivery
+        latency.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    since = 0
+    while not done.is_set() :
+        status, body = await http_get(reader, writer, f"/wait?since={since}&timeout=2")
+
+        if status != 200 :
+            continue
+
+        event = json.loads(body)
+        latencies.append(time.time() - event["time"])
+
+        # events skipped since a more recent message arrived meanwhile
+        counts["missed"] += event["seq"] - since - 1
+        since = event["seq"]
+
+    writer.close()
+
+async def query_client(port, done, latencies) :
+    """
+    Summary :
+        Query client: request the clock corrections of all the satellites and
+        record the response time.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    while not done.is_set() :
+        t0 = time.perf_counter()
+        status, body = await http_get(reader, writer, "/corrections/clock")
+        latencies.append(time.perf_counter() - t0)
+
+        # leave some time to the other clients
+        await asyncio.sleep(0.01)
+
+    writer.close()
+
+async def run_clients(port, done, num_clients, num_queries) :
+    """
+    Summary :
+        Run all the clients until the decoding is completed.
+    """
+    poll_latencies = []
+    query_latencies = []
+    counts = {"missed" : 0}
+
+    # asyncio event set when the decoding completes
+    stop = asyncio.Event()
+
+    async def watch() :
+        while not done.is_set() :
+            await asyncio.sleep(0.1)
+        stop.set()
+
+    tasks = [poll_client(port, stop, poll_latencies, counts) for ii in range(num_clients)]
+    tasks += [query_client(port, stop, query_latencies) for ii in range(num_queries)]
+
+    await asyncio.gather(watch(), *tasks)
+
+    return poll_latencies, query_latencies, counts
+
+def client_process(port, ready, done, results, num_clients, num_queries) :
+    """
+    Summary :
+        Body of the process running the clients: the results are sent back
+        through a queue.
+    """
+    async def main() :
+        clients = asyncio.ensure_future(run_clients(port, done, num_clients, num_queries))
+
+        # leave the time to open the connections before the decoding starts
+        await asyncio.sleep(0.5)
+        ready.set()
+
+        return await clients
+
+    results.put(asyncio.run(main()))
+
+def print_latencies(name, latencies) :
+    """
+    Summary :
+        Print the percentiles of a set of latencies.
+    """
+    if len(latencies) == 0 :
+        print(f"{name:>10}: no samples")
+        return
+
+    lat = 1e3 * np.array(latencies)
+    print(f"{name:>10}: {len(lat):7d} samples, p50 {np.percentile(lat, 50):7.2f} ms, " + \
+          f"p95 {np.percentile(lat, 95):7.2f} ms, p99 {np.percentile(lat, 99):7.2f} ms, " + \
+          f"max {np.max(lat):7.2f} ms")
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "HAS correction server load test")
+    parser.add_argument("--duration", type = int, default = 300, \
+                        help = "duration of the synthetic stream in seconds")
+    parser.add_argument("--speed", type = float, default = 10, \
+                        help = "multiple of the real-time rate")
+    parser.add_argument("--clients", type = int, default = 200, \
+                        help = "number of long-poll clients")
+    parser.add_argument("--queries", type = int, default = 20, \
+                        help = "number of query clients")
+    args = parser.parse_args()
+
+    df = hg.has_stream_generator().generate(args.duration)
+
+    store = hcs.has_correction_store()
+    server = hs.correction_server(store, "127.0.0.1", 0)
+    server.start()
+
+    # the clients are started in a fresh interpreter, not sharing the
+    # interpreter lock with the server and the decoder
+    ctx = multiprocessing.get_context("spawn")
+
+    ready = ctx.Event()
+    done = ctx.Event()
+    results = ctx.Queue()
+
+    clients = ctx.Process(target = client_process, \
+                          args = (server.port, ready, done, results, \
+                                  args.clients, args.queries))
+    clients.start()
+    ready.wait()
+
+    start = {}
+
+    def pace(tow, week) :
+        # the messages are released, and their corrections stored, at the
+        # simulated real-time rate
+        if len(start) == 0 :
+            start["tow"] = tow
+            start["wall"] = time.monotonic()
+
+        delay = (tow - start["tow"]) / args.speed - (time.monotonic() - start["wall"])
+        if delay > 0 :
+            time.sleep(delay)
+
+    t0 = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as tmp_dir :
+        pc.decode_data(df, os.path.join(tmp_dir, "synthetic"), _store = store, \
+                       _on_message = server.notify, _before_message = pace)
+
+    # let the clients receive the last message
+    time.sleep(0.5)
+    done.set()
+
+    poll_latencies, query_latencies, counts = results.get()
+    elapsed = time.perf_counter() - t0
+    clients.join()
+
+    server.stop()
+
+    print(f"\nMessages notified: {server.seq}, clients: {args.clients} long-poll, " + \
+          f"{args.queries} query, elapsed {elapsed:.1f} s")
+    print(f"Events missed by the long-poll clients: {counts['missed']}")
+    print_latencies("delivery", poll_latencies)
+    print_latencies("query", query_latencies)
+    print(f"Query throughput: {len(query_latencies) / elapsed:.1f} requests/s")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:08:44 2026
+
+@author: daniele
+
+Summary :
+    Benchmark of the SISRE evaluation (has_sisre.py): synthetic HAS
+    corrections for all the GPS and Galileo satellites (see
+    bench_products.py) evaluated against reference products computed from
+    the same broadcast ephemerides without corrections (SP3 every 5 minutes,
+    clocks every 30 seconds). The errors reproduce the corrections, the
+    interpolation of the reference orbits adds less than a millimetre.
+
+    Usage :
+        python bench_sisre.py [--days d] [--rate s] [--processes p] [--keep]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import has_products as hp
+import has_sisre as hs
+
+import bench_products as bp
+
+
+def reference_products(nav, hours, sp3_name, clk_name) :
+    """
+    Summary :
+        Write the reference products: broadcast orbits and clocks without
+        corrections.
+    """
+    sats = sorted(set(zip(nav.records["gnssID"].tolist(), nav.records["PRN"].tolist())))
+    gnss = np.array([sat[0] for sat in sats])
+    prn = np.array([sat[1] for sat in sats])
+
+    for name, rate, sp3, clk in ((sp3_name, 300, sp3_name, None), (clk_name, 30, None, clk_name)) :
+        writer = hp.product_writer(nav, rate, sp3, clk, sats)
+
+        tows = np.arange(bp.TOW0, bp.TOW0 + hours * 3600 + 1e-6, rate)
+
+        for ii in range(0, len(tows), 720) :
+            tow = tows[ii:ii + 720]
+            epoch = np.repeat(np.arange(len(tow)), len(sats))
+
+            row_gnss = np.tile(gnss, len(tow))
+            row_prn = np.tile(prn, len(tow))
+            iod = np.array([bp.iod_of(g, p, t) for g, p, t in \
+                            zip(row_gnss, row_prn, tow[epoch])])
+            zeros = np.zeros(len(epoch))
+
+            writer.write(bp.WEEK * 604800 + tow, epoch, row_gnss, row_prn, iod, \
+                         zeros, zeros, zeros, zeros + 1, zeros)
+
+        writer.close()
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "SISRE evaluation benchmark")
+    parser.add_argument("--days", type = float, default = 30, \
+                        help = "length of the data in days")
+    parser.add_argument("--rate", type = float, default = 30, \
+                        help = "interval of the evaluation epochs in seconds")
+    parser.add_argument("--processes", type = int, default = os.cpu_count(), \
+                        help = "number of processes")
+    parser.add_argument("--keep", action = "store_true", \
+                        help = "keep the files produced")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix = "bench_sisre_")
+    basename = os.path.join(work_dir, "syn")
+
+    hours = args.days * 24
+    rng = np.random.default_rng(0)
+
+    t0 = time.perf_counter()
+
+    nav = bp.synthetic_nav(hours)
+    bp.synthetic_corrections(basename, hours, rng, clock_interval = 30)
+    reference_products(nav, hours, basename + "_ref.sp3", basename + "_ref.clk")
+
+    print(f"{args.days:g} days of synthetic data generated in {time.perf_counter() - t0:.1f} s")
+
+    for processes in sorted(set([1, args.processes])) :
+        t0 = time.perf_counter()
+        errors = hs.evaluate(nav, basename, basename + "_ref.sp3", basename + "_ref.clk", \
+                             args.rate, processes = processes)
+        stats = hs.daily_stats(errors)
+
+        print(f"{processes:2d} processes: {len(errors)} epochs x satellites, " + \
+              f"{len(stats)} daily statistics in {time.perf_counter() - t0:7.2f} s")
+
+    # the corrections are normally distributed with sigma 0.1 m (orbit) and
+    # 0.2 m (clock)
+    print(hs.daily_stats(errors, by_satellite = False).head(4).to_string(index = False))
+
+    if not args.keep :
+        shutil.rmtree(work_dir)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:12:40 2026
+
+@author: daniele
+
+Summary :
+    Shared pytest fixtures: a short synthetic HAS page stream (has_generator)
+    written in the supported receiver formats, and RINEX navigation files.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import has_generator as hg
+import timefun as tf
+
+# Length of the synthetic stream in seconds
+STREAM_DURATION = 240
+
+# First epoch of the navigation files
+WN = 2400
+TOW = 345600
+
+# Time between the ephemerides of the navigation files, and their number
+NAV_INTERVAL = 7200
+NAV_RECORDS = 13
+
+# Duration of the correction files in seconds
+CORRECTION_DURATION = 4 * 3600
+
+
+@pytest.fixture(scope = "session")
+def pages() :
+    """
+    Summary :
+        Error-free synthetic page stream, in the data_loading format.
+    """
+    return hg.has_stream_generator(seed = 1).generate(STREAM_DURATION)
+
+@pytest.fixture(scope = "session")
+def stream_files(pages, tmp_path_factory) :
+    """
+    Summary :
+        The synthetic page stream written in all the receiver formats, see
+        has_generator.write_all_formats.
+    """
+    work_dir = tmp_path_factory.mktemp("stream")
+
+    return hg.write_all_formats(pages, str(work_dir / "syn"))
+
+def nav_record(system, prn, wn, tow, values) :
+    """
+    Summary :
+        Lines of a RINEX 3/4 navigation record.
+
+    Arguments :
+        system - RINEX system identifier ("G", "E", ...)
+        prn - satellite number
+        wn, tow - time of clock
+        values - parameters in the order of rinex_nav.record_fields, None for
+                 the blank fields
+    """
+    date = pd.Timestamp(tf.GpsToDatetime(wn, tow)).strftime("%Y %m %d %H %M %S")
+
+    def field(val) :
+        return " " * 19 if val is None else f"{val:19.12E}".replace("E", "D")
+
+    lines = [f"{system}{prn:02d} {date}" + "".join(field(val) for val in values[:3])]
+    for ii in range(3, len(values), 4) :
+        lines.append("    " + "".join(field(val) for val in values[ii:ii + 4]))
+
+    return lines
+
+def gps_values(prn, iod, wn, toe) :
+    """
+    Summary :
+        Parameters of a GPS LNAV record (orbit of radius close to 26560 km).
+    """
+    return [1e-4 * prn, 1e-12, 0.0,
+            iod, 20.0, 4.5e-9, 0.5 + prn,
+            1e-6, 0.01, 5e-6, 5153.6,
+            toe, 1e-7, 1.2 + 0.2 * prn, -5e-8,
+            0.96, 250.0, 0.8, -8e-9,
+            1e-10, 1, wn, 0,
+            2.0, 0, -1e-8, iod,
+            toe - 30, 4]
+
+def gal_values(prn, iod, wn, toe, sources = 517) :
+    """
+    Summary :
+        Parameters of a Galileo record, I/NAV by default (orbit of radius
+        close to 29600 km).
+    """
+    return [5e-4, 1e-12, 0.0,
+            iod, -30.0, 3e-9, 1.0 + prn,
+            -1e-6, 0.0002, 7e-6, 5440.6,
+            toe, 2e-8, -0.4 + 0.17 * prn, 1e-8,
+            0.98, 150.0, -0.5, -5.5e-9,
+            2e-10, sources, wn, None,
+            3.12, 0, 1e-9, 1.2e-9,
+            toe - 10]
+
+def nav_iod(gnss, prn, index) :
+    """
+    Summary :
+        IOD of the index-th ephemeris of a satellite in the navigation files.
+    """
+    return (prn * 7 + index) % 256 if gnss == 0 else (prn * 5 + index) % 1024
+
+def write_rinex_nav(filename, records, version = "3.04") :
+    """
+    Summary :
+        Write a RINEX navigation file.
+
+    Arguments :
+        filename - pathname of the file
+        records - list of records (list of lines, see nav_record) or of
+                  RINEX 4 record headers ("> EPH G01 LNAV")
+        version - RINEX version
+    """
+    lines = [f"{version:>9s}           N: GNSS NAV DATA    M: MIXED            RINEX VERSION / TYPE",
+             " " * 60 + "END OF HEADER"]
+
+    for record in records :
+        lines += [record] if isinstance(record, str) else record
+
+    with open(filename, "w") as fout :
+        fout.write("\n".join(lines) + "\n")
+
+@pytest.fixture(scope = "session")
+def rinex_nav() :
+    """
+    Summary :
+        Helpers writing RINEX navigation files.
+    """
+    return SimpleNamespace(record = nav_record, gps = gps_values, gal = gal_values, \
+                           iod = nav_iod, write = write_rinex_nav, wn = WN, tow = TOW, \
+                           interval = NAV_INTERVAL)
+
+@pytest.fixture(scope = "session")
+def nav_file(tmp_path_factory) :
+    """
+    Summary :
+        Navigation file with the ephemerides of GPS and Galileo satellites
+        1 to 8 every two hours, starting at the first epoch of the synthetic
+        stream. The IODs are given by nav_iod.
+    """
+    records = []
+    for index in range(NAV_RECORDS) :
+        toe = TOW + index * NAV_INTERVAL
+
+        for prn in range(1, 9) :
+            records.append(nav_record("G", prn, WN, toe, gps_values(prn, nav_iod(0, prn, index), WN, toe)))
+            records.append(nav_record("E", prn, WN, toe, gal_values(prn, nav_iod(2, prn, index), WN, toe)))
+
+    filename = str(tmp_path_factory.mktemp("nav") / "nav.rnx")
+    write_rinex_nav(filename, records)
+
+    return filename
+
+@pytest.fixture(scope = "session")
+def correction_files(tmp_path_factory) :
+    """
+    Summary :
+        Orbit and clock corrections of the satellites of nav_file, in the
+        format of the decoder (<basename>_has_orb.csv, <basename>_has_clk.csv),
+        referred to its ephemerides: orbits received every 30 s and clocks
+        every 10 s. The clock corrections of GPS 3 stop for 900 s after two
+        hours and the clocks of the satellites 5 should not be used.
+
+    Returns :
+        The basename of the files.
+    """
+    orbits = []
+    clocks = []
+    for tow in range(TOW, TOW + CORRECTION_DURATION, 10) :
+        index = (tow - TOW) // NAV_INTERVAL
+
+        for gnss in (0, 2) :
+            for prn in range(1, 9) :
+                iod = nav_iod(gnss, prn, index)
+
+                if tow % 30 == 0 :
+                    orbits.append((tow, WN, tow % 3600, 1, iod, 300, gnss, prn, \
+                                   0.01 * prn, 0.02, -0.03))
+
+                if gnss == 0 and prn == 3 and 7200 < tow - TOW < 8100 :
+                    continue
+
+                clocks.append((tow, WN, tow % 3600, 1, iod, 60, gnss, prn, \
+                               1.0, 0.001 * (tow % 97), 1 if prn == 5 else 0))
+
+    basename = str(tmp_path_factory.mktemp("products") / "cor")
+
+    pd.DataFrame(orbits, columns = ["ToW", "WN", "ToH", "IOD", "gnssIOD", "validity", "gnssID", \
+                                    "PRN", "delta_radial", "delta_in_track", \
+                                    "delta_cross_track"]).to_csv(basename + "_has_orb.csv", index = False)
+    pd.DataFrame(clocks, columns = ["ToW", "WN", "ToH", "IOD", "gnssIOD", "validity", "gnssID", \
+                                    "PRN", "multiplier", "delta_clock_c0", \
+                                    "status"]).to_csv(basename + "_has_clk.csv", index = False)
+
+    return basename
@@ -11,6 +11,23 @@ import numpy as np
 import timefun as tf
 import struct
 
+import io
+import os
+import gzip
+import bz2
+import lzma
+import shutil
+import zipfile
+import subprocess
+
+import has_profiler as hp
+
+# Optional multi-threaded gzip decompression through python-isal
+try :
+    from isal import igzip_threaded
+except ImportError :
+    igzip_threaded = None
+
 """
 Summary :
     Set of functions implementing data loading from different file formats
@@ -18,7 +35,232 @@ Summary :
      Mainly based on the code developed by Melania Susi.
 """
 
+# External multi-threaded decompressors, in order of preference. Each entry is
+# a command that writes the decompressed stream of the file appended to it to
+# the standard output.
+mt_decompressors = { ".gz" : [["pigz", "-dc"]],
+                     ".bz2" : [["lbzip2", "-dc"], ["pbzip2", "-dc"]],
+                     ".xz" : [["xz", "-T0", "-dc"]] }
+
+# Use the multi-threaded decompressors when available
+parallel_decompression = True
+
+# Python modules used when no external decompressor is available
+py_decompressors = { ".gz" : gzip.open,
+                     ".bz2" : bz2.open,
+                     ".xz" : lzma.open }
+
+# Decompressed bytes read from each compressed file opened while profiling
+bytes_read = {}
+
+class _pipe_reader(io.RawIOBase) :
+    """
+        Summary :
+            Raw stream reading the standard output of an external
+            decompression process.
+    """
+    def __init__(self, cmd) :
+        self.proc = subprocess.Popen(cmd, stdout = subprocess.PIPE, \
+                                     stderr = subprocess.DEVNULL)
+        self.eof = False
+        
+    def readable(self) :
+        return True
+    
+    def readinto(self, buffer) :
+        nbytes = self.proc.stdout.readinto(buffer)
+        
+        if nbytes == 0 :
+            self.eof = True
+            
+        return nbytes
+    
+    def close(self) :
+        if not self.closed :
+            self.proc.stdout.close()
+            
+            # If the stream was not fully read the process is stopped by a
+            # broken pipe: this is not an error
+            if self.proc.wait() != 0 and self.eof :
+                super().close()
+                raise OSError(f"Decompression failed: {' '.join(self.proc.args)}")
+                
+        super().close()
+
+class _offset_reader :
+    """
+        Summary :
+            Wrapper of a binary file object keeping track of the offset of the 
+            data read. It is used instead of tell() since streams provided by 
+            external decompressors are not seekable.
+    """
+    def __init__(self, fid, start = 0) :
+        self.fid = fid
+        self.offset = start
+        
+    def read(self, size = -1) :
+        data = self.fid.read(size)
+        self.offset += len(data)
+        return data
+    
+    def readline(self) :
+        line = self.fid.readline()
+        self.offset += len(line)
+        return line
+    
+    def close(self) :
+        self.fid.close()
+
+class _counting_reader(io.RawIOBase) :
+    """
+        Summary :
+            Raw stream counting the bytes read from a decompressed stream,
+            used by the profiling hooks: the size of a compressed file is not
+            the amount of data parsed.
+    """
+    def __init__(self, fid, filename) :
+        self.fid = fid
+        self.filename = filename
+        bytes_read[filename] = 0
+        
+    def readable(self) :
+        return True
+    
+    def readinto(self, buffer) :
+        nbytes = self.fid.readinto(buffer)
+        bytes_read[self.filename] += nbytes
+        
+        return nbytes
+    
+    def close(self) :
+        if not self.closed :
+            self.fid.close()
+            
+        super().close()
+
+def seek_file(fid, start : int) :
+    """
+        Summary :
+            Move to a byte offset of a file opened by open_file. If the stream
+            is not seekable (e.g. external decompressor), the data before the
+            offset are read and discarded.
+        
+        Arguments :
+            fid - the file object
+            start - byte offset in the (decompressed) stream
+    """
+    if start <= 0 :
+        return
+    
+    try :
+        fid.seek(start)
+    except (OSError, io.UnsupportedOperation) :
+        remaining = start
+        while remaining > 0 :
+            data = fid.read(min(remaining, 1 << 20))
+            if len(data) == 0 :
+                break
+            remaining -= len(data)
+
+def _load_counters(args, df) :
+    """
+        Summary :
+            Quantities processed by a loader, used by the profiling hooks.
+    """
+    # decompressed bytes read, size of the file if not compressed
+    num_bytes = bytes_read.pop(args[0], None)
+    
+    if num_bytes is None :
+        num_bytes = os.path.getsize(args[0])
+        
+    return {"bytes" : num_bytes, "records" : len(df)}
+
+def get_compression(filename : str) :
+    """
+        Summary :
+            Determine the compression type from the file extension.
+        
+        Arguments :
+            filename - pathname of the file
+            
+        Returns :
+            The file extension of the compression (".gz", ".bz2", ".xz", ".zip")
+            or None if the file is not compressed.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    
+    if ext in py_decompressors or ext == ".zip" :
+        return ext
+    
+    return None
+
+def open_file(filename : str, mode : str = "rb", parallel : bool = None) :
+    """
+        Summary :
+            Open a possibly compressed input file. Compressed files are
+            decompressed on the fly while reading: no temporary file is written
+            and the uncompressed data are never held in memory as a whole.
+            When available, a multi-threaded decompressor is used.
+        
+        Arguments :
+            filename - pathname of the file to be opened
+            mode - "rb" for a binary stream, "r" for a text stream
+            parallel - if True, use multi-threaded decompressors when available.
+                       If None, the module setting "parallel_decompression"
+                       is used.
+            
+        Returns :
+            A file object providing the decompressed data.
+    """
+    ext = get_compression(filename)
+    
+    if ext is None :
+        fid = open(filename, "rb")
+        
+    elif ext == ".zip" :
+        # Stream the first file of the archive
+        archive = zipfile.ZipFile(filename)
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        
+        if len(members) == 0 :
+            archive.close()
+            raise Exception(f"Empty zip archive: {filename}")
+        
+        fid = archive.open(members[0])
+        
+        # The member keeps the archive file open until it is closed
+        archive.close()
+        
+    else :
+        fid = None
+        
+        if parallel is None :
+            parallel = parallel_decompression
+        
+        if parallel :
+            if ext == ".gz" and igzip_threaded is not None :
+                fid = igzip_threaded.open(filename, "rb", threads = os.cpu_count())
+            else :
+                for cmd in mt_decompressors[ext] :
+                    if shutil.which(cmd[0]) is not None :
+                        fid = io.BufferedReader(_pipe_reader(cmd + [filename]), \
+                                                buffer_size = 1 << 20)
+                        break
+                    
+        if fid is None :
+            fid = py_decompressors[ext](filename, "rb")
+            
+    # count the bytes actually parsed
+    if ext is not None and hp.enabled :
+        fid = io.BufferedReader(_counting_reader(fid, filename), buffer_size = 1 << 20)
+        
+    if mode == "r" :
+        fid = io.TextIOWrapper(fid, encoding = "utf-8")
+        
+    return fid
+
 
+@hp.profile("load", _load_counters)
 def load_from_parsed_Septentrio(filename : str, _type : str = "hexa" ) :
     """
         Summary :
@@ -47,12 +289,9 @@ def load_from_parsed_Septentrio(filename : str, _type : str = "hexa" ) :
                        "word 15", "word 16"]
         
         
-        if filename.endswith('.zip') :               
-            df = pd.read_csv(filename, compression='zip', sep=',| ', names=header_list, \
-                         engine='python', dtype = data_types)
-        else :
-            df = pd.read_csv(filename, sep=',| ', names=header_list, \
-                         engine='python', dtype = data_types)
+        with open_file(filename, "r") as fid :
+            df = pd.read_csv(fid, sep=',| ', names=header_list, \
+                             engine='python', dtype = data_types)
                     
     elif _type == "hexa" :
         header_list = ["TOW", "WNc [w]", "SVID", "CRCPassed", "ViterbiCnt", "signalType",\
@@ -80,12 +319,9 @@ def load_from_parsed_Septentrio(filename : str, _type : str = "hexa" ) :
             "word 16" : lambda x: int(x, 16)
             }
         
-        if filename.endswith('.zip') :
-            df = pd.read_csv(filename, compression='zip', sep=',| ', names=header_list, \
-                         engine='python', converters = converters)
-        else :
-            df = pd.read_csv(filename, sep=',| ', names=header_list, \
-                         engine='python', converters = converters)
+        with open_file(filename, "r") as fid :
+            df = pd.read_csv(fid, sep=',| ', names=header_list, \
+                             engine='python', converters = converters)
         
         IsInterpreted = False        
                 
@@ -108,17 +344,28 @@ def load_from_parsed_Septentrio(filename : str, _type : str = "hexa" ) :
 
     return df
 
-def load_from_binary_Septentrio(filename : str) :
+@hp.profile("load", _load_counters)
+def load_from_binary_Septentrio(filename : str, start : int = 0, stop_tow : float = None, \
+                                offsets : bool = False) :
     """
         Summary :
             Load the data from a Septentrio (SBF) binary file.
         
         Arguments :
             filename - pathname of the file to be loaded
+            start - byte offset where the reading starts
+            stop_tow - if not None, the reading stops at the first record with
+                       a time of week larger than stop_tow
+            offsets - if True, the byte offset of each record is provided in
+                      the "Offset" column
     """
     
-    # Open the input file
-    fid = open(filename, "rb")
+    # Open the input file (compressed files are decompressed on the fly)
+    fid = open_file(filename)
+    seek_file(fid, start)
+    
+    if offsets :
+        fid = _offset_reader(fid, start)
     
     # Dictionary with the parsed information
     data = { "TOW" : [], 
@@ -145,6 +392,9 @@ def load_from_binary_Septentrio(filename : str) :
              "word 16": []
             }
     
+    if offsets :
+        data["Offset"] = []
+    
     # Local functions
     def get_message( fid ) :
         """
@@ -233,6 +483,13 @@ def load_from_binary_Septentrio(filename : str) :
         # get the time stamps
         ToW, WN = get_time_stamp( msg[1] )
         
+        if stop_tow is not None and ToW > stop_tow :
+            break
+        
+        if offsets :
+            # sync (2 bytes) and header (6 bytes) precede the payload
+            data["Offset"].append(fid.offset - len(msg[1]) - 8)
+        
         data["TOW"].append(ToW)
         data["WNc [w]"].append(WN)
         
@@ -258,17 +515,27 @@ def load_from_binary_Septentrio(filename : str) :
     
     return df
     
-def load_from_Javad(filename : str ) :
+@hp.profile("load", _load_counters)
+def load_from_Javad(filename : str, start : int = 0, stop_tow : float = None, \
+                    offsets : bool = False) :
     """
         Summary :
             Load the data from a Javad binary file.
         
         Arguments :
             filename - pathname of the file to be loaded
+            start - byte offset where the reading starts. The week number is
+                    obtained from the RD006 records: it is set to zero until
+                    the first RD006 record after start is found.
+            stop_tow - if not None, the reading stops at the first record with
+                       a time of week larger than stop_tow
+            offsets - if True, the byte offset of each record is provided in
+                      the "Offset" column
     """
     
-    # Open the input file
-    fid = open(filename, "rb")
+    # Open the input file (compressed files are decompressed on the fly)
+    fid = _offset_reader(open_file(filename), start)
+    seek_file(fid.fid, start)
     
     # Dictionary with the parsed information
     data = { "TOW" : [], 
@@ -295,11 +562,15 @@ def load_from_Javad(filename : str ) :
              "word 16": []
             }
     
+    if offsets :
+        data["Offset"] = []
+    
     WN = 0
     
     # read the file line by line
     while True :
         
+        line_offset = fid.offset
         line = fid.readline()
         if not line :
             break
@@ -340,12 +611,19 @@ def load_from_Javad(filename : str ) :
                 line1 = fid.readline()
                 line = line + line1
             
+            # Time of receiving message
+            ToW = int.from_bytes( line[6:10], 'little')
+            
+            if stop_tow is not None and ToW > stop_tow :
+                break
+            
+            if offsets :
+                data["Offset"].append(line_offset)
+            
             # prn
             prn = line[5]
             data["SVID"].append(prn)
             
-            # Time of receiving message
-            ToW = int.from_bytes( line[6:10], 'little')
             data["TOW"].append(ToW)
             data["WNc [w]"].append(WN)
             
@@ -372,6 +650,7 @@ def load_from_Javad(filename : str ) :
     
     return df
 
+@hp.profile("load", _load_counters)
 def load_from_TopCon(filename : str ) :
     """
         Summary :
@@ -381,8 +660,8 @@ def load_from_TopCon(filename : str ) :
         Arguments :
             filename - pathname of the file to be loaded
     """
-    # Open the input file
-    fid = open(filename, "rb")
+    # Open the input file (compressed files are decompressed on the fly)
+    fid = open_file(filename)
     
     # Dictionary with the parsed information
     data = { "TOW" : [], 
@@ -412,10 +691,11 @@ def load_from_TopCon(filename : str ) :
     WN = 0
     ToW = 0
     year = 0
-    month = 0
-    day = 0
     daysec = 0 
     
+    # time of week at the beginning of the current day
+    day_tow = 0
+    
     # read the file line by line
     while True :
         
@@ -439,10 +719,11 @@ def load_from_TopCon(filename : str ) :
             month = line[7]
             day   = line[8]
             
-            hour = daysec / 3600.0
+            # compute the GPS week and the time of week at the beginning of
+            # the day: the date conversion is performed once per day
+            day_tow, WN = tf.DateToGPS(year, month, day, 0)
             
-            # compute the GPS week
-            ToW, WN = tf.DateToGPS(year, month, day, hour)
+            ToW = int(day_tow + daysec + 0.5)
             
             continue
         
@@ -452,10 +733,9 @@ def load_from_TopCon(filename : str ) :
             # seconds of the day
             daysec = int.from_bytes( line[5:9], 'little') / 1000.0
             
-            # compute the GPS week
+            # compute the time of week
             if year != 0 :
-                hour = daysec / 3600.0
-                ToW, WN = tf.DateToGPS(year, month, day, hour)
+                ToW = int(day_tow + daysec + 0.5)
             
             continue
 
@@ -487,16 +767,24 @@ def load_from_TopCon(filename : str ) :
     
     return df
 
-def load_from_Novatel(filename : str ) :
+@hp.profile("load", _load_counters)
+def load_from_Novatel(filename : str, start : int = 0, stop_tow : float = None, \
+                      offsets : bool = False) :
     """
         Summary :
             Load the data from a Novatel data file. 
         
         Arguments :
             filename - pathname of the file to be loaded
+            start - byte offset where the reading starts
+            stop_tow - if not None, the reading stops at the first record with
+                       a time of week larger than stop_tow
+            offsets - if True, the byte offset of each record is provided in
+                      the "Offset" column
     """
-    # Open the input file
-    fid = open(filename, "rb")
+    # Open the input file (compressed files are decompressed on the fly)
+    fid = _offset_reader(open_file(filename), start)
+    seek_file(fid.fid, start)
     
     # Dictionary with the parsed information
     data = { "TOW" : [], 
@@ -523,11 +811,15 @@ def load_from_Novatel(filename : str ) :
              "word 16": []
             }
     
+    if offsets :
+        data["Offset"] = []
+    
     WN = 0
     
     # read the file line by line
     while True :
         
+        line_offset = fid.offset
         line = fid.readline()
         if not line :
             break
@@ -555,6 +847,9 @@ def load_from_Novatel(filename : str ) :
             else :
                 continue
             
+            if stop_tow is not None and ToW > stop_tow :
+                break
+            
             # Now read the next line that contains the PRN info and the payload
             line = fid.readline()
             
@@ -572,6 +867,9 @@ def load_from_Novatel(filename : str ) :
             payload = split_line[-1]
             
             # Write the extracted information to the dictionary
+            if offsets :
+                data["Offset"].append(line_offset)
+                
             data["SVID"].append(prn)
             data["TOW"].append(ToW)
             data["WNc [w]"].append(WN)
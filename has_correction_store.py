@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:48:22 2026
+
+@author: daniele
+
+Summary :
+    In-memory store of the HAS corrections, updated by the decoder while the
+    messages are interpreted. For each correction type, the last corrections
+    received are kept in a ring buffer indexed by (gnss ID, PRN, signal),
+    updated in place, so that the latest correction of a satellite is
+    retrieved in constant time, without re-reading the CSV files.
+
+    The ring buffers of a correction type and GNSS are the rows of
+    preallocated arrays (one row per satellite and signal, one column per
+    element of the buffers) with an array of head pointers: the corrections
+    valid at an epoch are selected for all the satellites with array
+    operations.
+
+    Times are expressed as (WN, ToW). The reference time of a correction is
+    derived from the ToH of the MT1 header (see timefun.ToHToTow): a
+    correction is valid from its reference time up to the end of its
+    validity interval.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+
+import timefun as tf
+
+# seconds in a week
+WEEK_SECONDS = tf.WEEK_SECONDS
+
+# initial number of rows of the ring buffer tables
+INITIAL_ROWS = 16
+
+
+class has_correction_store :
+    """
+    Summary :
+        Ring buffers of the last corrections received, for each correction
+        type and for each (gnss ID, PRN, signal). Orbit and clock corrections
+        are stored with signal None, biases are stored for each of their
+        signals.
+
+        For each correction type and GNSS, the buffers are stored in a table:
+        a dictionary of (rows, depth) arrays, one row per (PRN, signal), with
+        the head pointer (position of the last correction received) and the
+        number of elements of each row. A new correction overwrites the
+        oldest element of its row.
+    """
+
+    # correction types and corresponding fields returned by get_epoch
+    fields = {"orbit" : ("delta_radial", "delta_in_track", "delta_cross_track"),
+              "clock" : ("multiplier", "delta_clock_c0", "status"),
+              "code_bias" : ("bias", "availability_flag"),
+              "phase_bias" : ("bias", "availability_flag", "discontinuity_ind")}
+
+    # values of each element of the buffers in addition to the fields: the
+    # has_correction object and the index of the signal in the correction
+    # are kept to return the objects themselves (see latest)
+    columns = ("t_ref", "validity", "IOD", "gnssIOD", "cor", "index")
+
+    def __init__(self, depth : int = 8) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            depth - number of corrections kept for each (gnss ID, PRN, signal)
+        """
+        self.depth = depth
+
+        # for each correction type, dictionary of tables indexed by gnss ID
+        self.tables = {ctype : {} for ctype in self.fields}
+
+        # number of corrections stored, by type
+        self.counts = {ctype : 0 for ctype in self.fields}
+
+        # the store can be updated by the decoder while queried from another
+        # thread (e.g. by has_server)
+        self.lock = threading.RLock()
+
+    def __len__(self) :
+        with self.lock :
+            return sum(int(np.sum(table["filled"][:table["size"]].any(axis = 1))) \
+                       for tables in self.tables.values() for table in tables.values())
+
+    @staticmethod
+    def _field_values(ctype, cor, ii) :
+        """
+        Summary :
+            Values of the fields of a correction, for its ii-th signal in the
+            case of biases.
+        """
+        if ctype == "orbit" :
+            return cor.delta_radial, cor.delta_in_track, cor.delta_cross_track
+
+        if ctype == "clock" :
+            return cor.multiplier, cor.delta_clock_c0, cor.status
+
+        if ctype == "code_bias" :
+            return cor.biases[ii], cor.availability_flags[ii]
+
+        return cor.biases[ii], cor.availability_flags[ii], cor.phase_discontinuity_inds[ii]
+
+    def _new_table(self, ctype, values) :
+        """
+        Summary :
+            Empty table of a correction type and GNSS, the types of the
+            fields are the ones of their first values.
+        """
+        rows = INITIAL_ROWS
+
+        table = {"keys" : {}, "size" : 0,
+                 "PRN" : np.zeros(rows, dtype = np.int64),
+                 "signal" : np.zeros(rows, dtype = np.int64),
+                 "head" : np.full(rows, -1, dtype = np.int64),
+                 "filled" : np.zeros((rows, self.depth), dtype = bool)}
+
+        for name in self.columns :
+            table[name] = np.empty((rows, self.depth), dtype = object) if name == "cor" else \
+                          np.zeros((rows, self.depth), dtype = np.int64)
+
+        for field, value in zip(self.fields[ctype], values) :
+            table[field] = np.zeros((rows, self.depth), dtype = np.asarray(value).dtype)
+
+        return table
+
+    @staticmethod
+    def _grow(table) :
+        """
+        Summary :
+            Double the number of rows of a table.
+        """
+        for name, values in table.items() :
+            if isinstance(values, np.ndarray) :
+                extra = np.zeros_like(values) if values.dtype != object else \
+                        np.empty(values.shape, dtype = object)
+                if name == "head" :
+                    extra[:] = -1
+
+                table[name] = np.concatenate((values, extra))
+
+    def add(self, ctype : str, corrections) :
+        """
+        Summary :
+            Add a list of corrections to the store.
+
+        Arguments :
+            ctype - correction type (orbit, clock, code_bias, phase_bias)
+            corrections - list of has_correction objects of the same type
+        """
+        if ctype not in self.tables :
+            raise Exception(f"Unknown correction type: {ctype}")
+
+        tables = self.tables[ctype]
+
+        with self.lock :
+            for cor in corrections :
+                # absolute reference time in seconds
+                t_ref = int(tf.ToHToTow(int(cor.tow), int(cor.toh), int(cor.wn)))
+
+                if ctype in ("orbit", "clock") :
+                    signals = [-1]
+                else :
+                    signals = [int(sig) for sig in cor.signals]
+
+                for ii, sig in enumerate(signals) :
+                    values = self._field_values(ctype, cor, ii)
+
+                    table = tables.get(int(cor.gnss_ID))
+                    if table is None :
+                        table = self._new_table(ctype, values)
+                        tables[int(cor.gnss_ID)] = table
+
+                    # row of the satellite and signal
+                    row = table["keys"].get((int(cor.prn), sig))
+                    if row is None :
+                        row = table["size"]
+                        if row == len(table["head"]) :
+                            self._grow(table)
+
+                        table["keys"][(int(cor.prn), sig)] = row
+                        table["PRN"][row] = int(cor.prn)
+                        table["signal"][row] = sig
+                        table["size"] += 1
+
+                    # the oldest element is overwritten
+                    pos = (table["head"][row] + 1) % self.depth
+                    table["head"][row] = pos
+
+                    table["filled"][row, pos] = True
+                    table["t_ref"][row, pos] = t_ref
+                    table["validity"][row, pos] = int(cor.validity)
+                    table["IOD"][row, pos] = int(cor.IOD)
+                    table["gnssIOD"][row, pos] = int(cor.gnss_IOD)
+                    table["cor"][row, pos] = cor
+                    table["index"][row, pos] = ii
+
+                    for field, value in zip(self.fields[ctype], values) :
+                        table[field][row, pos] = value
+
+                self.counts[ctype] += len(signals)
+
+    def _select(self, table, rows, t) :
+        """
+        Summary :
+            For each row, select the last correction received with reference
+            time not after t, if still valid at t, or the last correction
+            received if t is None. Corrections with undefined validity (-1)
+            do not expire.
+
+        Arguments :
+            table - table of a correction type and GNSS
+            rows - array of rows
+            t - absolute time in seconds (scalar or array with the shape of
+                rows), or None
+
+        Returns :
+            Array with the positions of the corrections in the rows, -1 where
+            no correction is valid.
+        """
+        # positions of the elements of the buffers, from the newest one
+        pos = (table["head"][rows, None] - np.arange(self.depth)) % self.depth
+        rows = rows[:, None]
+
+        candidate = table["filled"][rows, pos]
+        if t is not None :
+            t = np.broadcast_to(np.asarray(t, dtype = np.float64), rows.shape[:1])[:, None]
+            candidate &= table["t_ref"][rows, pos] <= t
+
+        # the older elements are superseded by the first candidate
+        first = np.argmax(candidate, axis = 1)
+        ok = candidate[np.arange(len(first)), first]
+
+        out = np.where(ok, pos[np.arange(len(first)), first], -1)
+
+        if t is not None :
+            sel = out >= 0
+            validity = table["validity"][rows[sel, 0], out[sel]]
+            t_ref = table["t_ref"][rows[sel, 0], out[sel]]
+
+            sel[sel] = (validity < 0) | (t[sel, 0] - t_ref <= validity)
+            out[(out >= 0) & ~sel] = -1
+
+        return out
+
+    def _find(self, ctype, gnss_ID, prn, signal, wn, tow) :
+        """
+        Summary :
+            Find the latest correction for a satellite (and signal), the lock
+            is held by the caller.
+
+        Returns :
+            The table, the row and the position of the correction in the
+            row, (None, -1, -1) if no correction is available.
+        """
+        table = self.tables[ctype].get(gnss_ID)
+        if table is None :
+            return None, -1, -1
+
+        row = table["keys"].get((prn, -1 if signal is None else signal))
+        if row is None :
+            return None, -1, -1
+
+        head = table["head"][row]
+
+        # the newest element is checked first: without time, or in real-time
+        # processing, the loop stops immediately
+        t = None if tow is None else int(wn) * WEEK_SECONDS + tow
+
+        for kk in range(self.depth) :
+            pos = (head - kk) % self.depth
+
+            if not table["filled"][row, pos] :
+                continue
+
+            if t is None :
+                return table, row, pos
+
+            t_ref = table["t_ref"][row, pos]
+            if t_ref <= t :
+                validity = table["validity"][row, pos]
+
+                # older elements are superseded by this one
+                if validity < 0 or t - t_ref <= validity :
+                    return table, row, pos
+                break
+
+        return None, -1, -1
+
+    def latest(self, ctype : str, gnss_ID : int, prn : int, signal : int = None, \
+               wn : int = None, tow : float = None) :
+        """
+        Summary :
+            Return the latest correction for a satellite (and signal).
+
+        Arguments :
+            ctype - correction type (orbit, clock, code_bias, phase_bias)
+            gnss_ID - GNSS identifier
+            prn - satellite identifier
+            signal - signal identifier, required for biases
+            wn, tow - if provided, only a correction valid at this time is
+                      returned
+
+        Returns :
+            The has_correction object, or None if no correction is available.
+            For biases, the values of the requested signal can be obtained
+            with get_values.
+        """
+        with self.lock :
+            table, row, pos = self._find(ctype, gnss_ID, prn, signal, wn, tow)
+
+            return None if table is None else table["cor"][row, pos]
+
+    def get_values(self, ctype : str, gnss_ID : int, prn : int, signal : int = None, \
+                   wn : int = None, tow : float = None) :
+        """
+        Summary :
+            Return the values of the latest correction for a satellite (and
+            signal) as a dictionary.
+
+        Arguments :
+            see latest
+
+        Returns :
+            Dictionary with the reference time, validity, IODs and the fields
+            of the correction type, or None if no correction is available.
+        """
+        with self.lock :
+            table, row, pos = self._find(ctype, gnss_ID, prn, signal, wn, tow)
+
+            if table is None :
+                return None
+
+            values = self._frame(ctype, gnss_ID, table, np.array([row]), \
+                                 np.array([pos])).to_dict("records")[0]
+
+        # Python scalars
+        return {name : (val.item() if isinstance(val, np.generic) else val) \
+                for name, val in values.items()}
+
+    def _frame(self, ctype, gnss_ID, table, rows, pos) :
+        """
+        Summary :
+            Convert elements of a table into a dataframe with the columns
+            returned by get_epoch.
+        """
+        signal = table["signal"][rows]
+        t_ref = table["t_ref"][rows, pos]
+
+        data = {"gnssID" : np.full(len(rows), gnss_ID),
+                "PRN" : table["PRN"][rows],
+                # orbit and clock corrections do not refer to a signal
+                "signal" : signal if ctype.endswith("bias") else np.full(len(rows), None),
+                "WN" : t_ref // WEEK_SECONDS,
+                "RefToW" : t_ref % WEEK_SECONDS,
+                "validity" : table["validity"][rows, pos],
+                "IOD" : table["IOD"][rows, pos],
+                "gnssIOD" : table["gnssIOD"][rows, pos]}
+
+        for field in self.fields[ctype] :
+            data[field] = table[field][rows, pos]
+
+        return pd.DataFrame(data)
+
+    def get_epoch(self, ctype : str, wn : int, tow : float) :
+        """
+        Summary :
+            Return the corrections of a given type valid at an epoch for all
+            the satellites (and signals).
+
+        Arguments :
+            ctype - correction type (orbit, clock, code_bias, phase_bias)
+            wn, tow - the epoch
+
+        Returns :
+            Dataframe with one row per satellite (and signal), sorted by gnss
+            ID, PRN and signal, with the columns gnssID, PRN, signal, WN,
+            RefToW, validity, IOD, gnssIOD followed by the fields of the
+            correction type.
+        """
+        if ctype not in self.tables :
+            raise Exception(f"Unknown correction type: {ctype}")
+
+        t = int(wn) * WEEK_SECONDS + tow
+
+        frames = []
+        with self.lock :
+            for gnss_ID in sorted(self.tables[ctype]) :
+                table = self.tables[ctype][gnss_ID]
+
+                # one query for all the satellites (and signals) of the GNSS,
+                # in order of PRN and signal
+                rows = np.lexsort((table["signal"][:table["size"]], \
+                                   table["PRN"][:table["size"]]))
+                pos = self._select(table, rows, t)
+
+                if np.any(pos >= 0) :
+                    frames.append(self._frame(ctype, gnss_ID, table, rows[pos >= 0], \
+                                              pos[pos >= 0]))
+
+        if len(frames) == 0 :
+            columns = ["gnssID", "PRN", "signal", "WN", "RefToW", "validity", "IOD", \
+                       "gnssIOD"] + list(self.fields[ctype])
+
+            return pd.DataFrame(columns = columns)
+
+        return pd.concat(frames, ignore_index = True)
+
+    def get_epochs(self, ctype : str, gnss_ID : int, prn : int, wn, tow, signal : int = None) :
+        """
+        Summary :
+            Return the reference times of the corrections of a satellite valid
+            at a series of epochs.
+
+        Arguments :
+            ctype - correction type (orbit, clock, code_bias, phase_bias)
+            gnss_ID, prn, signal - the satellite (and signal)
+            wn, tow - arrays (or scalars) with the epochs
+
+        Returns :
+            Array with the absolute reference time (WN * 604800 + ToW) of the
+            correction valid at each epoch, -1 when no correction is valid.
+        """
+        t = np.asarray(wn, dtype = np.int64) * WEEK_SECONDS + np.asarray(tow)
+        t = np.atleast_1d(t)
+
+        out = np.full(len(t), -1, dtype = np.int64)
+
+        with self.lock :
+            table = self.tables[ctype].get(gnss_ID)
+            if table is None :
+                return out
+
+            row = table["keys"].get((prn, -1 if signal is None else signal))
+            if row is None :
+                return out
+
+            # the same row for all the epochs
+            rows = np.full(len(t), row)
+            pos = self._select(table, rows, t)
+
+            out[pos >= 0] = table["t_ref"][row, pos[pos >= 0]]
+
+        return out
+
+    def purge(self, wn : int, tow : float) :
+        """
+        Summary :
+            Remove the corrections expired at a given epoch.
+
+        Arguments :
+            wn, tow - the epoch
+        """
+        t = int(wn) * WEEK_SECONDS + tow
+
+        with self.lock :
+            for tables in self.tables.values() :
+                for table in tables.values() :
+                    expired = (table["validity"] >= 0) & (t - table["t_ref"] > table["validity"])
+
+                    table["filled"][expired] = False
+                    table["cor"][expired] = None
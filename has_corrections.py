@@ -85,12 +85,61 @@ def two_complement( val, nbits) :
     
     # if it is a negative number
     if (val >> type(val)(nbits - 1)) & 0x1 == 1 :
-        retval = val - 2**nbits 
+        retval = int(val) - 2**nbits 
     else:
         retval = val
     
     return retval
 
+class bit_writer :
+    """
+    Summary :
+        Write sequences of bits into a stream of bytes. It is the inverse of
+        get_bits, used to encode the HAS messages (has_generator) and the
+        RTCM SSR messages (has_rtcm).
+    """
+    def __init__(self) :
+        """
+        Summary :
+            Object constructor.
+        """
+        self.value = 0
+        self.num_bits = 0
+
+    def put_bits(self, val, num_bits) :
+        """
+        Summary :
+            Append the num_bits least significant bits of val to the stream.
+            Negative values are written as two's complement numbers.
+
+        Arguments :
+            val - the value to write
+            num_bits - number of bits
+        """
+        self.value = (self.value << num_bits) | (int(val) & ((1 << num_bits) - 1))
+        self.num_bits += num_bits
+
+    def get_bytes(self, num_bytes = None) :
+        """
+        Summary :
+            Return the stream as an array of bytes. The last byte is padded
+            with zeros.
+
+        Arguments :
+            num_bytes - total number of bytes, zeros are appended if required
+
+        Returns :
+            Array of bytes.
+        """
+        if num_bytes is None :
+            num_bytes = (self.num_bits + 7) // 8
+
+        pad_bits = 8 * num_bytes - self.num_bits
+
+        value = self.value << pad_bits
+
+        return np.frombuffer(value.to_bytes(num_bytes, 'big'), dtype = np.uint8)
+
 ###############################################################################
 class has_mask :
     """
@@ -248,6 +297,19 @@ class has_correction(metaclass = abc.ABCMeta) :
         """
         pass
     
+    def is_empty(self) :
+        """
+        Summary:
+            Check if the correction contains actual data or if it is empty.
+            
+        Arguments:
+            None.
+            
+        Returns:
+            False, by default a correction is not empty.
+        """
+        return False
+    
     def __str__(self) :
         """
         Summary :
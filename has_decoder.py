@@ -9,7 +9,276 @@ Created on Sun Jun 13 08:54:47 2021
 import has_message as hm
 import has_corrections as hc
 import numpy as np
+import time
+import hashlib
+import collections
 
+import has_profiler as hp
+
+def _num_corrections(args, out) :
+    """
+    Summary :
+        Number of corrections returned by an interpretation function, used by
+        the profiling hooks.
+    """
+    return {"corrections" : len(out[0])}
+
+class has_pending_queue :
+    """
+    Summary :
+        Bounded queue of decoded messages that cannot be interpreted since
+        their mask was not received yet. Messages are indexed by Mask ID and 
+        discarded once older than the validity of their corrections.
+    """
+    
+    def __init__(self, max_size = 64, metrics = None) :
+        """
+        Summary :
+            Object constructor.
+            
+        Arguments :
+            max_size - maximum number of messages in the queue. When the queue
+                       is full, the oldest message is discarded.
+            metrics - optional has_metrics.metrics_registry where the queue
+                      depth and the outcome of the deferred messages are
+                      recorded
+        """
+        self.max_size = max_size
+        
+        # Entries by Mask ID: list of (ToW, validity, item)
+        self.entries = {}
+        
+        # statistics
+        #   deferred - number of messages added to the queue
+        #   recovered - number of messages interpreted once the mask arrived
+        #   expired - number of messages discarded since older than their validity
+        #   overflow - number of messages discarded since the queue was full
+        #   max_depth - maximum number of messages in the queue
+        self.stats = {"deferred" : 0,
+                      "recovered" : 0,
+                      "expired" : 0,
+                      "overflow" : 0,
+                      "max_depth" : 0}
+        
+        self.metrics = None
+        if metrics is not None :
+            self.metrics = {
+                "depth" : metrics.gauge("has_pending_queue_depth", \
+                              "Messages waiting for their mask"),
+                "outcome" : metrics.counter("has_pending_messages_total", \
+                                "Messages deferred since their mask was missing, by outcome")
+                }
+            
+    def __len__(self) :
+        return sum(len(entries) for entries in self.entries.values())
+    
+    def update_stats(self, outcome, num = 1) :
+        """
+        Summary :
+            Update the statistics and the metrics of the queue.
+        """
+        if num == 0 :
+            return
+        
+        self.stats[outcome] += num
+        
+        depth = len(self)
+        self.stats["max_depth"] = max(self.stats["max_depth"], depth)
+        
+        if self.metrics is not None :
+            self.metrics["outcome"].inc(num, outcome = outcome)
+            self.metrics["depth"].set(depth)
+    
+    def push(self, mask_id, tow, validity, item) :
+        """
+        Summary :
+            Add a message to the queue.
+            
+        Arguments :
+            mask_id - Mask ID the message refers to
+            tow - time of the message in seconds, continuous across the weeks
+            validity - validity of the corrections in seconds
+            item - the message, returned as such by pop()
+        """
+        if len(self) >= self.max_size :
+            # remove the oldest message
+            oldest = min(self.entries, key = lambda key : self.entries[key][0][0])
+            self.entries[oldest].pop(0)
+            
+            if len(self.entries[oldest]) == 0 :
+                del self.entries[oldest]
+                
+            self.update_stats("overflow")
+            
+        self.entries.setdefault(mask_id, []).append((tow, validity, item))
+        self.update_stats("deferred")
+        
+    def expire(self, tow) :
+        """
+        Summary :
+            Remove the messages older than their validity.
+            
+        Arguments :
+            tow - current time, in the time scale of push()
+        """
+        num_expired = 0
+        
+        for mask_id in list(self.entries) :
+            entries = [entry for entry in self.entries[mask_id] if tow - entry[0] <= entry[1]]
+            num_expired += len(self.entries[mask_id]) - len(entries)
+            
+            if len(entries) > 0 :
+                self.entries[mask_id] = entries
+            else :
+                del self.entries[mask_id]
+                
+        self.update_stats("expired", num_expired)
+        
+    def pop(self, mask_id, tow) :
+        """
+        Summary :
+            Remove and return the messages waiting for a mask.
+            
+        Arguments :
+            mask_id - Mask ID of the mask received
+            tow - current time, in the time scale of push()
+            
+        Returns :
+            List of the messages still valid, in order of arrival.
+        """
+        self.expire(tow)
+        
+        items = [entry[2] for entry in self.entries.pop(mask_id, [])]
+        self.update_stats("recovered", len(items))
+        
+        return items
+        
+class has_message_cache :
+    """
+    Summary :
+        Bounded cache of the interpretation of the decoded MT1 messages, keyed
+        on a hash of the message bytes (header and body). HAS rebroadcasts
+        identical messages (same ToH, IOD Set, mask and content) several
+        times: the interpretation of the repetitions can be reused.
+        
+        An entry stores the decoder state the interpretation depends on (the
+        mask and GNSS IODs used) and produces (masks and GNSS IODs decoded)
+        and the rows written to file without their reception time.
+    """
+    
+    def __init__(self, max_size = 64, metrics = None) :
+        """
+        Summary :
+            Object constructor.
+        
+        Arguments :
+            max_size - maximum number of messages in the cache. When the cache
+                       is full, the least recently used message is discarded.
+            metrics - optional has_metrics.metrics_registry where the lookups
+                      are recorded
+        """
+        self.max_size = max_size
+        
+        self.entries = collections.OrderedDict()
+        
+        # statistics
+        #   lookups - number of messages looked up
+        #   hits - number of repeated messages whose interpretation was reused
+        #   stale - number of repeated messages interpreted again since the
+        #           mask or the GNSS IODs they refer to changed
+        #   suppressed_rows - rows not written since repeated
+        #   suppressed_bytes - size of the rows not written
+        self.stats = {"lookups" : 0,
+                      "hits" : 0,
+                      "stale" : 0,
+                      "suppressed_rows" : 0,
+                      "suppressed_bytes" : 0}
+        
+        self.metrics = None
+        if metrics is not None :
+            self.metrics = metrics.counter("has_message_cache_lookups_total", \
+                                           "Decoded messages looked up in the interpretation cache, by outcome")
+    
+    @staticmethod
+    def key(msg) :
+        """
+        Summary :
+            Key of a decoded message: digest of its bytes.
+        """
+        return hashlib.blake2b(np.ascontiguousarray(msg).tobytes(), digest_size = 16).digest()
+    
+    def get(self, key, masks, iods) :
+        """
+        Summary :
+            Return the interpretation of a message if it is still valid.
+        
+        Arguments :
+            key - key of the message
+            masks - masks currently associated to the Mask ID of the message
+            iods - GNSS IODs currently associated to the IOD Set ID of the
+                   message
+        
+        Returns :
+            The cache entry, None if the message is not in the cache or if it
+            refers to a different mask or set of GNSS IODs.
+        """
+        self.stats["lookups"] += 1
+        
+        entry = self.entries.get(key)
+        
+        outcome = "miss"
+        if entry is not None :
+            # the objects are replaced each time a mask or the orbit
+            # corrections of an IOD Set are interpreted
+            if (entry["masks_in"] is None or entry["masks_in"] is masks) and \
+               (entry["iods_in"] is None or entry["iods_in"] is iods) :
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+                outcome = "hit"
+            else :
+                del self.entries[key]
+                self.stats["stale"] += 1
+                entry = None
+                outcome = "stale"
+        
+        if self.metrics is not None :
+            self.metrics.inc(outcome = outcome)
+        
+        return entry
+    
+    def put(self, key, entry) :
+        """
+        Summary :
+            Add the interpretation of a message.
+        
+        Arguments :
+            key - key of the message
+            entry - dictionary with
+                        masks_in, iods_in - mask and GNSS IODs used, None if
+                                            provided by the message
+                        masks, iods - mask and GNSS IODs decoded, None if not
+                                      in the message
+                        headers - header of each output file
+                        rows - list of (output, row without ToW and WN)
+                        validity - longest validity of the corrections of
+                                   each output
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        
+        while len(self.entries) > self.max_size :
+            self.entries.popitem(last = False)
+    
+    def suppressed(self, num_rows, num_bytes) :
+        """
+        Summary :
+            Record rows not written since repeated.
+        """
+        self.stats["suppressed_rows"] += num_rows
+        self.stats["suppressed_bytes"] += num_bytes
+        
+
+###############################################################################
 class has_decoder :
     """
     Summary :
@@ -19,10 +288,21 @@ class has_decoder :
     # static variable
     LIMIT_AGE = 120
     
+    # maximum number of masks and sets of GNSS IODs cached. Mask ID and IOD
+    # Set ID are 5-bit fields: at most 32 different values are possible
+    CACHE_SIZE = 32
+    
+    # maximum number of decoded messages waiting for their mask
+    PENDING_SIZE = 64
+    
+    # maximum number of interpretations of messages cached
+    MESSAGE_CACHE_SIZE = 64
+    
     # validity intervals as specified by Table 13 of the ICD
     validity_t13 = [5, 10, 15, 20, 30, 60, 90, 120, 180, 240, 300, 600, 900, 1800, 3600, -1]
     
-    def __init__(self, ind_offset = 1) :
+    def __init__(self, ind_offset = 1, erasures = False, extra_pages = 0, metrics = None, \
+                 store = None) :
         """
         Summary :
             Object constructor.
@@ -30,6 +310,21 @@ class has_decoder :
         Arguments:
             ind_offset - index used to take into account potential offsets in the
                          page indexing
+            erasures - if True, pages that failed the CRC check are used by an
+                       errors-and-erasures decoder to complete the messages 
+                       earlier. With a single page in excess of the message
+                       size, errors in the pages that failed the CRC are only
+                       detected, not corrected: at least two extra pages are
+                       needed to correct one of them.
+            extra_pages - number of pages, in excess of the message size, kept
+                          to check the consistency of the decoding. Only the
+                          pages received in the epoch completing the message
+                          are used. With a single extra page, a message with
+                          a corrupted page is discarded.
+            metrics - optional has_metrics.metrics_registry where the 
+                      operational metrics of the decoder are recorded
+            store - optional has_correction_store.has_correction_store updated
+                    with the corrections interpreted
         Returns:
         """
         # list of HAS messages
@@ -41,7 +336,96 @@ class has_decoder :
         # table with the GNSS IOD for the different satellites
         self.gnss_IODs = {}       
         
-    def update(self, tow, sep_pages, msg_type, msg_id, msg_size) :
+        # masks decoded, by Mask ID, and tables of GNSS IODs, by IOD Set ID.
+        # Messages without mask or orbit corrections refer to them through 
+        # the IDs in the MT1 header
+        self.mask_cache = collections.OrderedDict()
+        self.iod_cache = collections.OrderedDict()
+        
+        # errors-and-erasures decoding
+        self.erasures = erasures
+        
+        # statistics on the errors-and-erasures decoding
+        #   messages - number of messages decoded before being complete
+        #   corrected_symbols - number of symbols corrected
+        #   time_gain - for each message, seconds between the errors-and-erasures
+        #               decoding and the completion with pages passing the CRC
+        self.erasure_stats = {"messages" : 0,
+                              "corrected_symbols" : 0,
+                              "time_gain" : []}
+        
+        # over-determined decoding with consistency check
+        self.extra_pages = extra_pages
+        
+        # statistics on the consistency check
+        #   messages - number of messages decoded using extra pages
+        #   subsets - total number of subsets of pages used for decoding
+        #   inconsistent - number of messages with at least a corrupted page
+        #   failed - number of messages discarded since no majority was found
+        #   corrupted_pages - list of (ToW, message ID, page ID) of the pages 
+        #                     found corrupted
+        #   time - time spent in the over-determined decoding [s]
+        self.consistency_stats = {"messages" : 0,
+                                  "subsets" : 0,
+                                  "inconsistent" : 0,
+                                  "failed" : 0,
+                                  "corrupted_pages" : [],
+                                  "time" : 0.0}
+        
+        # last message decoded (has_message object)
+        self.last_message = None
+        
+        # operational metrics
+        self.metrics = None
+        if metrics is not None :
+            self.init_metrics(metrics)
+            
+        # decoded messages waiting for their mask
+        self.pending = has_pending_queue(self.PENDING_SIZE, metrics)
+        
+        # interpretations of the messages, reused for the repetitions
+        self.message_cache = has_message_cache(self.MESSAGE_CACHE_SIZE, metrics)
+        
+        # in-memory store of the latest corrections
+        self.store = store
+        
+    def init_metrics(self, registry) :
+        """
+        Summary :
+            Create the operational metrics of the decoder.
+            
+        Arguments :
+            registry - has_metrics.metrics_registry where the metrics are 
+                       registered
+        """
+        self.metrics = {
+            "pages" : registry.counter("has_decoder_pages_total", \
+                          "Pages ingested by the decoder, by CRC status"),
+            "started" : registry.counter("has_messages_started_total", \
+                            "Messages for which a first page was received"),
+            "completed" : registry.counter("has_messages_completed_total", \
+                              "Messages successfully decoded"),
+            "evicted" : registry.counter("has_messages_evicted_total", \
+                            "Messages removed before completion since older than LIMIT_AGE"),
+            "failed" : registry.counter("has_decode_failures_total", \
+                           "Complete messages that could not be decoded (singular matrix or no majority)"),
+            "ratio" : registry.gauge("has_message_completion_ratio", \
+                          "Ratio between messages decoded and messages started"),
+            "last_tow" : registry.gauge("has_last_tow_seconds", \
+                             "Time of week of the last epoch processed"),
+            "completion_time" : registry.histogram("has_message_completion_seconds", \
+                                    "Time between the first page and the decoding of a message", \
+                                    [1, 2, 3, 4, 5, 7, 10, 15, 20, 30, 60, 120]),
+            "latency" : registry.histogram("has_decode_latency_seconds", \
+                            "Wall time spent decoding a message", \
+                            [1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1]),
+            "erasure_gain" : registry.histogram("has_erasure_time_gain_seconds", \
+                                 "Time between the errors-and-erasures decoding of a message and its completion with pages passing the CRC", \
+                                 [1, 2, 3, 4, 5, 7, 10, 15, 20, 30, 60])
+            }
+        
+    @hp.profile("decoder_update", lambda args, out : {"pages" : len(args[2])})
+    def update(self, tow, sep_pages, msg_type, msg_id, msg_size, crc_flags = None) :
         """
         Summary :
             Update the decoder using blocks of pages in the format provided by the 
@@ -54,22 +438,38 @@ class has_decoder :
             msg_type - message type
             msg_id - messge id 
             msg_size - message size
+            crc_flags - for each page, True if the page passed the CRC check.
+                        If None, all the pages are assumed correct.
             
         Returns:
-            Nothing.
+            The decoded message, None if no message was decoded.
         """
         has_message = False
         decoded_msg = None 
         
+        if crc_flags is None :
+            crc_flags = [True] * len(sep_pages)
+        
+        if self.metrics is not None :
+            num_passed = int(np.sum(crc_flags))
+            self.metrics["pages"].inc(num_passed, crc = "passed")
+            self.metrics["pages"].inc(len(crc_flags) - num_passed, crc = "failed")
+            self.metrics["last_tow"].set(tow)
+        
         for message in self.message_list :
             
             # check if this is the correct message 
             if message.is_message(msg_type, msg_id, msg_size) :
-               has_message = True
                
                # update the message
-               for page in sep_pages :
-                   message.add_page_sep_bytes(page)
+               for page, crc in zip(sep_pages, crc_flags) :
+                   message.add_page_sep_bytes(page, crc)
+                   
+               # a message decoded through errors-and-erasures decoding 
+               # received the pages of a new message with the same ID and 
+               # size: it is removed below and a new message is started
+               if not message.superseded :
+                   has_message = True
                                  
             # This is not the correct message
             else :
@@ -78,31 +478,212 @@ class has_decoder :
                 
         # if the message was not present add it to the list
         if not has_message :
-            message = hm.has_message(msg_type, msg_id, msg_size, self.ind_offset)
+            message = hm.has_message(msg_type, msg_id, msg_size, self.ind_offset, \
+                                     self.extra_pages)
+            message.start_tow = tow
+            
+            if self.metrics is not None :
+                self.metrics["started"].inc()
             
             # update the message
-            for page in sep_pages :
-                message.add_page_sep_bytes(page)
+            for page, crc in zip(sep_pages, crc_flags) :
+                message.add_page_sep_bytes(page, crc)
                 
             # add it to the decoder list
             self.message_list.append(message)
             
         # Do some clean up
+        message_list = []
+        
         for message in self.message_list :
         
-            decoded_msg = None 
-            
             # if the message is old, remove it
             if message.is_old(self.LIMIT_AGE) :
-                self.message_list.remove(message)
+                if self.metrics is not None and message.decoded_tow is None :
+                    self.metrics["evicted"].inc()
+                continue
             
+            # message already decoded through errors-and-erasures decoding:
+            # it only collects the pages consistent with the decoded message,
+            # to measure the time gain
+            if message.decoded_tow is not None :
+                if message.superseded :
+                    continue
+                
+                if message.complete() :
+                    self.erasure_stats["time_gain"].append(tow - message.decoded_tow)
+                    
+                    if self.metrics is not None :
+                        self.metrics["erasure_gain"].observe(tow - message.decoded_tow)
+                    continue
+                
             # if the message is complete, decode it and remove it from the list
             elif message.complete() :
+                start_time = time.perf_counter()
                 decoded_msg = message.decode()
-                self.message_list.remove(message)
+                elapsed = time.perf_counter() - start_time
+                self.last_message = message
+                
+                if message.page_index > message.size :
+                    self.update_consistency_stats(tow, message, decoded_msg, elapsed)
+                    
+                if self.metrics is not None :
+                    self.update_metrics(tow, message, decoded_msg, elapsed)
+                continue
+            
+            # try to decode the message using also the pages that failed the CRC
+            elif self.erasures and message.can_decode_erasures() :
+                start_time = time.perf_counter()
+                msg = message.decode_erasures()
+                elapsed = time.perf_counter() - start_time
+                
+                if msg is not None :
+                    decoded_msg = msg
+                    message.decoded_tow = tow
+                    self.last_message = message
+                    
+                    self.erasure_stats["messages"] += 1
+                    self.erasure_stats["corrected_symbols"] += message.corrected_symbols
+                    
+                    if self.metrics is not None :
+                        self.update_metrics(tow, message, decoded_msg, elapsed)
+                    
+            message_list.append(message)
+            
+        self.message_list = message_list
                     
         return decoded_msg
     
+    def update_metrics(self, tow, message, decoded_msg, elapsed) :
+        """
+        Summary :
+            Update the operational metrics after the decoding of a message.
+            
+        Arguments :
+            tow - time of week of the decoding
+            message - the has_message object decoded
+            decoded_msg - output of the decoding, None if the decoding failed
+            elapsed - wall time spent in the decoding [s]
+        """
+        self.metrics["latency"].observe(elapsed)
+        
+        if decoded_msg is None :
+            self.metrics["failed"].inc()
+            return
+        
+        self.metrics["completed"].inc()
+        self.metrics["completion_time"].observe(tow - message.start_tow)
+        
+        started = self.metrics["started"].get()
+        if started > 0 :
+            self.metrics["ratio"].set(self.metrics["completed"].get() / started)
+        
+    def update_consistency_stats(self, tow, message, decoded_msg, elapsed) :
+        """
+        Summary :
+            Update the statistics of the over-determined decoding.
+            
+        Arguments:
+            tow - time of week
+            message - the message decoded using extra pages
+            decoded_msg - the decoded message, None if the decoding failed
+            elapsed - time spent for decoding [s]
+            
+        Returns:
+            Nothing.
+        """
+        stats = self.consistency_stats
+        
+        stats["messages"] += 1
+        stats["subsets"] += message.num_subsets
+        stats["time"] += elapsed
+        
+        if decoded_msg is None :
+            stats["failed"] += 1
+            
+        if len(message.corrupted_ids) > 0 :
+            stats["inconsistent"] += 1
+            
+            for page_id in message.corrupted_ids :
+                stats["corrupted_pages"].append((int(tow), int(message.id), page_id))
+    
+    def get_validity(self, body) :
+        """
+        Summary :
+            Return the validity of the first correction block of a MT1 
+            message without mask. The validity index is in the first 4 bits
+            of the block (ICD Table 13).
+            
+        Arguments :
+            body - message body (bytes following the MT1 header)
+            
+        Returns :
+            The validity in seconds. LIMIT_AGE is returned when the validity
+            is not defined.
+        """
+        validity = has_decoder.validity_t13[int(body[0]) >> 4]
+        
+        if validity < 0 :
+            validity = self.LIMIT_AGE
+            
+        return validity
+    
+    def store_mask(self, mask_id, masks) :
+        """
+        Summary :
+            Store the masks decoded from a MT1 message.
+            
+        Arguments :
+            mask_id - Mask ID from the MT1 header
+            masks - list of has_mask objects
+        """
+        self.mask_cache[mask_id] = masks
+        self.mask_cache.move_to_end(mask_id)
+        
+        while len(self.mask_cache) > self.CACHE_SIZE :
+            self.mask_cache.popitem(last = False)
+            
+    def get_mask(self, mask_id) :
+        """
+        Summary :
+            Return the masks associated to a Mask ID.
+            
+        Arguments :
+            mask_id - Mask ID from the MT1 header
+            
+        Returns :
+            The list of has_mask objects, None if no mask with this ID was
+            received.
+        """
+        return self.mask_cache.get(mask_id)
+    
+    def store_iods(self, iod_id) :
+        """
+        Summary :
+            Store the GNSS IODs of the last orbit corrections interpreted.
+            
+        Arguments :
+            iod_id - IOD Set ID from the MT1 header
+        """
+        self.iod_cache[iod_id] = self.gnss_IODs
+        self.iod_cache.move_to_end(iod_id)
+        
+        while len(self.iod_cache) > self.CACHE_SIZE :
+            self.iod_cache.popitem(last = False)
+            
+    def select_iods(self, iod_id) :
+        """
+        Summary :
+            Select the GNSS IODs used for the clock and bias corrections. If no
+            orbit corrections with this IOD Set ID were received, the GNSS IODs
+            of the corrections are left undefined (-1).
+            
+        Arguments :
+            iod_id - IOD Set ID from the MT1 header
+        """
+        self.gnss_IODs = self.iod_cache.get(iod_id, {})
+    
+    @hp.profile("interpret_header")
     def interpret_mt1_header( self, header ) :
         """
         Summary:
@@ -138,6 +719,7 @@ class has_decoder :
     
     ###############################################################################
         
+    @hp.profile("interpret_mask", _num_corrections)
     def interpret_mt1_mask(self, body, byte_offset = 0, bit_offset = 0) :
         """
         Summary:
@@ -170,6 +752,7 @@ class has_decoder :
         return masks, byte_offset, bit_offset
     
         
+    @hp.profile("interpret_orbit", _num_corrections)
     def interpret_mt1_orbit_corrections(self, body, byte_offset, bit_offset, masks, info = None) :
         """
         Summary:
@@ -217,8 +800,12 @@ class has_decoder :
                 # This information will be used for the other correction types
                 self.gnss_IODs[str(gnss) + '_' + str(prn)] = orbit_cor.gnss_IOD
                 
+        if self.store is not None :
+            self.store.add("orbit", orbit_corrections)
+        
         return orbit_corrections, byte_offset, bit_offset          
     
+    @hp.profile("interpret_full_clock", _num_corrections)
     def interpret_mt1_full_clock_corrections(self, body, byte_offset, bit_offset, masks, info = None) :
         """
         Summary:
@@ -275,8 +862,12 @@ class has_decoder :
                 # add the correction to the list
                 clock_cors.append(clock_cor)
                         
+        if self.store is not None :
+            self.store.add("clock", clock_cors)
+        
         return clock_cors, byte_offset, bit_offset
     
+    @hp.profile("interpret_subset_clock", _num_corrections)
     def interpret_mt1_subset_clock_corrections(self, body, byte_offset, bit_offset, masks, info = None) :
         """
         Summary:
@@ -347,8 +938,12 @@ class has_decoder :
                     clock_cors.append(clock_cor)    
             # end loop on the different signals
         # end loop on the different GNSS
+        if self.store is not None :
+            self.store.add("clock", clock_cors)
+        
         return clock_cors, byte_offset, bit_offset
             
+    @hp.profile("interpret_code_bias", _num_corrections)
     def interpret_mt1_code_biases(self, body, byte_offset, bit_offset, masks, info = None ) :
             
         code_biases = []
@@ -392,8 +987,12 @@ class has_decoder :
             # end loop on the prns
         #end loop on the GNSS
         
+        if self.store is not None :
+            self.store.add("code_bias", code_biases)
+        
         return code_biases, byte_offset, bit_offset
     
+    @hp.profile("interpret_phase_bias", _num_corrections)
     def interpret_mt1_phase_biases(self, body, byte_offset, bit_offset, masks, info = None) :
         
         phase_biases = []
@@ -437,5 +1036,8 @@ class has_decoder :
             # end loop on the prns
         #end loop on the GNSS
         
+        if self.store is not None :
+            self.store.add("phase_bias", phase_biases)
+        
         return phase_biases, byte_offset, bit_offset    
     
\ No newline at end of file
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:14:05 2026
+
+@author: daniele
+
+Summary :
+    Diagnostics channel recording the failures occurred during the
+    interpretation of the HAS messages. Each failure is written as a line of a
+    compact CSV sidecar file, so that the problematic epochs can be identified
+    and reprocessed on their own.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class diagnostics_log :
+    """
+    Summary :
+        Sidecar log of the interpretation failures.
+    """
+
+    header = "ToW,WN,MessageID,MessageSize,Block,BitOffset,Exception,Details"
+
+    def __init__(self, filename : str = None) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            filename - pathname of the sidecar log. If None, the failures are
+                       only counted. The file is created at the first
+                       failure: a log left by a previous run is removed.
+        """
+        self.filename = filename
+        self.fid = None
+
+        if filename is not None and os.path.exists(filename) :
+            os.remove(filename)
+
+        # number of failures for each block type
+        self.counts = {}
+
+    def record(self, tow, wn, msg_id, msg_size, block, byte_offset, bit_offset, exc) :
+        """
+        Summary :
+            Record a failure.
+
+        Arguments :
+            tow - time of week of the message
+            wn - week number
+            msg_id - message ID
+            msg_size - message size in pages
+            block - type of block whose interpretation failed (mask, orbit,
+                    full_clock, subset_clock, code_bias, phase_bias)
+            byte_offset, bit_offset - position of the beginning of the block
+                                      in the message body
+            exc - the exception raised
+        """
+        self.counts[block] = self.counts.get(block, 0) + 1
+
+        if self.filename is None :
+            return
+
+        if self.fid is None :
+            self.fid = open(self.filename, "w")
+            self.fid.write(self.header + "\n")
+
+        # keep the log one line per failure
+        details = str(exc).replace(",", ";").replace("\n", " ")
+
+        self.fid.write(f"{int(tow)},{wn},{msg_id},{msg_size},{block}," + \
+                       f"{8 * int(byte_offset) + int(bit_offset)}," + \
+                       f"{type(exc).__name__},{details}\n")
+
+    def num_failures(self) :
+        """
+        Summary :
+            Return the total number of failures recorded.
+        """
+        return sum(self.counts.values())
+
+    def print_summary(self) :
+        """
+        Summary :
+            Print the number of failures for each block type.
+        """
+        if self.num_failures() == 0 :
+            return
+
+        print(f"Interpretation failures: {self.num_failures()}" + \
+              ("" if self.filename is None else f" (see {self.filename})"))
+
+        for block, num in self.counts.items() :
+            print(f"    {block}: {num}")
+
+    def close(self) :
+        """
+        Summary :
+            Close the sidecar log.
+        """
+        if self.fid is not None :
+            self.fid.close()
+            self.fid = None
+
+def load_diagnostics(filename : str) :
+    """
+    Summary :
+        Load a sidecar log of the interpretation failures.
+
+    Arguments :
+        filename - pathname of the sidecar log
+
+    Returns :
+        Dataframe with one row per failure.
+    """
+    return pd.read_csv(filename)
+
+def get_failed_epochs(filename : str) :
+    """
+    Summary :
+        Return the times of week of the messages whose interpretation failed.
+
+    Arguments :
+        filename - pathname of the sidecar log, not created if no failure
+                   occurred
+
+    Returns :
+        Sorted array of times of week, empty if the log does not exist.
+    """
+    if not os.path.exists(filename) :
+        return np.array([], dtype = np.int64)
+
+    df = load_diagnostics(filename)
+
+    return np.unique(df["ToW"].values)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:05 2026
+
+@author: daniele
+
+Summary :
+    Fusion of the E6B pages recorded by several receivers at the same site
+    (e.g. Septentrio and Javad) into a single stream decoded by one
+    has_decoder: a page lost by a receiver is often received by another one
+    and messages are completed earlier.
+
+    The pages of each receiver (as provided by process_cnav.load_data) are
+    aligned on the time of week of a reference receiver: the time tag
+    conventions of the receivers can differ by a few seconds and the offset
+    is estimated by matching the pages with identical content. The page
+    streams, sorted by (TOW, SVID), are merged with a heap and the pages
+    received by several receivers for the same satellite and epoch are
+    deduplicated: a page that passed the CRC check is preferred, then the
+    order of the receivers.
+
+    Optionally, each receiver is also decoded alone and the completion times
+    of the messages are compared with the ones of the fused stream.
+"""
+
+import os
+import heapq
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import process_cnav as pc
+
+# header of the dummy pages
+DUMMY_HEADER = 0xAF3BC3
+
+# columns with the page bits
+word_columns = ["word %d" % kk for kk in range(1, 17)]
+
+
+def page_headers(df) :
+    """
+    Summary :
+        HAS page headers (bits from 14 to 38) of a dataframe of pages.
+    """
+    return ((df["word 1"].values & 0x3FFFF) << 6) + (df["word 2"].values >> 26)
+
+def estimate_offset(ref, df, max_offset : int = 5) :
+    """
+    Summary :
+        Estimate the offset between the times of week of two receivers, by
+        matching the pages with the same satellite and content.
+
+    Arguments :
+        ref - dataframe with the pages of the reference receiver
+        df - dataframe with the pages of the other receiver
+        max_offset - maximum offset in seconds
+
+    Returns :
+        Offset in seconds to be added to the TOW of df, 0 if no page matches.
+    """
+    def keys(pages) :
+        # pages passing the CRC check, dummy pages excluded (identical content
+        # at all the epochs)
+        valid = (page_headers(pages) != DUMMY_HEADER) & (pages["CRCPassed"].values == 1)
+        pages = pages[valid]
+
+        return pd.DataFrame({"SVID" : pages["SVID"].values, \
+                             "hash" : pd.util.hash_pandas_object(pages[word_columns], \
+                                                                 index = False).values, \
+                             "TOW" : pages["TOW"].values.astype(np.float64)})
+
+    matches = keys(ref).merge(keys(df), on = ["SVID", "hash"], suffixes = ("_ref", ""))
+
+    diff = np.round(matches["TOW_ref"].values - matches["TOW"].values).astype(np.int64)
+    diff = diff[np.abs(diff) <= max_offset]
+
+    if len(diff) == 0 :
+        return 0
+
+    values, counts = np.unique(diff, return_counts = True)
+
+    return int(values[np.argmax(counts)])
+
+def page_stream(df, rx : int, offset : float = 0) :
+    """
+    Summary :
+        Generator of the pages of a receiver sorted by time of week,
+        satellite and CRC status (pages passing the CRC first).
+
+    Arguments :
+        df - dataframe with the pages of the receiver
+        rx - index of the receiver
+        offset - offset in seconds added to the times of week
+
+    Yields :
+        (TOW, SVID, rank, rx, row) with rank 0 for the pages passing the CRC
+        check and 1 for the others, and row the position of the page in df.
+    """
+    tow = df["TOW"].values.astype(np.float64) + offset
+    svid = df["SVID"].values.astype(np.int64)
+    rank = (df["CRCPassed"].values != 1).astype(np.int64)
+
+    order = np.lexsort((rank, svid, tow))
+
+    yield from zip(tow[order].tolist(), svid[order].tolist(), rank[order].tolist(), \
+                   [rx] * len(order), order.tolist())
+
+def fuse_pages(frames, offsets = None, max_offset : int = 5) :
+    """
+    Summary :
+        Merge the pages of several receivers into a single stream, with one
+        page per satellite and epoch.
+
+    Arguments :
+        frames - list of dataframes with the pages of the receivers, as
+                 provided by process_cnav.load_data. The first one is the
+                 reference of the times of week.
+        offsets - offsets in seconds added to the times of week of each
+                  receiver. If None, they are estimated with estimate_offset.
+        max_offset - maximum offset estimated
+
+    Returns :
+        df - dataframe with the pages of the fused stream, sorted by time of
+             week and satellite, with the "Receiver" column (index of the
+             receiver providing the page)
+        stats - dictionary with the statistics of the fusion: offsets, pages
+                of each receiver (pages), pages kept from each receiver
+                (kept), pages passing the CRC check received only by each
+                receiver (unique), duplicates removed and pages in output
+    """
+    if offsets is None :
+        offsets = [0] + [estimate_offset(frames[0], df, max_offset) for df in frames[1:]]
+
+    streams = [page_stream(df, rx, offset) for rx, (df, offset) in \
+               enumerate(zip(frames, offsets))]
+
+    num_rx = len(frames)
+    stats = {"offsets" : list(offsets), \
+             "pages" : [len(df) for df in frames], \
+             "kept" : [0] * num_rx, \
+             "unique" : [0] * num_rx, \
+             "duplicates" : 0}
+
+    selected = []
+
+    # receivers providing the current page with CRC passed
+    last_key = None
+    passed = []
+
+    for tow, svid, rank, rx, row in heapq.merge(*streams) :
+        if (tow, svid) == last_key :
+            # the first page of each satellite and epoch is the best one
+            stats["duplicates"] += 1
+
+            if rank == 0 :
+                passed.append(rx)
+            continue
+
+        if len(passed) == 1 :
+            stats["unique"][passed[0]] += 1
+
+        last_key = (tow, svid)
+        passed = [rx] if rank == 0 else []
+
+        selected.append((rx, row))
+        stats["kept"][rx] += 1
+
+    if len(passed) == 1 :
+        stats["unique"][passed[0]] += 1
+
+    stats["output"] = len(selected)
+
+    # pages of the fused stream, in the order of the merge
+    rx_sel = np.array([sel[0] for sel in selected], dtype = np.int64)
+    row_sel = np.array([sel[1] for sel in selected], dtype = np.int64)
+
+    parts = []
+    for rx, (df, offset) in enumerate(zip(frames, offsets)) :
+        mask = rx_sel == rx
+
+        part = df.iloc[row_sel[mask]].copy()
+        part["TOW"] = part["TOW"].values.astype(np.float64) + offset
+        part["Receiver"] = rx
+        part["_order"] = np.flatnonzero(mask)
+
+        parts.append(part)
+
+    fused = pd.concat(parts, ignore_index = True).sort_values("_order")
+
+    return fused.drop(columns = ["_order"]).reset_index(drop = True), stats
+
+def decode_times(df, basename, **kwargs) :
+    """
+    Summary :
+        Decode a dataframe of pages and return the completion times of the
+        messages.
+
+    Arguments :
+        df - dataframe with the pages
+        basename - base of the path name of the output files
+        kwargs - options of process_cnav.decode_data
+
+    Returns :
+        Dataframe with the time of week, week and message ID of each message
+        interpreted.
+    """
+    times = []
+
+    on_message = kwargs.pop("_on_message", None)
+
+    def record(tow, week, msg_id) :
+        times.append((tow, week, msg_id))
+
+        if on_message is not None :
+            on_message(tow, week, msg_id)
+
+    pc.decode_data(df, basename, _on_message = record, **kwargs)
+
+    return pd.DataFrame(times, columns = ["ToW", "WN", "Message_ID"])
+
+def compare_completion(fused, singles) :
+    """
+    Summary :
+        Compare the completion times of the messages of the fused stream with
+        the ones of the single receivers.
+
+        A message completed by a receiver is associated with the last message
+        with the same ID completed by the fused stream at the same time or
+        before it: the fused stream includes all the pages of the receiver.
+
+    Arguments :
+        fused - completion times of the fused stream, as returned by
+                decode_times
+        singles - list of completion times of the single receivers
+
+    Returns :
+        Dictionary with the number of messages of the fused stream
+        (messages), of each receiver (receiver_messages), of the messages
+        not completed by any receiver (only_fused) and the statistics of the
+        time gain with respect to the best single receiver [s]: gains (array,
+        one element per message completed also by a receiver), mean, median,
+        max and number of messages completed earlier (earlier).
+    """
+    def abs_times(df) :
+        return df["WN"].values.astype(np.float64) * 604800 + df["ToW"].values
+
+    t_fused = abs_times(fused)
+    ids_fused = fused["Message_ID"].values
+
+    # earliest completion of each message of the fused stream by a receiver
+    best = np.full(len(fused), np.inf)
+
+    for single in singles :
+        t_single = abs_times(single)
+        ids_single = single["Message_ID"].values
+
+        for msg_id in np.unique(ids_single) :
+            ind_fused = np.flatnonzero(ids_fused == msg_id)
+            if len(ind_fused) == 0 :
+                continue
+
+            # fused messages are in time order
+            t_single_id = t_single[ids_single == msg_id]
+            pos = np.searchsorted(t_fused[ind_fused], t_single_id, side = "right") - 1
+
+            ok = pos >= 0
+            np.minimum.at(best, ind_fused[pos[ok]], t_single_id[ok])
+
+    matched = np.isfinite(best)
+    gains = best[matched] - t_fused[matched]
+
+    return {"messages" : len(fused), \
+            "receiver_messages" : [len(single) for single in singles], \
+            "only_fused" : int(np.sum(~matched)), \
+            "gains" : gains, \
+            "mean" : float(np.mean(gains)) if len(gains) > 0 else 0.0, \
+            "median" : float(np.median(gains)) if len(gains) > 0 else 0.0, \
+            "max" : float(np.max(gains)) if len(gains) > 0 else 0.0, \
+            "earlier" : int(np.sum(gains > 0))}
+
+def parse_fused(sources, basename : str, offsets = None, compare : bool = False, \
+                **kwargs) :
+    """
+    Summary :
+        Load the pages of several receivers, fuse them and decode the fused
+        stream. The corrections are written to <basename>_has_*.csv.
+
+    Arguments :
+        sources - list of (filename, rx, type) of the receiver files (see
+                  process_cnav.parse_data). The first file is the reference
+                  of the times of week.
+        basename - base of the path name of the output files
+        offsets - offsets in seconds added to the times of week of each
+                  receiver, estimated if None
+        compare - if True, each receiver is also decoded alone (output in a
+                  temporary directory) and the completion times of the
+                  messages are compared
+        kwargs - options of process_cnav.decode_data (_page_offset,
+                 _erasures, _extra_pages, _store, _rtcm...). The replay index
+                 is not supported: the byte offsets refer to several files.
+
+    Returns :
+        Dictionary with the statistics of the fusion (see fuse_pages) and,
+        if compare is True, of the completion times (key "completion", see
+        compare_completion).
+    """
+    if kwargs.get("_index", False) :
+        raise Exception("The replay index is not supported for fused streams")
+
+    frames = [pc.load_data(filename, rx, _type) for filename, rx, _type in sources]
+
+    fused, stats = fuse_pages(frames, offsets)
+
+    print(f"Pages fused: {stats['output']}, duplicates removed: {stats['duplicates']}")
+    for (filename, _, _), pages, kept, unique, offset in zip(sources, stats["pages"], \
+                                                           stats["kept"], stats["unique"], \
+                                                           stats["offsets"]) :
+        print(f"  {os.path.basename(filename)}: {pages} pages, offset {offset} s, " + \
+              f"{kept} kept, {unique} received only by this receiver")
+
+    fused_times = decode_times(fused, basename, **kwargs)
+
+    if compare :
+        # options not affecting the completion of the messages are not used
+        options = {key : kwargs[key] for key in ("_page_offset", "_erasures", "_extra_pages") \
+                   if key in kwargs}
+
+        work_dir = tempfile.mkdtemp(prefix = "has_fusion_")
+        try :
+            singles = [decode_times(df, os.path.join(work_dir, f"rx{ii}"), **options) \
+                       for ii, df in enumerate(frames)]
+        finally :
+            shutil.rmtree(work_dir)
+
+        comp = compare_completion(fused_times, singles)
+        stats["completion"] = comp
+
+        print(f"Messages decoded: fused {comp['messages']}, single receivers " + \
+              f"{comp['receiver_messages']}, only with fusion {comp['only_fused']}")
+        print(f"Completed earlier than the best receiver: {comp['earlier']}, " + \
+              f"gain [s]: mean {comp['mean']:.2f}, median {comp['median']:.1f}, " + \
+              f"max {comp['max']:.0f}")
+
+    return stats
@@ -0,0 +1,658 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:21:05 2026
+
+@author: daniele
+
+Summary :
+    Synthetic generator of HAS data streams. MT1 messages are built by
+    inverting the bit layouts interpreted by has_corrections/has_decoder,
+    encoded with the HAS Reed-Solomon code and spread over simulated satellites
+    and epochs. The resulting pages can be written in all the receiver formats
+    supported by data_loading.
+"""
+
+import struct
+import datetime
+import numpy as np
+import pandas as pd
+import galois
+
+import has_corrections as hc
+import has_rtcm as hr
+import reed_solomon as rd
+
+# Dummy page header
+DUMMY_HEADER = 0xAF3BC3
+
+# Indexes of the validity intervals in Table 13 of the ICD
+VI_ORBIT = 10     # 300 s
+VI_CLOCK = 5      # 60 s
+VI_BIAS = 11      # 600 s
+
+
+def crc16_ccitt(data : bytes) :
+    """
+    Summary :
+        Compute the CRC-16 CCITT used by the SBF blocks.
+
+    Arguments :
+        data - the sequence of bytes
+
+    Returns :
+        The 16 bit CRC.
+    """
+    crc = 0
+    for byte in data :
+        crc ^= byte << 8
+        for ii in range(8) :
+            crc <<= 1
+            if crc & 0x10000 :
+                crc ^= 0x11021
+
+    return crc & 0xFFFF
+
+def greis_checksum(data : bytes) :
+    """
+    Summary :
+        Compute the 8 bit checksum of a GREIS message.
+
+    Arguments :
+        data - the message bytes, checksum excluded
+
+    Returns :
+        The checksum.
+    """
+    cs = 0
+    for byte in data :
+        cs = (((cs << 2) | (cs >> 6)) & 0xFF) ^ byte
+
+    return ((cs << 2) | (cs >> 6)) & 0xFF
+
+###############################################################################
+class has_content_generator :
+    """
+    Summary :
+        Generator of realistic MT1 message bodies for GPS and Galileo.
+    """
+
+    # Signals corrected by HAS for each GNSS (indexes of has_mask signals)
+    default_signals = {0 : [0, 7], 2 : [1, 4, 7, 13]}
+
+    def __init__(self, gnss_prns : dict = None, seed : int = 0, cell_mask : bool = False) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            gnss_prns - dictionary with GNSS ID (0 GPS, 2 Galileo) as key and
+                        the list of PRNs corrected as value
+            seed - seed of the random number generator
+            cell_mask - if True, the masks include a cell mask
+        """
+        if gnss_prns is None :
+            gnss_prns = {0 : list(range(1, 33)), 2 : list(range(1, 37))}
+
+        self.rng = np.random.default_rng(seed)
+
+        self.gnss_prns = gnss_prns
+        self.signals = {gnss : self.default_signals[gnss] for gnss in gnss_prns}
+
+        # cell masks: for each satellite, the signals actually corrected
+        self.cell_masks = {}
+        for gnss, prns in gnss_prns.items() :
+            nsig = len(self.signals[gnss])
+            if cell_mask :
+                cells = self.rng.integers(1, 1 << nsig, len(prns))
+            else :
+                cells = np.full(len(prns), (1 << nsig) - 1)
+            self.cell_masks[gnss] = cells
+        self.cell_mask_flag = int(cell_mask)
+
+        # state of the corrections, slowly varying
+        self.iods = {gnss : self.rng.integers(0, 256 if gnss == 0 else 1024, len(prns)) \
+                     for gnss, prns in gnss_prns.items()}
+        self.orbits = {gnss : self.rng.normal(0, [0.05, 0.2, 0.2], (len(prns), 3)) \
+                       for gnss, prns in gnss_prns.items()}
+        self.clocks = {gnss : self.rng.normal(0, 0.3, len(prns)) \
+                       for gnss, prns in gnss_prns.items()}
+        self.code_biases = {gnss : self.rng.normal(0, 2, (len(prns), len(self.signals[gnss]))) \
+                            for gnss, prns in gnss_prns.items()}
+        self.phase_biases = {gnss : self.rng.normal(0, 1, (len(prns), len(self.signals[gnss]))) \
+                             for gnss, prns in gnss_prns.items()}
+
+    def get_signals(self, gnss, ii) :
+        """
+        Summary :
+            Return the indexes (in the signal mask) of the signals corrected for
+            the ii-th satellite of a GNSS.
+        """
+        nsig = len(self.signals[gnss])
+        cell = format(int(self.cell_masks[gnss][ii]), f"0{nsig}b")
+
+        return [kk for kk in range(nsig) if cell[kk] == '1']
+
+    def evolve(self) :
+        """
+        Summary :
+            Random walk of the corrections between two messages.
+        """
+        for gnss in self.gnss_prns :
+            self.orbits[gnss] += self.rng.normal(0, 0.002, self.orbits[gnss].shape)
+            self.clocks[gnss] += self.rng.normal(0, 0.01, self.clocks[gnss].shape)
+            self.code_biases[gnss] += self.rng.normal(0, 0.005, self.code_biases[gnss].shape)
+            self.phase_biases[gnss] += self.rng.normal(0, 0.005, self.phase_biases[gnss].shape)
+
+    def new_iods(self) :
+        """
+        Summary :
+            Simulate the upload of a new broadcast ephemeris.
+        """
+        for gnss in self.gnss_prns :
+            self.iods[gnss] = (self.iods[gnss] + 1) % (256 if gnss == 0 else 1024)
+
+    def write_header(self, bw, toh, blocks, mask_id, iod_id) :
+        """
+        Summary :
+            Write the MT1 header (inverse of has_decoder.interpret_mt1_header).
+
+        Arguments :
+            bw - the bit writer
+            toh - time of hour
+            blocks - list of flags (mask, orbit, clock full-set, clock subset,
+                     code bias, phase bias)
+            mask_id - mask ID
+            iod_id - IOD Set ID
+        """
+        bw.put_bits(toh, 12)
+        for flag in blocks :
+            bw.put_bits(flag, 1)
+        bw.put_bits(0, 4)
+        bw.put_bits(mask_id, 5)
+        bw.put_bits(iod_id, 5)
+
+    def write_mask(self, bw) :
+        """
+        Summary :
+            Write the mask block (inverse of has_decoder.interpret_mt1_mask).
+        """
+        bw.put_bits(len(self.gnss_prns), 4)
+
+        for gnss, prns in self.gnss_prns.items() :
+            bw.put_bits(gnss, 4)
+
+            satmask = 0
+            for prn in prns :
+                satmask |= 1 << (40 - prn)
+            bw.put_bits(satmask, 40)
+
+            sigmask = 0
+            for sig in self.signals[gnss] :
+                sigmask |= 1 << (15 - sig)
+            bw.put_bits(sigmask, 16)
+
+            bw.put_bits(self.cell_mask_flag, 1)
+            if self.cell_mask_flag == 1 :
+                for cell in self.cell_masks[gnss] :
+                    bw.put_bits(cell, len(self.signals[gnss]))
+
+            # nav message
+            bw.put_bits(0, 3)
+
+        # reserved
+        bw.put_bits(0, 6)
+
+    def write_orbits(self, bw) :
+        """
+        Summary :
+            Write the orbit block (inverse of has_orbit_correction.interpret).
+        """
+        bw.put_bits(VI_ORBIT, 4)
+
+        for gnss in self.gnss_prns :
+            for ii in range(len(self.gnss_prns[gnss])) :
+                bw.put_bits(self.iods[gnss][ii], 8 if gnss == 0 else 10)
+                bw.put_bits(hr.quantize(self.orbits[gnss][ii, 0], 0.0025, 13), 13)
+                bw.put_bits(hr.quantize(self.orbits[gnss][ii, 1], 0.008, 12), 12)
+                bw.put_bits(hr.quantize(self.orbits[gnss][ii, 2], 0.008, 12), 12)
+
+    def write_full_clocks(self, bw, multiplier = 1) :
+        """
+        Summary :
+            Write the clock full-set block (inverse of
+            has_decoder.interpret_mt1_full_clock_corrections).
+        """
+        bw.put_bits(VI_CLOCK, 4)
+
+        for gnss in self.gnss_prns :
+            bw.put_bits(multiplier - 1, 2)
+
+        for gnss in self.gnss_prns :
+            for clock in self.clocks[gnss] :
+                bw.put_bits(hr.quantize(clock / multiplier, 0.0025, 13, reserved = 2), 13)
+
+    def write_subset_clocks(self, bw, fraction = 0.5, multiplier = 1) :
+        """
+        Summary :
+            Write the clock subset block (inverse of
+            has_decoder.interpret_mt1_subset_clock_corrections).
+
+        Arguments :
+            bw - the bit writer
+            fraction - fraction of the satellites included in the subset
+            multiplier - clock multiplier
+        """
+        bw.put_bits(VI_CLOCK, 4)
+        bw.put_bits(len(self.gnss_prns), 4)
+
+        for gnss, prns in self.gnss_prns.items() :
+            bw.put_bits(gnss, 4)
+            bw.put_bits(multiplier - 1, 2)
+
+            subset = self.rng.random(len(prns)) < fraction
+            for flag in subset :
+                bw.put_bits(flag, 1)
+
+            for ii in np.flatnonzero(subset) :
+                bw.put_bits(hr.quantize(self.clocks[gnss][ii] / multiplier, 0.0025, 13, reserved = 2), 13)
+
+    def write_code_biases(self, bw) :
+        """
+        Summary :
+            Write the code bias block (inverse of has_code_bias.interpret).
+        """
+        bw.put_bits(VI_BIAS, 4)
+
+        for gnss in self.gnss_prns :
+            for ii in range(len(self.gnss_prns[gnss])) :
+                for kk in self.get_signals(gnss, ii) :
+                    bw.put_bits(hr.quantize(self.code_biases[gnss][ii, kk], 0.02, 11), 11)
+
+    def write_phase_biases(self, bw) :
+        """
+        Summary :
+            Write the phase bias block (inverse of has_phase_bias.interpret).
+        """
+        bw.put_bits(VI_BIAS, 4)
+
+        for gnss in self.gnss_prns :
+            for ii in range(len(self.gnss_prns[gnss])) :
+                for kk in self.get_signals(gnss, ii) :
+                    bw.put_bits(hr.quantize(self.phase_biases[gnss][ii, kk], 0.01, 11), 11)
+                    bw.put_bits(0, 2)
+
+    def get_message(self, toh, blocks, mask_id = 1, iod_id = 0) :
+        """
+        Summary :
+            Build a MT1 message.
+
+        Arguments :
+            toh - time of hour
+            blocks - list of flags (mask, orbit, clock full-set, clock subset,
+                     code bias, phase bias)
+            mask_id - mask ID
+            iod_id - IOD Set ID
+
+        Returns :
+            msg - matrix (size x 53) with the message bytes
+        """
+        bw = hc.bit_writer()
+
+        self.write_header(bw, toh, blocks, mask_id, iod_id)
+
+        writers = [self.write_mask, self.write_orbits, self.write_full_clocks, \
+                   self.write_subset_clocks, self.write_code_biases, \
+                   self.write_phase_biases]
+
+        for flag, writer in zip(blocks, writers) :
+            if flag :
+                writer(bw)
+
+        size = (bw.num_bits + 424 - 1) // 424
+
+        if size > 32 :
+            raise Exception("Message too long: reduce the number of satellites")
+
+        return bw.get_bytes(size * 53).reshape((size, 53))
+
+###############################################################################
+class has_stream_generator :
+    """
+    Summary :
+        Generator of a stream of E6B pages carrying HAS messages, as received
+        by a receiver tracking several Galileo satellites.
+    """
+
+    # Cycle of MT1 messages: (mask, orbit, clock full-set, clock subset,
+    # code bias, phase bias)
+    schedule = [(1, 1, 1, 0, 0, 0),
+                (0, 0, 1, 0, 0, 0),
+                (0, 0, 0, 0, 1, 1),
+                (0, 0, 0, 1, 0, 0),
+                (1, 0, 1, 0, 0, 0),
+                (0, 1, 0, 0, 0, 0)]
+
+    def __init__(self, wn = 2400, tow = 345600, svids = None, content = None, \
+                 msg_duration = 10, dummy_rate = 0.1, crc_error_rate = 0.0, \
+                 corrupt_rate = 0.0, seed = 0) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            wn - GPS week of the first epoch
+            tow - time of week of the first epoch [s]
+            svids - list of the Galileo satellites broadcasting E6B pages
+            content - has_content_generator providing the message content
+            msg_duration - number of seconds each message is broadcast for
+            dummy_rate - probability of dummy pages
+            crc_error_rate - probability of pages with bit errors detected by
+                             the CRC check (CRCPassed = 0)
+            corrupt_rate - probability of pages with bit errors not detected by
+                           the CRC check
+            seed - seed of the random number generator
+        """
+        if svids is None :
+            svids = [2, 3, 5, 7, 8, 11, 12, 24, 25, 26]
+
+        if content is None :
+            content = has_content_generator(seed = seed)
+
+        self.wn = wn
+        self.tow = tow
+        self.svids = svids
+        self.content = content
+        self.msg_duration = msg_duration
+        self.dummy_rate = dummy_rate
+        self.crc_error_rate = crc_error_rate
+        self.corrupt_rate = corrupt_rate
+        self.rng = np.random.default_rng(seed + 1)
+
+        gf2m = galois.GF(2**8)
+        self.gf2m = gf2m
+        self.H = rd.get_has_encoding_matrix(gf2m)
+
+        # Counters of the broadcast messages
+        self.msg_count = 0
+        self.iod_id = 0
+
+        # List of the messages generated: (ToW, message ID, msg bytes)
+        self.messages = []
+
+    def get_page_words(self, headers, pages) :
+        """
+        Summary :
+            Build the 512 bits (16 32-bit words) of the E6B pages as provided
+            by the receivers: 14 reserved bits, 24 bits of HAS header, 424 bits
+            of data, 24 bits of CRC and 6 tail bits.
+
+        Arguments :
+            headers - array with the HAS headers
+            pages - matrix with the page data (53 bytes per row)
+
+        Returns :
+            Matrix with 16 32-bit words per row.
+        """
+        words = np.zeros((len(headers), 16), dtype = np.uint32)
+
+        for ii in range(len(headers)) :
+            bits = (int(headers[ii]) << 424) | int.from_bytes(bytes(pages[ii]), 'big')
+
+            # the CRC covers reserved bits, header and data (462 bits)
+            crc = hr.crc24q(bits.to_bytes(58, 'big'))
+
+            bits = (((bits << 24) | crc) << 6) << (512 - 14 - 448 - 30)
+
+            for kk in range(16) :
+                words[ii, kk] = (bits >> (32 * (15 - kk))) & 0xFFFFFFFF
+
+        return words
+
+    def generate(self, duration) :
+        """
+        Summary :
+            Generate the page stream.
+
+        Arguments :
+            duration - number of seconds to generate
+
+        Returns :
+            Dataframe with the same format provided by the data_loading
+            functions.
+        """
+        num_sats = len(self.svids)
+
+        tows = []
+        svids = []
+        crcs = []
+        headers = []
+        pages = []
+
+        for start in range(0, duration, self.msg_duration) :
+            tow = self.tow + start
+
+            blocks = self.schedule[self.msg_count % len(self.schedule)]
+
+            if blocks[1] :
+                # new orbits: new IOD set
+                self.iod_id = (self.iod_id + 1) % 32
+                if self.msg_count % (4 * len(self.schedule)) == 0 :
+                    self.content.new_iods()
+
+            self.content.evolve()
+            msg = self.content.get_message(int(tow % 3600), blocks, 1, self.iod_id)
+            msg_id = self.msg_count % 32
+            size = msg.shape[0]
+            self.msg_count += 1
+
+            self.messages.append((tow, msg_id, msg))
+
+            # encode all the pages of the message
+            num_pages = min(self.msg_duration, duration - start) * num_sats
+
+            page_ids = np.concatenate((np.arange(1, size + 1), np.arange(33, 256)))
+            page_ids = self.rng.permutation(page_ids)[:num_pages]
+            page_ids = np.resize(page_ids, num_pages)
+
+            codewords = np.array(self.gf2m(self.H[page_ids - 1, :size]) @ self.gf2m(msg), \
+                                 dtype = np.uint8)
+
+            header = (1 << 18) | (msg_id << 13) | ((size - 1) << 8)
+
+            for ii in range(num_pages) :
+                page_tow = tow + ii // num_sats
+
+                tows.append(page_tow)
+                svids.append(self.svids[ii % num_sats])
+
+                if self.rng.random() < self.dummy_rate :
+                    headers.append(DUMMY_HEADER)
+                    pages.append(np.zeros(53, dtype = np.uint8))
+                    crcs.append(1)
+                    continue
+
+                page = codewords[ii].copy()
+                crc = 1
+
+                error = self.rng.random()
+                if error < self.crc_error_rate + self.corrupt_rate :
+                    page[self.rng.integers(0, 53)] ^= self.rng.integers(1, 256)
+
+                    if error < self.crc_error_rate :
+                        crc = 0
+
+                headers.append(header | int(page_ids[ii]))
+                pages.append(page)
+                crcs.append(crc)
+
+        self.tow += duration
+
+        words = self.get_page_words(headers, np.array(pages).reshape((-1, 53)))
+
+        data = { "TOW" : np.array(tows, dtype = float),
+                 "WNc [w]" : np.full(len(tows), self.wn),
+                 "SVID" : np.array(svids),
+                 "CRCPassed" : np.array(crcs),
+                 "ViterbiCnt" : np.zeros(len(tows), dtype = int),
+                 "signalType" : np.full(len(tows), 19) }
+
+        for kk in range(16) :
+            data[f"word {kk + 1}"] = words[:, kk]
+
+        return pd.DataFrame(data = data)
+
+###############################################################################
+def write_sbf(df, filename) :
+    """
+    Summary :
+        Write the pages as GALRawCNAV (4024) SBF blocks.
+
+    Arguments :
+        df - dataframe with the pages (data_loading format)
+        filename - output file name
+    """
+    blocks = []
+    words = df[[f"word {kk}" for kk in range(1, 17)]].values.astype(np.uint32)
+
+    for ii, row in enumerate(df.itertuples(index = False)) :
+        body = struct.pack('<IHBBBBBB', int(round(row[0] * 1000)), int(row[1]), \
+                           int(row[2]) + 70, int(row[3]), int(row[4]), int(row[5]), \
+                           0, ii % 64) + words[ii].astype('<u4').tobytes()
+
+        msg = struct.pack('<HH', 4024, 8 + len(body)) + body
+        blocks.append(b'$@' + struct.pack('<H', crc16_ccitt(msg)) + msg)
+
+    with open(filename, "wb") as fout :
+        fout.write(b''.join(blocks))
+
+def write_greis(df, filename) :
+    """
+    Summary :
+        Write the pages as GREIS (Javad) ED messages. A RD message with the date
+        is written at the beginning of the file.
+
+        ED messages do not carry the CRC status (the loader marks all the pages
+        as passing the CRC): the pages that failed the CRC check are not
+        written, as done by the receiver.
+
+    Arguments :
+        df - dataframe with the pages (data_loading format)
+        filename - output file name
+    """
+    df = df[df["CRCPassed"].values == 1]
+
+    words = df[[f"word {kk}" for kk in range(1, 17)]].values.astype(np.uint32)
+
+    date = datetime.datetime(1980, 1, 6) + \
+           datetime.timedelta(weeks = int(df["WNc [w]"].values[0]), \
+                              seconds = float(df["TOW"].values[0]))
+
+    # RD message: date of the first epoch
+    body = b"RD006" + struct.pack('<HBBB', date.year, date.month, date.day, 0)
+    msgs = [body + bytes([greis_checksum(body)]) + b"\n"]
+
+    for ii, row in enumerate(df.itertuples(index = False)) :
+        data = words[ii].astype('>u4').tobytes()[:62]
+
+        body = b"ED046" + struct.pack('<BIBB', int(row[2]), int(row[0]), 6, 62) + data
+        msgs.append(body + bytes([greis_checksum(body)]) + b"\n")
+
+    with open(filename, "wb") as fout :
+        fout.write(b''.join(msgs))
+
+def write_novatel(df, filename) :
+    """
+    Summary :
+        Write the pages as NovAtel GALCNAVRAWPAGE messages in abbreviated
+        ASCII format. As for write_greis, the pages that failed the CRC check
+        are not written: the format does not carry the CRC status.
+
+    Arguments :
+        df - dataframe with the pages (data_loading format)
+        filename - output file name
+    """
+    df = df[df["CRCPassed"].values == 1]
+
+    words = df[[f"word {kk}" for kk in range(1, 17)]].values.astype(np.uint32)
+
+    lines = []
+    for ii, row in enumerate(df.itertuples(index = False)) :
+        payload = words[ii].astype('>u4').tobytes()[:58].hex().upper()
+
+        lines.append(f"<GALCNAVRAWPAGE USB1 0 80.0 SATTIME {int(row[1])} " + \
+                     f"{row[0] - 1:.3f} 02000020 d1f6 32768\n")
+        lines.append(f"<     {ii % 64} {int(row[2])} 0 0 {payload}\n")
+
+    with open(filename, "w") as fout :
+        fout.write(''.join(lines))
+
+def write_sbf2asc(df, filename, _type = "hexa") :
+    """
+    Summary :
+        Write the pages in the format produced by the Septentrio sbf2asc
+        utility.
+
+    Arguments :
+        df - dataframe with the pages (data_loading format)
+        filename - output file name
+        _type - "hexa" for hexadecimal words, "txt" for decimal words
+    """
+    words = df[[f"word {kk}" for kk in range(1, 17)]].values.astype(np.uint32)
+
+    lines = []
+    for ii, row in enumerate(df.itertuples(index = False)) :
+        if _type == "hexa" :
+            lines.append(f"{int(round(row[0] * 1000))},{int(row[1])},{int(row[2]) + 70}," + \
+                         f"{int(row[3])},{int(row[4])},{int(row[5])},0,{ii % 64}," + \
+                         ",".join(f"{w:08X}" for w in words[ii]) + "\n")
+        else :
+            lines.append(f"{int(row[0])},{int(row[1])},{int(row[2])}," + \
+                         f"{int(row[3])},{int(row[4])},{int(row[5])}," + \
+                         ",".join(f"{w}" for w in words[ii]) + "\n")
+
+    with open(filename, "w") as fout :
+        fout.write(''.join(lines))
+
+def write_all_formats(df, basename) :
+    """
+    Summary :
+        Write the pages in all the supported receiver formats.
+
+    Arguments :
+        df - dataframe with the pages (data_loading format)
+        basename - base name of the output files
+
+    Returns :
+        Dictionary with the file name and the parse_data options (_rx, _type)
+        for each format.
+    """
+    files = {"sbf" : (basename + ".sbf", "sep", "bin"),
+             "sbf2asc_hexa" : (basename + "_hexa.txt", "sep", "hexa"),
+             "sbf2asc_txt" : (basename + "_txt.txt", "sep", "txt"),
+             "greis" : (basename + ".jps", "jav", None),
+             "novatel" : (basename + ".nov", "nov", None)}
+
+    write_sbf(df, files["sbf"][0])
+    write_sbf2asc(df, files["sbf2asc_hexa"][0], "hexa")
+    write_sbf2asc(df, files["sbf2asc_txt"][0], "txt")
+    write_greis(df, files["greis"][0])
+    write_novatel(df, files["novatel"][0])
+
+    return files
+
+if __name__ == "__main__":
+
+    import sys
+
+    # Output base name and duration of the stream [s]
+    basename = sys.argv[1] if len(sys.argv) > 1 else "synthetic"
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else 3600
+
+    generator = has_stream_generator()
+    df = generator.generate(duration)
+
+    files = write_all_formats(df, basename)
+
+    for fmt, (filename, _rx, _type) in files.items() :
+        print(f"{fmt}: {filename} (_rx = {_rx}, _type = {_type})")
@@ -6,11 +6,15 @@ Created on Wed Jun  9 08:47:52 2021
 @author: daniele
 """
 
+import os
 import numpy as np
 
 # use the "galois" package for operations on GF(2^8) and Reed-Solomon decoding
 import galois
 
+import reed_solomon as rd
+import has_profiler as hp
+
 
 class has_message :
     """
@@ -26,10 +30,14 @@ class has_message :
     # Finite field for decoding operations
     GF256 = galois.GF(2**8)
     
-    # Reed-Solomon encoding matrix
-    H = np.genfromtxt('has_encoding_matrix.csv', delimiter=',', dtype=np.uint8)
+    # Reed-Solomon encoding matrix (stored with the module, see test_rd.py)
+    H = np.genfromtxt(os.path.join(os.path.dirname(os.path.abspath(__file__)), \
+                                   'has_encoding_matrix.csv'), delimiter=',', dtype=np.uint8)
+    
+    # Cache with the inverses of the reduced encoding matrices
+    inv_cache = {}
 
-    def __init__(self, mtype, mid, size, ind_offset = 1) :
+    def __init__(self, mtype, mid, size, ind_offset = 1, extra_pages = 0) :
         """        
         Summary :
             Object constructor.
@@ -41,6 +49,8 @@ class has_message :
             ind_offset - during the first testing phase page indexes started as zero,
                          it was then updated to 1. This offset takes into account
                          this effect.
+            extra_pages - number of pages in excess of msize that can be stored
+                          and used to check the consistency of the decoding
         Returns:
             Nothing.
         """
@@ -55,10 +65,10 @@ class has_message :
         self.size = size
         
         # Allocate the matrix containing the different pages
-        self.pages = np.zeros((size, 53), dtype = np.uint8)
+        self.pages = np.zeros((size + extra_pages, 53), dtype = np.uint8)
         
         # Array with the page ID
-        self.page_ids = - np.ones(size, dtype = np.uint8)
+        self.page_ids = - np.ones(size + extra_pages, dtype = np.uint8)
         
         # Index pointing to the next available page slot
         self.page_index = 0
@@ -69,7 +79,35 @@ class has_message :
         
         self.ind_offset = ind_offset
         
-    def add_page( self, page_id, page ) :
+        # Pages that failed the CRC check: they can be used by the 
+        # errors-and-erasures decoder
+        self.suspect_ids = []
+        self.suspect_pages = []
+        
+        # Number of symbols corrected by the errors-and-erasures decoder
+        self.corrected_symbols = 0
+        
+        # Time of week at which the message was decoded before being complete.
+        # None if the message was not decoded yet.
+        self.decoded_tow = None
+        
+        # Message decoded before being complete: the message is consumed and
+        # only accepts the pages consistent with it, to measure the time gain.
+        # A page inconsistent with it belongs to a new message with the same
+        # ID and size: the message is then superseded.
+        self.decoded_msg = None
+        self.superseded = False
+        
+        # Results of the consistency check performed when extra pages are 
+        # available: IDs of the pages found corrupted and number of subsets of
+        # pages used for decoding
+        self.corrupted_ids = []
+        self.num_subsets = 0
+        
+        # Time of week of the first page received, set by the decoder
+        self.start_tow = None
+        
+    def add_page( self, page_id, page, reliable = True ) :
         """
         Summary :
             Add a new page to the message
@@ -77,6 +115,7 @@ class has_message :
         Arguments :
             page_id - the page ID
             page - array with the 53 bytes of the new page 
+            reliable - False if the page failed the CRC check
         
         Returns :
             True if the update was correctly performed
@@ -84,9 +123,28 @@ class has_message :
         # In any case reset the age of the message
         self.age = 0
         
-        # Add a page only if the message is not complete
-        if self.page_index == self.size : 
+        # Add a page only if there is space left in the message
+        if self.page_index == len(self.page_ids) : 
             return False
+        
+        # consumed message: pages that failed the CRC cannot be attributed
+        # and pages inconsistent with the decoded message are from a new one
+        if self.decoded_msg is not None :
+            if not reliable :
+                return False
+            
+            if not self.matches_page(page_id, page) :
+                self.superseded = True
+                return False
+            
+        if not reliable :
+            return self.add_suspect_page(page_id, page)
+        
+        # A reliable page replaces a suspect one with the same ID
+        if page_id in self.suspect_ids :
+            ind = self.suspect_ids.index(page_id)
+            del self.suspect_ids[ind]
+            del self.suspect_pages[ind]
 
         # Add a page only if it is not present in the message
         if page_id not in self.page_ids :
@@ -98,8 +156,57 @@ class has_message :
             return True
         else :
             return False
+        
+    def add_suspect_page( self, page_id, page ) :
+        """
+        Summary :
+            Add a page that failed the CRC check to the message. These pages are 
+            used only by the errors-and-erasures decoder.
+            
+        Arguments :
+            page_id - the page ID
+            page - array with the 53 bytes of the new page 
+        
+        Returns :
+            True if the update was correctly performed
+        """
+        # The page ID can be corrupted as well
+        if (page_id < self.ind_offset) or (page_id - self.ind_offset >= self.H.shape[0]) :
+            return False
+        
+        if (page_id in self.page_ids[:self.page_index]) or (page_id in self.suspect_ids) :
+            return False
+        
+        self.suspect_ids.append(page_id)
+        self.suspect_pages.append(np.array(page, dtype = np.uint8))
+        
+        return True
+    
+    def matches_page( self, page_id, page ) :
+        """
+        Summary :
+            Check if a page is consistent with the message decoded before its
+            completion, i.e. if it is the encoding of the decoded message.
+            
+        Arguments :
+            page_id - the page ID
+            page - array with the 53 bytes of the page
+        
+        Returns :
+            True if the page is consistent with the decoded message.
+        """
+        row = int(page_id) - self.ind_offset
+        
+        if (row < 0) or (row >= self.H.shape[0]) :
+            return False
+        
+        encoded = self.GF256(self.H[row:row + 1, :self.size]) @ self.decoded_msg
+        
+        return np.array_equal(np.asarray(encoded[0], dtype = np.uint16), \
+                              np.asarray(page, dtype = np.uint16))
     
-    def add_page_sep_bytes(self, page_as_sep_bytes) :
+    @hp.profile("unpack_page", lambda args, out : {"pages" : 1})
+    def add_page_sep_bytes(self, page_as_sep_bytes, reliable = True) :
         """
         Summary :
             A Septentrio receiver provides the CNAV page as an array of 16 32-bit 
@@ -110,6 +217,8 @@ class has_message :
         Arguments :
             page_as_sep_bytes - array with 16 32-bit integers representing the HAS
                                 message
+            reliable - False if the page failed the CRC check
+                                
         Returns :
             True if the update was correctly performed        
         """
@@ -160,7 +269,7 @@ class has_message :
         page[52] = ( page_as_sep_bytes[14] >> 18 ) & 0xFF
        
         # Now we are ready for updating the message
-        success = self.add_page(page_id, page )
+        success = self.add_page(page_id, page, reliable )
        
         return success
    
@@ -205,7 +314,24 @@ class has_message :
         Returns :
             True if the message is complete
         """
-        return (self.size == self.page_index)
+        return (self.page_index >= self.size)
+    
+    def can_decode_erasures(self) :
+        """
+        Summary :    
+            Check if enough pages, including the ones that failed the CRC check,
+            have been collected to attempt an errors-and-erasures decoding. 
+            Pages that failed the CRC check need to be confirmed by at least one
+            additional page.
+        
+        Arguments :
+            None.    
+            
+        Returns :
+            True if the errors-and-erasures decoding can be attempted
+        """
+        return (len(self.suspect_ids) > 0) and \
+               (self.page_index + len(self.suspect_ids) > self.size)
     
     def is_message(self, msg_type, msg_id, msg_size) :
         """
@@ -225,6 +351,7 @@ class has_message :
                      
         return is_message
         
+    @hp.profile("rs_decode", lambda args, out : {"pages" : args[0].page_index})
     def decode(self) :
         """
         Summary :    
@@ -245,16 +372,73 @@ class has_message :
             return None 
         
         # If here, perform decoding
-        # Get the reduced encoding matrix
-        HR = self.GF256(self.H[self.page_ids - self.ind_offset, 0:self.size])
+        rows = self.page_ids[:self.page_index] - self.ind_offset
+        
+        # Extra pages are available: decode from several subsets of pages and
+        # check the consistency of the results
+        if self.page_index > self.size :
+            msg, corrupted, self.num_subsets = rd.rs_decode_subsets(self.GF256, self.H, \
+                                                    rows, self.pages[:self.page_index], \
+                                                    self.size, cache = self.inv_cache)
+            
+            self.corrupted_ids = [int(pid) for pid in self.page_ids[:self.page_index][corrupted]]
+            
+            return msg
+        
+        # Get the inverse of the reduced encoding matrix
+        with hp.stage("rs_inversion") :
+            HRinv = rd.get_reduced_inverse(self.GF256, self.H, rows, self.size, self.inv_cache)
         
-        try :
-            HRinv = np.linalg.inv(HR)
-        except :
+        if HRinv is None :
             return None
         
-        msg = HRinv @ self.GF256(self.pages)
+        msg = HRinv @ self.GF256(self.pages[:self.size])
         
         return msg
+    
+    @hp.profile("rs_decode_erasures", \
+                lambda args, out : {"pages" : args[0].page_index + len(args[0].suspect_ids)})
+    def decode_erasures(self) :
+        """
+        Summary :    
+            Decode the message using both the pages that passed the CRC check 
+            and the ones that failed it. The pages not received are treated as
+            erasures and the errors in the pages that failed the CRC check are 
+            corrected using the Reed-Solomon code structure. With a single page
+            in excess of the message size, errors are only detected (the
+            decoding fails), not corrected: see rd.rs_decode_erasures.
+            
+            After a successful decoding the message is consumed (see 
+            matches_page).
+            
+        Arguments :
+            None.
+            
+        Returns :
+            The deconded message, None if the decoding failed
+        """
+        # For the moment only MT1 messages are supported
+        if self.mtype != 1 :
+            return None 
+        
+        page_ids = np.concatenate((self.page_ids[:self.page_index], \
+                                   np.array(self.suspect_ids, dtype = np.uint8)))
+        
+        pages = np.vstack([self.pages[:self.page_index]] + self.suspect_pages)
+        
+        reliable = np.arange(len(page_ids)) < self.page_index
         
-        
\ No newline at end of file
+        rows = page_ids.astype(int) - self.ind_offset
+        
+        msg, self.corrected_symbols = rd.rs_decode_erasures(self.GF256, self.H, \
+                                                            rows, pages, reliable, \
+                                                            self.size, \
+                                                            cache = self.inv_cache)
+        
+        # the message is consumed: the suspect pages are no longer needed
+        if msg is not None :
+            self.decoded_msg = msg
+            self.suspect_ids = []
+            self.suspect_pages = []
+            
+        return msg
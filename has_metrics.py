@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:22:47 2026
+
+@author: daniele
+
+Summary :
+    Operational metrics of the HAS decoding (pages ingested and dropped,
+    messages started, completed and evicted, decoding latency...).
+
+    Metrics are collected in a registry and exported in the Prometheus text
+    exposition format, either through a file (e.g. for the textfile collector
+    of the node exporter) or through a local HTTP endpoint.
+"""
+
+import os
+import time
+import threading
+import http.server
+
+
+def _format_labels(labels) :
+    """
+    Summary :
+        Format a tuple of (name, value) pairs as Prometheus labels.
+    """
+    if len(labels) == 0 :
+        return ""
+
+    return "{" + ",".join(f'{key}="{val}"' for key, val in labels) + "}"
+
+def _format_value(val) :
+    """
+    Summary :
+        Format a sample value.
+    """
+    if val == float("inf") :
+        return "+Inf"
+
+    if float(val).is_integer() :
+        return str(int(val))
+
+    return repr(float(val))
+
+###############################################################################
+class counter :
+    """
+    Summary :
+        Monotonically increasing counter, optionally with labels.
+    """
+    mtype = "counter"
+
+    def __init__(self, name : str, description : str, lock) :
+        self.name = name
+        self.description = description
+        self.lock = lock
+
+        # value for each set of labels
+        self.values = {}
+
+    def inc(self, value = 1, **labels) :
+        """
+        Summary :
+            Increase the counter.
+
+        Arguments :
+            value - the increment
+            labels - labels identifying the series (e.g. reason = "dummy")
+        """
+        key = tuple(sorted(labels.items()))
+
+        with self.lock :
+            self.values[key] = self.values.get(key, 0) + value
+
+    def get(self, **labels) :
+        """
+        Summary :
+            Return the current value of a series.
+        """
+        return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) :
+        """
+        Summary :
+            Return the samples of the metric as a list of text lines.
+        """
+        # series never updated are reported as zero
+        if len(self.values) == 0 :
+            return [f"{self.name} 0"]
+        
+        return [f"{self.name}{_format_labels(key)} {_format_value(val)}" \
+                for key, val in self.values.items()]
+
+###############################################################################
+class gauge(counter) :
+    """
+    Summary :
+        Value that can go up and down.
+    """
+    mtype = "gauge"
+
+    def set(self, value, **labels) :
+        """
+        Summary :
+            Set the value of the gauge.
+        """
+        with self.lock :
+            self.values[tuple(sorted(labels.items()))] = value
+
+###############################################################################
+class histogram :
+    """
+    Summary :
+        Histogram with cumulative buckets.
+    """
+    mtype = "histogram"
+
+    def __init__(self, name : str, description : str, lock, buckets) :
+        self.name = name
+        self.description = description
+        self.lock = lock
+
+        # upper bounds of the buckets, the last one is always +Inf
+        self.buckets = sorted(buckets) + [float("inf")]
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) :
+        """
+        Summary :
+            Add an observation to the histogram.
+        """
+        with self.lock :
+            for ii, bound in enumerate(self.buckets) :
+                if value <= bound :
+                    self.counts[ii] += 1
+                    break
+
+            self.sum += value
+            self.count += 1
+
+    def samples(self) :
+        """
+        Summary :
+            Return the samples of the metric as a list of text lines.
+        """
+        lines = []
+        cumulative = 0
+        for bound, num in zip(self.buckets, self.counts) :
+            cumulative += num
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+
+        return lines
+
+###############################################################################
+class metrics_registry :
+    """
+    Summary :
+        Collection of metrics that can be exported in the Prometheus text
+        format.
+    """
+
+    def __init__(self, filename : str = None, interval : float = 10.0) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            filename - if not None, file where the metrics are periodically
+                       written by export()
+            interval - minimum time in seconds between two writes of the file
+        """
+        self.lock = threading.RLock()
+        self.metrics = {}
+
+        self.filename = filename
+        self.interval = interval
+        self.last_export = None
+
+        self.server = None
+
+    def _add(self, metric) :
+        with self.lock :
+            if metric.name not in self.metrics :
+                self.metrics[metric.name] = metric
+
+            return self.metrics[metric.name]
+
+    def counter(self, name : str, description : str) :
+        """
+        Summary :
+            Return the counter with the given name, creating it if needed.
+        """
+        return self._add(counter(name, description, self.lock))
+
+    def gauge(self, name : str, description : str) :
+        """
+        Summary :
+            Return the gauge with the given name, creating it if needed.
+        """
+        return self._add(gauge(name, description, self.lock))
+
+    def histogram(self, name : str, description : str, buckets) :
+        """
+        Summary :
+            Return the histogram with the given name, creating it if needed.
+        """
+        return self._add(histogram(name, description, self.lock, buckets))
+
+    def render(self) :
+        """
+        Summary :
+            Render all the metrics in the Prometheus text exposition format.
+
+        Returns :
+            String with the metrics.
+        """
+        lines = []
+
+        with self.lock :
+            for metric in self.metrics.values() :
+                lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {metric.mtype}")
+                lines.extend(metric.samples())
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, filename : str) :
+        """
+        Summary :
+            Write the metrics to file. The file is replaced atomically so that
+            readers never see a partial content.
+        """
+        tmp_name = filename + ".tmp"
+
+        with open(tmp_name, "w") as fout :
+            fout.write(self.render())
+
+        os.replace(tmp_name, filename)
+
+    def export(self, force : bool = False) :
+        """
+        Summary :
+            Write the metrics to the file specified in the constructor if
+            more than "interval" seconds passed since the last write.
+
+        Arguments :
+            force - if True, the file is written regardless of the interval
+        """
+        if self.filename is None :
+            return
+
+        now = time.monotonic()
+        if force or self.last_export is None or now - self.last_export >= self.interval :
+            self.write(self.filename)
+            self.last_export = now
+
+    def serve(self, port : int, address : str = "127.0.0.1") :
+        """
+        Summary :
+            Expose the metrics on http://address:port/metrics. The server runs
+            in a daemon thread and reads the metrics while they are updated.
+
+        Arguments :
+            port - TCP port
+            address - address the server is bound to (local by default)
+        """
+        registry = self
+
+        class handler(http.server.BaseHTTPRequestHandler) :
+            def do_GET(self) :
+                if self.path.split("?")[0] not in ("/", "/metrics") :
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) :
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((address, port), handler)
+
+        thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        thread.start()
+
+    def close(self) :
+        """
+        Summary :
+            Write the final metrics and stop the HTTP server, if running.
+        """
+        self.export(force = True)
+
+        if self.server is not None :
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:35:50 2026
+
+@author: daniele
+
+Summary :
+    Application of the HAS orbit and clock corrections to the broadcast
+    ephemerides. Satellite positions, velocities and clock offsets are
+    computed from the Keplerian parameters for many satellites and epochs at
+    once (one row per satellite and epoch) and the corrections are applied as
+    specified by the HAS SIS ICD:
+
+        X_HAS = X_broadcast - [e_radial, e_in_track, e_cross_track] * delta
+        dt_HAS = dt_broadcast + multiplier * delta_clock_c0 / c
+
+    with e_in_track = v / |v|, e_cross_track = r x v / |r x v| and
+    e_radial = e_in_track x e_cross_track (r and v ECEF position and
+    velocity). The broadcast ephemerides are selected by the gnss_IOD of the
+    corrections (IODE for GPS LNAV, IODnav for Galileo I/NAV).
+"""
+
+import numpy as np
+import pandas as pd
+
+import timefun as tf
+import rinex_nav as rn
+
+# speed of light [m/s]
+SPEED_OF_LIGHT = 299792458.0
+
+# Earth rotation rate [rad/s]
+OMEGA_E = 7.2921151467e-5
+
+# Earth gravitational constant [m^3/s^2]
+MU = {rn.GPS_ID : 3.986005e14, rn.GAL_ID : 3.986004418e14}
+
+# relativistic clock correction constant [s/m^0.5]
+F_REL = {rn.GPS_ID : -4.442807633e-10, rn.GAL_ID : -4.442807309e-10}
+
+# iterations of the solution of the Kepler equation
+KEPLER_ITERATIONS = 10
+
+
+def broadcast_states(eph, t) :
+    """
+    Summary :
+        Compute satellite positions, velocities and clock offsets from the
+        broadcast ephemerides (IS-GPS-200 / Galileo OS SIS ICD algorithm).
+
+    Arguments :
+        eph - dictionary of arrays with the ephemeris parameters, one element
+              per row (see rinex_nav.ephemeris_store.get)
+        t - epochs in seconds since the GPS epoch, one per row
+
+    Returns :
+        pos - (N, 3) ECEF positions [m]
+        vel - (N, 3) ECEF velocities [m/s]
+        clock - (N,) clock offsets [s], including the relativistic correction
+                and excluding the group delays
+    """
+    t = np.asarray(t, dtype = np.float64)
+    gnss = eph["gnssID"]
+
+    mu = np.where(gnss == rn.GPS_ID, MU[rn.GPS_ID], MU[rn.GAL_ID])
+    f_rel = np.where(gnss == rn.GPS_ID, F_REL[rn.GPS_ID], F_REL[rn.GAL_ID])
+
+    # time from the ephemeris reference epoch
+    tk = t - eph["t_oe"]
+
+    # mean motion and mean anomaly
+    A = eph["sqrtA"]**2
+    n = np.sqrt(mu / A**3) + eph["delta_n"]
+    M = eph["M0"] + n * tk
+
+    # eccentric anomaly
+    e = eph["e"]
+    E = M.copy()
+    for ii in range(KEPLER_ITERATIONS) :
+        E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+
+    sinE, cosE = np.sin(E), np.cos(E)
+    E_dot = n / (1 - e * cosE)
+
+    # true anomaly and argument of latitude
+    sq = np.sqrt(1 - e**2)
+    nu = np.arctan2(sq * sinE, cosE - e)
+    nu_dot = E_dot * sq / (1 - e * cosE)
+
+    phi = nu + eph["omega"]
+    sin2p, cos2p = np.sin(2 * phi), np.cos(2 * phi)
+
+    # second harmonic perturbations
+    u = phi + eph["Cus"] * sin2p + eph["Cuc"] * cos2p
+    r = A * (1 - e * cosE) + eph["Crs"] * sin2p + eph["Crc"] * cos2p
+    inc = eph["i0"] + eph["IDOT"] * tk + eph["Cis"] * sin2p + eph["Cic"] * cos2p
+
+    u_dot = nu_dot * (1 + 2 * (eph["Cus"] * cos2p - eph["Cuc"] * sin2p))
+    r_dot = A * e * sinE * E_dot + 2 * nu_dot * (eph["Crs"] * cos2p - eph["Crc"] * sin2p)
+    inc_dot = eph["IDOT"] + 2 * nu_dot * (eph["Cis"] * cos2p - eph["Cic"] * sin2p)
+
+    # position and velocity in the orbital plane
+    cosu, sinu = np.cos(u), np.sin(u)
+    xp, yp = r * cosu, r * sinu
+    xp_dot = r_dot * cosu - r * u_dot * sinu
+    yp_dot = r_dot * sinu + r * u_dot * cosu
+
+    # longitude of the ascending node
+    Omega = eph["OMEGA0"] + (eph["OMEGA_DOT"] - OMEGA_E) * tk - OMEGA_E * eph["toe"]
+    Omega_dot = eph["OMEGA_DOT"] - OMEGA_E
+
+    cosO, sinO = np.cos(Omega), np.sin(Omega)
+    cosi, sini = np.cos(inc), np.sin(inc)
+
+    pos = np.empty((len(t), 3))
+    pos[:, 0] = xp * cosO - yp * cosi * sinO
+    pos[:, 1] = xp * sinO + yp * cosi * cosO
+    pos[:, 2] = yp * sini
+
+    vel = np.empty((len(t), 3))
+    vel[:, 0] = xp_dot * cosO - yp_dot * cosi * sinO + yp * sini * sinO * inc_dot - \
+                pos[:, 1] * Omega_dot
+    vel[:, 1] = xp_dot * sinO + yp_dot * cosi * cosO - yp * sini * cosO * inc_dot + \
+                pos[:, 0] * Omega_dot
+    vel[:, 2] = yp_dot * sini + yp * cosi * inc_dot
+
+    # clock offset with the relativistic correction
+    dt = t - eph["t_oc"]
+    clock = eph["af0"] + eph["af1"] * dt + eph["af2"] * dt**2 + \
+            f_rel * e * eph["sqrtA"] * sinE
+
+    return pos, vel, clock
+
+def rac_to_ecef(pos, vel, radial, in_track, cross_track) :
+    """
+    Summary :
+        Convert radial, in-track and cross-track vectors into ECEF.
+
+    Arguments :
+        pos, vel - (N, 3) ECEF positions and velocities of the satellites
+        radial, in_track, cross_track - (N,) components
+
+    Returns :
+        (N, 3) ECEF vectors.
+    """
+    cross = np.cross(pos, vel)
+
+    e_in_track = vel / np.linalg.norm(vel, axis = 1, keepdims = True)
+    e_cross_track = cross / np.linalg.norm(cross, axis = 1, keepdims = True)
+    e_radial = np.cross(e_in_track, e_cross_track)
+
+    return e_radial * np.asarray(radial)[:, None] + \
+           e_in_track * np.asarray(in_track)[:, None] + \
+           e_cross_track * np.asarray(cross_track)[:, None]
+
+def corrected_states(nav, gnss, prn, iod, wn, tow, radial, in_track, cross_track, \
+                     multiplier = None, clock_c0 = None) :
+    """
+    Summary :
+        Apply the HAS corrections to the broadcast ephemerides, vectorized
+        over satellites and epochs.
+
+    Arguments :
+        nav - rinex_nav.ephemeris_store with the broadcast ephemerides
+        gnss, prn, iod - gnss IDs, PRNs and gnss_IODs of the corrections
+        wn, tow - epochs (GPS week and time of week) of the computation
+        radial, in_track, cross_track - orbit corrections [m]
+        multiplier, clock_c0 - optional clock corrections (multiplier and
+                               delta_clock_c0 [m]). NaN for clock
+                               corrections not available.
+
+    Returns :
+        Dictionary of arrays with one element per row:
+            pos, vel - (N, 3) corrected ECEF positions [m] and velocities [m/s]
+            clock - corrected clock offsets [s] (broadcast clock if no clock
+                    correction is provided)
+            pos_brdc, clock_brdc - broadcast positions and clock offsets
+            valid - True if the ephemeris was found and the corrections are
+                    available
+            record - index of the ephemeris record used, -1 if not found
+    """
+    gnss, prn, iod, wn, tow, radial, in_track, cross_track = \
+        np.broadcast_arrays(gnss, prn, iod, wn, tow, radial, in_track, cross_track)
+
+    t = np.asarray(wn, dtype = np.float64) * tf.WEEK_SECONDS + tow
+
+    rows = nav.match(gnss, prn, iod, t)
+    found = rows >= 0
+
+    num_rows = len(rows)
+    pos_brdc = np.full((num_rows, 3), np.nan)
+    vel = np.full((num_rows, 3), np.nan)
+    clock_brdc = np.full(num_rows, np.nan)
+
+    if np.any(found) :
+        pos_brdc[found], vel[found], clock_brdc[found] = \
+            broadcast_states(nav.get(rows[found]), t[found])
+
+    # orbit corrections, removed from the broadcast positions
+    delta = rac_to_ecef(pos_brdc, vel, radial, in_track, cross_track)
+    pos = pos_brdc - delta
+
+    valid = found & np.all(np.isfinite(pos), axis = 1)
+
+    clock = clock_brdc
+    if clock_c0 is not None :
+        clock = clock_brdc + np.asarray(multiplier) * np.asarray(clock_c0) / SPEED_OF_LIGHT
+        valid &= np.isfinite(clock)
+
+    return {"pos" : pos, "vel" : vel, "clock" : clock, "pos_brdc" : pos_brdc, \
+            "clock_brdc" : clock_brdc, "valid" : valid, "record" : rows}
+
+def correct_epoch(nav, orbits, clocks, wn, tow) :
+    """
+    Summary :
+        Compute the corrected orbits and clocks of all the satellites at an
+        epoch.
+
+    Arguments :
+        nav - rinex_nav.ephemeris_store with the broadcast ephemerides
+        orbits - dataframe with the orbit corrections (columns gnssID, PRN,
+                 gnssIOD, delta_radial, delta_in_track, delta_cross_track),
+                 e.g. has_correction_store.get_epoch("orbit", wn, tow)
+        clocks - dataframe with the clock corrections (columns gnssID, PRN,
+                 gnssIOD, multiplier, delta_clock_c0, status), e.g.
+                 has_correction_store.get_epoch("clock", wn, tow). If None,
+                 the broadcast clocks are provided.
+        wn, tow - epoch of the computation
+
+    Returns :
+        Dataframe with one row per satellite with valid corrections: gnssID,
+        PRN, IOD, X, Y, Z [m], VX, VY, VZ [m/s], clock [s] and the broadcast
+        position and clock (X_brdc, Y_brdc, Z_brdc, clock_brdc).
+    """
+    columns = ["gnssID", "PRN", "gnssIOD", "delta_radial", "delta_in_track", \
+               "delta_cross_track"]
+    data = orbits[columns]
+
+    if clocks is not None :
+        clk = clocks[["gnssID", "PRN", "gnssIOD", "multiplier", "delta_clock_c0", "status"]]
+
+        # clock corrections not available or not to be used (status != 0)
+        clk = clk.assign(delta_clock_c0 = np.where(clk["status"].values == 0, \
+                                                   clk["delta_clock_c0"].values, np.nan))
+
+        # clock corrections refer to the orbits with the same gnss IOD
+        data = data.merge(clk, on = ["gnssID", "PRN", "gnssIOD"], how = "inner")
+
+    states = corrected_states(nav, data["gnssID"].values, data["PRN"].values, \
+                              data["gnssIOD"].values, wn, tow, \
+                              data["delta_radial"].values, data["delta_in_track"].values, \
+                              data["delta_cross_track"].values, \
+                              None if clocks is None else data["multiplier"].values, \
+                              None if clocks is None else data["delta_clock_c0"].values)
+
+    valid = states["valid"]
+
+    out = pd.DataFrame({"gnssID" : data["gnssID"].values[valid], \
+                        "PRN" : data["PRN"].values[valid], \
+                        "IOD" : data["gnssIOD"].values[valid]})
+
+    for ii, axis in enumerate("XYZ") :
+        out[axis] = states["pos"][valid, ii]
+
+    for ii, axis in enumerate("XYZ") :
+        out["V" + axis] = states["vel"][valid, ii]
+
+    out["clock"] = states["clock"][valid]
+
+    for ii, axis in enumerate("XYZ") :
+        out[axis + "_brdc"] = states["pos_brdc"][valid, ii]
+
+    out["clock_brdc"] = states["clock_brdc"][valid]
+
+    return out
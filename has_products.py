@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:04:18 2026
+
+@author: daniele
+
+Summary :
+    SP3 and RINEX clock products from the HAS corrections.
+
+    The orbit and clock corrections are sampled at a regular epoch rate with
+    a validity-aware sample-and-hold: at each epoch, the latest correction of
+    each satellite is used if the epoch is within its validity interval
+    (same convention as has_correction_store). The corrections are applied
+    to the broadcast ephemerides (has_orbits) and the corrected positions and
+    clocks are written to:
+
+        SP3-c/d  - positions [km] and clocks [microseconds]
+        RINEX 3.00 clock - AS records [s]
+
+    The products can be generated
+        - while decoding, with product_stream.on_message passed as the
+          _on_message callback of process_cnav.decode_data (with the
+          has_correction_store given as _store)
+        - from the CSV files written by the decoder, with products_from_csv
+
+    Epochs are processed in blocks: the states of all the satellites and
+    epochs of a block are computed at once and the lines of the block are
+    formatted and written in a single operation.
+"""
+
+import numpy as np
+import pandas as pd
+
+import timefun as tf
+import rinex_nav as rn
+import has_orbits as ho
+
+# RINEX system identifiers of the HAS GNSS
+system_ids = {rn.GPS_ID : "G", rn.GAL_ID : "E"}
+
+# maximum PRN of the lookup table of the satellites
+MAX_PRN = 64
+
+# SP3 value of a missing clock
+SP3_BAD_CLOCK = 999999.999999
+
+
+def gps_to_calendar(t) :
+    """
+    Summary :
+        Convert times in seconds since the GPS epoch into calendar dates.
+
+    Returns :
+        year, month, day, hour, minute (integer arrays) and seconds.
+    """
+    t = np.asarray(t, dtype = np.float64)
+
+    dt = tf.GpsToDatetime(np.zeros(len(t), dtype = np.int64), t)
+
+    days = dt.astype("datetime64[D]")
+    months = dt.astype("datetime64[M]")
+    years = dt.astype("datetime64[Y]")
+
+    year = years.astype(np.int64) + 1970
+    month = (months - years.astype("datetime64[M]")).astype(np.int64) + 1
+    day = (days - months.astype("datetime64[D]")).astype(np.int64) + 1
+
+    sec_of_day = (dt - days.astype("datetime64[ns]")).astype(np.int64) / 1e9
+
+    hour = (sec_of_day // 3600).astype(np.int64)
+    minute = ((sec_of_day % 3600) // 60).astype(np.int64)
+    second = sec_of_day % 60
+
+    return year, month, day, hour, minute, second
+
+def header_line(content : str, label : str) :
+    """
+    Summary :
+        Build a RINEX header line: content in columns 1-60, label from
+        column 61.
+    """
+    return f"{content:<60.60s}{label}\n"
+
+class sp3_writer :
+    """
+    Summary :
+        Writer of SP3-c/d orbit files. The satellites are fixed when the
+        writer is created, the header is written with the first epoch and
+        the number of epochs is updated when the file is closed.
+    """
+
+    def __init__(self, filename : str, satellites, rate : float, version : str = "d", \
+                 agency : str = "HAS", coord_sys : str = "IGb20", orbit_type : str = "EXT") :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            filename - pathname of the SP3 file
+            satellites - list of satellite identifiers (e.g. G01, E11)
+            rate - epoch interval in seconds
+            version - SP3 version, "c" or "d"
+            agency, coord_sys, orbit_type - header fields
+        """
+        if version not in ("c", "d") :
+            raise Exception(f"Unsupported SP3 version: {version}")
+
+        if version == "c" and len(satellites) > 85 :
+            raise Exception("SP3-c files are limited to 85 satellites")
+
+        self.filename = filename
+        self.satellites = list(satellites)
+        self.rate = rate
+        self.version = version
+        self.agency = agency
+        self.coord_sys = coord_sys
+        self.orbit_type = orbit_type
+
+        self.fout = open(filename, "w", buffering = 1 << 20)
+
+        self.num_epochs = 0
+        self.first_line = None
+
+    def write_header(self, t0) :
+        """
+        Summary :
+            Write the header, with the first epoch t0 (seconds since the GPS
+            epoch).
+        """
+        year, month, day, hour, minute, second = [val[0] for val in gps_to_calendar([t0])]
+
+        week, tow = divmod(t0, tf.WEEK_SECONDS)
+        mjd = tf.GpsToMjd(week, tow)
+
+        # the number of epochs is updated by close
+        self.first_line = f"#{self.version}P{year:4d} {month:2d} {day:2d} {hour:2d} {minute:2d} " + \
+                          f"{second:11.8f} %7d ORBIT {self.coord_sys:<5.5s} " + \
+                          f"{self.orbit_type:<3.3s} {self.agency:<4.4s}\n"
+
+        lines = [self.first_line % 0]
+        lines.append(f"## {int(week):4d} {tow:15.8f} {self.rate:14.8f} {int(mjd):5d} " + \
+                     f"{mjd - int(mjd):15.13f}\n")
+
+        # satellite list and accuracy, 17 satellites per line, at least 5 lines
+        num_lines = max(5, (len(self.satellites) + 16) // 17)
+        sats = self.satellites + ["  0"] * (17 * num_lines - len(self.satellites))
+
+        for ii in range(num_lines) :
+            prefix = f"+  {len(self.satellites):3d}   " if ii == 0 else "+        "
+            lines.append(prefix + "".join(sats[17 * ii:17 * (ii + 1)]) + "\n")
+
+        for ii in range(num_lines) :
+            lines.append("++       " + "  0" * 17 + "\n")
+
+        systems = set(sat[0] for sat in self.satellites)
+        file_type = systems.pop() if len(systems) == 1 else "M"
+
+        lines.append(f"%c {file_type}  cc GPS ccc cccc cccc cccc cccc ccccc ccccc ccccc ccccc\n")
+        lines.append("%c cc cc ccc ccc cccc cccc cccc cccc ccccc ccccc ccccc ccccc\n")
+        lines.append("%f  1.2500000  1.025000000  0.00000000000  0.000000000000000\n")
+        lines.append("%f  0.0000000  0.000000000  0.00000000000  0.000000000000000\n")
+        lines.append("%i    0    0    0    0      0      0      0      0         0\n")
+        lines.append("%i    0    0    0    0      0      0      0      0         0\n")
+        lines.append("/* Galileo HAS corrections applied to the broadcast ephemerides\n")
+        lines.append("/* Generated by GHASP\n")
+        lines.append("/* Clocks include the relativistic correction, no group delays\n")
+        lines.append("/*\n")
+
+        self.fout.write("".join(lines))
+
+    def write(self, t, pos, clock) :
+        """
+        Summary :
+            Write a block of epochs.
+
+        Arguments :
+            t - (E,) epochs in seconds since the GPS epoch
+            pos - (E, S, 3) ECEF positions [m] of the satellites, NaN if not
+                  available
+            clock - (E, S) clock offsets [s], NaN if not available
+        """
+        if len(t) == 0 :
+            return
+
+        if self.first_line is None :
+            self.write_header(t[0])
+
+        year, month, day, hour, minute, second = gps_to_calendar(t)
+
+        # missing positions are written as 0, missing clocks as 999999.999999
+        pos_km = np.where(np.isnan(pos), 0.0, pos / 1e3)
+        clk_us = np.where(np.isnan(clock) | np.isnan(pos[:, :, 0]), SP3_BAD_CLOCK, clock * 1e6)
+
+        num_sats = len(self.satellites)
+        rows = zip(np.tile(self.satellites, len(t)), \
+                   pos_km[:, :, 0].ravel().tolist(), pos_km[:, :, 1].ravel().tolist(), \
+                   pos_km[:, :, 2].ravel().tolist(), clk_us.ravel().tolist())
+        sat_lines = ["P%s%14.6f%14.6f%14.6f%14.6f\n" % row for row in rows]
+
+        epochs = zip(year.tolist(), month.tolist(), day.tolist(), hour.tolist(), \
+                     minute.tolist(), second.tolist())
+        lines = []
+        for ii, epoch in enumerate(epochs) :
+            lines.append("*  %4d %2d %2d %2d %2d %11.8f\n" % epoch)
+            lines.extend(sat_lines[ii * num_sats:(ii + 1) * num_sats])
+
+        self.fout.write("".join(lines))
+        self.num_epochs += len(t)
+
+    def close(self) :
+        """
+        Summary :
+            Terminate the file and update the number of epochs.
+        """
+        if self.first_line is not None :
+            self.fout.write("EOF\n")
+
+        self.fout.close()
+
+        if self.first_line is not None :
+            # the first line has a fixed length
+            with open(self.filename, "r+") as fout :
+                fout.write(self.first_line % self.num_epochs)
+
+class clk_writer :
+    """
+    Summary :
+        Writer of RINEX 3.00 clock files with satellite clocks (AS records).
+    """
+
+    def __init__(self, filename : str, satellites, agency : str = "HAS", \
+                 description : str = "Galileo HAS corrected clocks") :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            filename - pathname of the clock file
+            satellites - list of satellite identifiers (e.g. G01, E11)
+            agency, description - analysis center fields of the header
+        """
+        self.filename = filename
+        self.satellites = list(satellites)
+        self.agency = agency
+        self.description = description
+
+        self.fout = open(filename, "w", buffering = 1 << 20)
+
+        self.header_written = False
+
+    def write_header(self) :
+        """
+        Summary :
+            Write the header.
+        """
+        systems = set(sat[0] for sat in self.satellites)
+        sat_system = systems.pop() if len(systems) == 1 else "M"
+
+        now = pd.Timestamp.now(tz = "UTC").strftime("%Y%m%d %H%M%S UTC")
+
+        lines = [header_line(f"{3.0:9.2f}{'':11s}C{'':19s}{sat_system}", "RINEX VERSION / TYPE"),
+                 header_line(f"{'GHASP':<20s}{self.agency:<20s}{now:<20s}", "PGM / RUN BY / DATE"),
+                 header_line(f"{'':3s}GPS", "TIME SYSTEM ID"),
+                 header_line(f"{1:6d}    AS", "# / TYPES OF DATA"),
+                 header_line(f"{self.agency:<3.3s}  {self.description}", "ANALYSIS CENTER"),
+                 header_line(f"{len(self.satellites):6d}", "# OF SOLN SATS")]
+
+        for ii in range(0, len(self.satellites), 15) :
+            lines.append(header_line("".join(f"{sat} " for sat in self.satellites[ii:ii + 15]), \
+                                     "PRN LIST"))
+
+        lines.append(header_line("", "END OF HEADER"))
+
+        self.fout.write("".join(lines))
+        self.header_written = True
+
+    def write(self, t, clock) :
+        """
+        Summary :
+            Write a block of epochs.
+
+        Arguments :
+            t - (E,) epochs in seconds since the GPS epoch
+            clock - (E, S) clock offsets [s], NaN if not available (no
+                    record is written)
+        """
+        if not self.header_written :
+            self.write_header()
+
+        if len(t) == 0 :
+            return
+
+        year, month, day, hour, minute, second = gps_to_calendar(t)
+
+        # the satellite and epoch fields are formatted once
+        epochs = ["%4d %02d %02d %02d %02d %9.6f" % epoch for epoch in \
+                  zip(year.tolist(), month.tolist(), day.tolist(), hour.tolist(), \
+                      minute.tolist(), second.tolist())]
+        sats = ["AS %-4s " % sat for sat in self.satellites]
+
+        # records of the available clocks, sorted by epoch and satellite
+        epoch_ind, sat_ind = np.nonzero(~np.isnan(clock))
+
+        rows = zip([sats[ii] for ii in sat_ind.tolist()], \
+                   [epochs[ii] for ii in epoch_ind.tolist()], \
+                   clock[epoch_ind, sat_ind].tolist())
+
+        self.fout.write("".join(["%s%s  1  %19.12E\n" % row for row in rows]))
+
+    def close(self) :
+        """
+        Summary :
+            Close the file (a header is written even without data).
+        """
+        if not self.header_written :
+            self.write_header()
+
+        self.fout.close()
+
+class product_writer :
+    """
+    Summary :
+        Compute the corrected positions and clocks of blocks of epochs and
+        write them to the SP3 and clock files.
+    """
+
+    def __init__(self, nav, rate : float = 30, sp3 : str = None, clk : str = None, \
+                 satellites = None, sp3_version : str = "d") :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            nav - rinex_nav.ephemeris_store with the broadcast ephemerides
+            rate - epoch interval in seconds
+            sp3 - pathname of the SP3 file, None for no SP3 output
+            clk - pathname of the RINEX clock file, None for no clock output
+            satellites - list of (gnss ID, PRN) of the products. If None, all
+                         the satellites of the ephemeris store are used.
+            sp3_version - SP3 version, "c" or "d"
+        """
+        self.nav = nav
+        self.rate = rate
+
+        if satellites is None :
+            satellites = sorted(set(zip(nav.records["gnssID"].tolist(), \
+                                        nav.records["PRN"].tolist())))
+
+        self.satellites = list(satellites)
+        self.sat_ids = [f"{system_ids[gnss]}{prn:02d}" for gnss, prn in self.satellites]
+
+        # column of each satellite, -1 for the satellites not in the products
+        self.columns = np.full((max(system_ids) + 1) * MAX_PRN, -1, dtype = np.int64)
+        for ii, (gnss, prn) in enumerate(self.satellites) :
+            self.columns[gnss * MAX_PRN + prn] = ii
+
+        self.sp3 = None if sp3 is None else sp3_writer(sp3, self.sat_ids, rate, sp3_version)
+        self.clk = None if clk is None else clk_writer(clk, self.sat_ids)
+
+    def write(self, t, epoch, gnss, prn, iod, radial, in_track, cross_track, multiplier, clock_c0) :
+        """
+        Summary :
+            Write a block of epochs.
+
+        Arguments :
+            t - (E,) epochs in seconds since the GPS epoch
+            epoch - index in t of each row of corrections
+            gnss, prn, iod - satellite and gnss_IOD of each row
+            radial, in_track, cross_track - orbit corrections [m]
+            multiplier, clock_c0 - clock corrections, NaN if not available
+        """
+        t = np.asarray(t, dtype = np.float64)
+
+        pos = np.full((len(t), len(self.satellites), 3), np.nan)
+        clock = np.full((len(t), len(self.satellites)), np.nan)
+
+        gnss = np.asarray(gnss, dtype = np.int64)
+        prn = np.asarray(prn, dtype = np.int64)
+
+        cols = np.full(len(gnss), -1, dtype = np.int64)
+        known = (prn >= 0) & (prn < MAX_PRN) & np.isin(gnss, list(system_ids))
+        cols[known] = self.columns[gnss[known] * MAX_PRN + prn[known]]
+
+        sel = cols >= 0
+
+        if np.any(sel) :
+            states = ho.corrected_states(self.nav, gnss[sel], prn[sel], np.asarray(iod)[sel], \
+                                         0, t[np.asarray(epoch)[sel]], \
+                                         np.asarray(radial)[sel], np.asarray(in_track)[sel], \
+                                         np.asarray(cross_track)[sel], \
+                                         np.asarray(multiplier)[sel], np.asarray(clock_c0)[sel])
+
+            rows = np.asarray(epoch)[sel]
+            pos[rows, cols[sel]] = states["pos"]
+            clock[rows, cols[sel]] = np.where(np.isnan(states["pos"][:, 0]), np.nan, \
+                                              states["clock"])
+
+        if self.sp3 is not None :
+            self.sp3.write(t, pos, clock)
+
+        if self.clk is not None :
+            self.clk.write(t, clock)
+
+    def close(self) :
+        """
+        Summary :
+            Close the output files.
+        """
+        if self.sp3 is not None :
+            self.sp3.close()
+
+        if self.clk is not None :
+            self.clk.close()
+
+class product_stream(product_writer) :
+    """
+    Summary :
+        Products generated while decoding: the corrections are sampled from a
+        has_correction_store at each epoch up to the time of the last message
+        decoded.
+    """
+
+    def __init__(self, nav, store, rate : float = 30, sp3 : str = None, clk : str = None, \
+                 satellites = None, sp3_version : str = "d", block : int = 120) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            nav, rate, sp3, clk, satellites, sp3_version - see product_writer
+            store - has_correction_store filled by the decoder
+            block - number of epochs written together
+        """
+        super().__init__(nav, rate, sp3, clk, satellites, sp3_version)
+
+        self.store = store
+        self.block = block
+
+        # next epoch to write and epochs sampled but not written yet
+        self.next_t = None
+        self.pending_t = []
+        self.pending = []
+
+    def on_message(self, tow, week, msg_id) :
+        """
+        Summary :
+            Sample the corrections at the epochs before the time of a message.
+            To be passed as _on_message to process_cnav.decode_data.
+        """
+        t_now = int(week) * tf.WEEK_SECONDS + tow
+
+        if self.next_t is None :
+            self.next_t = np.ceil(t_now / self.rate) * self.rate
+
+        # the epoch of the message is sampled with the next message, after
+        # all the messages received in the same second
+        while self.next_t < t_now :
+            self.sample(self.next_t)
+            self.next_t += self.rate
+
+            if len(self.pending_t) >= self.block :
+                self.flush()
+
+    def sample(self, t) :
+        """
+        Summary :
+            Sample the corrections valid at epoch t.
+        """
+        week, tow = divmod(t, tf.WEEK_SECONDS)
+
+        orbits = self.store.get_epoch("orbit", week, tow)
+        clocks = self.store.get_epoch("clock", week, tow)
+
+        # clock corrections refer to the orbits with the same gnss IOD
+        data = orbits.merge(clocks[["gnssID", "PRN", "gnssIOD", "multiplier", \
+                                    "delta_clock_c0", "status"]], \
+                            on = ["gnssID", "PRN", "gnssIOD"], how = "left")
+
+        c0 = data["delta_clock_c0"].values.astype(np.float64)
+        c0[data["status"].values != 0] = np.nan
+
+        self.pending.append((len(self.pending_t), data, c0))
+        self.pending_t.append(t)
+
+    def flush(self) :
+        """
+        Summary :
+            Write the epochs sampled.
+        """
+        if len(self.pending_t) == 0 :
+            return
+
+        epoch = np.concatenate([np.full(len(data), ind) for ind, data, _ in self.pending])
+
+        def column(name) :
+            return np.concatenate([data[name].values.astype(np.float64) \
+                                   for _, data, _ in self.pending])
+
+        self.write(self.pending_t, epoch, column("gnssID").astype(np.int64), \
+                   column("PRN").astype(np.int64), column("gnssIOD").astype(np.int64), \
+                   column("delta_radial"), column("delta_in_track"), \
+                   column("delta_cross_track"), column("multiplier"), \
+                   np.concatenate([c0 for _, _, c0 in self.pending]))
+
+        self.pending_t = []
+        self.pending = []
+
+    def close(self) :
+        """
+        Summary :
+            Write the remaining epochs and close the files.
+        """
+        self.flush()
+        super().close()
+
+def load_corrections(filename : str, columns) :
+    """
+    Summary :
+        Load the orbit or clock corrections written by the decoder, sorted by
+        satellite and reference time (reception order for equal times).
+
+    Arguments :
+        filename - pathname of the CSV file
+        columns - value columns to load
+
+    Returns :
+        Dictionary of arrays with key (satellite key), t_ref, validity, IOD
+        and the value columns.
+    """
+    df = pd.read_csv(filename, usecols = ["ToW", "WN", "ToH", "gnssIOD", "validity", \
+                                          "gnssID", "PRN"] + list(columns))
+
+    t_ref = tf.ToHToTow(df["ToW"].values, df["ToH"].values, df["WN"].values)
+    key = df["gnssID"].values.astype(np.int64) * MAX_PRN + df["PRN"].values.astype(np.int64)
+
+    order = np.lexsort((t_ref, key))
+
+    validity = df["validity"].values.astype(np.float64)
+    validity[validity < 0] = np.inf
+
+    out = {"key" : key[order], "t_ref" : t_ref[order], "validity" : validity[order], \
+           "IOD" : df["gnssIOD"].values[order], "t_rx" : (df["WN"].values * tf.WEEK_SECONDS + \
+                                                          df["ToW"].values)[order]}
+    for col in columns :
+        out[col] = df[col].values[order]
+
+    return out
+
+def sample_and_hold(cors, keys, t) :
+    """
+    Summary :
+        Select, for each satellite and epoch, the latest correction valid at
+        the epoch.
+
+    Arguments :
+        cors - corrections as returned by load_corrections
+        keys - (S,) satellite keys (gnss ID * MAX_PRN + PRN)
+        t - (E,) epochs in seconds since the GPS epoch
+
+    Returns :
+        (E, S) array with the index of the correction in cors, -1 if no
+        correction is valid.
+    """
+    out = np.full((len(t), len(keys)), -1, dtype = np.int64)
+
+    starts = np.searchsorted(cors["key"], keys, side = "left")
+    stops = np.searchsorted(cors["key"], keys, side = "right")
+
+    for jj, (start, stop) in enumerate(zip(starts, stops)) :
+        if start == stop :
+            continue
+
+        t_ref = cors["t_ref"][start:stop]
+
+        # the last correction with reference time not after the epoch
+        ind = np.searchsorted(t_ref, t, side = "right") - 1
+
+        ok = ind >= 0
+        ok[ok] = t[ok] - t_ref[ind[ok]] <= cors["validity"][start:stop][ind[ok]]
+
+        out[ok, jj] = start + ind[ok]
+
+    return out
+
+def load_orbits_clocks(basename : str) :
+    """
+    Summary :
+        Load the orbit and clock corrections written by the decoder
+        (<basename>_has_orb.csv, <basename>_has_clk.csv).
+
+    Returns :
+        orbits, clocks - as returned by load_corrections. clocks["clock_c0"]
+                         is delta_clock_c0, NaN when the status is not 0.
+    """
+    orbits = load_corrections(basename + "_has_orb.csv", \
+                              ["delta_radial", "delta_in_track", "delta_cross_track"])
+    clocks = load_corrections(basename + "_has_clk.csv", \
+                              ["multiplier", "delta_clock_c0", "status"])
+
+    # clock corrections not available or not to be used
+    clocks["clock_c0"] = np.where(clocks["status"] == 0, clocks["delta_clock_c0"], np.nan)
+
+    return orbits, clocks
+
+def sample_corrections(orbits, clocks, keys, t) :
+    """
+    Summary :
+        Sample-and-hold of the orbit and clock corrections of a set of
+        satellites at a set of epochs.
+
+    Arguments :
+        orbits, clocks - corrections as returned by load_orbits_clocks
+        keys - (S,) satellite keys (gnss ID * MAX_PRN + PRN)
+        t - (E,) epochs in seconds since the GPS epoch
+
+    Returns :
+        Dictionary of arrays with one element per epoch and satellite with a
+        valid orbit correction: epoch (index in t), sat (index in keys),
+        gnssID, PRN, gnssIOD, delta_radial, delta_in_track,
+        delta_cross_track, multiplier and clock_c0 (NaN if no valid clock
+        correction refers to the same gnss IOD).
+    """
+    orb_ind = sample_and_hold(orbits, keys, t)
+    clk_ind = sample_and_hold(clocks, keys, t)
+
+    epoch, sat = np.nonzero(orb_ind >= 0)
+    orb_ind = orb_ind[epoch, sat]
+    clk_ind = clk_ind[epoch, sat]
+
+    iod = orbits["IOD"][orb_ind]
+
+    # clock corrections refer to the orbits with the same gnss IOD
+    has_clk = (clk_ind >= 0)
+    has_clk[has_clk] = clocks["IOD"][clk_ind[has_clk]] == iod[has_clk]
+
+    out = {"epoch" : epoch, "sat" : sat, "gnssID" : keys[sat] // MAX_PRN, \
+           "PRN" : keys[sat] % MAX_PRN, "gnssIOD" : iod}
+
+    for col in ("delta_radial", "delta_in_track", "delta_cross_track") :
+        out[col] = orbits[col][orb_ind]
+
+    out["multiplier"] = np.where(has_clk, clocks["multiplier"][clk_ind], np.nan)
+    out["clock_c0"] = np.where(has_clk, clocks["clock_c0"][clk_ind], np.nan)
+
+    return out
+
+def products_from_csv(nav, basename : str, rate : float = 30, sp3 : str = None, \
+                      clk : str = None, start : float = None, stop : float = None, \
+                      satellites = None, sp3_version : str = "d", block : int = 720) :
+    """
+    Summary :
+        Generate SP3 and clock products from the orbit and clock corrections
+        written by the decoder (<basename>_has_orb.csv, <basename>_has_clk.csv).
+
+    Arguments :
+        nav, rate, sp3, clk, satellites, sp3_version - see product_writer
+        basename - base of the path name of the correction files
+        start, stop - first and last epochs in seconds since the GPS epoch.
+                      By default, from the first reference time to the last
+                      reception time of the orbit corrections.
+        block - number of epochs processed together
+
+    Returns :
+        Number of epochs written.
+    """
+    orbits, clocks = load_orbits_clocks(basename)
+
+    if start is None :
+        start = np.ceil(np.min(orbits["t_ref"]) / rate) * rate
+    if stop is None :
+        stop = np.max(orbits["t_rx"])
+
+    epochs = np.arange(start, stop + 1e-6, rate)
+
+    writer = product_writer(nav, rate, sp3, clk, satellites, sp3_version)
+    keys = np.array([gnss * MAX_PRN + prn for gnss, prn in writer.satellites], dtype = np.int64)
+
+    for ii in range(0, len(epochs), block) :
+        t = epochs[ii:ii + block]
+
+        rows = sample_corrections(orbits, clocks, keys, t)
+
+        writer.write(t, rows["epoch"], rows["gnssID"], rows["PRN"], rows["gnssIOD"], \
+                     rows["delta_radial"], rows["delta_in_track"], rows["delta_cross_track"], \
+                     rows["multiplier"], rows["clock_c0"])
+
+    writer.close()
+
+    return len(epochs)
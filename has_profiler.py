@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:05:31 2026
+
+@author: daniele
+
+Summary :
+    Lightweight instrumentation of the processing stages (loading, header
+    filtering, page unpacking, decoding, interpretation and writing).
+
+    The instrumentation is disabled by default: an instrumented function
+    then only pays for the check of a module flag. When enabled, wall time,
+    number of calls and stage specific counters (bytes, records, pages,
+    corrections...) are accumulated and can be printed or saved as JSON.
+
+    Times are inclusive: a stage calling another instrumented stage also
+    accounts for the time spent in it.
+
+    Usage :
+        python has_profiler.py <input file> <rx> [<type>] [cprofile|pyinstrument] [<output>]
+"""
+
+import sys
+import json
+import time
+import functools
+
+# Flag enabling the collection of the statistics
+enabled = False
+
+# Accumulated statistics, one dictionary per stage
+_stats = {}
+
+def enable(reset_stats : bool = True) :
+    """
+    Summary :
+        Enable the collection of the timing statistics.
+
+    Arguments :
+        reset_stats - if True, the statistics previously collected are removed
+    """
+    global enabled
+
+    if reset_stats :
+        reset()
+
+    enabled = True
+
+def disable() :
+    """
+    Summary :
+        Disable the collection of the timing statistics.
+    """
+    global enabled
+    enabled = False
+
+def reset() :
+    """
+    Summary :
+        Remove all the statistics collected.
+    """
+    _stats.clear()
+
+def record(name : str, elapsed : float, calls : int = 1, **counters) :
+    """
+    Summary :
+        Accumulate the statistics of a stage.
+
+    Arguments :
+        name - name of the stage
+        elapsed - wall time in seconds
+        calls - number of calls
+        counters - additional quantities processed by the stage (e.g.
+                   bytes = 1024, pages = 3)
+    """
+    stat = _stats.get(name)
+
+    if stat is None :
+        stat = {"time" : 0.0, "calls" : 0}
+        _stats[name] = stat
+
+    stat["time"] += elapsed
+    stat["calls"] += calls
+
+    for key, val in counters.items() :
+        stat[key] = stat.get(key, 0) + int(val)
+
+def profile(name : str, counters = None) :
+    """
+    Summary :
+        Decorator adding the timing instrumentation to a function.
+
+    Arguments :
+        name - name of the stage
+        counters - optional function with signature counters(args, output)
+                   returning a dictionary with the quantities processed by
+                   a call (e.g. {"pages" : 3})
+
+    Returns :
+        The decorator.
+    """
+    def decorator(fun) :
+
+        @functools.wraps(fun)
+        def wrapper(*args, **kwargs) :
+            if not enabled :
+                return fun(*args, **kwargs)
+
+            start_time = time.perf_counter()
+            try :
+                output = fun(*args, **kwargs)
+            except :
+                record(name, time.perf_counter() - start_time)
+                raise
+
+            elapsed = time.perf_counter() - start_time
+
+            if counters is None :
+                record(name, elapsed)
+            else :
+                record(name, elapsed, **counters(args, output))
+
+            return output
+
+        return wrapper
+
+    return decorator
+
+class stage :
+    """
+    Summary :
+        Context manager timing a block of code:
+
+            with hp.stage("write", lines = 10) :
+                ...
+    """
+    __slots__ = ("name", "counters", "start_time")
+
+    def __init__(self, name : str, **counters) :
+        self.name = name
+        self.counters = counters
+        self.start_time = None
+
+    def __enter__(self) :
+        if enabled :
+            self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        if self.start_time is not None :
+            record(self.name, time.perf_counter() - self.start_time, **self.counters)
+        return False
+
+def get_summary() :
+    """
+    Summary :
+        Return the statistics collected.
+
+    Returns :
+        Dictionary with, for each stage, the total time, the number of calls,
+        the mean time per call and the counters with the corresponding rates
+        (quantity per second).
+    """
+    summary = {}
+
+    for name, stat in _stats.items() :
+        entry = dict(stat)
+        entry["mean_time"] = stat["time"] / stat["calls"] if stat["calls"] > 0 else 0.0
+
+        for key, val in stat.items() :
+            if key in ("time", "calls") :
+                continue
+
+            entry[key + "_per_s"] = val / stat["time"] if stat["time"] > 0 else 0.0
+
+        summary[name] = entry
+
+    return summary
+
+def dump(filename : str) :
+    """
+    Summary :
+        Save the statistics collected as a JSON file.
+
+    Arguments :
+        filename - pathname of the output file
+    """
+    with open(filename, "w") as fout :
+        json.dump(get_summary(), fout, indent = 2)
+
+def print_summary() :
+    """
+    Summary :
+        Print the statistics collected, sorted by total time.
+    """
+    summary = get_summary()
+
+    print(f"{'stage':>24} {'calls':>9} {'time [s]':>10} {'mean [ms]':>10}  counters")
+    for name, entry in sorted(summary.items(), key = lambda x : -x[1]["time"]) :
+        counters = ", ".join(f"{key} {entry[key]}" for key in entry \
+                             if key not in ("time", "calls", "mean_time") and \
+                             not key.endswith("_per_s"))
+
+        print(f"{name:>24} {entry['calls']:9d} {entry['time']:10.3f} " + \
+              f"{1e3 * entry['mean_time']:10.3f}  {counters}")
+
+def run_profiler(fun, *args, tool : str = "cprofile", output : str = None, **kwargs) :
+    """
+    Summary :
+        Run a function under a statistical or deterministic profiler.
+
+    Arguments :
+        fun - the function to profile
+        args, kwargs - arguments passed to the function
+        tool - "cprofile" or "pyinstrument" (optional dependency)
+        output - optional output file: cProfile statistics (to be opened with
+                 pstats/snakeviz) or pyinstrument HTML report
+
+    Returns :
+        The output of the function.
+    """
+    if tool == "cprofile" :
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        retval = profiler.runcall(fun, *args, **kwargs)
+
+        if output is not None :
+            profiler.dump_stats(output)
+
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
+
+    elif tool == "pyinstrument" :
+        try :
+            from pyinstrument import Profiler
+        except ImportError :
+            raise Exception("pyinstrument is not installed")
+
+        profiler = Profiler()
+        profiler.start()
+        try :
+            retval = fun(*args, **kwargs)
+        finally :
+            profiler.stop()
+
+        if output is not None :
+            with open(output, "w") as fout :
+                fout.write(profiler.output_html())
+
+        print(profiler.output_text(unicode = True, color = False))
+
+    else :
+        raise Exception("Unsupported profiler")
+
+    return retval
+
+if __name__ == "__main__":
+
+    import process_cnav as pc
+
+    if len(sys.argv) < 3 :
+        print(__doc__)
+        sys.exit(1)
+
+    filename = sys.argv[1]
+    _rx = sys.argv[2]
+    _type = sys.argv[3] if len(sys.argv) > 3 else None
+    tool = sys.argv[4] if len(sys.argv) > 4 else "cprofile"
+    output = sys.argv[5] if len(sys.argv) > 5 else None
+
+    enable()
+    run_profiler(pc.parse_data, filename, _rx, _type, tool = tool, output = output)
+    print_summary()
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:26:43 2026
+
+@author: daniele
+
+Summary :
+    Encoder of the HAS corrections into RTCM 3 State Space Representation
+    (SSR) messages:
+
+                      GPS     Galileo
+        orbit         1057    1240
+        clock         1058    1241
+        code bias     1059    1242
+        phase bias    1265    1267
+
+    HAS and RTCM SSR share the same conventions: orbit corrections are
+    radial, along-track and cross-track components subtracted from the
+    broadcast position, clock and bias corrections are added to the broadcast
+    clock and to the measurements. HAS phase biases, in cycles, are converted
+    to meters using the carrier frequency of the signal.
+
+    The frames, with CRC-24Q, can be streamed to a file or to a TCP socket.
+"""
+
+import socket
+import numpy as np
+
+import has_corrections as hc
+import timefun as tf
+
+# speed of light [m/s]
+SPEED_OF_LIGHT = 299792458.0
+
+# GNSS IDs used by HAS
+GPS_ID = 0
+GAL_ID = 2
+
+# RTCM message numbers for each GNSS and correction type
+MESSAGE_TYPES = {GPS_ID : {"orbit" : 1057, "clock" : 1058, "code_bias" : 1059, \
+                           "phase_bias" : 1265},
+                 GAL_ID : {"orbit" : 1240, "clock" : 1241, "code_bias" : 1242, \
+                           "phase_bias" : 1267}}
+
+# RTCM SSR signal and tracking mode identifiers and carrier frequencies [Hz]
+# of the HAS signals, by signal name
+_gps_rtcm_signals = {"L1 C/A" : (0, 1575.42e6),
+                     "L1C(D)" : (17, 1575.42e6),
+                     "L1C(P)" : (18, 1575.42e6),
+                     "L1C(D+P)" : (19, 1575.42e6),
+                     "L2C(M)" : (7, 1227.60e6),
+                     "L2C(L)" : (8, 1227.60e6),
+                     "L2C(M+L)" : (9, 1227.60e6),
+                     "L2P" : (10, 1227.60e6),
+                     "L5-I" : (14, 1176.45e6),
+                     "L5-Q" : (15, 1176.45e6),
+                     "L5-I + L5-Q" : (16, 1176.45e6)}
+
+_gal_rtcm_signals = {"E1-B" : (1, 1575.42e6),
+                     "E1-C" : (2, 1575.42e6),
+                     "E1-B+E1-C" : (3, 1575.42e6),
+                     "E5a-I" : (5, 1176.45e6),
+                     "E5a-Q" : (6, 1176.45e6),
+                     "E5a-I+E5a-Q" : (7, 1176.45e6),
+                     "E5b-I" : (8, 1207.14e6),
+                     "E5b-Q" : (9, 1207.14e6),
+                     "E5b-I+E5b-Q" : (10, 1207.14e6),
+                     "E5-I" : (11, 1191.795e6),
+                     "E5-Q" : (12, 1191.795e6),
+                     "E5-I+E5-Q" : (13, 1191.795e6),
+                     "E6-B" : (15, 1278.75e6),
+                     "E6-C" : (16, 1278.75e6),
+                     "E6-B+E6-C" : (17, 1278.75e6)}
+
+# For each GNSS, (RTCM signal ID, carrier frequency) indexed by the HAS signal
+# index of the signal mask. None for the reserved signals.
+SIGNAL_TABLE = {GPS_ID : [_gps_rtcm_signals.get(name) for name in hc.has_mask.gps_signals],
+                GAL_ID : [_gal_rtcm_signals.get(name) for name in hc.has_mask.gal_signals]}
+
+# SSR update intervals (DF391) [s]
+UPDATE_INTERVALS = [1, 2, 5, 10, 15, 30, 60, 120, 240, 300, 600, 900, 1800, 3600, \
+                    7200, 10800]
+
+# maximum length of the payload of a RTCM 3 frame [bytes]
+MAX_PAYLOAD = 1023
+
+
+def _crc24q_table() :
+    """
+    Summary :
+        Build the table used for the byte-wise computation of the CRC-24Q.
+    """
+    table = []
+    for byte in range(256) :
+        crc = byte << 16
+        for ii in range(8) :
+            crc <<= 1
+            if crc & 0x1000000 :
+                crc ^= 0x1864CFB
+
+        table.append(crc & 0xFFFFFF)
+
+    return table
+
+_CRC24Q_TABLE = _crc24q_table()
+
+def crc24q(data : bytes) :
+    """
+    Summary :
+        Compute the CRC-24Q of a sequence of bytes (table-driven), used by the
+        RTCM frames and by the HAS pages.
+
+    Arguments :
+        data - the sequence of bytes
+
+    Returns :
+        The 24 bit CRC.
+    """
+    crc = 0
+    for byte in data :
+        crc = ((crc << 8) & 0xFFFFFF) ^ _CRC24Q_TABLE[(crc >> 16) ^ byte]
+
+    return crc
+
+def rtcm_frame(payload : bytes) :
+    """
+    Summary :
+        Build a RTCM 3 frame: preamble, reserved bits, length, payload and
+        CRC-24Q.
+
+    Arguments :
+        payload - the message
+
+    Returns :
+        The frame as bytes.
+    """
+    if len(payload) > MAX_PAYLOAD :
+        raise Exception("RTCM payload too long")
+
+    data = bytes([0xD3, len(payload) >> 8, len(payload) & 0xFF]) + payload
+
+    return data + crc24q(data).to_bytes(3, "big")
+
+def quantize(value, lsb, num_bits, reserved = 1) :
+    """
+    Summary :
+        Quantize a value as a two's complement integer, saturating to the
+        range of the field. The codes above the range are not returned: the
+        most negative one for the RTCM fields, also the most positive ones
+        reserved by the HAS ICD (data not available, do not use).
+
+    Arguments :
+        value - the value to quantize
+        lsb - the least significant bit
+        num_bits - number of bits
+        reserved - number of reserved codes at the upper end of the range
+
+    Returns :
+        The quantized integer.
+    """
+    max_val = (1 << (num_bits - 1)) - reserved
+
+    return int(np.clip(np.round(value / lsb), -max_val, max_val))
+
+def update_interval_index(validity) :
+    """
+    Summary :
+        Index of the largest SSR update interval not exceeding the validity of
+        the corrections.
+    """
+    if validity < 0 :
+        return len(UPDATE_INTERVALS) - 1
+
+    index = 0
+    for ii, interval in enumerate(UPDATE_INTERVALS) :
+        if interval <= validity :
+            index = ii
+
+    return index
+
+class rtcm_ssr_encoder :
+    """
+    Summary :
+        Conversion of lists of HAS corrections into RTCM SSR frames.
+    """
+
+    def __init__(self, provider_id : int = 0, solution_id : int = 0) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            provider_id - SSR provider ID (DF414)
+            solution_id - SSR solution ID (DF415)
+        """
+        self.provider_id = provider_id
+        self.solution_id = solution_id
+
+        # functions encoding the satellite blocks, by correction type
+        self.sat_encoders = {"orbit" : self.encode_orbit,
+                             "clock" : self.encode_clock,
+                             "code_bias" : self.encode_code_bias,
+                             "phase_bias" : self.encode_phase_bias}
+
+    def encode(self, ctype : str, corrections) :
+        """
+        Summary :
+            Encode a list of corrections of the same type. The corrections are
+            split by GNSS and, if required, over several messages with the
+            multiple message indicator set.
+
+        Arguments :
+            ctype - correction type (orbit, clock, code_bias, phase_bias)
+            corrections - list of has_correction objects
+
+        Returns :
+            List of RTCM frames (bytes).
+        """
+        if ctype not in self.sat_encoders :
+            raise Exception(f"Unknown correction type: {ctype}")
+
+        frames = []
+
+        for gnss in (GPS_ID, GAL_ID) :
+            cors = [cor for cor in corrections if cor.gnss_ID == gnss]
+
+            if len(cors) == 0 :
+                continue
+
+            # satellite blocks, (value, number of bits)
+            blocks = []
+            for cor in cors :
+                bw = self.sat_encoders[ctype](gnss, cor)
+
+                if bw is not None :
+                    blocks.append((bw.value, bw.num_bits))
+
+            frames.extend(self.build_messages(ctype, gnss, cors[0], blocks))
+
+        return frames
+
+    def build_messages(self, ctype, gnss, ref_cor, blocks) :
+        """
+        Summary :
+            Group the satellite blocks into messages not exceeding the maximum
+            payload and the maximum number of satellites (63).
+
+        Arguments :
+            ctype - correction type
+            gnss - GNSS ID
+            ref_cor - correction providing the timing information
+            blocks - list of (value, number of bits) of the satellite blocks
+
+        Returns :
+            List of RTCM frames.
+        """
+        if len(blocks) == 0 :
+            return []
+
+        header_bits = self.encode_header(ctype, gnss, ref_cor, 0, 0).num_bits
+
+        # split the blocks into groups
+        groups = [[]]
+        num_bits = header_bits
+        for block in blocks :
+            if len(groups[-1]) == 63 or num_bits + block[1] > 8 * MAX_PAYLOAD :
+                groups.append([])
+                num_bits = header_bits
+
+            groups[-1].append(block)
+            num_bits += block[1]
+
+        frames = []
+        for ii, group in enumerate(groups) :
+            multiple = 1 if ii < len(groups) - 1 else 0
+
+            bw = self.encode_header(ctype, gnss, ref_cor, multiple, len(group))
+
+            for value, num_bits in group :
+                bw.put_bits(value, num_bits)
+
+            frames.append(rtcm_frame(bw.get_bytes().tobytes()))
+
+        return frames
+
+    def encode_header(self, ctype, gnss, ref_cor, multiple, num_sats) :
+        """
+        Summary :
+            Encode the header of a SSR message.
+
+        Arguments :
+            ctype - correction type
+            gnss - GNSS ID
+            ref_cor - correction providing the reference time, the validity
+                      and the IOD
+            multiple - multiple message indicator
+            num_sats - number of satellites in the message
+
+        Returns :
+            bit_writer with the header.
+        """
+        bw = hc.bit_writer()
+
+        # epoch time: reference time of the corrections, derived from the ToH
+        epoch = int(tf.ToHToTow(int(ref_cor.tow), int(ref_cor.toh))) % tf.WEEK_SECONDS
+
+        bw.put_bits(MESSAGE_TYPES[gnss][ctype], 12)
+        bw.put_bits(epoch, 20)
+        bw.put_bits(update_interval_index(ref_cor.validity), 4)
+        bw.put_bits(multiple, 1)
+
+        # satellite reference datum: ITRF
+        if ctype == "orbit" :
+            bw.put_bits(0, 1)
+
+        bw.put_bits(int(ref_cor.IOD) & 0xF, 4)
+        bw.put_bits(self.provider_id, 16)
+        bw.put_bits(self.solution_id, 4)
+
+        # dispersive bias and Melbourne-Wubbena consistency indicators
+        if ctype == "phase_bias" :
+            bw.put_bits(0, 1)
+            bw.put_bits(0, 1)
+
+        bw.put_bits(num_sats, 6)
+
+        return bw
+
+    def encode_orbit(self, gnss, cor) :
+        """
+        Summary :
+            Encode the orbit correction of a satellite. Returns None if the
+            correction is not available or its GNSS IOD is unknown.
+        """
+        deltas = (cor.delta_radial, cor.delta_in_track, cor.delta_cross_track)
+
+        if np.any(np.isnan(deltas)) or cor.gnss_IOD < 0 :
+            return None
+
+        bw = hc.bit_writer()
+        bw.put_bits(cor.prn, 6)
+
+        # IODE (GPS) or IODnav (Galileo)
+        bw.put_bits(cor.gnss_IOD, 8 if gnss == GPS_ID else 10)
+
+        bw.put_bits(quantize(cor.delta_radial, 1e-4, 22), 22)
+        bw.put_bits(quantize(cor.delta_in_track, 4e-4, 20), 20)
+        bw.put_bits(quantize(cor.delta_cross_track, 4e-4, 20), 20)
+
+        # HAS does not provide the rates of the orbit corrections
+        bw.put_bits(0, 21)
+        bw.put_bits(0, 19)
+        bw.put_bits(0, 19)
+
+        return bw
+
+    def encode_clock(self, gnss, cor) :
+        """
+        Summary :
+            Encode the clock correction of a satellite. Returns None if the
+            correction is not available or should not be used.
+        """
+        if cor.status != 0 :
+            return None
+
+        bw = hc.bit_writer()
+        bw.put_bits(cor.prn, 6)
+        bw.put_bits(quantize(cor.multiplier * cor.delta_clock_c0, 1e-4, 22), 22)
+
+        # HAS only provides the C0 term
+        bw.put_bits(0, 21)
+        bw.put_bits(0, 27)
+
+        return bw
+
+    def get_bias_signals(self, gnss, cor) :
+        """
+        Summary :
+            Return the index in the correction, the RTCM signal ID and the
+            carrier frequency of the available biases that have a RTCM
+            equivalent.
+        """
+        table = SIGNAL_TABLE[gnss]
+
+        signals = []
+        for ii, sig in enumerate(cor.signals) :
+            if cor.availability_flags[ii] == 0 or table[sig] is None :
+                continue
+
+            signals.append((ii, ) + table[sig])
+
+        return signals
+
+    def encode_code_bias(self, gnss, cor) :
+        """
+        Summary :
+            Encode the code biases of a satellite. Returns None if no bias is
+            available.
+        """
+        signals = self.get_bias_signals(gnss, cor)
+
+        if len(signals) == 0 :
+            return None
+
+        bw = hc.bit_writer()
+        bw.put_bits(cor.prn, 6)
+        bw.put_bits(len(signals), 5)
+
+        for ii, sig_id, freq in signals :
+            bw.put_bits(sig_id, 5)
+            bw.put_bits(quantize(cor.biases[ii], 0.01, 14), 14)
+
+        return bw
+
+    def encode_phase_bias(self, gnss, cor) :
+        """
+        Summary :
+            Encode the phase biases of a satellite. Returns None if no bias is
+            available.
+        """
+        signals = self.get_bias_signals(gnss, cor)
+
+        if len(signals) == 0 :
+            return None
+
+        bw = hc.bit_writer()
+        bw.put_bits(cor.prn, 6)
+        bw.put_bits(len(signals), 5)
+
+        # yaw angle and yaw rate are not provided by HAS
+        bw.put_bits(0, 9)
+        bw.put_bits(0, 8)
+
+        for ii, sig_id, freq in signals :
+            bw.put_bits(sig_id, 5)
+
+            # integer and wide-lane integer indicators: HAS phase biases are
+            # not declared as integer
+            bw.put_bits(0, 1)
+            bw.put_bits(0, 2)
+
+            bw.put_bits(int(cor.phase_discontinuity_inds[ii]), 4)
+
+            # conversion from cycles to meters
+            bias = cor.biases[ii] * SPEED_OF_LIGHT / freq
+            bw.put_bits(quantize(bias, 1e-4, 20), 20)
+
+        return bw
+
+class rtcm_writer :
+    """
+    Summary :
+        Stream of RTCM SSR frames to a file or to a TCP socket. Frames are
+        accumulated and written in batches.
+    """
+
+    def __init__(self, output : str, batch_size : int = 8192, provider_id : int = 0, \
+                 solution_id : int = 0) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            output - pathname of the binary output file or "tcp://host:port"
+            batch_size - number of bytes accumulated before writing to a file.
+                         On sockets, the frames are sent at the end of each HAS
+                         message.
+            provider_id, solution_id - SSR provider and solution IDs
+        """
+        self.encoder = rtcm_ssr_encoder(provider_id, solution_id)
+        self.batch_size = batch_size
+
+        if output.startswith("tcp://") :
+            host, port = output[6:].rsplit(":", 1)
+            self.sock = socket.create_connection((host, int(port)))
+            self.fid = None
+        else :
+            self.sock = None
+            self.fid = open(output, "wb")
+
+        self.buffer = bytearray()
+
+        # number of frames and bytes produced
+        self.num_frames = 0
+        self.num_bytes = 0
+
+    def write(self, ctype : str, corrections) :
+        """
+        Summary :
+            Encode a list of corrections and queue the frames.
+
+        Arguments :
+            ctype - correction type (orbit, clock, code_bias, phase_bias)
+            corrections - list of has_correction objects
+        """
+        for frame in self.encoder.encode(ctype, corrections) :
+            self.buffer += frame
+            self.num_frames += 1
+
+        if self.sock is None and len(self.buffer) >= self.batch_size :
+            self.flush()
+
+    def end_message(self) :
+        """
+        Summary :
+            Signal the end of a HAS message: the frames are sent immediately
+            on sockets.
+        """
+        if self.sock is not None :
+            self.flush()
+
+    def flush(self) :
+        """
+        Summary :
+            Write the frames queued.
+        """
+        if len(self.buffer) == 0 :
+            return
+
+        if self.sock is not None :
+            self.sock.sendall(self.buffer)
+        else :
+            self.fid.write(self.buffer)
+
+        self.num_bytes += len(self.buffer)
+        self.buffer = bytearray()
+
+    def close(self) :
+        """
+        Summary :
+            Write the remaining frames and close the output.
+        """
+        self.flush()
+
+        if self.sock is not None :
+            self.sock.close()
+            self.sock = None
+
+        if self.fid is not None :
+            self.fid.close()
+            self.fid = None
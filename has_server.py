@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:31:09 2026
+
+@author: daniele
+
+Summary :
+    Embedded HTTP/JSON server sharing the HAS corrections with other processes
+    of the same host. The decoder runs in the main thread and fills a
+    has_correction_store, while an asyncio server running in a background
+    thread answers the queries of the clients:
+
+        GET /status
+            number of messages decoded, last message and number of clients
+        GET /corrections/<type>[?wn=..&tow=..]
+            corrections of a type (orbit, clock, code_bias, phase_bias) for
+            all the satellites, valid at the epoch of the last message or at
+            the requested epoch
+        GET /corrections/<type>/<gnss ID>/<PRN>[/<signal>][?wn=..&tow=..]
+            correction of a single satellite (and signal)
+        GET /wait?since=<seq>[&timeout=<s>]
+            long-poll: answers as soon as a message more recent than <seq> is
+            decoded (status 204 after the timeout)
+        GET /events
+            server-sent events, one event for each message decoded
+
+    Usage :
+        python has_server.py <input file> <rx> [<type>] [--port 8080]
+                             [--host 127.0.0.1] [--realtime speed]
+"""
+
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import threading
+import urllib.parse
+
+import numpy as np
+
+import process_cnav as pc
+import has_correction_store as hcs
+
+
+def _sanitize(obj) :
+    """
+    Summary :
+        Convert an object into types that can be serialized as JSON: numpy
+        scalars are converted into Python numbers, NaN into null.
+    """
+    if isinstance(obj, dict) :
+        return {key : _sanitize(val) for key, val in obj.items()}
+
+    if isinstance(obj, (list, tuple)) :
+        return [_sanitize(val) for val in obj]
+
+    if isinstance(obj, np.generic) :
+        obj = obj.item()
+
+    if isinstance(obj, float) and math.isnan(obj) :
+        return None
+
+    return obj
+
+class correction_server :
+    """
+    Summary :
+        Asyncio HTTP server exposing the content of a has_correction_store.
+    """
+
+    # maximum number of events queued for a slow server-sent events client:
+    # older events are dropped
+    SSE_QUEUE_SIZE = 16
+
+    # seconds between two keep-alive comments on the server-sent events stream
+    SSE_KEEP_ALIVE = 15
+
+    # maximum duration of a long-poll request [s]
+    MAX_TIMEOUT = 300
+
+    def __init__(self, store, host : str = "127.0.0.1", port : int = 8080) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            store - has_correction_store.has_correction_store with the
+                    corrections
+            host - address the server is bound to (local by default)
+            port - TCP port, 0 to let the system choose a free port
+        """
+        self.store = store
+        self.host = host
+        self.port = port
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.started = threading.Event()
+
+        # number of messages notified, last message and its JSON encoding
+        self.seq = 0
+        self.last_event = None
+        self.last_data = None
+
+        # JSON responses of the queries for all the satellites, by correction
+        # type and epoch. The cache is cleared at each new message.
+        self.cache = {}
+
+        # futures of the long-poll clients and queues of the server-sent
+        # events clients
+        self.waiters = set()
+        self.subscribers = set()
+
+        # number of connected clients
+        self.num_clients = 0
+
+    def start(self) :
+        """
+        Summary :
+            Start the server in a daemon thread.
+        """
+        self.thread = threading.Thread(target = self._run, daemon = True)
+        self.thread.start()
+        self.started.wait()
+
+    def _run(self) :
+        """
+        Summary :
+            Body of the server thread.
+        """
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        self.server = self.loop.run_until_complete( \
+            asyncio.start_server(self._handle, self.host, self.port, backlog = 1024))
+
+        # actual port, if chosen by the system
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started.set()
+
+        self.loop.run_forever()
+
+        # close the connections still open
+        self.server.close()
+
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks :
+            task.cancel()
+
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions = True))
+        self.loop.close()
+
+    def stop(self) :
+        """
+        Summary :
+            Stop the server and wait for the end of its thread.
+        """
+        if self.thread is None :
+            return
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.thread = None
+
+    def notify(self, tow, week, msg_id) :
+        """
+        Summary :
+            Notify the clients that a new message was decoded. The function
+            can be called from any thread, e.g. as _on_message callback of
+            process_cnav.decode_data.
+
+        Arguments :
+            tow - time of week of the message
+            week - week number
+            msg_id - message ID
+        """
+        event = {"ToW" : int(tow), "WN" : int(week), "MessageID" : int(msg_id), \
+                 "time" : time.time()}
+
+        self.loop.call_soon_threadsafe(self._publish, event)
+
+    def _publish(self, event) :
+        """
+        Summary :
+            Deliver an event to the waiting clients, executed in the server
+            thread.
+        """
+        self.seq += 1
+        event["seq"] = self.seq
+        self.last_event = event
+
+        # the event is encoded once for all the clients
+        self.last_data = json.dumps(event).encode("utf-8")
+        self.cache.clear()
+
+        for fut in self.waiters :
+            if not fut.done() :
+                fut.set_result(self.last_data)
+
+        self.waiters.clear()
+
+        for queue in self.subscribers :
+            if queue.full() :
+                queue.get_nowait()
+
+            queue.put_nowait((self.seq, self.last_data))
+
+    async def _handle(self, reader, writer) :
+        """
+        Summary :
+            Serve the requests of a connection. Persistent connections
+            (HTTP/1.1 keep-alive) are supported.
+        """
+        self.num_clients += 1
+
+        try :
+            while True :
+                line = await reader.readline()
+
+                if len(line) == 0 :
+                    break
+
+                parts = line.decode("latin-1").split()
+
+                if len(parts) < 2 :
+                    await self._send(writer, 400, {"error" : "bad request"}, False)
+                    break
+
+                method, target = parts[0], parts[1]
+                version = parts[2] if len(parts) > 2 else "HTTP/1.0"
+
+                headers = {}
+                while True :
+                    line = await reader.readline()
+
+                    if line in (b"\r\n", b"\n", b"") :
+                        break
+
+                    key, _, val = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = val.strip().lower()
+
+                connection = headers.get("connection", "")
+                keep_alive = (version == "HTTP/1.1" and connection != "close") or \
+                             connection == "keep-alive"
+
+                url = urllib.parse.urlsplit(target)
+                path = [part for part in url.path.split("/") if len(part) > 0]
+                query = dict(urllib.parse.parse_qsl(url.query))
+
+                if method != "GET" :
+                    await self._send(writer, 405, {"error" : "method not allowed"}, keep_alive)
+
+                elif len(path) > 0 and path[0] == "events" :
+                    await self._stream_events(writer)
+                    break
+
+                else :
+                    try :
+                        status, body = await self._route(path, query)
+                    except ValueError :
+                        status, body = 400, {"error" : "invalid parameter"}
+
+                    await self._send(writer, status, body, keep_alive)
+
+                if not keep_alive :
+                    break
+
+        except (ConnectionError, asyncio.IncompleteReadError) :
+            pass
+
+        finally :
+            self.num_clients -= 1
+            writer.close()
+
+    async def _send(self, writer, status, body, keep_alive) :
+        """
+        Summary :
+            Send a JSON response. The body is either an object or its JSON
+            encoding (bytes).
+        """
+        reasons = {200 : "OK", 204 : "No Content", 400 : "Bad Request", \
+                   404 : "Not Found", 405 : "Method Not Allowed"}
+
+        if body is None :
+            data = b""
+        elif isinstance(body, bytes) :
+            data = body
+        else :
+            data = json.dumps(_sanitize(body)).encode("utf-8")
+
+        head = f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n" + \
+               "Content-Type: application/json\r\n" + \
+               f"Content-Length: {len(data)}\r\n" + \
+               f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    def _get_epoch(self, query) :
+        """
+        Summary :
+            Epoch of a query: the requested (wn, tow) or the epoch of the last
+            message decoded. None if no message was decoded yet.
+        """
+        if "tow" in query :
+            wn = int(query["wn"]) if "wn" in query else \
+                 (self.last_event["WN"] if self.last_event is not None else 0)
+
+            return wn, float(query["tow"])
+
+        if self.last_event is None :
+            return None
+
+        return self.last_event["WN"], self.last_event["ToW"]
+
+    async def _route(self, path, query) :
+        """
+        Summary :
+            Process a GET request.
+
+        Returns :
+            HTTP status and body of the response.
+        """
+        if len(path) == 0 or path[0] == "status" :
+            return 200, {"messages" : self.seq, "last" : self.last_event, \
+                         "corrections" : self.store.counts, \
+                         "clients" : self.num_clients}
+
+        if path[0] == "corrections" :
+            if len(path) < 2 or path[1] not in self.store.fields :
+                return 404, {"error" : "unknown correction type"}
+
+            ctype = path[1]
+            epoch = self._get_epoch(query)
+
+            # all the satellites
+            if len(path) == 2 :
+                if epoch is None :
+                    return 200, []
+
+                key = (ctype, ) + epoch
+
+                if key not in self.cache :
+                    df = self.store.get_epoch(ctype, *epoch)
+
+                    # bound the memory used by queries for arbitrary epochs
+                    if len(self.cache) >= 64 :
+                        self.cache.clear()
+
+                    self.cache[key] = json.dumps(_sanitize(df.to_dict("records"))).encode("utf-8")
+
+                return 200, self.cache[key]
+
+            # single satellite (and signal)
+            if len(path) in (4, 5) :
+                gnss_ID = int(path[2])
+                prn = int(path[3])
+                signal = int(path[4]) if len(path) == 5 else None
+
+                if epoch is None :
+                    values = self.store.get_values(ctype, gnss_ID, prn, signal)
+                else :
+                    values = self.store.get_values(ctype, gnss_ID, prn, signal, *epoch)
+
+                if values is None :
+                    return 404, {"error" : "no valid correction"}
+
+                return 200, values
+
+            return 404, {"error" : "not found"}
+
+        if path[0] == "wait" :
+            since = int(query.get("since", self.seq))
+            timeout = min(float(query.get("timeout", 30)), self.MAX_TIMEOUT)
+
+            if self.seq > since :
+                return 200, self.last_data
+
+            fut = self.loop.create_future()
+            self.waiters.add(fut)
+
+            try :
+                data = await asyncio.wait_for(fut, timeout)
+            except asyncio.TimeoutError :
+                self.waiters.discard(fut)
+                return 204, None
+
+            return 200, data
+
+        return 404, {"error" : "not found"}
+
+    async def _stream_events(self, writer) :
+        """
+        Summary :
+            Send a server-sent event for each new message until the client
+            disconnects.
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\n" + \
+                     b"Content-Type: text/event-stream\r\n" + \
+                     b"Cache-Control: no-cache\r\n" + \
+                     b"Connection: keep-alive\r\n\r\n")
+        await writer.drain()
+
+        queue = asyncio.Queue(self.SSE_QUEUE_SIZE)
+        self.subscribers.add(queue)
+
+        # the last message is sent immediately
+        if self.last_data is not None :
+            queue.put_nowait((self.seq, self.last_data))
+
+        try :
+            while True :
+                try :
+                    seq, data = await asyncio.wait_for(queue.get(), self.SSE_KEEP_ALIVE)
+                except asyncio.TimeoutError :
+                    writer.write(b": keep-alive\n\n")
+                    await writer.drain()
+                    continue
+
+                writer.write(f"id: {seq}\nevent: message\ndata: ".encode("latin-1") + \
+                             data + b"\n\n")
+                await writer.drain()
+
+        finally :
+            self.subscribers.discard(queue)
+
+def serve(filename, _rx, _type = None, port : int = 8080, host : str = "127.0.0.1", \
+          realtime : float = None, _page_offset = 1, _erasures = False, _extra_pages = 0, \
+          depth : int = 8) :
+    """
+    Summary :
+        Decode a receiver file and serve the corrections while they are
+        decoded.
+
+    Arguments :
+        filename, _rx, _type, _page_offset, _erasures, _extra_pages - see
+                process_cnav.parse_data
+        port, host - address of the server
+        realtime - if not None, the messages are released at this multiple of
+                   the real-time rate (1 for real time), simulating a live
+                   stream. Otherwise the file is decoded as fast as possible.
+        depth - number of corrections kept for each satellite and signal
+
+    Returns :
+        The correction_server, still running after the end of the decoding.
+    """
+    store = hcs.has_correction_store(depth)
+
+    server = correction_server(store, host, port)
+    server.start()
+
+    print(f"Serving HAS corrections on http://{host}:{server.port}")
+
+    pace = None
+
+    if realtime is not None :
+        # GPS time of the first message and corresponding wall time
+        start = {}
+
+        def pace(tow, week) :
+            # wait before the message is interpreted: its corrections are
+            # stored, and visible to the clients, only at its release time
+            gps_time = week * hcs.WEEK_SECONDS + tow
+
+            if len(start) == 0 :
+                start["gps"] = gps_time
+                start["wall"] = time.monotonic()
+
+            delay = (gps_time - start["gps"]) / realtime - (time.monotonic() - start["wall"])
+            if delay > 0 :
+                time.sleep(delay)
+
+    df = pc.load_data(filename, _rx, _type)
+
+    pc.decode_data(df, filename.split('__')[0], _page_offset, _erasures, _extra_pages, \
+                   _store = store, _on_message = server.notify, _before_message = pace)
+
+    return server
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "HAS correction server")
+    parser.add_argument("filename", help = "receiver file")
+    parser.add_argument("rx", help = "receiver type (sep, nov, jav)")
+    parser.add_argument("type", nargs = "?", default = None, help = "input data format")
+    parser.add_argument("--port", type = int, default = 8080, help = "TCP port")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address of the server")
+    parser.add_argument("--realtime", type = float, default = None, \
+                        help = "release the messages at this multiple of the real-time rate")
+    args = parser.parse_args()
+
+    server = serve(args.filename, args.rx, args.type, args.port, args.host, args.realtime)
+
+    print("Decoding completed, the server is still running (Ctrl+C to stop)")
+
+    try :
+        while True :
+            time.sleep(1)
+    except KeyboardInterrupt :
+        server.stop()
+        sys.exit(0)
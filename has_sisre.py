@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:37:52 2026
+
+@author: daniele
+
+Summary :
+    Evaluation of the HAS corrections against reference products (e.g. IGS
+    final SP3 and RINEX clock files): orbit and clock errors of the
+    HAS-corrected broadcast ephemerides and signal-in-space range error
+    (SISRE) per satellite and epoch, and daily statistics.
+
+    The reference orbits are interpolated with Lagrange polynomials over
+    sliding windows and the reference clocks linearly, vectorized over
+    epochs and satellites. The corrections are sampled with the validity
+    rule of has_products and applied with has_orbits. Orbit errors are
+    expressed in the radial, in-track and cross-track frame of the
+    satellite and
+
+        SISRE = sqrt((w_r * err_radial - err_clock)^2 +
+                     w_ac^2 * (err_in_track^2 + err_cross_track^2))
+
+    with the weights of the GNSS (SISRE_WEIGHTS). The reference clocks are
+    aligned to an arbitrary time scale: by default the median clock error of
+    each constellation at each epoch (clock datum) is removed.
+
+    The reference products refer to the centre of mass of the satellites,
+    the broadcast ephemerides to the antenna phase centre: the phase centre
+    offsets (e.g. of the ionosphere-free combination, from an ANTEX file) can
+    be provided to move the reference positions to the phase centre with the
+    nominal attitude.
+
+    The epochs are processed in chunks, distributed over several processes.
+
+    Usage :
+        python has_sisre.py basename --nav nav1 [nav2 ...] --sp3 sp3_1 [...]
+                            [--clk clk1 ...] [--rate s] [--processes n]
+"""
+
+import io
+import argparse
+import multiprocessing
+import concurrent.futures
+
+import numpy as np
+import pandas as pd
+
+import timefun as tf
+import rinex_nav as rn
+import has_orbits as ho
+import has_products as hp
+
+# SISRE weights of the radial and (squared) of the along and cross-track
+# errors, for the orbit altitudes of GPS and Galileo
+SISRE_WEIGHTS = {rn.GPS_ID : (0.98, 1 / 49), rn.GAL_ID : (0.98, 1 / 61)}
+
+# SP3 values of missing positions and clocks
+SP3_BAD_CLOCK = 999999.0
+
+# order of the interpolation of the reference orbits and clocks
+ORBIT_ORDER = 10
+CLOCK_ORDER = 2
+
+
+def to_files(filenames) :
+    """
+    Summary :
+        Return a list of pathnames from a pathname or a list of pathnames.
+    """
+    return [filenames] if isinstance(filenames, str) else list(filenames)
+
+def to_grid(t, sats, values) :
+    """
+    Summary :
+        Arrange records (epoch, satellite, values) in a grid of epochs and
+        satellites. For repeated records (e.g. the last epoch of a daily file
+        and the first epoch of the next one), the last one is kept.
+
+    Arguments :
+        t - (N,) epochs in seconds since the GPS epoch
+        sats - (N,) satellite identifiers (e.g. G01)
+        values - (N, ...) values
+
+    Returns :
+        Dictionary with t (E,) sorted epochs, satellites (S,) sorted
+        identifiers and values (E, S, ...), NaN for the missing records.
+    """
+    epochs, epoch_ind = np.unique(t, return_inverse = True)
+    satellites, sat_ind = np.unique(sats, return_inverse = True)
+
+    grid = np.full((len(epochs), len(satellites)) + values.shape[1:], np.nan)
+    grid[epoch_ind, sat_ind] = values
+
+    return {"t" : epochs, "satellites" : satellites.tolist(), "values" : grid}
+
+def load_sp3(filenames) :
+    """
+    Summary :
+        Load the positions and clocks of one or more SP3-c/d files.
+
+    Arguments :
+        filenames - pathname or list of pathnames, e.g. consecutive daily
+                    files
+
+    Returns :
+        Dictionary with t (E,) epochs in seconds since the GPS epoch,
+        satellites (S,) identifiers, pos (E, S, 3) ECEF positions [m] and
+        clock (E, S) clock offsets [s]. NaN for the missing values.
+    """
+    epochs, sats, values = [], [], []
+
+    for filename in to_files(filenames) :
+        with open(filename, "r") as fin :
+            lines = fin.read().splitlines()
+
+        if len(lines) == 0 or lines[0][:1] != "#" or lines[0][1:2] not in ("c", "d") :
+            raise Exception(f"Not an SP3-c/d file: {filename}")
+
+        # epoch lines and position records (index of their epoch line)
+        dates = []
+        records = []
+        for line in lines :
+            if line[:1] == "*" :
+                dates.append(line[1:].split()[:6])
+            elif line[:1] == "P" and len(dates) > 0 :
+                records.append(len(dates) - 1)
+                sats.append(line[1:4].replace(" ", "0"))
+                values.append((line[4:18], line[18:32], line[32:46], line[46:60]))
+
+        if len(dates) == 0 :
+            continue
+
+        dates = np.array(dates, dtype = np.float64)
+        tow, week = tf.DatesToGps(dates[:, 0], dates[:, 1], dates[:, 2], \
+                                  dates[:, 3] + dates[:, 4] / 60 + dates[:, 5] / 3600)
+
+        # rounded to the millisecond (hours of day in floating point)
+        t_file = np.round((week * tf.WEEK_SECONDS + tow) * 1e3) / 1e3
+
+        epochs.append(t_file[np.array(records, dtype = np.int64)])
+
+    if len(sats) == 0 :
+        raise Exception(f"No orbit records in {filenames}")
+
+    values = np.array(values, dtype = np.float64).reshape(-1, 4)
+
+    # missing positions are 0, missing clocks 999999.999999
+    pos = values[:, :3] * 1e3
+    pos[np.all(values[:, :3] == 0, axis = 1)] = np.nan
+
+    clock = values[:, 3] * 1e-6
+    clock[~(np.abs(values[:, 3]) < SP3_BAD_CLOCK)] = np.nan
+
+    grid = to_grid(np.concatenate(epochs), np.array(sats), \
+                   np.column_stack((pos, clock)))
+
+    return {"t" : grid["t"], "satellites" : grid["satellites"], \
+            "pos" : grid["values"][:, :, :3], "clock" : grid["values"][:, :, 3]}
+
+def load_clk(filenames) :
+    """
+    Summary :
+        Load the satellite clocks (AS records) of one or more RINEX clock
+        files.
+
+    Arguments :
+        filenames - pathname or list of pathnames
+
+    Returns :
+        Dictionary with t (E,) epochs in seconds since the GPS epoch,
+        satellites (S,) identifiers and clock (E, S) clock offsets [s], NaN
+        for the missing values.
+    """
+    frames = []
+
+    for filename in to_files(filenames) :
+        with open(filename, "r") as fin :
+            text = fin.read()
+
+        end = text.find("END OF HEADER")
+        if end < 0 :
+            raise Exception(f"Not a RINEX clock file: {filename}")
+
+        # satellite clock records: type, name, date, number of values, clock
+        # and optional sigma. The continuation lines of records with more
+        # than two values and the other records (receivers...) are discarded
+        lines = [line for line in text[text.find("\n", end) + 1:].splitlines() \
+                 if line[:3] == "AS "]
+
+        if len(lines) > 0 :
+            frames.append(pd.read_csv(io.StringIO("\n".join(lines)), sep = r"\s+", \
+                                      header = None, names = list(range(11)), \
+                                      dtype = {1 : str}))
+
+    if len(frames) == 0 :
+        raise Exception(f"No satellite clock records in {filenames}")
+
+    df = pd.concat(frames, ignore_index = True)
+
+    date = df[list(range(2, 8))].values.astype(np.float64)
+    tow, week = tf.DatesToGps(date[:, 0], date[:, 1], date[:, 2], \
+                              date[:, 3] + date[:, 4] / 60 + date[:, 5] / 3600)
+    t = np.round((week * tf.WEEK_SECONDS + tow) * 1e3) / 1e3
+
+    grid = to_grid(t, df[1].values.astype(str), df[9].values.astype(np.float64))
+
+    return {"t" : grid["t"], "satellites" : grid["satellites"], "clock" : grid["values"]}
+
+def lagrange_interpolate(t_ref, values, t, order : int = ORBIT_ORDER, max_gap : float = None) :
+    """
+    Summary :
+        Lagrange interpolation over sliding windows, vectorized: each epoch
+        is interpolated with the polynomial through the order samples
+        centred on it.
+
+    Arguments :
+        t_ref - (E,) sorted epochs of the samples
+        values - (E, ...) samples, NaN if missing
+        t - (Q,) epochs of the interpolation
+        order - number of samples of the windows (2 for linear
+                interpolation)
+        max_gap - maximum interval between the samples of a window. By
+                  default, 1.5 times the median sampling interval.
+
+    Returns :
+        (Q, ...) interpolated values, NaN if the window contains missing
+        samples or gaps or if t is outside the epochs of the samples.
+    """
+    t_ref = np.asarray(t_ref, dtype = np.float64)
+    t = np.asarray(t, dtype = np.float64)
+
+    out = np.full((len(t),) + values.shape[1:], np.nan)
+
+    if len(t_ref) < order :
+        return out
+
+    step = np.median(np.diff(t_ref))
+    if max_gap is None :
+        max_gap = 1.5 * step
+
+    # first sample of the window of each epoch
+    start = np.clip(np.searchsorted(t_ref, t) - order // 2, 0, len(t_ref) - order)
+    ind = start[:, None] + np.arange(order)
+
+    # normalized distances of the samples from the epochs
+    x = (t_ref[ind] - t[:, None]) / step
+
+    # weights: prod_(m != j) (0 - x_m) / (x_j - x_m)
+    diag = np.eye(order, dtype = bool)
+    num = np.where(diag, 1.0, -x[:, None, :])
+    den = np.where(diag, 1.0, x[:, :, None] - x[:, None, :])
+    weights = np.prod(num, axis = 2) / np.prod(den, axis = 2)
+
+    # samples at the epochs are used directly, the other samples of the
+    # window may be missing
+    exact = x == 0
+    weights[np.any(exact, axis = 1)] = exact[np.any(exact, axis = 1)]
+
+    samples = values[ind]
+    samples = np.where(weights.reshape(weights.shape + (1,) * (values.ndim - 1)) == 0, \
+                       0.0, samples)
+    out = np.einsum("qj,qj...->q...", weights, samples)
+
+    # epochs outside the windows or windows with gaps
+    gaps = np.max(np.diff(t_ref[ind], axis = 1), axis = 1) > max_gap
+    outside = (t < t_ref[ind[:, 0]]) | (t > t_ref[ind[:, -1]])
+
+    out[gaps | outside] = np.nan
+
+    return out
+
+def sun_position(t) :
+    """
+    Summary :
+        Low precision ECEF position of the Sun (Montenbruck and Gill,
+        Satellite Orbits, 3.3.2), sufficient for the satellite attitude.
+
+    Arguments :
+        t - (N,) epochs in seconds since the GPS epoch
+
+    Returns :
+        (N, 3) ECEF positions [m].
+    """
+    # days since J2000 (the differences between time scales are negligible)
+    days = np.asarray(t, dtype = np.float64) / 86400 + tf.GPS_EPOCH_MJD - 51544.5
+    T = days / 36525
+
+    M = np.radians(357.5256 + 35999.049 * T)
+    lon = np.radians(282.94 + 357.5256 + 35999.049 * T + \
+                     (6892 * np.sin(M) + 72 * np.sin(2 * M)) / 3600)
+    dist = (149.619 - 2.499 * np.cos(M) - 0.021 * np.cos(2 * M)) * 1e9
+
+    eps = np.radians(23.43929111)
+
+    x = dist * np.cos(lon)
+    y = dist * np.sin(lon) * np.cos(eps)
+    z = dist * np.sin(lon) * np.sin(eps)
+
+    # rotation to ECEF with the Earth rotation angle
+    theta = 2 * np.pi * (0.7790572732640 + 1.00273781191135448 * days)
+
+    return np.column_stack((np.cos(theta) * x + np.sin(theta) * y, \
+                            -np.sin(theta) * x + np.cos(theta) * y, z))
+
+def apc_offsets(pos, t, pco) :
+    """
+    Summary :
+        ECEF antenna phase centre offsets of satellites with nominal yaw
+        attitude: z axis towards the Earth, y axis perpendicular to the Sun
+        direction, x axis completing the frame (towards the Sun side).
+
+    Arguments :
+        pos - (N, 3) ECEF positions of the centre of mass
+        t - (N,) epochs in seconds since the GPS epoch
+        pco - (N, 3) offsets in the satellite body frame [m]
+
+    Returns :
+        (N, 3) ECEF offsets, to be added to the centre of mass positions.
+    """
+    e_z = -pos / np.linalg.norm(pos, axis = 1, keepdims = True)
+
+    e_sun = sun_position(t) - pos
+    e_sun /= np.linalg.norm(e_sun, axis = 1, keepdims = True)
+
+    e_y = np.cross(e_z, e_sun)
+    e_y /= np.linalg.norm(e_y, axis = 1, keepdims = True)
+    e_x = np.cross(e_y, e_z)
+
+    return e_x * pco[:, 0:1] + e_y * pco[:, 1:2] + e_z * pco[:, 2:3]
+
+def _evaluate_chunk(nav, t, rows, ref_t, ref_pos, clk_t, ref_clock, pco, clock_datum) :
+    """
+    Summary :
+        Compute the errors of a chunk of epochs: executed in the worker
+        processes.
+
+    Arguments :
+        nav - rinex_nav.ephemeris_store
+        t - (E,) epochs of the chunk
+        rows - corrections of the chunk, as returned by
+               has_products.sample_corrections
+        ref_t, ref_pos - epochs and (E_ref, S, 3) reference positions
+        clk_t, ref_clock - epochs and (E_clk, S) reference clocks
+        pco - (S, 3) phase centre offsets, None to ignore them
+        clock_datum - if True, the median clock error of each constellation
+                      at each epoch is removed
+
+    Returns :
+        Dictionary of arrays with the errors, one element per row.
+    """
+    epoch, sat = rows["epoch"], rows["sat"]
+    gnss = rows["gnssID"]
+
+    states = ho.corrected_states(nav, gnss, rows["PRN"], rows["gnssIOD"], 0, t[epoch], \
+                                 rows["delta_radial"], rows["delta_in_track"], \
+                                 rows["delta_cross_track"], rows["multiplier"], \
+                                 rows["clock_c0"])
+
+    # reference values at the epochs of the chunk, for all the satellites
+    pos_ref = lagrange_interpolate(ref_t, ref_pos, t, ORBIT_ORDER)[epoch, sat]
+    clock_ref = lagrange_interpolate(clk_t, ref_clock, t, CLOCK_ORDER)[epoch, sat]
+
+    if pco is not None :
+        pos_ref = pos_ref + apc_offsets(pos_ref, t[epoch], pco[sat])
+
+    pos = states["pos"]
+    vel = states["vel"]
+
+    # orbit errors in the radial, in-track and cross-track frame
+    delta = pos - pos_ref
+
+    cross = np.cross(pos, vel)
+    e_in_track = vel / np.linalg.norm(vel, axis = 1, keepdims = True)
+    e_cross_track = cross / np.linalg.norm(cross, axis = 1, keepdims = True)
+    e_radial = np.cross(e_in_track, e_cross_track)
+
+    err_radial = np.sum(delta * e_radial, axis = 1)
+    err_in_track = np.sum(delta * e_in_track, axis = 1)
+    err_cross_track = np.sum(delta * e_cross_track, axis = 1)
+
+    err_clock = (states["clock"] - clock_ref) * ho.SPEED_OF_LIGHT
+
+    valid = np.isfinite(err_radial) & np.isfinite(err_in_track) & np.isfinite(err_cross_track)
+
+    # clock datum: median clock error of each constellation and epoch
+    datum = np.zeros(len(epoch))
+    if clock_datum :
+        group = epoch * (max(SISRE_WEIGHTS) + 1) + gnss
+        ok = valid & np.isfinite(err_clock)
+
+        medians = pd.Series(err_clock[ok]).groupby(group[ok]).median()
+        datum = medians.reindex(group).values
+
+        err_clock = err_clock - datum
+
+    w_r = np.where(gnss == rn.GPS_ID, SISRE_WEIGHTS[rn.GPS_ID][0], SISRE_WEIGHTS[rn.GAL_ID][0])
+    w_ac2 = np.where(gnss == rn.GPS_ID, SISRE_WEIGHTS[rn.GPS_ID][1], SISRE_WEIGHTS[rn.GAL_ID][1])
+
+    along_cross = w_ac2 * (err_in_track**2 + err_cross_track**2)
+
+    out = {"t" : t[epoch], "gnssID" : gnss, "PRN" : rows["PRN"], "IOD" : rows["gnssIOD"], \
+           "err_radial" : err_radial, "err_in_track" : err_in_track, \
+           "err_cross_track" : err_cross_track, "err_clock" : err_clock, \
+           "clock_datum" : datum, \
+           "sisre_orbit" : np.sqrt((w_r * err_radial)**2 + along_cross), \
+           "sisre" : np.sqrt((w_r * err_radial - err_clock)**2 + along_cross)}
+
+    return {key : val[valid] for key, val in out.items()}
+
+def evaluate(nav, basename : str, sp3, clk = None, rate : float = 300, start : float = None, \
+             stop : float = None, satellites = None, pco : dict = None, \
+             clock_datum : bool = True, processes : int = 1, chunk : float = 86400) :
+    """
+    Summary :
+        Compute the orbit and clock errors and the SISRE of the HAS
+        corrections of a decoder output with respect to reference products.
+
+    Arguments :
+        nav - rinex_nav.ephemeris_store with the broadcast ephemerides
+        basename - base of the path name of the correction files
+                   (<basename>_has_orb.csv, <basename>_has_clk.csv)
+        sp3 - pathname or list of pathnames of the reference SP3 files
+        clk - pathname or list of pathnames of the reference clock files. If
+              None, the clocks of the SP3 files are used.
+        rate - interval of the evaluation epochs in seconds
+        start, stop - first and last epochs in seconds since the GPS epoch.
+                      By default, the interval covered by the corrections and
+                      the reference orbits.
+        satellites - list of satellite identifiers (e.g. G01, E11) to
+                     evaluate. By default, all the GPS and Galileo satellites
+                     of the reference orbits.
+        pco - dictionary {satellite identifier : (x, y, z)} with the phase
+              centre offsets [m] in the satellite body frame. None to compare
+              the broadcast positions with the centre of mass.
+        clock_datum - if True, the median clock error of each constellation
+                      at each epoch is removed
+        processes - number of processes. The epochs are divided in chunks and
+                    the chunks are distributed over the processes.
+        chunk - duration of the chunks in seconds
+
+    Returns :
+        Dataframe with one row per satellite and epoch with valid
+        corrections and reference values: t (seconds since the GPS epoch),
+        gnssID, PRN, IOD, err_radial, err_in_track, err_cross_track,
+        err_clock (HAS - reference, [m]), clock_datum [m], sisre_orbit (SISRE
+        without the clock error) and sisre [m].
+    """
+    orbits, clocks = hp.load_orbits_clocks(basename)
+
+    ref = load_sp3(sp3)
+    ref_clk = load_clk(clk) if clk is not None else \
+              {"t" : ref["t"], "satellites" : ref["satellites"], "clock" : ref["clock"]}
+
+    if satellites is None :
+        satellites = [sat for sat in ref["satellites"] if sat[0] in rn.systems]
+
+    keys = np.array([rn.systems[sat[0]] * hp.MAX_PRN + int(sat[1:]) for sat in satellites], \
+                    dtype = np.int64)
+
+    # reference values of the satellites evaluated (NaN if missing)
+    def columns(product, values) :
+        index = {sat : ii for ii, sat in enumerate(product["satellites"])}
+        out = np.full((len(product["t"]), len(satellites)) + values.shape[2:], np.nan)
+
+        for ii, sat in enumerate(satellites) :
+            if sat in index :
+                out[:, ii] = values[:, index[sat]]
+
+        return out
+
+    ref_pos = columns(ref, ref["pos"])
+    ref_clock = columns(ref_clk, ref_clk["clock"])
+
+    sat_pco = None
+    if pco is not None :
+        sat_pco = np.array([pco.get(sat, (0.0, 0.0, 0.0)) for sat in satellites], \
+                           dtype = np.float64)
+
+    if start is None :
+        start = max(np.min(orbits["t_ref"]), ref["t"][0])
+    if stop is None :
+        stop = min(np.max(orbits["t_rx"]), ref["t"][-1])
+
+    epochs = np.arange(np.ceil(start / rate) * rate, stop + 1e-6, rate)
+
+    # chunks of epochs with the reference samples of their windows
+    args = []
+    chunk_size = max(int(chunk // rate), 1)
+
+    for ii in range(0, len(epochs), chunk_size) :
+        t = epochs[ii:ii + chunk_size]
+
+        rows = hp.sample_corrections(orbits, clocks, keys, t)
+
+        pos_slice = slice(max(np.searchsorted(ref["t"], t[0]) - ORBIT_ORDER, 0), \
+                          np.searchsorted(ref["t"], t[-1]) + ORBIT_ORDER)
+        clk_slice = slice(max(np.searchsorted(ref_clk["t"], t[0]) - CLOCK_ORDER, 0), \
+                          np.searchsorted(ref_clk["t"], t[-1]) + CLOCK_ORDER)
+
+        args.append((nav, t, rows, ref["t"][pos_slice], ref_pos[pos_slice], \
+                     ref_clk["t"][clk_slice], ref_clock[clk_slice], sat_pco, clock_datum))
+
+    if processes > 1 and len(args) > 1 :
+        # fresh interpreters: the threads started by the caller (e.g. the
+        # numba threading layer used by the decoder) do not survive a fork
+        ctx = multiprocessing.get_context("spawn")
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = processes, \
+                                                    mp_context = ctx) as pool :
+            results = list(pool.map(_evaluate_chunk, *zip(*args)))
+    else :
+        results = [_evaluate_chunk(*arg) for arg in args]
+
+    columns = ["t", "gnssID", "PRN", "IOD", "err_radial", "err_in_track", "err_cross_track", \
+               "err_clock", "clock_datum", "sisre_orbit", "sisre"]
+
+    if len(results) == 0 :
+        return pd.DataFrame(columns = columns)
+
+    return pd.DataFrame({col : np.concatenate([res[col] for res in results]) \
+                         for col in columns})
+
+def daily_stats(errors, by_satellite : bool = True) :
+    """
+    Summary :
+        Daily statistics of the errors.
+
+    Arguments :
+        errors - dataframe as returned by evaluate
+        by_satellite - if True, statistics per satellite, otherwise per
+                       constellation
+
+    Returns :
+        Dataframe with one row per day (date) and satellite (gnssID, PRN) or
+        constellation (gnssID): number of epochs, RMS of the errors, mean of
+        the radial and clock errors and 95th percentile of the SISRE. The
+        statistics of the clock errors and of the SISRE exclude the epochs
+        without clock corrections.
+    """
+    data = errors.assign(date = tf.GpsToDatetime(0, errors["t"].values).astype("datetime64[D]"))
+
+    keys = ["date", "gnssID", "PRN"] if by_satellite else ["date", "gnssID"]
+
+    err_columns = ["err_radial", "err_in_track", "err_cross_track", "err_clock", \
+                   "sisre_orbit", "sisre"]
+
+    squares = data[keys].copy()
+    for col in err_columns :
+        squares[col] = data[col].values**2
+
+    groups = data.groupby(keys)
+
+    stats = groups.size().to_frame("epochs")
+
+    rms = np.sqrt(squares.groupby(keys)[err_columns].mean())
+    stats = stats.join(rms.add_prefix("rms_"))
+
+    stats["mean_radial"] = groups["err_radial"].mean()
+    stats["mean_clock"] = groups["err_clock"].mean()
+    stats["sisre_95"] = groups["sisre"].quantile(0.95)
+
+    return stats.reset_index()
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "SISRE of the HAS corrections")
+    parser.add_argument("basename", help = "base name of the correction files")
+    parser.add_argument("--nav", nargs = "+", required = True, \
+                        help = "RINEX navigation files")
+    parser.add_argument("--sp3", nargs = "+", required = True, \
+                        help = "reference SP3 files")
+    parser.add_argument("--clk", nargs = "+", default = None, \
+                        help = "reference RINEX clock files")
+    parser.add_argument("--rate", type = float, default = 300, \
+                        help = "interval of the evaluation epochs in seconds")
+    parser.add_argument("--processes", type = int, default = 1, \
+                        help = "number of processes")
+    args = parser.parse_args()
+
+    errors = evaluate(rn.ephemeris_store(args.nav), args.basename, args.sp3, args.clk, \
+                      args.rate, processes = args.processes)
+
+    errors.to_csv(args.basename + "_has_sisre.csv", index = False)
+    daily_stats(errors).to_csv(args.basename + "_has_sisre_stats.csv", index = False)
+
+    print(daily_stats(errors, by_satellite = False).to_string(index = False))
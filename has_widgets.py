@@ -7,18 +7,112 @@ Created on 19 October 2022
     Daniele Borio
 """ 
 import os
-from ipywidgets import (VBox, Dropdown, HTML, Layout, RadioButtons, Button )
+import time
+import queue
+import threading
+import multiprocessing
+import concurrent.futures
+
+from ipywidgets import (VBox, HBox, Dropdown, HTML, Layout, RadioButtons, Button,
+                        FloatProgress )
 
 # Main file with actual parsing routines
-from process_cnav import parse_data
+import process_cnav as pc
+import has_correction_store as hcs
+
 
+def process_file(filename, rx, _type, events, cancel, interval = 0.5) :
+    """
+    Summary :
+        Parse a file reporting the progress, the latest corrections and the
+        final metrics through a queue. The function is executed in a
+        background thread or in a worker process.
+        
+    Arguments:
+        filename, rx, _type - see process_cnav.parse_data
+        events - queue where tuples (kind, filename, payload) are put:
+                    progress - (epochs processed, total epochs, messages)
+                    corrections - (ToW, WN, {type : dataframe}) with the
+                                  latest orbit and clock corrections
+                    done - dictionary with the metrics of the file
+        cancel - event stopping the processing when set
+        interval - minimum time between two progress events in seconds.
+                   Corrections are sent when first available and then
+                   every 4 intervals.
+        
+    Returns:
+        The dictionary with the metrics of the file.
+    """
+    metrics = {"status" : "completed", "pages" : 0, "epochs" : 0, \
+               "total_epochs" : 0, "messages" : 0, "load_time" : 0.0, \
+               "decode_time" : 0.0}
+    
+    # only the latest corrections are needed for the display
+    store = hcs.has_correction_store(depth = 1)
+    
+    last = {"progress" : 0.0, "corrections" : None}
+    
+    def on_progress(done, total) :
+        metrics["epochs"], metrics["total_epochs"] = done, total
+        
+        now = time.perf_counter()
+        if done == total or now - last["progress"] >= interval :
+            last["progress"] = now
+            events.put(("progress", filename, (done, total, metrics["messages"])))
+            
+    def on_message(tow, week, msg_id) :
+        metrics["messages"] += 1
+        
+        now = time.perf_counter()
+        if last["corrections"] is not None and now - last["corrections"] < 4 * interval :
+            return
+        
+        cors = {ctype : store.get_epoch(ctype, week, tow) for ctype in ("orbit", "clock")}
+        
+        if sum(len(df) for df in cors.values()) > 0 :
+            last["corrections"] = now
+            events.put(("corrections", filename, (tow, week, cors)))
+    
+    try :
+        if cancel.is_set() :
+            metrics["status"] = "cancelled"
+        else :
+            start = time.perf_counter()
+            df = pc.load_data(filename, rx, _type)
+            metrics["pages"] = len(df)
+            metrics["load_time"] = time.perf_counter() - start
+            
+            # parsing cancelled while loading
+            if cancel.is_set() :
+                metrics["status"] = "cancelled"
+            else :
+                start = time.perf_counter()
+                pc.decode_data(df, filename.split('__')[0], 1, _store = store, \
+                               _on_message = on_message, _cancel = cancel, \
+                               _on_progress = on_progress)
+                metrics["decode_time"] = time.perf_counter() - start
+                
+                if metrics["epochs"] < metrics["total_epochs"] :
+                    metrics["status"] = "cancelled"
+    except Exception as exc :
+        metrics["status"] = f"error: {exc}"
+        
+    events.put(("done", filename, metrics))
+    
+    return metrics
 
 class process_button_widget(VBox) :
     """
     Summary:
-        Simple widget with a single button to start the processing.
+        Widget with the buttons to start and cancel the processing.
+        
+        The parsing runs in the background: a single file is processed in a
+        thread, the files of a directory in a pool of processes. The kernel 
+        stays responsive, the progress and the metrics of each file are
+        displayed while the data are processed, together with the latest
+        corrections decoded.
     """
-    def __init__(self, filename, options) :
+    def __init__(self, filename, options, processes = None) :
         """
         Summary :
             Object constructor.
@@ -26,57 +120,263 @@ class process_button_widget(VBox) :
         Arguments:
             filename - filename of the file to process
             options - list with the options defining the processing parameters
+            processes - maximum number of processes used for the files of a
+                        directory, the number of CPUs if None
             
         Returns:
             The process_button_widget.
         """
         self.filename = filename
         self.options = options
+        self.processes = processes
         
         self.wb_process = Button(
             description='Parse',
             disabled=False,
-            icon='Initialize'
+            icon='play'
         )
         
+        self.wb_cancel = Button(
+            description='Cancel',
+            disabled=True,
+            icon='stop'
+        )
+        
+        self.status = HTML(value = "")
+        self.files_box = VBox([])
+        self.corrections = HTML(value = "")
+        
+        # widgets of each file: progress bar and metrics
+        self.file_widgets = {}
+        
+        # event stopping the processing, and True if the cancellation was
+        # requested (possibly before the event is created)
+        self.cancel_event = None
+        self.cancelled = False
+        
         @self.wb_process.on_click
         def process_on_click(b) :
-            _type = None
+            self.start()
             
-            # Get the _rx type
-            if self.options[0] == "Septentrio" :
-                rx = "sep"
-                
-                if len(self.options) > 1 :
-                    if self.options[1] == 'decimal' :
-                        _type = "txt"
-                    elif self.options[1] == 'binary':
-                        _type = "bin"
+        @self.wb_cancel.on_click
+        def cancel_on_click(b) :
+            self.cancel()
+        
+        super().__init__([HBox([self.wb_process, self.wb_cancel]), self.status,
+                          self.files_box, self.corrections],
+                         layout=Layout(border='1px solid black'))
+        
+    def get_receiver(self) :
+        """
+        Summary :
+            Determine receiver and data type from the options.
+            
+        Returns:
+            rx, _type as required by parse_data.
+        """
+        _type = None
+        
+        # Get the _rx type
+        if self.options[0] == "Septentrio" :
+            rx = "sep"
+            
+            if len(self.options) > 1 :
+                if self.options[1] == 'decimal' :
+                    _type = "txt"
+                elif self.options[1] == 'binary':
+                    _type = "bin"
                 else :
                     _type = "hexa"
+            else :
+                _type = "hexa"
+        
+        elif self.options[0] == "Novatel" :
+            rx = "nov"
+        elif self.options[0] == "Javad" :
+            rx = "jav"
+        else :
+            raise Exception("Unsupported Receiver Type")
+            
+        return rx, _type
+    
+    def start(self) :
+        """
+        Summary :
+            Start the processing in the background.
+        """
+        rx, _type = self.get_receiver()
+        
+        # Check if filename is directory or a file
+        if os.path.isdir(self.filename) :
+            # process all the files, except the outputs of previous runs
+            files = [os.path.join(self.filename, f) for f in sorted(os.listdir(self.filename))
+                     if os.path.isfile(os.path.join(self.filename, f)) and "_has_" not in f]
+        else :
+            files = [self.filename]
+            
+        if len(files) == 0 :
+            self.status.value = "No files to process"
+            return
+        
+        self.file_widgets = {}
+        rows = []
+        for f in files :
+            bar = FloatProgress(value = 0, min = 0, max = 1, layout = Layout(width = '30%'))
+            info = HTML(value = f"{os.path.basename(f)}: waiting")
+            self.file_widgets[f] = (bar, info)
+            rows.append(HBox([bar, info]))
             
-            elif self.options[0] == "Novatel" :
-                rx = "nov"
-            elif self.options[0] == "Javad" :
-                rx = "jav"
+        self.files_box.children = rows
+        self.corrections.value = ""
+        
+        self.cancel_event = None
+        self.cancelled = False
+        
+        self.wb_process.disabled = True
+        self.wb_cancel.disabled = False
+        self.status.value = f"Processing {len(files)} file(s)..."
+        
+        threading.Thread(target = self.run, args = (files, rx, _type), daemon = True).start()
+        
+    def run(self, files, rx, _type) :
+        """
+        Summary :
+            Process the files and update the widgets with the events received
+            from the workers. Executed in a background thread.
+        """
+        start = time.perf_counter()
+        
+        try :
+            if len(files) == 1 :
+                # a single file is processed in a thread: the corrections
+                # can be displayed as soon as they are decoded
+                events = queue.Queue()
+                self.set_cancel_event(threading.Event())
+                
+                worker = threading.Thread(target = process_file, \
+                                          args = (files[0], rx, _type, events, self.cancel_event), \
+                                          daemon = True)
+                worker.start()
+                
+                self.monitor(events, lambda : worker.is_alive())
             else :
-                raise Exception("Unsupported Receiver Type")
+                # the files of a directory are processed in parallel by
+                # fresh interpreters
+                ctx = multiprocessing.get_context("spawn")
+                
+                with ctx.Manager() as manager :
+                    events = manager.Queue()
+                    self.set_cancel_event(manager.Event())
+                    
+                    processes = self.processes if self.processes is not None else os.cpu_count()
+                    
+                    with concurrent.futures.ProcessPoolExecutor( \
+                            max_workers = min(processes, len(files)), mp_context = ctx) as pool :
+                        futures = [pool.submit(process_file, f, rx, _type, events, self.cancel_event) \
+                                   for f in files]
+                        
+                        self.monitor(events, lambda : not all(fut.done() for fut in futures))
+                        
+                        for f, fut in zip(files, futures) :
+                            if fut.exception() is not None :
+                                self.file_widgets[f][1].value = \
+                                    f"{os.path.basename(f)}: error: {fut.exception()}"
+                                    
+            state = "cancelled" if self.cancelled else "completed"
+            self.status.value = f"Processing {state} in {time.perf_counter() - start:.1f} s"
+            
+        except Exception as exc :
+            self.status.value = f"Processing failed: {exc}"
+            
+        finally :
+            self.wb_process.disabled = False
+            self.wb_cancel.disabled = True
             
-            # Check if filename is directory or a file
-            if os.path.isdir(filename) :
-                files = os.listdir(filename)
+    def monitor(self, events, running) :
+        """
+        Summary :
+            Update the widgets with the events of the workers while they are
+            running.
+            
+        Arguments:
+            events - queue with the events of the workers
+            running - function returning True while the workers are running
+        """
+        while True :
+            try :
+                kind, filename, payload = events.get(timeout = 0.1)
+            except queue.Empty :
+                if not running() :
+                    break
+                continue
+            
+            self.update(kind, filename, payload)
+            
+        # events left in the queue
+        while True :
+            try :
+                self.update(*events.get_nowait())
+            except queue.Empty :
+                break
+            
+    def update(self, kind, filename, payload) :
+        """
+        Summary :
+            Update the widgets with an event of a worker (see process_file).
+        """
+        bar, info = self.file_widgets[filename]
+        name = os.path.basename(filename)
+        
+        if kind == "progress" :
+            done, total, messages = payload
+            bar.value = done / total if total > 0 else 1
+            info.value = f"{name}: {done}/{total} epochs, {messages} messages"
+            
+        elif kind == "corrections" :
+            tow, week, cors = payload
+            
+            html = f"<B>Latest corrections - {name} - WN {week}, ToW {tow}</B>"
+            for ctype, df in cors.items() :
+                html += f"<br><I>{ctype}</I>" + df.to_html(index = False, max_rows = 12)
                 
-                for f in files :
-                    full_path = filename + f
-                    # process all the files
-                    parse_data(full_path, rx, _type, True)
+            self.corrections.value = html
+            
+        elif kind == "done" :
+            metrics = payload
+            if metrics["status"] == "completed" :
+                bar.bar_style = "success"
+            elif metrics["status"] == "cancelled" :
+                bar.bar_style = "warning"
             else :
-                # it is a filename
-                 # Start the processing
-                parse_data(filename, rx, _type, True)
+                bar.bar_style = "danger"
+            
+            info.value = f"{name}: {metrics['status']} - {metrics['pages']} pages, " + \
+                         f"{metrics['epochs']}/{metrics['total_epochs']} epochs, " + \
+                         f"{metrics['messages']} messages, " + \
+                         f"load {metrics['load_time']:.1f} s, decode {metrics['decode_time']:.1f} s"
+            
+    def set_cancel_event(self, event) :
+        """
+        Summary :
+            Set the event stopping the workers, taking into account a
+            cancellation requested before its creation.
+        """
+        self.cancel_event = event
         
-        super().__init__([self.wb_process],
-                         layout=Layout(border='1px solid black'))
+        if self.cancelled :
+            event.set()
+            
+    def cancel(self) :
+        """
+        Summary :
+            Stop the processing: each file is stopped at its next epoch and
+            the files not yet started are skipped.
+        """
+        self.cancelled = True
+        self.status.value = "Cancelling..."
+        
+        if self.cancel_event is not None :
+            self.cancel_event.set()
             
 class receiver_type_widget(VBox) :
     """
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:17:36 2026
+
+@author: daniele
+
+Summary :
+    Overlapping Allan deviation (ADEV) and modified Allan deviation (MDEV) of
+    phase data (e.g. clock corrections in seconds) for several satellites.
+
+    The series are placed on a regular grid with step tau0: missing epochs
+    are NaN and the terms of the estimators involving a missing sample are
+    discarded, so that gaps do not bias the result. The series of a group of
+    satellites are stacked in a 2D array and processed together; for the
+    MDEV, the inner averages are obtained from cumulative sums. Groups of
+    satellites can be processed in parallel by several processes.
+
+    On gap-free data the results are the same as allantools.oadev and
+    allantools.mdev with data_type = "phase".
+"""
+
+import numpy as np
+import multiprocessing
+import concurrent.futures
+
+
+def get_tau0(times) :
+    """
+    Summary :
+        Estimate the nominal sampling interval as the most frequent positive
+        difference between consecutive epochs.
+
+    Arguments :
+        times - list of arrays of sorted epochs in seconds
+
+    Returns :
+        The sampling interval in seconds.
+    """
+    dt = np.concatenate([np.diff(np.asarray(time, dtype = np.float64)) for time in times])
+    dt = dt[dt > 0]
+
+    if len(dt) == 0 :
+        raise Exception("At least two distinct epochs are required")
+
+    values, counts = np.unique(dt, return_counts = True)
+
+    return values[np.argmax(counts)]
+
+def to_grid(series, tau0) :
+    """
+    Summary :
+        Place several series on a common regular grid.
+
+    Arguments :
+        series - list of (time, phase) arrays
+        tau0 - grid step in seconds. Epochs not aligned with the grid are
+               assigned to the nearest grid point; when several epochs fall
+               on the same point, the first one is kept.
+
+    Returns :
+        2D array with one row per series and NaN at the missing epochs.
+    """
+    t_start = min(np.min(time) for time, _ in series if len(time) > 0)
+    t_stop = max(np.max(time) for time, _ in series if len(time) > 0)
+
+    length = int(np.round((t_stop - t_start) / tau0)) + 1
+
+    grid = np.full((len(series), length), np.nan)
+
+    for ii, (time, phase) in enumerate(series) :
+        if len(time) == 0 :
+            continue
+
+        ind = np.round((np.asarray(time) - t_start) / tau0).astype(np.int64)
+
+        # keep the first sample for each grid point
+        ind, first = np.unique(ind, return_index = True)
+
+        grid[ii, ind] = np.asarray(phase, dtype = np.float64)[first]
+
+    # the estimators are invariant to a constant offset: removing the mean
+    # reduces the magnitude of the cumulative sums
+    with np.errstate(invalid = "ignore") :
+        offset = np.nanmean(grid, axis = 1, keepdims = True)
+
+    return grid - np.nan_to_num(offset)
+
+def get_ms(taus, tau0, length) :
+    """
+    Summary :
+        Convert averaging times into numbers of samples, as done by
+        allantools.tau_generator.
+
+    Returns :
+        Sorted array of unique averaging factors m.
+    """
+    taus = np.asarray(taus, dtype = np.float64)
+    taus = taus[(taus > 0) & (taus < tau0 * length)]
+
+    ms = np.floor(taus / tau0).astype(np.int64)
+
+    return np.unique(ms[ms > 0])
+
+def oadev_grid(grid, tau0, ms) :
+    """
+    Summary :
+        Overlapping ADEV of gridded phase data.
+
+    Arguments :
+        grid - 2D array (series x epochs) with NaN at the missing epochs
+        tau0 - grid step in seconds
+        ms - averaging factors
+
+    Returns :
+        dev - 2D array (series x ms) of deviations, NaN if not computed
+        num - 2D array with the number of terms used
+    """
+    num_series, length = grid.shape
+
+    dev = np.full((num_series, len(ms)), np.nan)
+    num = np.zeros((num_series, len(ms)), dtype = np.int64)
+
+    for kk, m in enumerate(ms) :
+        if 2 * m >= length :
+            break
+
+        # second differences, NaN when a sample is missing
+        d2 = grid[:, 2 * m:] - 2 * grid[:, m:-m] + grid[:, :-2 * m]
+
+        valid = ~np.isnan(d2)
+        num[:, kk] = np.sum(valid, axis = 1)
+
+        ssum = np.sum(np.where(valid, d2, 0.0)**2, axis = 1)
+
+        with np.errstate(invalid = "ignore", divide = "ignore") :
+            dev[:, kk] = np.sqrt(ssum / (2.0 * num[:, kk])) / (m * tau0)
+
+    return dev, num
+
+def mdev_grid(grid, tau0, ms) :
+    """
+    Summary :
+        Modified ADEV of gridded phase data. The averages over m samples are
+        obtained as differences of cumulative sums.
+
+    Arguments :
+        grid - 2D array (series x epochs) with NaN at the missing epochs
+        tau0 - grid step in seconds
+        ms - averaging factors
+
+    Returns :
+        dev - 2D array (series x ms) of deviations, NaN if not computed
+        num - 2D array with the number of terms used
+    """
+    num_series, length = grid.shape
+
+    dev = np.full((num_series, len(ms)), np.nan)
+    num = np.zeros((num_series, len(ms)), dtype = np.int64)
+
+    valid = ~np.isnan(grid)
+
+    # cumulative sums of the samples and of the valid samples, with a
+    # leading zero
+    zeros = np.zeros((num_series, 1))
+    csum = np.concatenate((zeros, np.cumsum(np.where(valid, grid, 0.0), axis = 1)), axis = 1)
+    cnum = np.concatenate((zeros, np.cumsum(valid, axis = 1)), axis = 1)
+
+    for kk, m in enumerate(ms) :
+        if 3 * m > length :
+            break
+
+        # number of terms
+        nt = length - 3 * m + 1
+
+        # sums over windows of m samples starting at i = 0 ... length - m
+        win = csum[:, m:] - csum[:, :-m]
+
+        inner = win[:, 2 * m:2 * m + nt] - 2 * win[:, m:m + nt] + win[:, :nt]
+
+        # a term is valid if its 3m samples are all available
+        ok = (cnum[:, 3 * m:3 * m + nt] - cnum[:, :nt]) == 3 * m
+
+        num[:, kk] = np.sum(ok, axis = 1)
+        ssum = np.sum(np.where(ok, inner, 0.0)**2, axis = 1)
+
+        tau = m * tau0
+
+        with np.errstate(invalid = "ignore", divide = "ignore") :
+            dev[:, kk] = np.sqrt(ssum / (2.0 * m * m * tau * tau * num[:, kk]))
+
+    return dev, num
+
+def _process_group(series, taus, tau0, kind) :
+    """
+    Summary :
+        Compute the deviations of a group of series on a common grid.
+
+    Returns :
+        List of (taus, dev, err, num) tuples, one per series.
+    """
+    grid = to_grid(series, tau0)
+    ms = get_ms(taus, tau0, grid.shape[1])
+
+    if kind == "oadev" :
+        dev, num = oadev_grid(grid, tau0, ms)
+    elif kind == "mdev" :
+        dev, num = mdev_grid(grid, tau0, ms)
+    else :
+        raise Exception(f"Unsupported deviation: {kind}")
+
+    out = []
+    for ii in range(len(series)) :
+        # as in allantools, values estimated with a single term are removed
+        keep = num[ii] > 1
+
+        with np.errstate(invalid = "ignore", divide = "ignore") :
+            err = dev[ii, keep] / np.sqrt(num[ii, keep])
+
+        out.append((ms[keep] * tau0, dev[ii, keep], err, num[ii, keep]))
+
+    return out
+
+def multi_dev(series : dict, taus, tau0 : float = None, kind : str = "oadev", \
+              processes : int = 1, group_size : int = 8) :
+    """
+    Summary :
+        Compute the ADEV or MDEV of several series of phase data.
+
+    Arguments :
+        series - dictionary {key : (time, phase)}, e.g. one entry per satellite
+                 with times in seconds and clock corrections in seconds
+        taus - averaging times in seconds
+        tau0 - sampling interval in seconds. If None, it is estimated from all
+               the series with get_tau0.
+        kind - "oadev" (overlapping ADEV) or "mdev" (modified ADEV)
+        processes - number of processes. Series are processed in groups and
+                    groups are distributed over the processes.
+        group_size - number of series processed together. It bounds the
+                     memory used: the grid of a group has group_size rows.
+
+    Returns :
+        Dictionary {key : (taus, dev, err, num)} with the averaging times
+        used, the deviations, their errors and the number of terms, as
+        returned by allantools.
+    """
+    keys = [key for key in series if len(series[key][0]) > 1]
+
+    if len(keys) == 0 :
+        return {}
+
+    if tau0 is None :
+        tau0 = get_tau0([series[key][0] for key in keys])
+
+    groups = [keys[ii:ii + group_size] for ii in range(0, len(keys), group_size)]
+
+    args = [([series[key] for key in group], taus, tau0, kind) for group in groups]
+
+    if processes > 1 and len(groups) > 1 :
+        # fresh interpreters: the threads started by the caller (e.g. the
+        # numba threading layer used by the decoder) do not survive a fork
+        ctx = multiprocessing.get_context("spawn")
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = processes, \
+                                                    mp_context = ctx) as pool :
+            results = list(pool.map(_process_group, *zip(*args)))
+    else :
+        results = [_process_group(*arg) for arg in args]
+
+    out = {}
+    for group, result in zip(groups, results) :
+        for key, res in zip(group, result) :
+            out[key] = res
+
+    return out
+
+def oadev(time, phase, taus, tau0 : float = None) :
+    """
+    Summary :
+        Overlapping ADEV of a single series of phase data.
+
+    Returns :
+        taus, dev, err, num
+    """
+    return multi_dev({0 : (time, phase)}, taus, tau0, "oadev")[0]
+
+def mdev(time, phase, taus, tau0 : float = None) :
+    """
+    Summary :
+        Modified ADEV of a single series of phase data.
+
+    Returns :
+        taus, dev, err, num
+    """
+    return multi_dev({0 : (time, phase)}, taus, tau0, "mdev")[0]
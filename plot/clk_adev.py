@@ -8,13 +8,15 @@ Created on Mon Jan 30 17:05:49 2023
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-import allantools as at
 
 
 import matplotlib as mp
+
+import plot_data as pdl
+import adev
     
 
-def clk_adev( filename ) :
+def clk_adev( filename, kind = "oadev", processes = 1, gnss_list = None ) :
     
     fsize = 16
     mp.rc('xtick', labelsize=fsize) 
@@ -27,10 +29,7 @@ def clk_adev( filename ) :
     
     # load the csv file with the clock corrections
     fname = filename[:filename.rfind(".")]
-    df = pd.read_csv(filename)
-    
-    # determine which GNSS is present in the correction file
-    GNSS = np.unique(df["gnssID"].values)
+    data = pdl.plot_data(filename, "clk")
     
     ###################### SOME INFO #####################
     # light speed [m/sec]
@@ -41,59 +40,52 @@ def clk_adev( filename ) :
     
     #######################################################
     
+    # names of the files produced
+    outputs = []
+    
     # make different plots for each gnss
-    for gnss in GNSS :
-        # filter by gnss
-        gnss_df = df[df["gnssID"] == gnss]
+    for gnss in data.gnss_list() :
+        if gnss_list is not None and gnss not in gnss_list :
+            continue
         
         # Create a new plot
         fig, ax = plt.subplots()
         fig.set_size_inches((12, 8))
-        # Determine the list of prn
-        sats = np.unique(gnss_df["PRN"].values)
         
-        # Make a plot for each satellite
-        for sat in sats :
-            sat_df = gnss_df[gnss_df["PRN"] == sat]
-            
-            # build the time index
-            time = np.floor( sat_df["ToW"].values / 3600 )  * 3600 + sat_df["ToH"].values
+        # clock corrections of all the satellites (duplicated epochs already
+        # removed); gaps are handled by the ADEV engine
+        series = {}
+        for sat in data.satellites(gnss) :
+            sat_data = data.get(gnss, sat)
             
             # build the clock correction
-            clk_corr = sat_df["delta_clock_c0"].values * sat_df["multiplier"].values
+            clk_corr = sat_data["delta_clock_c0"] * sat_data["multiplier"] / v_light
             
-            # remove duplicated values
-            time, ind = np.unique(time, return_index = True)
-            clk_corr = clk_corr[ind] / v_light
+            series[sat] = (sat_data["tow"], clk_corr)
             
-            # measurement rate
-            Ts = np.median(np.diff(time))
-            rate = 1 / Ts 
-            
-            t, ad, ade, adn = at.oadev( clk_corr, rate = rate, \
-                                        data_type = "phase", taus = tau[:-3])
-            
-                
-            # ADEV can also be computed from frequency measurements
-            # Uncomment to test
-            # clk_freq = np.diff(clk_corr) / Ts
-            # t, ad, ade, adn = at.oadev( clk_corr, rate = rate, \
-            #                             data_type = "phase", taus = tau[:-3])
-                
-            # finally plot the result
+        # ADEV (or MDEV) of all the satellites
+        devs = adev.multi_dev(series, tau[:-3], kind = kind, processes = processes)
+        
+        # Make a plot for each satellite
+        for sat, (t, ad, ade, adn) in devs.items() :
             ax.loglog(t, ad, "-.", label = f"{gnss_ids[gnss]}{sat}")
             
         # Some cosmetics for the plots
         # ax.tick_params(axis='x', labelrotation = 45)
         ax.set_xlabel("Averaging Interval [s]", fontsize = fsize)
-        ax.set_ylabel("ADEV", fontsize = fsize)
+        ax.set_ylabel("ADEV" if kind == "oadev" else "MDEV", fontsize = fsize)
         ax.legend(loc=(1.05, 0), fontsize = 14, ncol=2)
         ax.autoscale(tight=True)
         ax.set_title(f"{gnss_spell[gnss]}", fontsize = fsize)
         plt.tight_layout()
      
         # Save as pdf
-        plt.savefig(f"{fname}_{gnss_spell[gnss]}_adev.png", bbox_inches="tight")
+        outname = f"{fname}_{gnss_spell[gnss]}_{kind[-4:]}.png"
+        plt.savefig(outname, bbox_inches="tight")
+        plt.close(fig)
+        outputs.append(outname)
+        
+    return outputs
         
 if __name__ == "__main__":
     
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:26:14 2026
+
+@author: daniele
+
+Summary :
+    Downsampling of the series drawn by the plot scripts, so that series with
+    millions of points are rendered in bounded time.
+
+        minmax - the x range is divided in columns (e.g. one per pixel) and,
+                 for each column, the points with the minimum and maximum y
+                 are kept: the envelope of the series is preserved.
+        lttb   - Largest-Triangle-Three-Buckets: in each bucket, the point
+                 forming the largest triangle with the point selected in the
+                 previous bucket and the average of the next bucket is kept.
+"""
+
+import numpy as np
+
+
+def minmax_decimate(x, y, num_columns : int) :
+    """
+    Summary :
+        Keep, for each column of the x range, the points with the minimum and
+        maximum y.
+
+    Arguments :
+        x, y - coordinates of the points, without NaN
+        num_columns - number of columns
+
+    Returns :
+        x, y of the points kept, in their original order.
+    """
+    num_points = len(x)
+
+    if num_points <= 2 * num_columns :
+        return x, y
+
+    x_min, x_max = np.min(x), np.max(x)
+
+    # column of each point
+    if x_max > x_min :
+        col = ((x - x_min) * (num_columns / (x_max - x_min))).astype(np.int64)
+        col = np.minimum(col, num_columns - 1)
+    else :
+        col = np.zeros(num_points, dtype = np.int64)
+
+    if np.all(col[1:] >= col[:-1]) :
+        # x sorted (time series): the columns are contiguous segments and the
+        # extremes are found with reduceat, without sorting
+        starts = np.flatnonzero(np.concatenate(([True], col[1:] != col[:-1])))
+        counts = np.diff(np.append(starts, num_points))
+
+        keep = []
+        for ufunc in (np.minimum, np.maximum) :
+            extreme = np.repeat(ufunc.reduceat(y, starts), counts)
+
+            # first point of each column equal to the extreme
+            ind = np.flatnonzero(y == extreme)
+            _, first = np.unique(col[ind], return_index = True)
+            keep.append(ind[first])
+
+        keep = np.unique(np.concatenate(keep))
+
+        return x[keep], y[keep]
+
+    # sort by column and y: the first and last point of each column are the
+    # minimum and the maximum
+    order = np.lexsort((y, col))
+    col_sorted = col[order]
+
+    first = np.flatnonzero(np.concatenate(([True], col_sorted[1:] != col_sorted[:-1])))
+    last = np.append(first[1:] - 1, num_points - 1)
+
+    keep = np.unique(np.concatenate((order[first], order[last])))
+
+    return x[keep], y[keep]
+
+def lttb(x, y, num_out : int) :
+    """
+    Summary :
+        Largest-Triangle-Three-Buckets downsampling.
+
+    Arguments :
+        x, y - coordinates of the points, without NaN and sorted by x
+        num_out - number of points to keep (at least 3)
+
+    Returns :
+        x, y of the points kept.
+    """
+    num_points = len(x)
+
+    if num_out >= num_points or num_out < 3 :
+        return x, y
+
+    # the first and last points are always kept; the others are divided in
+    # num_out - 2 buckets
+    edges = np.linspace(1, num_points - 1, num_out - 1).astype(np.int64)
+
+    keep = np.empty(num_out, dtype = np.int64)
+    keep[0] = 0
+    keep[-1] = num_points - 1
+
+    a = 0
+    for ii in range(num_out - 2) :
+        start, stop = edges[ii], edges[ii + 1]
+
+        # average of the next bucket (the last point for the last bucket)
+        if ii < num_out - 3 :
+            n_start, n_stop = edges[ii + 1], edges[ii + 2]
+        else :
+            n_start, n_stop = num_points - 1, num_points
+
+        avg_x = np.mean(x[n_start:n_stop])
+        avg_y = np.mean(y[n_start:n_stop])
+
+        # twice the area of the triangles
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - \
+                      (x[a] - x[start:stop]) * (avg_y - y[a]))
+
+        a = start + int(np.argmax(area))
+        keep[ii + 1] = a
+
+    return x[keep], y[keep]
+
+def decimate(x, y, max_points : int = None, method : str = "minmax") :
+    """
+    Summary :
+        Downsample a series to at most max_points points.
+
+    Arguments :
+        x, y - coordinates of the points
+        max_points - maximum number of points. If None, the series is
+                     returned unchanged. With minmax, max_points / 2 columns
+                     are used: twice the figure width in pixels preserves the
+                     appearance of the plot.
+        method - "minmax" or "lttb"
+
+    Returns :
+        x, y of the points kept.
+    """
+    if max_points is None or len(x) <= max_points :
+        return x, y
+
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    # NaN are not drawn
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+
+    if method == "minmax" :
+        return minmax_decimate(x, y, max(max_points // 2, 1))
+    elif method == "lttb" :
+        return lttb(x, y, max_points)
+    else :
+        raise Exception(f"Unsupported decimation method: {method}")
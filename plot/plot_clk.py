@@ -11,10 +11,13 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 import matplotlib as mp
+
+import plot_data as pdl
+import decimation as dec
     
 
 
-def plot_clk( filename ) :
+def plot_clk( filename, gnss_list = None, max_points = None, method = "minmax" ) :
 
     fsize = 16
     mp.rc('xtick', labelsize=fsize) 
@@ -27,35 +30,32 @@ def plot_clk( filename ) :
     
     # load the csv file with the clock corrections
     fname = filename[:filename.rfind(".")]
-    df = pd.read_csv(filename)
+    data = pdl.plot_data(filename, "clk")
     
-    # determine which GNSS is present in the correction file
-    GNSS = np.unique(df["gnssID"].values)
+    # names of the files produced
+    outputs = []
     
     # make different plots for each gnss
-    for gnss in GNSS :
-        # filter by gnss
-        gnss_df = df[df["gnssID"] == gnss]
+    for gnss in data.gnss_list() :
+        if gnss_list is not None and gnss not in gnss_list :
+            continue
         
         # Create a new plot
         fig, ax = plt.subplots()
         fig.set_size_inches((12, 8))
-        # Determine the list of prn
-        sats = np.unique(gnss_df["PRN"].values)
         
         # Make a plot for each satellite
-        for sat in sats :
-            sat_df = gnss_df[gnss_df["PRN"] == sat]
+        for sat in data.satellites(gnss) :
+            sat_data = data.get(gnss, sat)
             
-            # build the time index
-            time = np.floor( sat_df["ToW"].values / 3600 )  * 3600 + sat_df["ToH"].values
+            # time index (duplicated epochs already removed)
+            time = sat_data["tow"]
             
             # build the clock correction
-            clk_corr = sat_df["delta_clock_c0"].values * sat_df["multiplier"].values
+            clk_corr = sat_data["delta_clock_c0"] * sat_data["multiplier"]
             
-            # remove duplicated values
-            time, ind = np.unique(time, return_index = True)
-            clk_corr = clk_corr[ind]
+            # downsample long series
+            time, clk_corr = dec.decimate(time, clk_corr, max_points, method)
             
             # finally plot the result
             ax.plot(time, clk_corr, ".", label = f"{gnss_ids[gnss]}{sat}")
@@ -70,7 +70,12 @@ def plot_clk( filename ) :
         plt.tight_layout()
      
         # Save as pdf
-        plt.savefig(f"{fname}_{gnss_spell[gnss]}.png", bbox_inches="tight")
+        outname = f"{fname}_{gnss_spell[gnss]}.png"
+        plt.savefig(outname, bbox_inches="tight")
+        plt.close(fig)
+        outputs.append(outname)
+        
+    return outputs
 
 if __name__ == "__main__":
     
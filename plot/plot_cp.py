@@ -12,7 +12,10 @@ import numpy as np
 
 import matplotlib as mp
 
-def plot_cp(filename, sig_off = 0) :
+import plot_data as pdl
+import decimation as dec
+
+def plot_cp(filename, sig_off = 0, gnss_list = None, max_points = None, method = "minmax") :
 
     fsize = 16
     mp.rc('xtick', labelsize=fsize) 
@@ -44,18 +47,18 @@ def plot_cp(filename, sig_off = 0) :
     
     # load the csv file with the code bias corrections
     fname = filename[:filename.rfind(".")]
-    df = pd.read_csv(filename)
+    data = pdl.plot_data(filename, "cp")
     
-    # determine which GNSS is present in the correction file
-    GNSS = np.unique(df["gnssID"].values)
+    # names of the files produced
+    outputs = []
     
     # make different plots for each gnss
-    for gnss in GNSS :
-        # filter by gnss
-        gnss_df = df[df["gnssID"] == gnss]
+    for gnss in data.gnss_list() :
+        if gnss_list is not None and gnss not in gnss_list :
+            continue
     
-        # determine the number of unique signals in the file
-        signals = np.unique(gnss_df["signal"].values)    
+        # determine the signals of the gnss
+        signals = data.signals(gnss)
     
         # Create a new plot with as many subplots as signals
         fig, ax = plt.subplots(nrows=len(signals), ncols = 1)
@@ -63,24 +66,19 @@ def plot_cp(filename, sig_off = 0) :
     
         # Loop on the different signals
         for ii, signal in enumerate(signals) :
-            signal_df = gnss_df[gnss_df["signal"] == signal]
-                    
-            # Determine the list of prn
-            sats = np.unique(signal_df["PRN"].values)
         
             # Make a plot for each satellite
-            for sat in sats :
-                sat_df = signal_df[signal_df["PRN"] == sat]
+            for sat in data.satellites(gnss, signal) :
+                sat_data = data.get(gnss, sat, signal)
             
-                # build the time index
-                time = np.floor( sat_df["ToW"].values / 3600 )  * 3600 + sat_df["ToH"].values
+                # time index (duplicated epochs already removed)
+                time = sat_data["tow"]
             
-                # build the code bias
-                phase_bias = sat_df["phase_bias"].values
+                # extract the bias
+                phase_bias = sat_data["phase_bias"]
             
-                # remove duplicated values
-                time, ind = np.unique(time, return_index = True)
-                phase_bias = phase_bias[ind]
+                # downsample long series
+                time, phase_bias = dec.decimate(time, phase_bias, max_points, method)
             
                 # finally plot the result
                 ax[ii].plot(time, phase_bias, ".--", label = f"{gnss_ids[gnss]}{sat}")
@@ -100,7 +98,12 @@ def plot_cp(filename, sig_off = 0) :
         # plt.tight_layout()
      
         # Save as pdf
-        plt.savefig(f"{fname}_{gnss_spell[gnss]}.png", bbox_inches="tight")
+        outname = f"{fname}_{gnss_spell[gnss]}.png"
+        plt.savefig(outname, bbox_inches="tight")
+        plt.close(fig)
+        outputs.append(outname)
+        
+    return outputs
 
 
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:02:51 2026
+
+@author: daniele
+
+Summary :
+    Columnar data layer shared by the plot scripts. A correction file is
+    loaded once, with only the columns needed and explicit dtypes, the
+    reference times are rebuilt from ToW, ToH and WN, and the rows are sorted
+    by (gnss, signal, PRN, time) with the duplicated epochs removed.
+    Per-satellite data are then obtained as slices through an offset index.
+
+    The prepared arrays are cached in a .npz file next to the CSV file and
+    reused as long as the CSV file is not modified.
+
+    The reference times are rebuilt with timefun: the repository root must be
+    in the module search path, e.g. PYTHONPATH=.. when running the plot
+    scripts from this folder.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+import timefun as tf
+
+# version of the cache format, increased when the content of the cache changes
+CACHE_VERSION = 1
+
+# columns common to all the correction files
+_common_columns = {"ToW" : np.int64, "WN" : np.int64, "ToH" : np.int64, \
+                   "gnssID" : np.int64, "PRN" : np.int64}
+
+# columns with the values of the different correction types
+value_columns = {"orb" : {"delta_radial" : np.float64, \
+                          "delta_in_track" : np.float64, \
+                          "delta_cross_track" : np.float64},
+                 "clk" : {"multiplier" : np.float64, \
+                          "delta_clock_c0" : np.float64, \
+                          "status" : np.int64},
+                 "cb" : {"signal" : np.int64, \
+                         "code_bias" : np.float64, \
+                         "av_flag" : np.float64},
+                 "cp" : {"signal" : np.int64, \
+                         "phase_bias" : np.float64, \
+                         "av_flag" : np.float64, \
+                         "phase_discontinuity_ind" : np.float64}}
+
+
+def get_correction_type(filename : str) :
+    """
+    Summary :
+        Determine the correction type from the name of a file produced by
+        process_cnav (e.g. xxx_has_clk.csv).
+
+    Returns :
+        orb, clk, cb or cp.
+    """
+    base = os.path.basename(filename)
+    base = base[:base.rfind(".")] if "." in base else base
+
+    ctype = base.split("_")[-1]
+
+    if ctype not in value_columns :
+        raise Exception(f"Unknown correction type: {filename}")
+
+    return ctype
+
+class plot_data :
+    """
+    Summary :
+        Correction data sorted by (gnss, signal, PRN, time) with an offset
+        index giving the rows of each satellite (and signal).
+    """
+
+    def __init__(self, filename : str, ctype : str = None, cache : bool = True) :
+        """
+        Summary :
+            Object constructor: load the data from the cache, if valid, or
+            from the CSV file.
+
+        Arguments :
+            filename - pathname of the CSV file with the corrections
+            ctype - correction type (orb, clk, cb, cp). If None, it is
+                    determined from the file name.
+            cache - if True, the prepared arrays are read from and written to
+                    <filename>.npz
+        """
+        self.filename = filename
+        self.ctype = get_correction_type(filename) if ctype is None else ctype
+
+        cache_name = filename + ".npz"
+
+        stat = os.stat(filename)
+        source = np.array([CACHE_VERSION, stat.st_size, stat.st_mtime_ns], dtype = np.int64)
+
+        self.arrays = None
+
+        if cache and os.path.exists(cache_name) :
+            try :
+                with np.load(cache_name) as npz :
+                    if np.array_equal(npz["_source"], source) :
+                        self.arrays = {key : npz[key] for key in npz.files if key != "_source"}
+            except Exception :
+                self.arrays = None
+
+        if self.arrays is None :
+            self.arrays = self.prepare(self.load_csv())
+
+            if cache :
+                try :
+                    np.savez(cache_name, _source = source, **self.arrays)
+                except OSError :
+                    pass
+
+        self.build_index()
+
+    def load_csv(self) :
+        """
+        Summary :
+            Load the columns needed from the CSV file.
+
+        Returns :
+            Dictionary of arrays.
+        """
+        dtypes = dict(_common_columns)
+        dtypes.update(value_columns[self.ctype])
+
+        df = pd.read_csv(self.filename, usecols = list(dtypes.keys()), dtype = dtypes)
+
+        return {key : df[key].values for key in dtypes}
+
+    def prepare(self, columns) :
+        """
+        Summary :
+            Rebuild the times, sort the rows and remove the duplicated epochs.
+
+        Arguments :
+            columns - dictionary of arrays as returned by load_csv
+
+        Returns :
+            Dictionary of arrays: time (seconds since the GPS epoch), gnssID,
+            signal (-1 for orbits and clocks), PRN and the value columns.
+        """
+        time = tf.ToHToTow(columns["ToW"], columns["ToH"], columns["WN"])
+
+        gnss = columns["gnssID"]
+        prn = columns["PRN"]
+        signal = columns["signal"] if "signal" in columns else np.full(len(time), -1)
+
+        # stable sort: among duplicated epochs, the first row of the file is
+        # kept, as done by np.unique in the original scripts
+        order = np.lexsort((time, prn, signal, gnss))
+
+        arrays = {"time" : time[order], "gnssID" : gnss[order], \
+                  "signal" : signal[order], "PRN" : prn[order]}
+
+        for key in value_columns[self.ctype] :
+            if key != "signal" :
+                arrays[key] = columns[key][order]
+
+        # remove the duplicated epochs of each satellite (and signal)
+        keep = np.ones(len(time), dtype = bool)
+        keep[1:] = (np.diff(arrays["time"]) != 0) | \
+                   (np.diff(arrays["PRN"]) != 0) | \
+                   (np.diff(arrays["signal"]) != 0) | \
+                   (np.diff(arrays["gnssID"]) != 0)
+
+        return {key : val[keep] for key, val in arrays.items()}
+
+    def build_index(self) :
+        """
+        Summary :
+            Build the offset index: for each (gnss, signal, PRN), the first
+            and last + 1 rows.
+        """
+        gnss = self.arrays["gnssID"]
+        signal = self.arrays["signal"]
+        prn = self.arrays["PRN"]
+
+        starts = np.flatnonzero(np.concatenate(([True], \
+                                (np.diff(gnss) != 0) | (np.diff(signal) != 0) | \
+                                (np.diff(prn) != 0)))) if len(gnss) > 0 else np.array([], dtype = int)
+        stops = np.append(starts[1:], len(gnss))
+
+        self.index = {(int(gnss[ii]), int(signal[ii]), int(prn[ii])) : (int(ii), int(jj)) \
+                      for ii, jj in zip(starts, stops)}
+
+        # first week of the data, used to express the times as seconds of
+        # that week
+        self.week0 = int(self.arrays["time"][0] // tf.WEEK_SECONDS) if len(gnss) > 0 else 0
+
+    def gnss_list(self) :
+        """
+        Summary :
+            Return the GNSS IDs present in the data.
+        """
+        return sorted(set(key[0] for key in self.index))
+
+    def signals(self, gnss : int) :
+        """
+        Summary :
+            Return the signals of a GNSS (-1 for orbits and clocks).
+        """
+        return sorted(set(key[1] for key in self.index if key[0] == gnss))
+
+    def satellites(self, gnss : int, signal : int = -1) :
+        """
+        Summary :
+            Return the PRNs of a GNSS (and signal).
+        """
+        return sorted(key[2] for key in self.index if key[0] == gnss and key[1] == signal)
+
+    def get(self, gnss : int, prn : int, signal : int = -1) :
+        """
+        Summary :
+            Return the data of a satellite (and signal).
+
+        Arguments :
+            gnss - GNSS ID
+            prn - satellite PRN
+            signal - signal, -1 for orbits and clocks
+
+        Returns :
+            Dictionary of arrays (views on the sorted data). "tow" provides
+            the times as seconds of the first week of the data, equal to the
+            time of week for data within a single week.
+        """
+        start, stop = self.index[(gnss, signal, prn)]
+
+        out = {key : val[start:stop] for key, val in self.arrays.items()}
+        out["tow"] = out["time"] - self.week0 * tf.WEEK_SECONDS
+
+        return out
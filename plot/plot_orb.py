@@ -12,8 +12,11 @@ import numpy as np
 
 import matplotlib as mp
 
+import plot_data as pdl
+import decimation as dec
 
-def plot_orb(filename) :
+
+def plot_orb(filename, gnss_list = None, max_points = None, method = "minmax") :
     
     fsize = 16
     mp.rc('xtick', labelsize=fsize) 
@@ -24,46 +27,38 @@ def plot_orb(filename) :
     gnss_ids = ["G", "", "E"]
     gnss_spell = ["GPS", "", "Galileo"]
     
-    # load the csv file with the clock corrections
+    # load the csv file with the orbit corrections
     fname = filename[:filename.rfind(".")]
-    df = pd.read_csv(filename)
+    data = pdl.plot_data(filename, "orb")
     
-    # determine which GNSS is present in the correction file
-    GNSS = np.unique(df["gnssID"].values)
+    # names of the files produced
+    outputs = []
     
     # make different plots for each gnss
-    for gnss in GNSS :
-        # filter by gnss
-        gnss_df = df[df["gnssID"] == gnss]
+    for gnss in data.gnss_list() :
+        if gnss_list is not None and gnss not in gnss_list :
+            continue
         
         # Create a new plot
         fig, ax = plt.subplots(nrows=3, ncols=1, sharex = True)
         fig.set_size_inches((14, 9))
-        # Determine the list of prn
-        sats = np.unique(gnss_df["PRN"].values)
         
         # Make a plot for each satellite
-        for sat in sats :
-            sat_df = gnss_df[gnss_df["PRN"] == sat]
+        for sat in data.satellites(gnss) :
+            sat_data = data.get(gnss, sat)
             
-            # build the time index
-            time = np.floor( sat_df["ToW"].values / 3600 )  * 3600 + sat_df["ToH"].values
+            # time index (duplicated epochs already removed)
+            time = sat_data["tow"]
             
             # extract the corrections
-            radial = sat_df["delta_radial"].values
-            in_track = sat_df["delta_in_track"].values
-            cross_track = sat_df["delta_cross_track"].values
-            
-            # remove duplicated values
-            time, ind = np.unique(time, return_index = True)
-            radial = radial[ind]
-            in_track = in_track[ind]
-            cross_track = cross_track[ind]
+            radial = sat_data["delta_radial"]
+            in_track = sat_data["delta_in_track"]
+            cross_track = sat_data["delta_cross_track"]
             
-            # finally plot the result
-            ax[0].plot(time, radial, ".", label = f"{gnss_ids[gnss]}{sat}")
-            ax[1].plot(time, in_track, ".", label = f"{gnss_ids[gnss]}{sat}")
-            ax[2].plot(time, cross_track, ".", label = f"{gnss_ids[gnss]}{sat}")
+            # finally plot the result (long series are downsampled)
+            ax[0].plot(*dec.decimate(time, radial, max_points, method), ".", label = f"{gnss_ids[gnss]}{sat}")
+            ax[1].plot(*dec.decimate(time, in_track, max_points, method), ".", label = f"{gnss_ids[gnss]}{sat}")
+            ax[2].plot(*dec.decimate(time, cross_track, max_points, method), ".", label = f"{gnss_ids[gnss]}{sat}")
            
         # Some cosmetics for the plots
         ax[2].tick_params(axis='x', labelrotation = 45)
@@ -84,7 +79,12 @@ def plot_orb(filename) :
         # plt.tight_layout()
      
         # Save as pdf
-        plt.savefig(f"{fname}_{gnss_spell[gnss]}.png", bbox_inches="tight")
+        outname = f"{fname}_{gnss_spell[gnss]}.png"
+        plt.savefig(outname, bbox_inches="tight")
+        plt.close(fig)
+        outputs.append(outname)
+        
+    return outputs
         
 if __name__ == "__main__":
     
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:48:53 2026
+
+@author: daniele
+
+Summary :
+    Batch rendering of the plots of the HAS corrections produced by
+    process_cnav (<basename>_orb.csv, _clk.csv, _cb.csv, _cp.csv).
+
+    Each figure (plot script, correction file, GNSS) is a job. Jobs are
+    rendered in a pool of processes with the non-interactive Agg backend.
+    A manifest (<basename>_plots.json) stores, for each figure, the hash of
+    the data plotted (the rows of the GNSS in the sorted correction file),
+    of the plot script and of its parameters: on the next run, only the
+    figures whose hash changed, or whose files are missing, are redrawn.
+
+    Usage (timefun is imported from the repository root) :
+        PYTHONPATH=.. python plot_runner.py basename [--processes n] [--max-points n]
+                                            [--method minmax|lttb] [--force]
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import importlib
+import multiprocessing
+import concurrent.futures
+
+# headless rendering: the backend must be selected before pyplot is imported
+# by the plot scripts
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+
+# folder of the plot scripts
+plot_dir = os.path.dirname(os.path.abspath(__file__))
+
+import plot_data as pdl
+
+# version of the rendering, increased to force the regeneration of all figures
+RENDER_VERSION = 1
+
+# plots of each correction type: (module, function, keyword arguments, whether
+# the function supports downsampling)
+plot_types = {"orb" : [("plot_orb", "plot_orb", {}, True)],
+              "clk" : [("plot_clk", "plot_clk", {}, True), \
+                       ("clk_adev", "clk_adev", {}, False)],
+              "cb" : [("plot_cb", "plot_cb", {}, True)],
+              "cp" : [("plot_cp", "plot_cp", {}, True)]}
+
+
+def source_hash(module : str) :
+    """
+    Summary :
+        Hash of the source of a plot script and of the modules it relies on,
+        so that the figures are redrawn when the code changes.
+    """
+    hasher = hashlib.sha1()
+
+    for name in (module, "plot_data", "decimation", "adev") :
+        with open(os.path.join(plot_dir, name + ".py"), "rb") as fin :
+            hasher.update(fin.read())
+
+    return hasher.hexdigest()
+
+def slice_hash(data, gnss : int, params) :
+    """
+    Summary :
+        Hash of the data of a GNSS and of the parameters of a figure.
+
+    Arguments :
+        data - plot_data object
+        gnss - GNSS ID
+        params - any representable object identifying the figure (script,
+                 source hash, keyword arguments)
+
+    Returns :
+        Hexadecimal digest.
+    """
+    # rows are sorted by GNSS first: the data of a GNSS are contiguous
+    ranges = [val for key, val in data.index.items() if key[0] == gnss]
+    start = min(rng[0] for rng in ranges)
+    stop = max(rng[1] for rng in ranges)
+
+    hasher = hashlib.sha1()
+    hasher.update(repr((RENDER_VERSION, params, data.week0)).encode())
+
+    for key in sorted(data.arrays) :
+        hasher.update(key.encode())
+        hasher.update(np.ascontiguousarray(data.arrays[key][start:stop]).tobytes())
+
+    return hasher.hexdigest()
+
+def render(module : str, func : str, filename : str, gnss : int, kwargs : dict) :
+    """
+    Summary :
+        Render a figure: executed in the worker processes.
+
+    Returns :
+        List of the files produced.
+    """
+    plot_func = getattr(importlib.import_module(module), func)
+
+    return plot_func(filename, gnss_list = [gnss], **kwargs)
+
+def run(basename : str, processes : int = None, max_points : int = None, \
+        method : str = "minmax", force : bool = False) :
+    """
+    Summary :
+        Render the figures of the correction files of basename whose data
+        changed since the last run.
+
+    Arguments :
+        basename - base name of the correction files (<basename>_orb.csv...)
+        processes - number of worker processes, the number of CPUs if None
+        max_points - maximum number of points drawn per series, None for no
+                     downsampling
+        method - downsampling method, "minmax" or "lttb"
+        force - if True, all the figures are redrawn
+
+    Returns :
+        Number of figures rendered and number of figures up to date.
+    """
+    manifest_name = basename + "_plots.json"
+
+    manifest = {}
+    if os.path.exists(manifest_name) and not force :
+        with open(manifest_name, "r") as fin :
+            manifest = json.load(fin)
+
+    jobs = []
+    num_skipped = 0
+
+    for ctype, plots in plot_types.items() :
+        filename = f"{basename}_{ctype}.csv"
+
+        if not os.path.exists(filename) :
+            continue
+
+        # loading the data here also builds the cache used by the workers
+        data = pdl.plot_data(filename, ctype)
+
+        for gnss in data.gnss_list() :
+            for module, func, kwargs, decimate in plots :
+                kwargs = dict(kwargs)
+                if decimate and max_points is not None :
+                    kwargs.update(max_points = max_points, method = method)
+
+                key = f"{func}|{os.path.basename(filename)}|{gnss}"
+                digest = slice_hash(data, gnss, (func, source_hash(module), sorted(kwargs.items())))
+
+                entry = manifest.get(key)
+                if entry is not None and entry["hash"] == digest and \
+                   all(os.path.exists(name) for name in entry["outputs"]) :
+                    num_skipped += 1
+                    continue
+
+                jobs.append((key, digest, (module, func, filename, gnss, kwargs)))
+
+    failed = []
+
+    if len(jobs) > 0 :
+        # the figures are rendered by fresh interpreters: the caller may have
+        # started threads (e.g. the numba threading layer used by the decoder)
+        # that do not survive a fork
+        ctx = multiprocessing.get_context("spawn")
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = processes, \
+                                                    mp_context = ctx) as pool :
+            futures = {pool.submit(render, *args) : (key, digest) \
+                       for key, digest, args in jobs}
+
+            for future in concurrent.futures.as_completed(futures) :
+                key, digest = futures[future]
+
+                try :
+                    manifest[key] = {"hash" : digest, "outputs" : future.result()}
+                except Exception as err :
+                    # the figure is redrawn on the next run
+                    manifest.pop(key, None)
+                    failed.append((key, err))
+
+    # the figures completed are recorded even if some jobs failed
+    with open(manifest_name, "w") as fout :
+        json.dump(manifest, fout, indent = 1, sort_keys = True)
+
+    if len(failed) > 0 :
+        raise Exception(f"{len(failed)} figures failed, first: {failed[0][0]}") from failed[0][1]
+
+    return len(jobs), num_skipped
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "Batch rendering of the HAS correction plots")
+    parser.add_argument("basename", help = "base name of the correction files")
+    parser.add_argument("--processes", type = int, default = None, \
+                        help = "number of worker processes")
+    parser.add_argument("--max-points", type = int, default = None, \
+                        help = "maximum number of points drawn per series")
+    parser.add_argument("--method", default = "minmax", choices = ["minmax", "lttb"], \
+                        help = "downsampling method")
+    parser.add_argument("--force", action = "store_true", \
+                        help = "redraw all the figures")
+    args = parser.parse_args()
+
+    num_rendered, num_skipped = run(args.basename, args.processes, args.max_points, \
+                                    args.method, args.force)
+
+    print(f"{num_rendered} figures rendered, {num_skipped} up to date")
@@ -8,8 +8,14 @@ Created on 31st May 2021
 """ 
 
 import numpy as np
+import pandas as pd
 import data_loading as dl
 import has_decoder as hd
+import has_profiler as hp
+import has_metrics as hmet
+import has_diagnostics as hdg
+import has_rtcm as hr
+import timefun as tf
 
 # Import the right library depending on the environment
 import sys
@@ -19,7 +25,53 @@ else :
     from tqdm import tqdm 
     
     
-def parse_data( filename, _rx, _type = None, _page_offset = 1) :
+def load_data( filename, _rx, _type = None, start = 0, stop_tow = None, offsets = False) :
+    """
+    Summary :
+        Load the pages from a receiver file.
+        
+    Arguments:
+        filename, _rx, _type - see parse_data
+        start - byte offset where the reading starts
+        stop_tow - if not None, the reading stops after this time of week
+        offsets - if True, the byte offset of each record is provided in the
+                  "Offset" column
+                  
+        Byte offsets are supported for SBF, Javad and Novatel files only: for
+        the other formats the whole file is loaded and the "Offset" column, if
+        requested, is set to -1.
+        
+    Returns :
+        Dataframe with the pages.
+    """
+    if _rx == "sep" :
+        
+        if _type == "bin" :
+            return dl.load_from_binary_Septentrio(filename, start, stop_tow, offsets)
+        
+        df = dl.load_from_parsed_Septentrio(filename, _type)
+    
+    elif _rx == "nov" :
+        return dl.load_from_Novatel(filename, start, stop_tow, offsets)
+        
+    elif _rx == "jav" :
+        return dl.load_from_Javad(filename, start, stop_tow, offsets)
+        
+    else :
+        raise Exception("Unsupported Receiver format")
+        
+    if stop_tow is not None :
+        df = df[df["TOW"].values <= stop_tow].copy()
+        
+    if offsets :
+        df["Offset"] = -1
+        
+    return df
+    
+def parse_data( filename, _rx, _type = None, _page_offset = 1, _erasures = False, \
+                _extra_pages = 0, _profile = None, _metrics = None, _index = False, \
+                _store = None, _rtcm = None, _cancel = None, _on_progress = None, \
+                _duplicates = False, _changes_only = False) :
     
     """
     Summary :
@@ -47,229 +99,827 @@ def parse_data( filename, _rx, _type = None, _page_offset = 1) :
                      it is starting from 0. The page offset allows one to account for this 
                      convention. It should be set to 1 unless data from the very initial test phase 
                      are used.                  
+                     
+        _erasures - if True, the pages that failed the CRC check are not discarded
+                    but used by an errors-and-erasures decoder. Messages can then
+                    be completed before all the required pages are correctly
+                    received.
+                    
+        _extra_pages - number of pages in excess of the message size used to check
+                       the consistency of the decoding. Corrupted pages are 
+                       detected and reported, and the message confirmed by the
+                       majority of the pages is retained. With a single extra 
+                       page, a corrupted page is detected but no majority can
+                       be found: the message is discarded.
+                       
+        _profile - if not None, pathname of a JSON file where the timing
+                   statistics of the different processing stages (loading,
+                   filtering, unpacking, decoding, interpretation, writing)
+                   are saved. A summary is also printed at the end.
+                   
+        _metrics - if not None, operational metrics (pages ingested and dropped,
+                   messages started, completed and evicted, decoding latency...)
+                   are exported in the Prometheus text format while the data
+                   are processed. If a string, the pathname of the file where
+                   the metrics are written; if an integer, the local port on
+                   which they are served over HTTP while the data are
+                   processed (the server is stopped at the end). A
+                   has_metrics.metrics_registry can also be provided: it is
+                   owned by the caller and not closed, so that a server
+                   started with its serve() method stays available after the
+                   processing and the metrics accumulate over several runs.
+                   
+        _index - if True, an index mapping each decoded message to the byte
+                 offset of its first page is written to <file>_has_idx.csv.
+                 The index is used by replay() to reprocess a time window 
+                 without parsing the whole file.
+                 
+        _store - optional has_correction_store.has_correction_store filled
+                 with the corrections decoded, in addition to the CSV files.
+                 The latest corrections can then be queried from memory.
+                 
+        _rtcm - if not None, the corrections are also encoded as RTCM 3 SSR
+                messages and streamed to this output: pathname of a binary
+                file or "tcp://host:port". The SSR messages are encoded for
+                each repetition of a HAS message, which is then interpreted
+                again (the interpretation cache is not used); the rows
+                written to the CSV files are the same.
+                
+        _cancel - optional threading.Event (or any object with an is_set
+                  method): when it is set, the decoding stops at the next
+                  epoch. The corrections decoded so far are written.
+                  
+        _on_progress - optional function called as _on_progress(done, total)
+                       after each epoch, with the number of epochs processed
+                       and the total number of epochs.
+                       
+        _duplicates - HAS repeats identical messages several times. The
+                      interpretation of a repeated message is reused and, by
+                      default, its corrections are not written again while
+                      they are valid (same reference time, received within
+                      their validity). If True, the corrections are written
+                      for each repetition (full output, e.g. to analyse the
+                      broadcast).
+                      
+        _changes_only - if True, a correction is written only if it differs
+                        from the last one written for the same satellite
+                        (and signal for the biases): same ToH, IODs, validity
+                        and values, and still valid. Repeated corrections,
+                        also from messages with different IDs, are not
+                        written. It cannot be used with _duplicates.
     """    
     print("Process started")
     
-    if _rx == "sep" :
-        
-        if _type == "bin" :
-            df = dl.load_from_binary_Septentrio(filename)
-        else :
-            df = dl.load_from_parsed_Septentrio(filename, _type)
+    if _profile is not None :
+        hp.enable()
     
-    elif _rx == "nov" :
-        df = dl.load_from_Novatel(filename)
-        
-    elif _rx == "jav" :
-        df = dl.load_from_Javad(filename)
-        
-    else :
-        raise Exception("Unsupported Receiver format")
+    df = load_data(filename, _rx, _type, offsets = _index)
             
     print("Data loaded ...\n")
+    
+    decode_data(df, filename.split('__')[0], _page_offset, _erasures, _extra_pages, \
+                _metrics, _index, _store = _store, _rtcm = _rtcm, _cancel = _cancel, \
+                _on_progress = _on_progress, _duplicates = _duplicates, \
+                _changes_only = _changes_only)
+    
+    if _profile is not None :
+        hp.dump(_profile)
+        hp.print_summary()
+        hp.disable()
+    
+def decode_data( df, basename, _page_offset = 1, _erasures = False, _extra_pages = 0, \
+                 _metrics = None, _index = False, _time_range = None, _store = None, \
+                 _on_message = None, _rtcm = None, _cancel = None, _on_progress = None, \
+                 _duplicates = False, _changes_only = False, _before_message = None) :
+    """
+    Summary :
+        Decode the HAS pages loaded from a receiver file and write the 
+        corrections to file.
+        
+    Arguments:
+        df - dataframe with the pages, as provided by load_data
+        basename - base of the path name of the output files
+        _page_offset, _erasures, _extra_pages, _metrics, _index, _store, _rtcm,
+        _cancel, _on_progress, _duplicates, _changes_only - see parse_data
+        _time_range - if not None, (start, end) times in seconds since the
+                      GPS epoch (WN * 604800 + ToW): the messages are decoded
+                      and interpreted as usual, but only the corrections in
+                      the range are written to file. The rows suppressed
+                      (repetitions, unchanged corrections) also depend on the
+                      messages received before the range.
+        _on_message - optional function called as _on_message(tow, week, msg_id)
+                      after each message is interpreted (e.g. to notify the
+                      clients of has_server), including the messages
+                      interpreted later, when their mask is received
+        _before_message - optional function called as _before_message(tow, week)
+                          when a message is decoded, before it is interpreted
+                          and its corrections are stored (e.g. to release the
+                          messages at the real-time rate)
+    """
+    if _duplicates and _changes_only :
+        raise Exception("_duplicates and _changes_only cannot be used together")
         
-    # Now compute the HAS page type (bits from 14 to 38)
-    HAS_Header = ( (df["word 1"].values & 0x3FFFF) << 6 ) + \
-               (df["word 2"].values >> 26)
+    with hp.stage("filter", records = len(df)) :
+        # Now compute the HAS page type (bits from 14 to 38)
+        HAS_Header = ( (df["word 1"].values & 0x3FFFF) << 6 ) + \
+                   (df["word 2"].values >> 26)
     
-    # Find non-dummy elements
-    non_dummy = np.argwhere((HAS_Header != 0xAF3BC3) & (df["CRCPassed"].values == 1)).flatten()
+        # Find non-dummy elements
+        if _erasures :
+            non_dummy = np.argwhere(HAS_Header != 0xAF3BC3).flatten()
+        else :
+            non_dummy = np.argwhere((HAS_Header != 0xAF3BC3) & (df["CRCPassed"].values == 1)).flatten()
     
-    # Select only non-dummy
-    df_valid = df.iloc[non_dummy].copy()
+        # Select only non-dummy
+        df_valid = df.iloc[non_dummy].copy()
     
     
     
-    HAS_Header = HAS_Header[non_dummy]
+        # number of pages discarded
+        num_dummy = int(np.sum(HAS_Header == 0xAF3BC3))
+        num_crc_failed = len(HAS_Header) - num_dummy - len(non_dummy)
+        
+        HAS_Header = HAS_Header[non_dummy]
     
-    # Extract valid information from the header
-    df_valid["HAS_status"] = (HAS_Header >> 22) & 0x3
-    df_valid["Message_Type"] = ( HAS_Header >> 18 ) & 0x3 
-    df_valid["Message_ID"] = ( HAS_Header >> 13 ) & 0x1F
-    df_valid["Message_Size"] = (( HAS_Header >> 8 ) & 0x1F) + 1
-    df_valid["Page_ID"] = (HAS_Header) & 0xFF
+        # Extract valid information from the header
+        df_valid["HAS_status"] = (HAS_Header >> 22) & 0x3
+        df_valid["Message_Type"] = ( HAS_Header >> 18 ) & 0x3 
+        df_valid["Message_ID"] = ( HAS_Header >> 13 ) & 0x1F
+        df_valid["Message_Size"] = (( HAS_Header >> 8 ) & 0x1F) + 1
+        df_valid["Page_ID"] = (HAS_Header) & 0xFF
     
-    # Allocate the decoder
-    decoder = hd.has_decoder(_page_offset)
+    crc_passed = (df_valid["CRCPassed"].values == 1)
+    
+    # Operational metrics
+    metrics = None
+    if _metrics is not None :
+        if isinstance(_metrics, hmet.metrics_registry) :
+            # registry owned by the caller
+            metrics = _metrics
+        elif isinstance(_metrics, int) :
+            metrics = hmet.metrics_registry()
+            metrics.serve(_metrics)
+        else :
+            metrics = hmet.metrics_registry(_metrics)
+            
+        dropped = metrics.counter("has_pages_dropped_total", \
+                                  "Pages discarded before decoding, by reason")
+        dropped.inc(num_dummy, reason = "dummy")
+        dropped.inc(num_crc_failed, reason = "crc")
+        
+        errors = metrics.counter("has_interpretation_errors_total", \
+                                 "Message blocks whose interpretation failed, by block type")
+        interpreted = metrics.counter("has_corrections_total", \
+                                      "Corrections interpreted, by type")
     
-    valid_tows = np.unique(df_valid['TOW'])
+    # Allocate the decoder
+    decoder = hd.has_decoder(_page_offset, _erasures, _extra_pages, metrics, _store)
     
-    masks = None
+    # epochs in order of absolute time: the times of week restart at the
+    # beginning of each week
+    epoch_times = df_valid['WNc [w]'].values.astype(np.int64) * tf.WEEK_SECONDS + \
+                  df_valid['TOW'].values
+    valid_times = np.unique(epoch_times)
     
     # different files where to save the different corrections
-    orbit_filename = filename.split('__')[0] + '_has_orb.csv'
-    clock_filename = filename.split('__')[0] + '_has_clk.csv'
-    cbias_filename = filename.split('__')[0] + '_has_cb.csv'
-    pbias_filename = filename.split('__')[0] + '_has_cp.csv'
+    out_files = {"orbit" : open(basename + '_has_orb.csv', 'w'),
+                 "clock" : open(basename + '_has_clk.csv', 'w'),
+                 "cbias" : open(basename + '_has_cb.csv', 'w'),
+                 "pbias" : open(basename + '_has_cp.csv', 'w')}
     
-    orbit_file = open(orbit_filename, 'w')
-    clock_file = open(clock_filename, 'w')
-    cbias_file = open(cbias_filename, 'w')
-    pbias_file = open(pbias_filename, 'w')
+    # True if the header was already written in the file
+    out_headers = {key : False for key in out_files}
     
-    orbit_header = False
-    clock_header = False
-    cbias_header = False
-    pbias_header = False
+    # Change-only output: values and reference time of the last row written
+    # for each output, satellite and signal, and number of rows checked and
+    # written
+    last_rows = {}
+    change_stats = {"rows" : 0, "written" : 0, "suppressed_bytes" : 0}
     
-    # Masks have to be propagated between different loops
-    masks = None
+    # Blocks of a MT1 message, in order of transmission: flag in the MT1 header,
+    # block name, interpretation function and output file
+    mt1_blocks = [("Orbit Corr", "orbit", decoder.interpret_mt1_orbit_corrections, "orbit"),
+                  ("Clock Full-set", "full_clock", decoder.interpret_mt1_full_clock_corrections, "clock"),
+                  ("Clock Subset", "subset_clock", decoder.interpret_mt1_subset_clock_corrections, "clock"),
+                  ("Code Bias", "code_bias", decoder.interpret_mt1_code_biases, "cbias"),
+                  ("Phase Bias", "phase_bias", decoder.interpret_mt1_phase_biases, "pbias")]
     
-    for hh in tqdm(range(len(valid_tows))) :
+    # Sidecar log of the interpretation failures
+    diagnostics = hdg.diagnostics_log(basename + '_has_err.csv')
+    
+    # RTCM SSR output, with the correction type of each output file
+    rtcm = None
+    if _rtcm is not None :
+        rtcm = hr.rtcm_writer(_rtcm)
         
-        tow = valid_tows[hh]
+    rtcm_types = {"orbit" : "orbit", "clock" : "clock", "cbias" : "code_bias", \
+                  "pbias" : "phase_bias"}
+    
+    # The interpretation of the repeated messages is reused, unless the
+    # corrections are also streamed as RTCM: the SSR messages are then encoded
+    # for each repetition
+    use_cache = rtcm is None
+    
+    # Rows written for each message (digest of its bytes): reference time of
+    # the copy written and digest of the rows of each output file. The state
+    # is kept apart from the interpretation cache, so that the rows written do
+    # not depend on the cache size or on the RTCM output, and a repetition is
+    # suppressed only while its corrections are valid: the rows written in a
+    # time window then depend only on the messages received since the
+    # reference time of its corrections (see replay).
+    written_blocks = {}
+    
+    # absolute time of the last removal of the expired entries
+    pruned_at = [0]
+    
+    # Replay index: for each decoded message, offset of the epoch of its first
+    # page and times of week of the last messages providing its mask and the
+    # orbit corrections (with the GNSS IODs) of its IOD set, which are needed
+    # to seed the decoder state, and absolute reference time (seconds since
+    # the GPS epoch) of its corrections. The times of week preceding ToW
+    # refer to the week before WN when they are larger than ToW.
+    if _index :
+        index_file = open(basename + '_has_idx.csv', 'w')
+        index_file.write("ToW,WN,StartToW,Offset,MaskToW,OrbitToW,RefTime\n")
         
-        tow_ind = np.argwhere(df_valid['TOW'].values == tow).flatten()
+        # first offset of each epoch
+        tow_offsets = df.groupby(["WNc [w]", "TOW"])["Offset"].min()
         
+        # ToW of the last message with a given Mask ID and IOD Set ID
+        mask_tows = {}
+        orbit_tows = {}
         
-        page_block = []
-        for ii in tow_ind :
-            page = np.array([df_valid["word %d" % kk].iloc[ii] for kk in range(1, 17)], dtype=np.uint32)
-            page_block.append(page)
+    def process_message(tow, week, msg_id, msg_size, msg) :
+        """
+        Summary :
+            Interpret a decoded MT1 message and write the corrections to file.
             
-        msg_type = df_valid['Message_Type'].iloc[tow_ind[0]]
-        msg_id = df_valid['Message_ID'].iloc[tow_ind[0]]
-        msg_size = df_valid['Message_Size'].iloc[tow_ind[0]]
+        Returns :
+            False if the mask of the message is not available and the message
+            has to be interpreted later, True otherwise.
+        """
+        header = decoder.interpret_mt1_header(msg.flatten()[0:4])
         
-        # also get the week number
-        week = df_valid['WNc [w]'].iloc[tow_ind[0]]
+        # absolute reference time of the corrections of the message
+        t_ref = int(tf.ToHToTow(int(tow), int(header["TOH"]), int(week)))
         
-        msg = decoder.update(tow, page_block, msg_type, msg_id, msg_size)
+        # repeated message: the interpretation of the first copy is reused if
+        # the mask and the GNSS IODs it refers to did not change
+        key = decoder.message_cache.key(msg)
+        masks_in = None
+        iods_in = None
         
+        # the clock and bias corrections use the GNSS IODs of the orbit
+        # corrections previously received with the same IOD Set ID
+        needs_iods = header["Orbit Corr"] != 1 and \
+                     any(header[flag] == 1 for flag, block, _, _ in mt1_blocks[1:])
         
-        if msg is not None :
-            header = decoder.interpret_mt1_header(msg.flatten()[0:4])
+        if use_cache :
+            if header["Mask"] != 1 :
+                masks_in = decoder.get_mask(header["Mask ID"])
+                
+                if masks_in is None :
+                    return False
+                
+            if needs_iods :
+                iods_in = decoder.iod_cache.get(header["IOD Set ID"])
+                
+            entry = decoder.message_cache.get(key, masks_in, iods_in)
             
-            info = {'ToW' : int(tow),
-                    'WN' : week,
-                    'ToH' : header['TOH'],
-                    'IOD' : header['IOD Set ID']}
-            # Check on timing information
-            # if (info['ToW'] % 3600) < info['ToH'] :
-            #     print('Invalid ToH')
-            #     continue
+            if entry is not None :
+                reuse_message(tow, week, header, entry, key, t_ref)
+                return True
             
-            body = msg.flatten()[4:]
-            byte_offset = 0 
-            bit_offset = 0
+        info = {'ToW' : int(tow),
+                'WN' : week,
+                'ToH' : header['TOH'],
+                'IOD' : header['IOD Set ID']}
+        # Check on timing information
+        # if (info['ToW'] % 3600) < info['ToH'] :
+        #     print('Invalid ToH')
+        #     continue
+        
+        body = msg.flatten()[4:]
+        byte_offset = 0 
+        bit_offset = 0
+        
+        if header["Mask"] == 1 :
+            try :
+                masks, byte_offset, bit_offset = decoder.interpret_mt1_mask(body)
+            except Exception as exc :
+                diagnostics.record(tow, week, msg_id, msg_size, "mask", \
+                                   byte_offset, bit_offset, exc)
+                if metrics is not None :
+                    errors.inc(block = "mask")
+                return True
+            
+            decoder.store_mask(header["Mask ID"], masks)
+            
+            # interpret the messages waiting for this mask
+            process_pending(header["Mask ID"], tow, week)
+            
+        else :
+            masks = decoder.get_mask(header["Mask ID"])
             
-            if header["Mask"] == 1 :
-                try :
-                    masks, byte_offset, bit_offset = decoder.interpret_mt1_mask(body)
-                except :
-                    continue
-                
             if masks is None :
+                return False
+            
+        # GNSS IODs of the orbit corrections with the same IOD Set ID
+        decoder.select_iods(header["IOD Set ID"])
+        
+        # rows of the message without ToW and WN, kept for the repetitions. A
+        # message whose interpretation failed, or using GNSS IODs not yet
+        # received, is not cached.
+        cacheable = use_cache and not (needs_iods and iods_in is None)
+        
+        entry = {"masks_in" : masks_in, \
+                 "iods_in" : iods_in, \
+                 "masks" : masks if header["Mask"] == 1 else None, \
+                 "iods" : None, \
+                 "headers" : {}, \
+                 "rows" : [], \
+                 "validity" : {}}
+        
+        for flag, block, interpret, out_key in mt1_blocks :
+            if header[flag] != 1 :
                 continue
             
-            if header['Orbit Corr'] == 1 :
-                try :
-                    cors, byte_offset, bit_offset = decoder.interpret_mt1_orbit_corrections(body,\
-                                                    byte_offset, bit_offset, masks, info)
-                except :
-                    continue
-                
-                if len(cors) == 0 :
-                    continue
-                
-                # print the corrections to file
-                if not orbit_header :
-                    orbit_file.write(cors[0].get_header() + '\n')
-                    orbit_header = True
-                    
-                for cor in cors :
-                    cor_str = cor.__str__() + '\n'
-                    orbit_file.write(cor_str)
-                
-            if header['Clock Full-set'] == 1 :
-                try :
-                    cors, byte_offset, bit_offset = decoder.interpret_mt1_full_clock_corrections(body,\
-                                                    byte_offset, bit_offset, masks, info)
-                except :
-                    continue
-                
-                if len(cors) == 0 :
-                    continue
-                
-                # print the corrections to file
-                if not clock_header :
-                    clock_file.write(cors[0].get_header() + '\n')
-                    clock_header = True
-                    
-                for cor in cors :
-                    cor_str = cor.__str__() + '\n'
-                    clock_file.write(cor_str)
-                
-            if header['Clock Subset'] == 1 :
-                # This block needs an "external" mask 
-                if masks is not None :
-                    try :
-                        cors, byte_offset, bit_offset = decoder.interpret_mt1_subset_clock_corrections(body,\
-                                                    byte_offset, bit_offset, masks, info)
-                    except :
-                        continue
-                    
-                    if len(cors) == 0 :
-                        continue
+            try :
+                cors, byte_offset, bit_offset = interpret(body, byte_offset, \
+                                                          bit_offset, masks, info)
+            except Exception as exc :
+                # the position of the following blocks is unknown: the
+                # rest of the message is skipped
+                diagnostics.record(tow, week, msg_id, msg_size, block, \
+                                   byte_offset, bit_offset, exc)
+                if metrics is not None :
+                    errors.inc(block = block)
+                cacheable = False
+                break
+            
+            if block == "orbit" :
+                decoder.store_iods(header["IOD Set ID"])
+                entry["iods"] = decoder.gnss_IODs
+            
+            if len(cors) == 0 :
+                break
+            
+            if metrics is not None :
+                interpreted.inc(len(cors), type = block)
+            
+            # rows without ToW and WN, the biases of the signals of a
+            # satellite are on several rows
+            rows = [line.split(',', 2)[2] for cor in cors if not cor.is_empty() \
+                    for line in cor.__str__().split('\n')]
+            
+            # longest validity of the corrections of the block
+            validity = max(cor.validity for cor in cors)
+            
+            if cacheable :
+                entry["headers"][out_key] = cors[0].get_header()
+                entry["rows"].extend((out_key, row) for row in rows)
+                entry["validity"][out_key] = validity
+            
+            # only the corrections in the requested range are streamed
+            if rtcm is not None and in_range(tow, week) :
+                with hp.stage("rtcm", corrections = len(cors)) :
+                    rtcm.write(rtcm_types[out_key], cors)
+            
+            # print the corrections to file
+            with hp.stage("write", corrections = len(cors)) :
+                write_block(key, t_ref, validity, out_key, cors[0].get_header(), \
+                            tow, week, rows)
                     
-                    # print the corrections to file
-                    if not clock_header :
-                        clock_file.write(cors[0].get_header() + '\n')
-                        clock_header = True
-    
-                    for cor in cors :
-                        cor_str = cor.__str__() + '\n'
-                        clock_file.write(cor_str) 
-    
-            if header['Code Bias'] == 1 :
-                try :
-                    cors, byte_offset, bit_offset = decoder.interpret_mt1_code_biases(body,\
-                                                byte_offset, bit_offset, masks, info)
-                except :
-                    continue
-                
-                if len(cors) == 0 :
-                    continue
+        if cacheable :
+            decoder.message_cache.put(key, entry)
+            
+        return True
+    
+    def process_pending(mask_id, tow, week) :
+        """
+        Summary :
+            Interpret the messages waiting for a mask just received. The
+            messages recovered are notified as the ones interpreted on
+            reception.
+        """
+        for args in decoder.pending.pop(mask_id, int(week) * tf.WEEK_SECONDS + tow) :
+            if process_message(*args) and _on_message is not None :
+                _on_message(int(args[0]), int(args[1]), int(args[2]))
+    
+    def in_range(tow, week) :
+        """
+        Summary :
+            True if the corrections received at tow are written to file.
+        """
+        return _time_range is None or \
+               _time_range[0] <= int(week) * tf.WEEK_SECONDS + tow <= _time_range[1]
+    
+    def reuse_message(tow, week, header, entry, key, t_ref) :
+        """
+        Summary :
+            Apply the interpretation of a repeated message: the mask and the
+            GNSS IODs it provides are stored again and its rows are written
+            as for the first copy (see write_block).
+        """
+        if entry["masks"] is not None :
+            decoder.store_mask(header["Mask ID"], entry["masks"])
+            
+            # interpret the messages waiting for this mask
+            process_pending(header["Mask ID"], tow, week)
                 
-                # print the corrections to file
-                if not cbias_header :
-                    cbias_file.write(cors[0].get_header() + '\n')
-                    cbias_header = True
-                    
-                for cor in cors :
-                    if cor.is_empty() :
-                        continue
-                    
-                    cor_str = cor.__str__() + '\n'
-                    cbias_file.write(cor_str)
+        decoder.select_iods(header["IOD Set ID"])
+        
+        if entry["iods"] is not None :
+            decoder.gnss_IODs = entry["iods"]
+            decoder.store_iods(header["IOD Set ID"])
+            
+        with hp.stage("write", corrections = len(entry["rows"])) :
+            for out_key, out_header in entry["headers"].items() :
+                write_block(key, t_ref, entry["validity"][out_key], out_key, out_header, \
+                            tow, week, [row for block, row in entry["rows"] if block == out_key])
+    
+    def write_block(key, t_ref, validity, out_key, out_header, tow, week, rows) :
+        """
+        Summary :
+            Write the rows of a block of a message, unless requested
+            (_duplicates) or the same rows were already written for a copy of
+            the message with the same reference time whose corrections are
+            still valid. The state is updated also outside the range of ToW
+            written.
+            
+        Arguments :
+            key - key of the message
+            t_ref - absolute reference time of the corrections
+            validity - longest validity of the corrections of the block
+            out_key, out_header - output file and its header
+            tow, week - reception time of the message
+            rows - rows of the block without ToW and WN
+        """
+        now = int(week) * tf.WEEK_SECONDS + int(tow)
+        
+        if not _duplicates :
+            digest = hash(tuple(rows))
+            written = written_blocks.get(key)
+            
+            if written is not None and written[0] == t_ref and \
+               written[1].get(out_key) == digest and \
+               (validity < 0 or now - t_ref <= validity) :
+                if in_range(tow, week) :
+                    decoder.message_cache.suppressed(len(rows), \
+                                                     sum(len(row) + len(f"{int(tow)},{week},\n") \
+                                                         for row in rows))
+                return
+            
+            if written is None or written[0] != t_ref :
+                written = (t_ref, {})
+                written_blocks[key] = written
                 
-            if header['Phase Bias'] == 1 :
-                try:
-                    cors, byte_offset, bit_offset = decoder.interpret_mt1_phase_biases(body,\
-                                                byte_offset, bit_offset, masks, info)
-                except:
-                    continue
+            written[1][out_key] = digest
+            
+            # a copy received one hour after the reference time refers to
+            # the following hour: older entries are no longer needed
+            if now - pruned_at[0] >= 3600 :
+                for old_key in [old_key for old_key, val in written_blocks.items() \
+                                if val[0] <= now - 3600] :
+                    del written_blocks[old_key]
+                pruned_at[0] = now
+            
+        write_rows(out_key, out_header, tow, week, t_ref, rows)
+    
+    def write_rows(out_key, out_header, tow, week, t_ref, rows) :
+        """
+        Summary :
+            Write rows of corrections (without ToW and WN) to an output file,
+            if tow is in the requested range. In the change-only mode, a row
+            is written only if it differs from the last one written for the
+            same satellite (and signal) or if the last one is no longer valid.
+        """
+        if not _changes_only :
+            if not in_range(tow, week) :
+                return
+            
+            out_file = get_output(out_key, out_header)
+            
+            prefix = f"{int(tow)},{week},"
+            for row in rows :
+                out_file.write(prefix + row + '\n')
+            return
+        
+        now = int(week) * tf.WEEK_SECONDS + int(tow)
+        
+        # the biases are identified also by the signal
+        num_key_fields = 7 if out_key in ("cbias", "pbias") else 6
+        
+        prefix = f"{int(tow)},{week},"
+        
+        for row in rows :
+            # row: ToH, IOD, gnssIOD, validity, gnssID, PRN, [signal,] values
+            fields = row.split(',')
+            state_key = (out_key, *fields[4:num_key_fields])
+            
+            # the values are compared as numbers: the full-set and subset
+            # clock corrections format the multiplier differently. A value
+            # not available (NaN) is replaced by None, equal to itself.
+            values = tuple(None if val != val else val for val in map(float, fields))
+            
+            # the rows outside the range only update the state
+            in_window = in_range(tow, week)
+            if in_window :
+                change_stats["rows"] += 1
+            
+            # values[3]: validity of the correction
+            if last_rows.get(state_key) == (values, t_ref) and \
+               (values[3] < 0 or now - t_ref <= values[3]) :
+                if in_window :
+                    change_stats["suppressed_bytes"] += len(prefix) + len(row) + 1
+                continue
+            
+            last_rows[state_key] = (values, t_ref)
+            
+            if in_window :
+                change_stats["written"] += 1
+                get_output(out_key, out_header).write(prefix + row + '\n')
+    
+    def get_output(out_key, out_header) :
+        """
+        Summary :
+            Output file of a type of corrections, with its header written.
+        """
+        out_file = out_files[out_key]
+        
+        if not out_headers[out_key] :
+            out_file.write(out_header + '\n')
+            out_headers[out_key] = True
+            
+        return out_file
+    
+    # number of epochs processed
+    num_done = 0
+    
+    for hh in tqdm(range(len(valid_times))) :
+        
+        if _cancel is not None and _cancel.is_set() :
+            print("Processing cancelled")
+            break
+        
+        if _on_progress is not None and hh > 0 :
+            _on_progress(hh, len(valid_times))
+            
+        num_done = hh + 1
+        
+        tow_ind = np.argwhere(epoch_times == valid_times[hh]).flatten()
+        tow = df_valid['TOW'].values[tow_ind[0]]
+        
+        
+        with hp.stage("unpack", pages = len(tow_ind)) :
+            page_block = []
+            for ii in tow_ind :
+                page = np.array([df_valid["word %d" % kk].iloc[ii] for kk in range(1, 17)], dtype=np.uint32)
+                page_block.append(page)
+            
+        crc_flags = crc_passed[tow_ind]
+        
+        # the message header is taken from a page that passed the CRC check 
+        # (if any)
+        ref_ind = tow_ind[np.argmax(crc_flags)]
+            
+        msg_type = df_valid['Message_Type'].iloc[ref_ind]
+        msg_id = df_valid['Message_ID'].iloc[ref_ind]
+        msg_size = df_valid['Message_Size'].iloc[ref_ind]
+        
+        # also get the week number
+        week = df_valid['WNc [w]'].iloc[ref_ind]
+        
+        msg = decoder.update(tow, page_block, msg_type, msg_id, msg_size, crc_flags)
+        
+        if metrics is not None :
+            metrics.export()
+            
+        if msg is None :
+            continue
+        
+        if _before_message is not None :
+            _before_message(int(tow), int(week))
+            
+        if _index :
+            header = decoder.interpret_mt1_header(msg.flatten()[0:4])
+            start_tow = decoder.last_message.start_tow
+            
+            if header["Mask"] == 1 :
+                mask_tows[header["Mask ID"]] = int(tow)
+            if header["Orbit Corr"] == 1 :
+                orbit_tows[header["IOD Set ID"]] = int(tow)
                 
-                if len(cors) == 0 :
-                    continue
+            # the first page can be received in the previous week
+            start_week = week - 1 if start_tow > tow else week
                 
-                # print the corrections to file
-                if not pbias_header :
-                    pbias_file.write(cors[0].get_header() + '\n')
-                    pbias_header = True
-                    
-                for cor in cors :
-                    if cor.is_empty() :
-                        continue
-                    
-                    cor_str = cor.__str__() + '\n'
-                    pbias_file.write(cor_str)
+            index_file.write(f"{int(tow)},{week},{int(start_tow)}," + \
+                             f"{tow_offsets[(start_week, start_tow)]}," + \
+                             f"{mask_tows.get(header['Mask ID'], -1)}," + \
+                             f"{orbit_tows.get(header['IOD Set ID'], -1)}," + \
+                             f"{int(tf.ToHToTow(int(tow), int(header['TOH']), int(week)))}\n")
+        
+        # remove the messages waiting for a mask that are no longer valid
+        decoder.pending.expire(int(week) * tf.WEEK_SECONDS + tow)
+        
+        if not process_message(tow, week, msg_id, msg_size, msg) :
+            mask_id = decoder.interpret_mt1_header(msg.flatten()[0:4])["Mask ID"]
+            validity = decoder.get_validity(msg.flatten()[4:])
+            
+            decoder.pending.push(mask_id, int(week) * tf.WEEK_SECONDS + tow, validity, \
+                                 (tow, week, msg_id, msg_size, msg))
+            
+        elif _on_message is not None :
+            _on_message(int(tow), int(week), int(msg_id))
+            
+        if rtcm is not None :
+            rtcm.end_message()
+            
+    if _on_progress is not None :
+        _on_progress(num_done, len(valid_times))
                     
-    orbit_file.close()
-    clock_file.close()
-    cbias_file.close()
-    pbias_file.close()
+    for out_file in out_files.values() :
+        out_file.close()
+        
+    diagnostics.close()
+    diagnostics.print_summary()
+    
+    if rtcm is not None :
+        rtcm.close()
+        print(f"RTCM SSR frames written: {rtcm.num_frames} ({rtcm.num_bytes} bytes)")
+    
+    if _index :
+        index_file.close()
+    
+    if metrics is not None :
+        if metrics is _metrics :
+            metrics.export(force = True)
+        else :
+            metrics.close()
+        
+    stats = decoder.pending.stats
+    if stats["deferred"] > 0 :
+        print(f"Messages deferred waiting for their mask: {stats['deferred']}, " + \
+              f"recovered: {stats['recovered']}, expired: {stats['expired']}, " + \
+              f"dropped (queue full): {stats['overflow']}, " + \
+              f"maximum queue depth: {stats['max_depth']}")
+        
+    if _changes_only and change_stats["rows"] > 0 :
+        print(f"Change-only output: {change_stats['written']} of {change_stats['rows']} " + \
+              f"rows written ({change_stats['suppressed_bytes'] / 2**20:.2f} MB saved)")
+        
+    stats = decoder.message_cache.stats
+    if stats["lookups"] > 0 :
+        print(f"Repeated messages reused: {stats['hits']} of {stats['lookups']} " + \
+              f"({100 * stats['hits'] / stats['lookups']:.1f} %), " + \
+              f"interpreted again (mask or IODs changed): {stats['stale']}")
+        print(f"Duplicate rows suppressed: {stats['suppressed_rows']} " + \
+              f"({stats['suppressed_bytes'] / 2**20:.2f} MB)")
+        
+    if _erasures :
+        stats = decoder.erasure_stats
+        print(f"Messages decoded using pages that failed the CRC: {stats['messages']}")
+        print(f"Symbols corrected: {stats['corrected_symbols']}")
+        
+        if len(stats["time_gain"]) > 0 :
+            print("Time gain with respect to CRC-passed pages only [s]: " + \
+                  f"mean {np.mean(stats['time_gain']):.1f}, " + \
+                  f"median {np.median(stats['time_gain']):.1f}, " + \
+                  f"max {np.max(stats['time_gain']):.0f}")
+            
+    if _extra_pages > 0 :
+        stats = decoder.consistency_stats
+        print(f"Messages decoded with extra pages: {stats['messages']}")
+        print(f"Subsets used: {stats['subsets']}, " + \
+              f"time spent: {stats['time']:.3f} s")
+        print(f"Inconsistent messages: {stats['inconsistent']}, " + \
+              f"discarded: {stats['failed']}")
+        
+        for tow, msg_id, page_id in stats["corrupted_pages"] :
+            print(f"Corrupted page - ToW: {tow}, message ID: {msg_id}, page ID: {page_id}")
+
 
+def replay( filename, _rx, _type = None, tow_start = 0, tow_end = 604800, \
+            _page_offset = 1, _erasures = False, _extra_pages = 0, \
+            _duplicates = False, _changes_only = False) :
+    """
+    Summary :
+        Reprocess only a time window of a receiver file using the index written
+        by parse_data( ..., _index = True). The reading starts directly at the
+        byte offsets stored in the index and the decoder state (mask and GNSS
+        IODs) is seeded by first decoding the messages that provided them.
+        
+        The repetitions and the unchanged corrections are suppressed as in
+        the processing of the whole file: the decoding starts at the earliest
+        reference time (ToH) of the corrections replayed, so that the copies
+        of the messages already written are known.
+        
+    Arguments:
+        filename, _rx, _type, _page_offset, _erasures, _extra_pages, 
+        _duplicates, _changes_only - see parse_data. The same options used to
+                create the index should be used.
+        tow_start - first time of week of the window
+        tow_end - last time of week of the window
+        
+        The times of week refer to the first week of the index, the times
+        larger than 604800 to the following weeks: e.g. (604700, 605000) is
+        a window across the week rollover.
+        
+        The corrections are written to <file>_replay_<tow_start>_<tow_end>_has_*.csv
+    """
+    basename = filename.split('__')[0]
+    
+    index = pd.read_csv(basename + '_has_idx.csv')
+    
+    # absolute times (seconds since the GPS epoch) of the messages and of the
+    # messages they refer to, received in the previous week if their time of
+    # week is larger
+    week_start = index["WN"].values.astype(np.int64) * tf.WEEK_SECONDS
+    t_index = week_start + index["ToW"].values
+    
+    def abs_times(tows) :
+        tows = tows.values.astype(np.int64)
+        return np.where(tows < 0, -1, week_start + tows -                         np.where(tows > index["ToW"].values, tf.WEEK_SECONDS, 0))
+    
+    t_start = abs_times(index["StartToW"])
+    t_mask = abs_times(index["MaskToW"])
+    t_orbit = abs_times(index["OrbitToW"])
+    
+    t_window = (int(index["WN"].min()) * tf.WEEK_SECONDS + tow_start, \
+                int(index["WN"].min()) * tf.WEEK_SECONDS + tow_end)
+    
+    window = (t_index >= t_window[0]) & (t_index <= t_window[1])
+    
+    if not np.any(window) :
+        raise Exception(f"No message decoded between {tow_start} and {tow_end}")
+        
+    # Messages decoded before the window since the reference time of the
+    # corrections, which determine the rows suppressed. The messages added
+    # can themselves be suppressed by earlier copies: the start is moved back
+    # until it includes all the reference times.
+    if "RefTime" in index.columns :
+        prime_start = t_window[0]
+        while True :
+            decoded = (t_index >= prime_start) & (t_index <= t_window[1])
+            ref_start = min(prime_start, index["RefTime"].values[decoded].min())
+            
+            if ref_start == prime_start :
+                break
+            prime_start = ref_start
+    else :
+        # index without the reference times: the corrections are referred to
+        # the last hour
+        decoded = (t_index >= t_window[0] - 3600) & (t_index <= t_window[1])
+        
+    # Segments of the file to decode: (offset, first time, last time)
+    segments = [(index["Offset"].values[decoded].min(), t_start[decoded].min(), t_window[1])]
+    
+    # Messages providing the masks and the GNSS IODs used and received before
+    # the first message decoded
+    t_first = t_index[decoded].min()
+    for t_seed in set(t_mask[decoded]) | set(t_orbit[decoded]) :
+        if t_seed < 0 or t_seed >= t_first :
+            continue
+        
+        seed = np.flatnonzero(t_index == t_seed)[0]
+        segments.append((index["Offset"].values[seed], t_start[seed], t_seed))
+        
+    # Merge overlapping segments
+    segments.sort(key = lambda x : x[1])
+    
+    merged = [list(segments[0])]
+    for offset, seg_start, seg_stop in segments[1:] :
+        if seg_start <= merged[-1][2] :
+            merged[-1][2] = max(merged[-1][2], seg_stop)
+        else :
+            merged.append([offset, seg_start, seg_stop])
+            
+    # Load only the required parts of the file
+    dfs = []
+    for offset, seg_start, seg_stop in merged :
+        # the reading stops at a time of week only within a week
+        same_week = seg_start // tf.WEEK_SECONDS == seg_stop // tf.WEEK_SECONDS
+        stop_tow = seg_stop % tf.WEEK_SECONDS if same_week else None
+        
+        df = load_data(filename, _rx, _type, max(int(offset), 0), stop_tow)
+        
+        # the week number of Javad files is provided by daily records that can
+        # precede the offset
+        tows = df["TOW"].values
+        weeks = np.where(tows >= seg_start % tf.WEEK_SECONDS, seg_start // tf.WEEK_SECONDS, \
+                         seg_start // tf.WEEK_SECONDS + 1)
+        df["WNc [w]"] = np.where(df["WNc [w]"].values == 0, weeks, df["WNc [w]"].values)
+        
+        t_df = df["WNc [w]"].values.astype(np.int64) * tf.WEEK_SECONDS + tows
+        dfs.append(df[(t_df >= seg_start) & (t_df <= seg_stop)])
+        
+    df = pd.concat(dfs, ignore_index = True)
+    
+    print(f"Replaying {int(np.sum(window))} messages from {len(df)} records ...\n")
+    
+    decode_data(df, basename + f'_replay_{int(tow_start)}_{int(tow_end)}', _page_offset, \
+                _erasures, _extra_pages, _time_range = t_window, \
+                _duplicates = _duplicates, _changes_only = _changes_only)
     
 if __name__ == "__main__":
     
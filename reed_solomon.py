@@ -8,6 +8,10 @@ Created on
 
 import galois
 import numpy as np
+import itertools
+
+# Maximum number of inverses stored in a cache of reduced encoding matrices
+MAX_INV_CACHE = 4096
 
 def get_poly_gen( gf2m, k ) :
 
@@ -27,7 +31,7 @@ def get_poly_gen( gf2m, k ) :
 
     History:
         Mar 27/19 - Function created by Daniele Borio.
-        Jun 
+        Oct 19/26 - Coefficients updated as vectors for each root.
     Remarks:
         1) polygen will be used to generate a RS( 2^m - 1, k ) code
         2) polygen is obtained by considering consecutive powers of alpha,
@@ -39,20 +43,17 @@ def get_poly_gen( gf2m, k ) :
     # Degree of the generating polynomial
     pdeg = n - k
     
-    # allocate the first term of the generating polynomial
-    pgen = gf2m.Ones(2)
+    # Roots of the generating polynomial: alpha^1, alpha^2, ..., alpha^pdeg
+    roots = gf2m.primitive_element ** np.arange(1, pdeg + 1)
     
-    # Initialize the polynomial as (z + alpha)
-    pgen[0] = gf2m.primitive_element
+    # Multiply by (z + alpha^ii): all the coefficients are updated at once
+    coeffs = gf2m.Ones(1)
+    zero = gf2m.Zeros(1)
     
-    polygen = galois.Poly(pgen.copy(), order="asc")
-
-    # Now perform the multiplications by (z + alpha^ii)
-    for ii in range(pdeg - 1) :
-        pgen[0] *= gf2m.primitive_element
-        p = galois.Poly(pgen, order="asc")
+    for root in roots :
+        coeffs = np.concatenate((coeffs, zero)) + np.concatenate((zero, coeffs * root))
         
-        polygen *= p
+    polygen = galois.Poly(coeffs, order="desc")
         
     return polygen
 
@@ -95,20 +96,52 @@ def rs_encode( gf2m, message, polygen, order = "asc" ) :
     
     return msg_poly.coeffs
     
+def rs_encode_batch( gf2m, messages, H ) :
+    """
+    Summary:
+        Function that encodes in a systematic way several messages at once,
+        using the encoding matrix H.
+ 
+    Arguments:
+        gf2m - struct containing the elements for the different operations
+               in GF(2^m)
+        messages - matrix with a message of k words per row
+        H - the encoding matrix (n x k) in the HAS convention, i.e. as returned
+            by get_has_encoding_matrix
+ 
+    Returns:
+        cwords - matrix with an encoded message of n words per row. Each row
+                 is equal to the output of rs_encode with order "desc".
+    """
+    messages = np.atleast_2d(messages)
+    
+    return gf2m(messages) @ gf2m(H).T
+
 def get_encoding_matrix( gf2m, polygen ) :
+    """
+    Summary:
+        Function that builds the systematic encoding matrix of the 
+        Reed-Solomon code defined by polygen on GF(2^m)
+ 
+    Arguments:
+        gf2m - struct containing the elements for the different operations
+               in GF(2^m)
+        polygen - the generating polynomial
+ 
+    Returns:
+        H - the encoding matrix (n x k). The last k rows are the identity.
+    """
 
     # Build the generating matrix from 'polygen'
     n = gf2m.order - 1
     k = gf2m.order - len(polygen.coeffs)
 
-    G = gf2m.Zeros( (n, k) )
-    
     gcol = gf2m.Zeros( n )
     gcol[:(n-k+1)] = np.flip(polygen.coeffs)
 
-    for ii in range(k) :
-        G[:, ii] = np.roll(gcol, ii)
-        
+    # Each column of G is gcol circularly shifted by the column index
+    shifts = (np.arange(n)[:, None] - np.arange(k)[None, :]) % n
+    G = gcol[shifts]
 
     Gk = G[(n-k):n,:] 
     InvGk = np.linalg.inv( Gk )
@@ -116,11 +149,280 @@ def get_encoding_matrix( gf2m, polygen ) :
     # Finally find H
     H = gf2m.Zeros( G.shape )
     
-    for ii in range(k) :
-        H[n - k + ii, ii] = 1
+    H[n - k + np.arange(k), np.arange(k)] = 1
 
     H[:(n-k),:] = G[:(n-k),:] @ InvGk
     
     return H
 
-    
\ No newline at end of file
+def get_has_encoding_matrix( gf2m, k = 32 ) :
+    """
+    Summary:
+        Function that builds the encoding matrix used by the HAS messages.
+        Row ii of the matrix encodes the page with ID ii + 1.
+ 
+    Arguments:
+        gf2m - struct containing the elements for the different operations
+               in GF(2^m)
+        k - number of input words
+ 
+    Returns:
+        H - the HAS encoding matrix (n x k). The first k rows are the identity.
+    """
+    polygen = get_poly_gen( gf2m, k )
+    
+    H = get_encoding_matrix( gf2m, polygen )
+    
+    return np.fliplr(np.flipud(H))
+
+def save_encoding_matrix( H, filename ) :
+    """
+    Summary:
+        Save the encoding matrix to file. The format is determined by the 
+        file extension: ".npy" for the numpy binary format, CSV otherwise.
+ 
+    Arguments:
+        H - the encoding matrix
+        filename - the output file name
+ 
+    Returns:
+        Nothing.
+    """
+    H = np.asarray(H, dtype = np.uint8)
+    
+    if filename.endswith(".npy") :
+        np.save(filename, H)
+    else :
+        np.savetxt(filename, H, fmt = "%d", delimiter = ",")
+
+def get_reduced_inverse( gf2m, H, rows, k, cache = None ) :
+    """
+    Summary:
+        Compute the inverse of the reduced encoding matrix obtained by 
+        selecting the rows 'rows' and the first k columns of H.
+        
+    Arguments:
+        gf2m - struct containing the elements for the different operations
+               in GF(2^m)
+        H - the encoding matrix
+        rows - indexes of the rows to select (k elements)
+        k - number of input words
+        cache - optional dictionary storing the inverses already computed
+        
+    Returns:
+        HRinv - the inverse of the reduced matrix, None if the matrix is singular
+    """
+    key = (tuple(int(row) for row in rows), k)
+    
+    if cache is not None and key in cache :
+        return cache[key]
+    
+    try :
+        HRinv = np.linalg.inv( gf2m(H[rows, 0:k]) )
+    except np.linalg.LinAlgError :
+        HRinv = None
+        
+    if cache is not None :
+        if len(cache) >= MAX_INV_CACHE :
+            cache.clear()
+        cache[key] = HRinv
+        
+    return HRinv
+
+def rs_decode_erasures( gf2m, H, rows, words, reliable, k, max_trials = 256, cache = None ) :
+    """
+    Summary:
+        Errors-and-erasures decoding of the (shortened) Reed-Solomon code 
+        defined by the encoding matrix H. Each row of 'words' is a received 
+        symbol of as many codewords as the number of columns. The symbols
+        that have not been received are erasures. The symbols that are not
+        reliable (e.g. pages that failed the CRC check) may contain errors:
+        these are located and corrected codeword by codeword.
+        
+    Arguments:
+        gf2m - struct containing the elements for the different operations
+               in GF(2^m)
+        H - the encoding matrix
+        rows - indexes of the rows of H corresponding to the received symbols
+        words - matrix with the received symbols, one row per symbol
+        reliable - boolean array, True if the corresponding symbol is error free
+        k - number of input words
+        max_trials - maximum number of candidate error patterns tested
+        cache - optional dictionary storing the inverses of the reduced 
+                encoding matrices
+        
+    Returns:
+        msg - k x L matrix with the decoded codewords, None if decoding failed
+        num_corrected - number of symbols corrected
+        
+    Remarks:
+        1) an unreliable symbol is assumed correct only if it is confirmed by
+           the other symbols: at least k + 1 symbols are thus required when 
+           unreliable symbols are used
+        2) up to (m - k) / 2 errors per codeword are corrected, m being the
+           number of received symbols. Candidate error patterns are tested in 
+           order of increasing weight, so that the first consistent candidate
+           is the maximum likelihood solution. With a single symbol in excess
+           of k (m = k + 1), no error can be corrected: an error in an
+           unreliable symbol is only detected and the decoding fails.
+    """
+    rows = np.asarray(rows, dtype = int)
+    reliable = np.asarray(reliable, dtype = bool)
+    
+    m = len(rows)
+    
+    if m < k :
+        return None, 0
+    
+    # reliable symbols first: they are preferred for solving the system
+    order = np.argsort(~reliable, kind = "stable")
+    rows = rows[order]
+    reliable = reliable[order]
+    R = gf2m(np.asarray(words)[order])
+    
+    if np.all(reliable[:k]) and m == k :
+        HRinv = get_reduced_inverse( gf2m, H, rows, k, cache )
+        
+        if HRinv is None :
+            return None, 0
+        
+        return HRinv @ R, 0
+    
+    # unreliable symbols can be used only if they can be checked
+    if m == k :
+        return None, 0
+    
+    G = gf2m(H[rows, 0:k])
+    
+    suspects = np.flatnonzero(~reliable)
+    max_errors = min((m - k) // 2, len(suspects))
+    
+    msg = gf2m.Zeros((k, R.shape[1]))
+    solved = np.zeros(R.shape[1], dtype = bool)
+    num_corrected = 0
+    num_trials = 0
+    
+    for num_errors in range(max_errors + 1) :
+        for err_rows in itertools.combinations(suspects, num_errors) :
+            
+            if num_trials == max_trials :
+                return None, num_corrected
+            num_trials += 1
+            
+            # solve the system using the first k symbols assumed correct...
+            keep = np.setdiff1d(np.arange(m), err_rows)
+            
+            HRinv = get_reduced_inverse( gf2m, H, rows[keep[:k]], k, cache )
+            
+            if HRinv is None :
+                continue
+            
+            candidate = HRinv @ R[keep[:k]]
+            
+            # ...and check that the other ones are consistent
+            consistent = np.all(G[keep[k:]] @ candidate == R[keep[k:]], axis = 0)
+            
+            new_cols = consistent & ~solved
+            
+            if not np.any(new_cols) :
+                continue
+            
+            msg[:, new_cols] = candidate[:, new_cols]
+            solved |= new_cols
+            
+            if num_errors > 0 :
+                err_rows = list(err_rows)
+                num_corrected += int(np.count_nonzero(G[err_rows] @ candidate[:, new_cols] \
+                                                      != R[err_rows][:, new_cols]))
+            
+            if np.all(solved) :
+                return msg, num_corrected
+            
+    return None, num_corrected
+
+def rs_decode_subsets( gf2m, H, rows, words, k, max_subsets = 3, cache = None ) :
+    """
+    Summary:
+        Decoding of an over-determined set of symbols (more than k symbols
+        received) with consistency check. The codewords are decoded from 
+        different subsets of k symbols and the received symbols are checked 
+        against each candidate. The candidate confirmed by the largest number 
+        of symbols is selected (majority) and the symbols that disagree with it
+        are reported as corrupted.
+        
+    Arguments:
+        gf2m - struct containing the elements for the different operations
+               in GF(2^m)
+        H - the encoding matrix
+        rows - indexes of the rows of H corresponding to the received symbols
+        words - matrix with the received symbols, one row per symbol
+        k - number of input words
+        max_subsets - maximum number of subsets of k symbols used for decoding
+        cache - optional dictionary storing the inverses of the reduced 
+                encoding matrices
+        
+    Returns:
+        msg - k x L matrix with the decoded codewords, None if no candidate
+              is confirmed by a majority of symbols
+        corrupted - boolean array, True for the symbols not consistent with msg
+        num_subsets - number of subsets actually used
+        
+    Remarks:
+        1) the subsets exclude disjoint groups of m - k symbols, m being the 
+           number of symbols received. The ii-th subset excludes the symbols
+           from ii * (m - k) to (ii + 1) * (m - k) - 1 (modulo m): the first
+           subset excludes the first m - k symbols and uses the following k.
+        2) the decoding stops as soon as a candidate consistent with all the
+           symbols is found. In the absence of corrupted symbols, the extra 
+           cost is thus a single matrix product.
+        3) a candidate is accepted only if it is consistent with more than k
+           symbols, i.e. up to m - k - 1 corrupted symbols can be identified.
+           With a single extra symbol (m = k + 1), a corrupted symbol is 
+           detected but cannot be identified: no candidate is accepted and 
+           the message is discarded (msg is None).
+    """
+    rows = np.asarray(rows, dtype = int)
+    
+    m = len(rows)
+    num_extra = m - k
+    
+    if num_extra < 1 :
+        return None, np.zeros(m, dtype = bool), 0
+    
+    G = gf2m(H[rows, 0:k])
+    R = gf2m(np.asarray(words))
+    
+    best_msg = None
+    best_consistent = np.zeros(m, dtype = bool)
+    
+    num_windows = int(np.ceil(m / num_extra))
+    num_subsets = 0
+    
+    for ii in range(min(max_subsets, num_windows)) :
+        
+        # exclude the symbols of the ii-th window
+        excluded = (np.arange(num_extra) + ii * num_extra) % m
+        subset = np.setdiff1d(np.arange(m), excluded)[:k]
+        
+        HRinv = get_reduced_inverse( gf2m, H, rows[subset], k, cache )
+        num_subsets += 1
+        
+        if HRinv is None :
+            continue
+        
+        candidate = HRinv @ R[subset]
+        
+        # a symbol is consistent if all its elements are correctly re-encoded
+        consistent = np.all(G @ candidate == R, axis = 1)
+        
+        if np.count_nonzero(consistent) > np.count_nonzero(best_consistent) :
+            best_msg = candidate
+            best_consistent = consistent
+            
+        if np.all(consistent) :
+            break
+    
+    if np.count_nonzero(best_consistent) <= k :
+        return None, ~best_consistent, num_subsets
+    
+    return best_msg, ~best_consistent, num_subsets
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:27 2026
+
+@author: daniele
+
+Summary :
+    Reader of RINEX 3 and RINEX 4 navigation files and store of the GPS LNAV
+    and Galileo I/NAV - F/NAV broadcast ephemerides, indexed by (gnss ID, PRN,
+    IOD). The IOD is the IODE for GPS and the IODnav for Galileo, as the
+    gnss_IOD of the HAS orbit corrections.
+
+    Times are expressed in seconds since the GPS epoch (GPS week * 604800 +
+    time of week): Galileo System Time is aligned with GPS time and the
+    Galileo weeks of the RINEX files are given in the GPS week numbering.
+"""
+
+import numpy as np
+import pandas as pd
+
+import timefun as tf
+
+# GNSS IDs used by HAS
+GPS_ID = 0
+GAL_ID = 2
+
+# RINEX system identifiers of the GNSS supported
+systems = {"G" : GPS_ID, "E" : GAL_ID}
+
+# Parameters of the ephemeris records, in the order of the RINEX file
+# (clock parameters of the first line followed by the broadcast orbits)
+record_fields = {GPS_ID : ["af0", "af1", "af2",
+                           "IOD", "Crs", "delta_n", "M0",
+                           "Cuc", "e", "Cus", "sqrtA",
+                           "toe", "Cic", "OMEGA0", "Cis",
+                           "i0", "Crc", "omega", "OMEGA_DOT",
+                           "IDOT", "L2_codes", "week", "L2P_flag",
+                           "accuracy", "health", "TGD", "IODC",
+                           "transmission_time", "fit_interval"],
+                 GAL_ID : ["af0", "af1", "af2",
+                           "IOD", "Crs", "delta_n", "M0",
+                           "Cuc", "e", "Cus", "sqrtA",
+                           "toe", "Cic", "OMEGA0", "Cis",
+                           "i0", "Crc", "omega", "OMEGA_DOT",
+                           "IDOT", "data_sources", "week", "spare",
+                           "accuracy", "health", "BGD_E5a", "BGD_E5b",
+                           "transmission_time"]}
+
+# Galileo data sources (bits of the data_sources field)
+GAL_INAV = 0x5
+GAL_FNAV = 0x2
+
+# RINEX 4 navigation message types retained
+rinex4_types = {GPS_ID : ("LNAV",), GAL_ID : ("INAV", "FNAV")}
+
+
+def parse_values(line : str, start : int, num_values : int) :
+    """
+    Summary :
+        Parse the values (19 characters each, with D or E exponent) of a
+        line of a RINEX navigation record.
+
+    Arguments :
+        line - the line
+        start - position of the first value
+        num_values - number of values in the line
+
+    Returns :
+        List of values, NaN for the missing ones.
+    """
+    values = []
+    for ii in range(num_values) :
+        field = line[start + 19 * ii:start + 19 * (ii + 1)].strip()
+
+        if len(field) == 0 :
+            values.append(np.nan)
+        else :
+            values.append(float(field.replace("D", "E").replace("d", "e")))
+
+    return values
+
+def parse_record(lines) :
+    """
+    Summary :
+        Parse an ephemeris record of a RINEX 3/4 navigation file.
+
+    Arguments :
+        lines - lines of the record: the line with the satellite and the time
+                of clock followed by the broadcast orbits
+
+    Returns :
+        Dictionary with the parameters of the record, None if the system is
+        not supported.
+    """
+    gnss = systems.get(lines[0][0])
+
+    if gnss is None :
+        return None
+
+    # epoch of the time of clock
+    date = lines[0][3:23].split()
+
+    values = parse_values(lines[0], 23, 3)
+    for line in lines[1:] :
+        values += parse_values(line, 4, 4)
+
+    names = record_fields[gnss]
+
+    if len(values) < len(names) - 1 :
+        raise Exception(f"Incomplete navigation record: {lines[0].strip()}")
+
+    record = dict(zip(names, values))
+    record["gnssID"] = gnss
+    record["PRN"] = int(lines[0][1:3])
+
+    record["year"] = int(date[0])
+    record["month"] = int(date[1])
+    record["day"] = int(date[2])
+    record["hour"] = int(date[3]) + int(date[4]) / 60 + float(date[5]) / 3600
+
+    return record
+
+def load_rinex_nav(filename : str) :
+    """
+    Summary :
+        Load the GPS and Galileo ephemerides of a RINEX 3 or 4 navigation
+        file.
+
+    Arguments :
+        filename - pathname of the navigation file
+
+    Returns :
+        Dataframe with one row per ephemeris record: gnssID, PRN, the
+        parameters of record_fields (IOD is the IODE or IODnav) and t_oe, t_oc,
+        the times of ephemeris and clock in seconds since the GPS epoch.
+    """
+    with open(filename, "r") as fin :
+        lines = fin.read().splitlines()
+
+    # header
+    version = None
+    for ii, line in enumerate(lines) :
+        if line[60:].strip() == "RINEX VERSION / TYPE" :
+            version = float(line[:9])
+
+            if line[20] != "N" :
+                raise Exception(f"Not a navigation file: {filename}")
+
+        if line[60:].strip() == "END OF HEADER" :
+            break
+
+    if version is None or version < 3 :
+        raise Exception(f"Unsupported RINEX version: {filename}")
+
+    records = []
+
+    # group the lines of each record: a record starts with a non-blank
+    # character, the broadcast orbits are indented
+    block = []
+    keep = True
+    for line in lines[ii + 1:] + [">"] :
+        if len(line.strip()) == 0 :
+            continue
+
+        if line[0] != " " :
+            if len(block) > 0 and keep :
+                record = parse_record(block)
+
+                if record is not None :
+                    records.append(record)
+
+            block = []
+
+            if line[0] == ">" :
+                # RINEX 4 record header: > EPH G01 LNAV. Only the ephemerides
+                # of the supported messages are retained
+                fields = line[1:].split()
+                gnss = systems.get(fields[1][0]) if len(fields) > 2 else None
+
+                keep = len(fields) > 2 and fields[0] == "EPH" and \
+                       gnss is not None and fields[2] in rinex4_types[gnss]
+                continue
+
+            if version < 4 :
+                keep = True
+
+        block.append(line)
+
+    columns = ["gnssID", "PRN"] + sorted(set(record_fields[GPS_ID]) | set(record_fields[GAL_ID]))
+    df = pd.DataFrame(records, columns = columns + ["year", "month", "day", "hour"])
+
+    df["gnssID"] = df["gnssID"].astype(np.int64)
+    df["PRN"] = df["PRN"].astype(np.int64)
+    df["IOD"] = df["IOD"].astype(np.int64)
+
+    # times of ephemeris and clock since the GPS epoch
+    df["t_oe"] = df["week"].values * tf.WEEK_SECONDS + df["toe"].values
+
+    toc, week = tf.DatesToGps(df["year"].values, df["month"].values, df["day"].values, \
+                              df["hour"].values)
+    df["t_oc"] = (week * tf.WEEK_SECONDS + toc).astype(np.float64)
+
+    return df.drop(columns = ["year", "month", "day", "hour"])
+
+class ephemeris_store :
+    """
+    Summary :
+        Broadcast ephemerides indexed by (gnss ID, PRN, IOD). When the same
+        IOD is used by several records (e.g. IODE reused on different days),
+        the record with the time of ephemeris closest to the epoch of interest
+        is selected.
+    """
+
+    def __init__(self, filenames = None, galileo_source : str = "inav", \
+                 max_age : float = 4 * 3600) :
+        """
+        Summary :
+            Object constructor.
+
+        Arguments :
+            filenames - optional pathname or list of pathnames of RINEX
+                        navigation files to load
+            galileo_source - Galileo ephemerides retained: "inav" (reference
+                             of the HAS corrections), "fnav" or None for all
+            max_age - maximum difference in seconds between an epoch and the
+                      time of ephemeris of the record used
+        """
+        self.galileo_source = galileo_source
+        self.max_age = max_age
+
+        self.records = None
+
+        if filenames is not None :
+            if isinstance(filenames, str) :
+                filenames = [filenames]
+
+            for filename in filenames :
+                self.load(filename)
+
+    def __len__(self) :
+        return 0 if self.records is None else len(self.records)
+
+    def load(self, filename : str) :
+        """
+        Summary :
+            Load the ephemerides of a RINEX navigation file.
+        """
+        self.add(load_rinex_nav(filename))
+
+    def add(self, records) :
+        """
+        Summary :
+            Add ephemeris records and rebuild the index.
+
+        Arguments :
+            records - dataframe as returned by load_rinex_nav
+        """
+        if self.galileo_source is not None :
+            mask = {"inav" : GAL_INAV, "fnav" : GAL_FNAV}[self.galileo_source]
+
+            sources = np.nan_to_num(records["data_sources"].values).astype(np.int64)
+            keep = (records["gnssID"].values != GAL_ID) | ((sources & mask) != 0)
+
+            records = records[keep]
+
+        if self.records is not None :
+            records = pd.concat([self.records, records], ignore_index = True)
+
+        # the same record is usually broadcast several times (and by
+        # several messages for Galileo)
+        records = records.drop_duplicates(subset = ["gnssID", "PRN", "IOD", "t_oe"])
+
+        self.records = records.sort_values(["gnssID", "PRN", "IOD", "t_oe"], \
+                                           kind = "stable").reset_index(drop = True)
+
+        self.build_index()
+
+    @staticmethod
+    def key(gnss, prn, iod) :
+        """
+        Summary :
+            Integer key of (gnss ID, PRN, IOD).
+        """
+        return (np.asarray(gnss, dtype = np.int64) << 20) + \
+               (np.asarray(prn, dtype = np.int64) << 12) + \
+               np.asarray(iod, dtype = np.int64)
+
+    def build_index(self) :
+        """
+        Summary :
+            Build the search index: records sorted by key and time of
+            ephemeris, combined in a single sorted integer.
+        """
+        self.t_ref = np.min(self.records["t_oe"].values) if len(self.records) > 0 else 0
+
+        self.keys = self.key(self.records["gnssID"].values, self.records["PRN"].values, \
+                             self.records["IOD"].values)
+
+        self.sorted_index = (self.keys << 32) + \
+                            np.round(self.records["t_oe"].values - self.t_ref).astype(np.int64)
+
+    def match(self, gnss, prn, iod, t) :
+        """
+        Summary :
+            Find the records of a set of satellites and IODs, vectorized.
+
+        Arguments :
+            gnss, prn, iod - arrays (or scalars) with the gnss IDs, PRNs and
+                             IODs (negative if unknown)
+            t - epochs in seconds since the GPS epoch
+
+        Returns :
+            Array of record indices, -1 where no record is found.
+        """
+        gnss, prn, iod, t = np.broadcast_arrays(gnss, prn, iod, t)
+
+        if len(self) == 0 :
+            return np.full(gnss.shape, -1, dtype = np.int64)
+
+        keys = self.key(gnss, prn, np.maximum(iod, 0))
+
+        # relative time clipped to the range of the index
+        rel = np.clip(np.round(t - self.t_ref), 0, 2**32 - 1).astype(np.int64)
+
+        pos = np.searchsorted(self.sorted_index, (keys << 32) + rel)
+
+        # candidates: the records before and after the insertion point
+        before = np.clip(pos - 1, 0, len(self) - 1)
+        after = np.clip(pos, 0, len(self) - 1)
+
+        t_oe = self.records["t_oe"].values
+
+        d_before = np.where(self.keys[before] == keys, np.abs(t - t_oe[before]), np.inf)
+        d_after = np.where(self.keys[after] == keys, np.abs(t - t_oe[after]), np.inf)
+
+        rows = np.where(d_after < d_before, after, before)
+        dist = np.minimum(d_before, d_after)
+
+        return np.where((dist <= self.max_age) & (iod >= 0), rows, -1)
+
+    def get(self, rows) :
+        """
+        Summary :
+            Return the parameters of a set of records.
+
+        Arguments :
+            rows - record indices (as returned by match, without -1)
+
+        Returns :
+            Dictionary of arrays.
+        """
+        return {key : self.records[key].values[rows] for key in self.records.columns}
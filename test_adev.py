@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:18:45 2026
+
+@author: daniele
+
+Summary :
+    Tests of the ADEV/MDEV engine of the plot scripts against a direct
+    implementation of the estimators (allantools, phase data).
+"""
+
+import os
+import importlib
+
+import numpy as np
+import pytest
+
+# folder of the plot scripts
+PLOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plot")
+
+TAU0 = 10.0
+
+
+@pytest.fixture
+def adev(monkeypatch) :
+    """
+    Summary :
+        The adev module of the plot scripts.
+    """
+    monkeypatch.syspath_prepend(PLOT_DIR)
+
+    return importlib.import_module("adev")
+
+def direct_dev(phase, m, kind) :
+    """
+    Summary :
+        Deviation for the averaging factor m, term by term. The terms with a
+        missing (NaN) sample are discarded.
+
+    Returns :
+        The deviation and the number of terms.
+    """
+    tau = m * TAU0
+    terms = []
+
+    if kind == "oadev" :
+        for ii in range(len(phase) - 2 * m) :
+            terms.append(phase[ii + 2 * m] - 2 * phase[ii + m] + phase[ii])
+    else :
+        for ii in range(len(phase) - 3 * m + 1) :
+            terms.append(np.sum(phase[ii + 2 * m:ii + 3 * m]) - \
+                         2 * np.sum(phase[ii + m:ii + 2 * m]) + np.sum(phase[ii:ii + m]))
+
+    terms = np.array(terms)
+    terms = terms[~np.isnan(terms)]
+
+    if kind == "oadev" :
+        return np.sqrt(np.sum(terms**2) / (2 * len(terms))) / tau, len(terms)
+
+    return np.sqrt(np.sum(terms**2) / (2 * m * m * tau * tau * len(terms))), len(terms)
+
+def random_walk(rng, num_samples) :
+    return np.cumsum(rng.normal(0, 1e-9, num_samples))
+
+@pytest.mark.parametrize("kind", ["oadev", "mdev"])
+def test_gap_free(adev, kind) :
+    rng = np.random.default_rng(3)
+    phase = random_walk(rng, 500)
+    time = 345600 + TAU0 * np.arange(len(phase))
+
+    taus = [10, 20, 40, 100, 400, 2000]
+    out_taus, dev, err, num = adev.multi_dev({0 : (time, phase)}, taus, kind = kind)[0]
+
+    # 2000 s: the MDEV requires 600 samples
+    assert out_taus.tolist() == ([10, 20, 40, 100, 400, 2000] if kind == "oadev" else \
+                                 [10, 20, 40, 100, 400])
+
+    for tau, val, count in zip(out_taus, dev, num) :
+        expected, num_terms = direct_dev(phase, int(tau / TAU0), kind)
+
+        assert count == num_terms
+        assert val == pytest.approx(expected, rel = 1e-10)
+
+    assert np.allclose(err, dev / np.sqrt(num))
+
+@pytest.mark.parametrize("kind", ["oadev", "mdev"])
+def test_gaps(adev, kind) :
+    rng = np.random.default_rng(4)
+    phase = random_walk(rng, 400)
+    time = 345600 + TAU0 * np.arange(len(phase))
+
+    # missing epochs, and a duplicated epoch whose first sample is kept
+    keep = rng.random(len(phase)) > 0.1
+    keep[0] = keep[-1] = True
+
+    gap_time = np.insert(time[keep], 1, time[keep][0])
+    gap_phase = np.insert(phase[keep], 1, 1.0)
+
+    out_taus, dev, _, num = adev.multi_dev({0 : (gap_time, gap_phase)}, [10, 30, 100], \
+                                           kind = kind)[0]
+
+    assert len(out_taus) == 3
+    assert adev.get_tau0([gap_time]) == TAU0
+
+    grid = np.where(keep, phase, np.nan)
+    for tau, val, count in zip(out_taus, dev, num) :
+        expected, num_terms = direct_dev(grid, int(tau / TAU0), kind)
+
+        assert count == num_terms
+        assert val == pytest.approx(expected, rel = 1e-8)
+
+def test_several_series(adev) :
+    rng = np.random.default_rng(5)
+
+    series = {}
+    for sat in range(1, 12) :
+        # series of different lengths and start times
+        num_samples = 100 + 20 * sat
+        start = 345600 + TAU0 * int(rng.integers(0, 50))
+        series[sat] = (start + TAU0 * np.arange(num_samples), random_walk(rng, num_samples))
+
+    # a single epoch: not processed
+    series[20] = (np.array([345600.0]), np.array([0.0]))
+
+    taus = [10, 50, 200]
+    grouped = adev.multi_dev(series, taus, kind = "mdev", group_size = 4)
+
+    assert sorted(grouped) == list(range(1, 12))
+
+    for sat in grouped :
+        single = adev.mdev(*series[sat], taus)
+
+        for val, expected in zip(grouped[sat], single) :
+            assert np.allclose(val, expected, rtol = 1e-10)
+
+    # groups processed by several processes
+    parallel = adev.multi_dev(series, taus, kind = "mdev", group_size = 4, processes = 2)
+
+    for sat in grouped :
+        for val, expected in zip(parallel[sat], grouped[sat]) :
+            assert np.array_equal(val, expected)
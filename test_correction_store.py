@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:20:15 2026
+
+@author: daniele
+
+Summary :
+    Tests of the in-memory store of the HAS corrections.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+import has_correction_store as hcs
+import process_cnav as pc
+
+WN = 2400
+
+
+def clock(prn, tow, toh, c0, validity = 60, gnss_ID = 2) :
+    """
+    Summary :
+        Clock correction with the attributes used by the store.
+    """
+    return SimpleNamespace(gnss_ID = gnss_ID, prn = prn, wn = WN, tow = tow, toh = toh, \
+                           validity = validity, IOD = 1, gnss_IOD = 7, multiplier = 1.0, \
+                           delta_clock_c0 = c0, status = 0)
+
+def code_bias(prn, tow, toh, signals, biases, gnss_ID = 0) :
+    """
+    Summary :
+        Code bias correction with the attributes used by the store.
+    """
+    return SimpleNamespace(gnss_ID = gnss_ID, prn = prn, wn = WN, tow = tow, toh = toh, \
+                           validity = 300, IOD = 1, gnss_IOD = 3, signals = signals, \
+                           biases = np.array(biases), \
+                           availability_flags = np.ones(len(signals)))
+
+def test_reference_time_and_validity() :
+    store = hcs.has_correction_store()
+
+    # received at 345620 with ToH 10: reference time 345610
+    store.add("clock", [clock(5, 345620, 10, 0.5), clock(6, 345620, 10, 0.7)])
+
+    assert len(store.get_epoch("clock", WN, 345605)) == 0
+
+    df = store.get_epoch("clock", WN, 345640)
+    assert df["PRN"].tolist() == [5, 6]
+    assert df["RefToW"].tolist() == [345610, 345610]
+    assert df["delta_clock_c0"].tolist() == [0.5, 0.7]
+
+    # expired after the validity interval
+    assert len(store.get_epoch("clock", WN, 345671)) == 0
+
+def test_latest_valid_correction_per_satellite() :
+    store = hcs.has_correction_store(depth = 2)
+
+    store.add("clock", [clock(5, 345620, 10, 0.1)])
+    store.add("clock", [clock(5, 345650, 40, 0.2), clock(6, 345650, 40, 0.3, gnss_ID = 0)])
+    store.add("clock", [clock(5, 345680, 70, 0.4)])
+
+    df = store.get_epoch("clock", WN, 345660)
+    assert df[["gnssID", "PRN", "delta_clock_c0"]].values.tolist() == [[0, 6, 0.3], [2, 5, 0.2]]
+
+    # only the last two corrections of a satellite are kept
+    assert len(store.get_epoch("clock", WN, 345625)) == 0
+    assert store.latest("clock", 2, 5).delta_clock_c0 == 0.4
+
+    assert store.get_epochs("clock", 2, 5, WN, [345600, 345655, 345690, 345800]).tolist() == \
+           [-1, WN * hcs.WEEK_SECONDS + 345640, WN * hcs.WEEK_SECONDS + 345670, -1]
+
+    assert len(store) == 2
+    assert store.counts["clock"] == 4
+
+def test_biases_by_signal() :
+    store = hcs.has_correction_store()
+
+    store.add("code_bias", [code_bias(3, 345620, 0, [0, 7], [1.5, -0.5])])
+
+    df = store.get_epoch("code_bias", WN, 345700)
+    assert df[["signal", "bias"]].values.tolist() == [[0, 1.5], [7, -0.5]]
+
+    values = store.get_values("code_bias", 0, 3, 7, WN, 345700)
+    assert values["bias"] == -0.5
+    assert values["RefToW"] == 345600
+
+    assert store.get_values("code_bias", 0, 3, 1) is None
+    assert store.get_values("code_bias", 0, 3) is None
+
+def test_purge() :
+    store = hcs.has_correction_store()
+
+    store.add("clock", [clock(5, 345620, 10, 0.1), clock(6, 345620, 10, 0.2, validity = -1)])
+    store.purge(WN, 345700)
+
+    # corrections with undefined validity do not expire
+    assert store.get_epoch("clock", WN, 346000)["PRN"].tolist() == [6]
+    assert len(store) == 1
+
+def test_epoch_query_consistent_with_satellite_queries(pages, tmp_path) :
+    store = hcs.has_correction_store()
+
+    pc.decode_data(pages, str(tmp_path / "syn"), _store = store)
+
+    tow = int(pages["TOW"].values[-1])
+    for ctype in store.fields :
+        df = store.get_epoch(ctype, WN, tow)
+        assert len(df) > 0
+
+        for row in df.to_dict("records") :
+            signal = row["signal"] if ctype.endswith("bias") else None
+            values = store.get_values(ctype, row["gnssID"], row["PRN"], signal, WN, tow)
+
+            assert values == {key : (val.item() if isinstance(val, np.generic) else val) \
+                              for key, val in row.items()}
+
+def test_ring_buffers() :
+    store = hcs.has_correction_store(depth = 3)
+
+    # more satellites than the initial rows of the tables
+    for tow in range(345610, 345670, 10) :
+        store.add("clock", [clock(prn, tow, tow % 3600, tow / 1e6) for prn in range(1, 41)])
+
+    assert len(store) == 40
+    assert store.counts["clock"] == 240
+
+    # the oldest corrections are overwritten
+    t_refs = store.get_epochs("clock", 2, 40, WN, range(345610, 345670, 10))
+    assert t_refs.tolist() == [-1, -1, -1] + [WN * hcs.WEEK_SECONDS + tow \
+                                              for tow in (345640, 345650, 345660)]
+
+    assert store.latest("clock", 2, 17).delta_clock_c0 == 0.34566
+
+    # a copy of an older correction received last: the latest correction is
+    # the last received, the corrections with later reference times are
+    # superseded at the epochs after its reference time
+    store.add("clock", [clock(17, 345670, 30, 0.9)])
+
+    assert store.latest("clock", 2, 17).delta_clock_c0 == 0.9
+    assert store.get_values("clock", 2, 17, None, WN, 345665)["delta_clock_c0"] == 0.9
+    assert store.get_values("clock", 2, 17, None, WN, 345625) is None
+
+    df = store.get_epoch("clock", WN, 345665)
+    assert df["PRN"].tolist() == list(range(1, 41))
+    assert df["delta_clock_c0"][df["PRN"] == 17].tolist() == [0.9]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:20:11 2026
+
+@author: daniele
+
+Summary :
+    Tests of the streaming of compressed inputs in data_loading and of the
+    byte counters of the loading stage.
+"""
+
+import os
+import gzip
+import bz2
+import lzma
+import zipfile
+
+import pytest
+import pandas as pd
+
+import data_loading as dl
+import has_profiler as hp
+import process_cnav as pc
+
+
+def compress(filename, ext) :
+    """
+    Summary :
+        Compress a file in the format given by the extension.
+    """
+    comp_name = filename + ext
+
+    with open(filename, "rb") as fin :
+        data = fin.read()
+
+    if ext == ".zip" :
+        with zipfile.ZipFile(comp_name, "w", zipfile.ZIP_DEFLATED) as archive :
+            archive.writestr(os.path.basename(filename), data)
+    else :
+        opener = {".gz" : gzip.open, ".bz2" : bz2.open, ".xz" : lzma.open}[ext]
+        with opener(comp_name, "wb") as fout :
+            fout.write(data)
+
+    return comp_name
+
+@pytest.mark.parametrize("fmt", ["sbf", "greis", "novatel", "sbf2asc_hexa"])
+@pytest.mark.parametrize("ext", [".gz", ".bz2", ".xz", ".zip"])
+def test_compressed_input(stream_files, fmt, ext) :
+    filename, _rx, _type = stream_files[fmt]
+
+    plain = pc.load_data(filename, _rx, _type)
+    comp = pc.load_data(compress(filename, ext), _rx, _type)
+
+    pd.testing.assert_frame_equal(plain.reset_index(drop = True), \
+                                  comp.reset_index(drop = True))
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_profiled_bytes_are_decompressed_bytes(stream_files, parallel) :
+    filename, _, _ = stream_files["sbf"]
+    comp_name = compress(filename, ".gz")
+
+    dl.parallel_decompression = parallel
+    hp.enable()
+    try :
+        dl.load_from_binary_Septentrio(comp_name)
+        stats = hp.get_summary()["load"]
+    finally :
+        hp.disable()
+        dl.parallel_decompression = True
+
+    assert stats["bytes"] == os.path.getsize(filename)
+    assert comp_name not in dl.bytes_read
+
+def test_profiled_bytes_plain_file(stream_files) :
+    filename, _, _ = stream_files["novatel"]
+
+    hp.enable()
+    try :
+        dl.load_from_Novatel(filename)
+        stats = hp.get_summary()["load"]
+    finally :
+        hp.disable()
+
+    assert stats["bytes"] == os.path.getsize(filename)
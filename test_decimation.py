@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:58:41 2026
+
+@author: daniele
+
+Summary :
+    Tests of the downsampling of the series drawn by the plot scripts.
+"""
+
+import os
+import importlib
+
+import numpy as np
+import pytest
+
+# folder of the plot scripts
+PLOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plot")
+
+
+@pytest.fixture
+def dec(monkeypatch) :
+    """
+    Summary :
+        The decimation module of the plot scripts.
+    """
+    monkeypatch.syspath_prepend(PLOT_DIR)
+
+    return importlib.import_module("decimation")
+
+@pytest.fixture
+def series() :
+    """
+    Summary :
+        Irregularly sampled series with spikes, without ties in y.
+    """
+    rng = np.random.default_rng(4)
+
+    x = np.cumsum(rng.uniform(0.5, 1.5, 5000))
+    y = np.sin(x / 300) + 0.1 * rng.standard_normal(len(x))
+    y[[17, 2500, 4999]] = [5.0, -5.0, 7.0]
+
+    return x, y
+
+def columns(x, num_columns) :
+    col = ((x - x.min()) * (num_columns / (x.max() - x.min()))).astype(np.int64)
+
+    return np.minimum(col, num_columns - 1)
+
+def test_minmax(dec, series) :
+    x, y = series
+    num_columns = 100
+
+    x_out, y_out = dec.minmax_decimate(x, y, num_columns)
+
+    assert len(x_out) <= 2 * num_columns
+
+    # points of the series, in their original order
+    ind = np.searchsorted(x, x_out)
+    assert np.all(np.diff(ind) > 0)
+    assert np.array_equal(y[ind], y_out)
+
+    # minimum and maximum of each column
+    col = columns(x, num_columns)
+    col_out = col[ind]
+    for cc in range(num_columns) :
+        assert y_out[col_out == cc].min() == y[col == cc].min()
+        assert y_out[col_out == cc].max() == y[col == cc].max()
+
+    # the spikes are kept
+    assert {17, 2500, 4999} <= set(ind.tolist())
+
+    # short series are not decimated
+    x_out, y_out = dec.minmax_decimate(x[:150], y[:150], num_columns)
+    assert len(x_out) == 150
+
+def test_minmax_unsorted(dec, series) :
+    x, y = series
+    num_columns = 80
+
+    x_sorted, y_sorted = dec.minmax_decimate(x, y, num_columns)
+
+    # the same points are kept, in the order of the shuffled series
+    perm = np.random.default_rng(5).permutation(len(x))
+    x_out, y_out = dec.minmax_decimate(x[perm], y[perm], num_columns)
+
+    pos = np.argsort(perm)
+
+    order = np.argsort(x_out)
+    assert np.array_equal(x_out[order], x_sorted)
+    assert np.array_equal(y_out[order], y_sorted)
+
+    # original order of the shuffled series
+    ind = np.searchsorted(x, x_out)
+    assert np.all(np.diff(pos[ind]) > 0)
+
+def test_lttb(dec, series) :
+    x, y = series
+
+    for num_out in (3, 10, 257, 4999) :
+        x_out, y_out = dec.lttb(x, y, num_out)
+
+        assert len(x_out) == num_out
+        assert x_out[0] == x[0] and x_out[-1] == x[-1]
+        assert np.all(np.diff(x_out) > 0)
+        assert np.array_equal(y[np.searchsorted(x, x_out)], y_out)
+
+    # the spike is the largest triangle of its bucket
+    x_out, _ = dec.lttb(x, y, 500)
+    assert x[2500] in x_out
+
+    # nothing to decimate
+    x_out, y_out = dec.lttb(x[:20], y[:20], 50)
+    assert len(x_out) == 20
+
+def test_decimate(dec, series) :
+    x, y = series
+    y = y.copy()
+    y[::7] = np.nan
+
+    for method in ("minmax", "lttb") :
+        x_out, y_out = dec.decimate(x, y, 400, method)
+
+        assert len(x_out) <= 400
+        assert not np.isnan(y_out).any()
+
+    # minmax with half the points as columns
+    valid = ~np.isnan(y)
+    x_out, _ = dec.decimate(x, y, 400)
+    x_ref, _ = dec.minmax_decimate(x[valid], y[valid], 200)
+    assert np.array_equal(x_out, x_ref)
+
+    x_out, _ = dec.decimate(x, y, 400, "lttb")
+    assert len(x_out) == 400
+
+    # no decimation
+    x_out, y_out = dec.decimate(x, y, None)
+    assert x_out is x and y_out is y
+
+    with pytest.raises(Exception) :
+        dec.decimate(x, y, 400, "average")
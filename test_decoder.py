@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:52:18 2026
+
+@author: daniele
+
+Summary :
+    Tests of the decoder state: masks cached by Mask ID, GNSS IODs cached by
+    IOD Set ID and messages waiting for their mask.
+"""
+
+import pandas as pd
+
+import has_decoder as hd
+import process_cnav as pc
+
+
+def test_mask_cache(monkeypatch) :
+    monkeypatch.setattr(hd.has_decoder, "CACHE_SIZE", 2)
+    decoder = hd.has_decoder()
+
+    decoder.store_mask(1, ["mask 1"])
+    decoder.store_mask(2, ["mask 2"])
+
+    # the mask 1 is used again: the mask 2 is the least recently stored
+    decoder.store_mask(1, ["mask 1 new"])
+    decoder.store_mask(3, ["mask 3"])
+
+    assert decoder.get_mask(1) == ["mask 1 new"]
+    assert decoder.get_mask(2) is None
+    assert decoder.get_mask(3) == ["mask 3"]
+
+def test_iod_cache() :
+    decoder = hd.has_decoder()
+
+    decoder.gnss_IODs = {2 : {11 : 700}}
+    decoder.store_iods(4)
+    decoder.gnss_IODs = {2 : {11 : 701}}
+    decoder.store_iods(5)
+
+    decoder.select_iods(4)
+    assert decoder.gnss_IODs == {2 : {11 : 700}}
+
+    # orbit corrections never received with this IOD Set ID
+    decoder.select_iods(6)
+    assert decoder.gnss_IODs == {}
+
+def test_clock_iods_from_orbits(pages, tmp_path) :
+    pc.decode_data(pages, str(tmp_path / "syn"))
+
+    orb = pd.read_csv(str(tmp_path / "syn_has_orb.csv"))
+    clk = pd.read_csv(str(tmp_path / "syn_has_clk.csv"))
+
+    # clock messages without orbits use the GNSS IODs of the orbit
+    # corrections with the same IOD Set ID
+    keys = ["IOD", "gnssID", "PRN"]
+    iods = orb[keys + ["gnssIOD"]].drop_duplicates()
+    merged = clk.merge(iods, on = keys, how = "left", suffixes = ("", "_orb"))
+
+    assert len(merged) == len(clk) > 0
+    assert (merged["gnssIOD"] == merged["gnssIOD_orb"]).all()
+
+def test_pending_queue() :
+    queue = hd.has_pending_queue(max_size = 3)
+
+    queue.push(1, 100, 30, "a")
+    queue.push(2, 105, 60, "b")
+    queue.push(1, 110, 5, "c")
+
+    # the queue is full: the oldest message is dropped
+    queue.push(2, 112, 60, "d")
+    assert len(queue) == 3
+
+    # "c" is older than its validity
+    assert queue.pop(1, 120) == []
+    assert queue.pop(2, 120) == ["b", "d"]
+    assert len(queue) == 0
+
+    assert queue.stats == {"deferred" : 4, "recovered" : 2, "expired" : 1, \
+                           "overflow" : 1, "max_depth" : 3}
+
+def test_messages_recovered(pages, tmp_path, capsys) :
+    # the stream starts after the first mask: the first messages wait for
+    # the next one
+    df = pages[pages["TOW"].values >= pages["TOW"].values[0] + 10]
+
+    # the index requires the offsets of the records in the file
+    df = df.assign(Offset = range(len(df)))
+    pc.decode_data(df, str(tmp_path / "syn"), _index = True)
+
+    out = capsys.readouterr().out
+    assert "recovered: 0," not in out
+
+    index = pd.read_csv(str(tmp_path / "syn_has_idx.csv"))
+    clk = pd.read_csv(str(tmp_path / "syn_has_clk.csv"))
+
+    # corrections of the messages received before the mask, written with
+    # their reception time
+    first_mask = index["MaskToW"][index["MaskToW"] >= 0].min()
+    assert (clk["ToW"] < first_mask).any()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:44:37 2026
+
+@author: daniele
+
+Summary :
+    Tests of the sidecar log of the interpretation failures.
+"""
+
+import os
+
+import has_diagnostics as hdg
+import process_cnav as pc
+
+
+def test_log_created_at_first_failure(tmp_path) :
+    filename = str(tmp_path / "x_has_err.csv")
+
+    log = hdg.diagnostics_log(filename)
+    assert not os.path.exists(filename)
+
+    log.record(345600, 2400, 3, 5, "orbit", 10, 3, ValueError("bad, value"))
+    log.record(345610, 2400, 4, 5, "code_bias", 0, 0, IndexError("out of range"))
+    log.close()
+
+    df = hdg.load_diagnostics(filename)
+
+    assert df["BitOffset"].tolist() == [83, 0]
+    assert df["Details"].tolist() == ["bad; value", "out of range"]
+    assert hdg.get_failed_epochs(filename).tolist() == [345600, 345610]
+    assert log.counts == {"orbit" : 1, "code_bias" : 1}
+
+def test_no_log_without_failures(pages, tmp_path) :
+    basename = str(tmp_path / "syn")
+
+    # log left by a previous run
+    with open(basename + "_has_err.csv", "w") as fout :
+        fout.write(hdg.diagnostics_log.header + "\n345600,2400,1,1,mask,0,ValueError,x\n")
+
+    pc.decode_data(pages, basename)
+
+    assert os.path.exists(basename + "_has_orb.csv")
+    assert not os.path.exists(basename + "_has_err.csv")
+    assert len(hdg.get_failed_epochs(basename + "_has_err.csv")) == 0
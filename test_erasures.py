@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:41:27 2026
+
+@author: daniele
+
+Summary :
+    Tests of the errors-and-erasures decoding of the HAS messages, using the
+    pages that failed the CRC check.
+"""
+
+import numpy as np
+
+import has_decoder as hd
+import has_generator as hg
+import has_message as hm
+import reed_solomon as rd
+
+GF256 = hm.has_message.GF256
+H = hm.has_message.H
+
+# Message carrying a mask, orbit and full-set clock corrections
+BLOCKS = (1, 1, 1, 0, 0, 0)
+
+
+def build_message(toh, seed = 0) :
+    """
+    Summary :
+        Build a MT1 message with the synthetic content generator.
+    """
+    return hg.has_content_generator(seed = seed).get_message(toh, BLOCKS)
+
+def encode_pages(msg, msg_id, page_ids, corrupt = ()) :
+    """
+    Summary :
+        Encode the pages of a message in the format provided by the
+        receivers (16 32-bit words). The pages in corrupt have one byte
+        altered.
+    """
+    size = msg.shape[0]
+    page_ids = np.asarray(page_ids)
+
+    codewords = np.array(GF256(H[page_ids - 1, :size]) @ GF256(msg), dtype = np.uint8)
+    for ii in corrupt :
+        codewords[ii, 10] ^= 0x5A
+
+    headers = (1 << 18) | (msg_id << 13) | ((size - 1) << 8) | page_ids
+
+    words = hg.has_stream_generator().get_page_words(headers, codewords)
+
+    return [row for row in words]
+
+def test_rs_decode_erasures_corrects_with_two_extra_symbols() :
+    k = 4
+    msg = GF256.Random((k, 53), seed = 1)
+    rows = np.arange(40, 40 + k + 2)
+    words = np.array(GF256(H[rows, :k]) @ msg, dtype = np.uint8)
+    words[k + 1, 3] ^= 0x11
+
+    reliable = np.arange(k + 2) < k - 1
+
+    decoded, num_corrected = rd.rs_decode_erasures(GF256, H, rows, words, reliable, k)
+
+    assert np.array_equal(decoded, msg)
+    assert num_corrected == 1
+
+def test_rs_decode_erasures_only_detects_with_one_extra_symbol() :
+    k = 4
+    msg = GF256.Random((k, 53), seed = 2)
+    rows = np.arange(40, 40 + k + 1)
+    words = np.array(GF256(H[rows, :k]) @ msg, dtype = np.uint8)
+    words[k, 3] ^= 0x11
+
+    reliable = np.arange(k + 1) < k - 1
+
+    decoded, _ = rd.rs_decode_erasures(GF256, H, rows, words, reliable, k)
+
+    assert decoded is None
+
+def test_early_decoding_and_time_gain() :
+    msg = build_message(100)
+    size = msg.shape[0]
+    assert size >= 3
+
+    decoder = hd.has_decoder(1, erasures = True)
+
+    # size - 1 pages passing the CRC and two correct pages failing it
+    pages = encode_pages(msg, 5, np.arange(1, size + 2))
+    crc = [True] * (size - 1) + [False, False]
+
+    decoded = decoder.update(100, pages, 1, 5, size, crc)
+
+    assert np.array_equal(np.asarray(decoded, dtype = np.uint8), msg)
+    assert decoder.erasure_stats["messages"] == 1
+
+    # the message is completed 3 seconds later by a page passing the CRC
+    decoded = decoder.update(103, encode_pages(msg, 5, [40]), 1, 5, size)
+
+    assert decoded is None
+    assert decoder.erasure_stats["time_gain"] == [3]
+    assert len(decoder.message_list) == 0
+
+def test_consumed_message_does_not_absorb_next_message() :
+    msg_a = build_message(100)
+    msg_b = build_message(200, seed = 1)
+    size = msg_a.shape[0]
+    assert msg_b.shape[0] == size
+
+    decoder = hd.has_decoder(1, erasures = True)
+
+    pages = encode_pages(msg_a, 5, np.arange(1, size + 2))
+    crc = [True] * (size - 1) + [False, False]
+    assert decoder.update(100, pages, 1, 5, size, crc) is not None
+
+    # a new message with the same ID and size: its pages must not be taken
+    # by the message already decoded
+    decoded = decoder.update(110, encode_pages(msg_b, 5, np.arange(50, 50 + size)), \
+                             1, 5, size)
+
+    assert np.array_equal(np.asarray(decoded, dtype = np.uint8), msg_b)
+    assert decoder.erasure_stats["time_gain"] == []
+
+def test_rs_decode_subsets_identifies_corrupted_symbol() :
+    k = 4
+    msg = GF256.Random((k, 53), seed = 3)
+    rows = np.arange(40, 40 + k + 2)
+    words = np.array(GF256(H[rows, :k]) @ msg, dtype = np.uint8)
+
+    # the first subset excludes the first two symbols and is not affected
+    words[0, 0] ^= 0x01
+
+    decoded, corrupted, _ = rd.rs_decode_subsets(GF256, H, rows, words, k)
+
+    assert np.array_equal(decoded, msg)
+    assert np.flatnonzero(corrupted).tolist() == [0]
+
+def test_rs_decode_subsets_discards_with_one_extra_symbol() :
+    k = 4
+    msg = GF256.Random((k, 53), seed = 4)
+    rows = np.arange(40, 40 + k + 1)
+    words = np.array(GF256(H[rows, :k]) @ msg, dtype = np.uint8)
+    words[2, 0] ^= 0x01
+
+    decoded, _, _ = rd.rs_decode_subsets(GF256, H, rows, words, k)
+
+    assert decoded is None
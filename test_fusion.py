@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:58:27 2026
+
+@author: daniele
+
+Summary :
+    Tests of the fusion of the pages of several receivers: estimation of the
+    time tag offsets, selection of the pages, decoding of the fused stream
+    and completion times of the messages.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import has_fusion as hf
+import has_generator as hg
+import process_cnav as pc
+
+# time tag offset of the second receiver [s]
+OFFSET = 2
+
+
+@pytest.fixture(scope = "module")
+def receivers(pages) :
+    """
+    Summary :
+        Pages of two receivers: each receiver loses pages received by the
+        other one, the second receiver has a page failing the CRC check and
+        time tags OFFSET seconds earlier.
+
+    Returns :
+        List of the dataframes of the receivers and mask of the pages of
+        each receiver.
+    """
+    rng = np.random.default_rng(6)
+
+    # lost by one receiver at most
+    lost = rng.random(len(pages))
+    first = lost > 0.15
+    second = (lost < 0.15) | (lost > 0.45)
+
+    rx_1 = pages[first].reset_index(drop = True)
+    rx_2 = pages[second].reset_index(drop = True)
+
+    # page of both receivers failing the CRC check on the second one
+    bad = np.flatnonzero(first[second] & (hf.page_headers(rx_2) != hf.DUMMY_HEADER))[3]
+    rx_2.loc[bad, "CRCPassed"] = 0
+    rx_2.loc[bad, "word 5"] = rx_2.loc[bad, "word 5"] ^ 0xFFFF
+
+    rx_2["TOW"] = rx_2["TOW"] - OFFSET
+
+    return [rx_1, rx_2], [first, second]
+
+def test_estimate_offset(receivers) :
+    (rx_1, rx_2), _ = receivers
+
+    assert hf.estimate_offset(rx_1, rx_2) == OFFSET
+    assert hf.estimate_offset(rx_2, rx_1) == -OFFSET
+
+    # offsets larger than the maximum are not estimated
+    assert hf.estimate_offset(rx_1, rx_2, max_offset = 1) == 0
+
+def test_fuse_pages(pages, receivers) :
+    frames, (first, second) = receivers
+
+    fused, stats = hf.fuse_pages(frames)
+
+    assert stats["offsets"] == [0, OFFSET]
+    assert stats["pages"] == [len(frames[0]), len(frames[1])]
+
+    # one page per satellite and epoch, all passing the CRC check
+    assert stats["output"] == len(fused) == len(pages)
+    assert stats["duplicates"] == np.sum(first & second)
+    assert (fused["CRCPassed"] == 1).all()
+
+    assert fused[["TOW", "SVID"]].values.tolist() == pages[["TOW", "SVID"]].values.tolist()
+    assert np.array_equal(fused[hf.word_columns].values, pages[hf.word_columns].values)
+
+    # the reference receiver is preferred, except for the page failing the
+    # CRC check
+    assert stats["kept"] == [np.sum(first), np.sum(~first)]
+    assert fused["Receiver"].tolist() == np.where(first, 0, 1).tolist()
+    assert stats["unique"] == [np.sum(first & ~second) + 1, np.sum(~first)]
+
+    # second receiver as reference: its page failing the CRC check is
+    # replaced, the order of the receivers applies to the same CRC status
+    fused, stats = hf.fuse_pages(frames[::-1], offsets = [0, -OFFSET])
+
+    assert (fused["CRCPassed"] == 1).all()
+    assert stats["kept"] == [np.sum(second) - 1, np.sum(~second) + 1]
+
+def test_decode_fused(pages, receivers, tmp_path) :
+    frames, _ = receivers
+    fused, _ = hf.fuse_pages(frames)
+
+    fused_times = hf.decode_times(fused, str(tmp_path / "fused"))
+    times = hf.decode_times(pages, str(tmp_path / "all"))
+
+    # the fused stream contains all the pages
+    pd.testing.assert_frame_equal(fused_times, times)
+
+    for ctype in ("orb", "clk", "cb", "cp") :
+        with open(str(tmp_path / f"fused_has_{ctype}.csv")) as fin :
+            with open(str(tmp_path / f"all_has_{ctype}.csv")) as fall :
+                assert fin.read() == fall.read()
+
+    singles = [hf.decode_times(df, str(tmp_path / f"rx{ii}")) for ii, df in enumerate(frames)]
+    comp = hf.compare_completion(fused_times, singles)
+
+    assert comp["messages"] == len(times)
+    assert comp["receiver_messages"] == [len(single) for single in singles]
+    assert len(comp["gains"]) + comp["only_fused"] == len(times)
+    assert (comp["gains"] >= 0).all()
+    assert comp["earlier"] > 0
+
+def test_compare_completion() :
+    fused = pd.DataFrame({"ToW" : [100, 110, 130, 5], "WN" : [2400, 2400, 2400, 2401], \
+                          "Message_ID" : [1, 2, 1, 1]})
+
+    # the message 1 completed at 100 by the fused stream is completed at 104
+    # by the first receiver and at 120 by the second one. The message 3 is
+    # not decoded by the fused stream
+    singles = [pd.DataFrame({"ToW" : [104, 140, 10], "WN" : [2400, 2400, 2401], \
+                             "Message_ID" : [1, 1, 1]}), \
+               pd.DataFrame({"ToW" : [120, 110, 604795], "WN" : [2400, 2400, 2400], \
+                             "Message_ID" : [1, 3, 2]})]
+
+    comp = hf.compare_completion(fused, singles)
+
+    assert comp["receiver_messages"] == [3, 3]
+    assert comp["only_fused"] == 0
+    assert comp["gains"].tolist() == [4, 604795 - 110, 10, 5]
+    assert comp["earlier"] == 4
+    assert comp["max"] == 604795 - 110
+
+def test_parse_fused(receivers, tmp_path, capsys) :
+    frames, _ = receivers
+
+    sources = [(str(tmp_path / "rx1.sbf"), "sep", "bin"), (str(tmp_path / "rx2.jps"), "jav", None)]
+    hg.write_sbf(frames[0], sources[0][0])
+    hg.write_greis(frames[1], sources[1][0])
+
+    stats = hf.parse_fused(sources, str(tmp_path / "fused"), compare = True)
+
+    assert stats["offsets"] == [0, OFFSET]
+    assert stats["output"] == stats["kept"][0] + stats["kept"][1]
+    assert stats["completion"]["earlier"] > 0
+
+    assert "rx2.jps" in capsys.readouterr().out
+
+    with pytest.raises(Exception) :
+        hf.parse_fused(sources, str(tmp_path / "fused"), _index = True)
+
+    # the same corrections as the fused pages
+    fused, _ = hf.fuse_pages(frames)
+    pc.decode_data(fused, str(tmp_path / "pages"))
+
+    with open(str(tmp_path / "fused_has_orb.csv")) as fin :
+        with open(str(tmp_path / "pages_has_orb.csv")) as fpages :
+            assert fin.read() == fpages.read()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:14:37 2026
+
+@author: daniele
+
+Summary :
+    Tests of the suppression of the repeated HAS messages and of the
+    unchanged corrections (change-only output): the rows written must not
+    depend on the interpretation cache, on the RTCM output or on the start of
+    the processing (replay of a time window).
+"""
+
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import has_corrections as hc
+import has_decoder as hd
+import has_generator as hg
+import process_cnav as pc
+import timefun as tf
+
+# correction files
+CTYPES = ("orb", "clk", "cb", "cp")
+
+
+def read_rows(basename) :
+    """
+    Summary :
+        Rows of the correction files of basename, without the header.
+    """
+    out = {}
+    for ctype in CTYPES :
+        with open(f"{basename}_has_{ctype}.csv") as fin :
+            out[ctype] = fin.read().splitlines()[1:]
+
+    return out
+
+class fixed_content :
+    """
+    Summary :
+        Content generator whose corrections do not change and are all
+        referred to the same ToH and IOD Set: the messages differ only by
+        their blocks.
+    """
+    def __init__(self, toh = 0, iod_id = 1) :
+        self.content = hg.has_content_generator(seed = 1)
+        self.toh = toh
+        self.iod_id = iod_id
+
+    def evolve(self) :
+        pass
+
+    def new_iods(self) :
+        pass
+
+    def get_message(self, toh, blocks, mask_id = 1, iod_id = 0) :
+        return self.content.get_message(self.toh, blocks, mask_id, self.iod_id)
+
+def test_repetitions_suppressed(pages, tmp_path) :
+    pc.decode_data(pages, str(tmp_path / "all"), _duplicates = True)
+    pc.decode_data(pages, str(tmp_path / "def"))
+
+    full = read_rows(str(tmp_path / "all"))
+    rows = read_rows(str(tmp_path / "def"))
+
+    assert sum(map(len, rows.values())) < sum(map(len, full.values()))
+
+    # the same corrections, each written once
+    for ctype in CTYPES :
+        assert set(row.split(",", 2)[2] for row in rows[ctype]) == \
+               set(row.split(",", 2)[2] for row in full[ctype])
+
+def test_output_independent_of_cache(pages, tmp_path, monkeypatch) :
+    pc.decode_data(pages, str(tmp_path / "def"))
+    expected = read_rows(str(tmp_path / "def"))
+
+    # no interpretation cache when the corrections are streamed as RTCM
+    pc.decode_data(pages, str(tmp_path / "rtcm"), _rtcm = str(tmp_path / "syn.rtcm"))
+    assert read_rows(str(tmp_path / "rtcm")) == expected
+
+    monkeypatch.setattr(hd.has_decoder, "MESSAGE_CACHE_SIZE", 1)
+    pc.decode_data(pages, str(tmp_path / "small"))
+    assert read_rows(str(tmp_path / "small")) == expected
+
+@pytest.mark.parametrize("options", [{}, {"_changes_only" : True}])
+def test_replay_unaligned_window(stream_files, tmp_path, options) :
+    source, _rx, _type = stream_files["sbf"]
+
+    filename = str(tmp_path / "syn.sbf")
+    shutil.copy(source, filename)
+
+    pc.parse_data(filename, _rx, _type, _index = True, **options)
+    full = read_rows(filename)
+
+    # the window starts while the corrections of earlier messages are valid
+    tow_start, tow_end = 345703, 345807
+    pc.replay(filename, _rx, _type, tow_start, tow_end, **options)
+    rows = read_rows(filename + f"_replay_{tow_start}_{tow_end}")
+
+    for ctype in CTYPES :
+        expected = [row for row in full[ctype] \
+                    if tow_start <= int(row.split(",")[0]) <= tow_end]
+
+        assert len(expected) > 0
+        assert rows[ctype] == expected
+
+@pytest.mark.parametrize("tow_start, tow_end", [(604700, 604900), (604830, 604920)])
+def test_replay_week_rollover(tmp_path, tow_start, tow_end) :
+    # stream across the end of the week 2400
+    pages = hg.has_stream_generator(tow = tf.WEEK_SECONDS - 200, seed = 1).generate(360)
+
+    rollover = pages["TOW"].values >= tf.WEEK_SECONDS
+    wrapped = pages.assign(TOW = np.where(rollover, pages["TOW"] - tf.WEEK_SECONDS, pages["TOW"]), \
+                           **{"WNc [w]" : np.where(rollover, 2401, 2400)})
+
+    filename = str(tmp_path / "week.sbf")
+    hg.write_sbf(wrapped, filename)
+
+    pc.parse_data(filename, "sep", "bin", _index = True)
+    full = read_rows(filename)
+
+    # the epochs are decoded in order of time, as without the rollover
+    pc.decode_data(pages, str(tmp_path / "continuous"))
+    continuous = read_rows(str(tmp_path / "continuous"))
+
+    for ctype in CTYPES :
+        assert [row.split(",", 2)[2] for row in full[ctype]] == \
+               [row.split(",", 2)[2] for row in continuous[ctype]]
+
+    # absolute reference times, also for the messages of the new week
+    index = pd.read_csv(filename + "_has_idx.csv")
+    assert (index["RefTime"] // tf.WEEK_SECONDS).isin([2400, 2401]).all()
+    assert (index["RefTime"] <= index["WN"] * tf.WEEK_SECONDS + index["ToW"]).all()
+
+    # window in the times of week of the first week, continued in the next
+    pc.replay(filename, "sep", "bin", tow_start, tow_end)
+    rows = read_rows(filename + f"_replay_{tow_start}_{tow_end}")
+
+    for ctype in CTYPES :
+        expected = [row for row in full[ctype] if tow_start <= \
+                    (int(row.split(",")[1]) - 2400) * tf.WEEK_SECONDS + int(row.split(",")[0]) <= tow_end]
+
+        assert len(expected) > 0
+        assert rows[ctype] == expected
+
+@pytest.mark.parametrize("not_available", [False, True])
+def test_changes_only(tmp_path, monkeypatch, not_available) :
+    if not_available :
+        interpret = hc.has_orbit_correction.interpret
+
+        def interpret_na(self, *args) :
+            offsets = interpret(self, *args)
+            self.delta_radial = np.nan
+            return offsets
+
+        monkeypatch.setattr(hc.has_orbit_correction, "interpret", interpret_na)
+
+    # the orbits and the clocks are repeated by messages with different
+    # blocks
+    pages = hg.has_stream_generator(content = fixed_content(), seed = 1).generate(60)
+
+    pc.decode_data(pages, str(tmp_path / "def"))
+    pc.decode_data(pages, str(tmp_path / "chg"), _changes_only = True)
+
+    full = read_rows(str(tmp_path / "def"))
+    rows = read_rows(str(tmp_path / "chg"))
+
+    assert len(rows["orb"]) < len(full["orb"])
+    assert len(rows["clk"]) < len(full["clk"])
+
+    # corrections not available are compared as the other values
+    for ctype in CTYPES :
+        assert len(set(row.split(",", 2)[2] for row in rows[ctype])) == len(rows[ctype])
+
+    if not_available :
+        assert all(row.split(",")[8] == "nan" for row in full["orb"])
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:31:08 2026
+
+@author: daniele
+
+Summary :
+    Tests of the operational metrics exported in the Prometheus text format.
+"""
+
+import socket
+import urllib.request
+
+import has_metrics as hmet
+import process_cnav as pc
+
+
+def free_port() :
+    """
+    Summary :
+        Return a free local TCP port.
+    """
+    with socket.socket() as sock :
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def scrape(port) :
+    """
+    Summary :
+        Read the metrics served on a local port.
+    """
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout = 5) as resp :
+        return resp.read().decode("utf-8")
+
+def test_render() :
+    registry = hmet.metrics_registry()
+    registry.counter("pages_total", "Pages").inc(3, crc = "passed")
+    registry.histogram("latency_seconds", "Latency", [1, 10]).observe(5)
+
+    text = registry.render()
+
+    assert 'pages_total{crc="passed"} 3' in text
+    assert 'latency_seconds_bucket{le="1"} 0' in text
+    assert 'latency_seconds_bucket{le="10"} 1' in text
+    assert "latency_seconds_count 1" in text
+
+def test_file_export(pages, tmp_path) :
+    filename = str(tmp_path / "metrics.prom")
+
+    pc.decode_data(pages, str(tmp_path / "syn"), _metrics = filename)
+
+    with open(filename) as fin :
+        text = fin.read()
+
+    assert "has_messages_completed_total" in text
+
+def test_caller_owned_server_outlives_the_run(pages, tmp_path) :
+    port = free_port()
+
+    registry = hmet.metrics_registry()
+    registry.serve(port)
+    try :
+        pc.decode_data(pages, str(tmp_path / "run1"), _metrics = registry)
+        first = scrape(port)
+
+        pc.decode_data(pages, str(tmp_path / "run2"), _metrics = registry)
+        second = scrape(port)
+    finally :
+        registry.close()
+
+    def completed(text) :
+        line = [line for line in text.splitlines() \
+                if line.startswith("has_messages_completed_total")][0]
+        return float(line.split()[-1])
+
+    # the server is still available after each run and the metrics
+    # accumulate
+    assert completed(first) > 0
+    assert completed(second) == 2 * completed(first)
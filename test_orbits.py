@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:46:02 2026
+
+@author: daniele
+
+Summary :
+    Tests of the RINEX navigation reader and of the application of the HAS
+    orbit and clock corrections to the broadcast ephemerides.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import has_orbits as ho
+import rinex_nav as rn
+import timefun as tf
+
+
+@pytest.fixture
+def nav(nav_file) :
+    return rn.ephemeris_store(nav_file)
+
+def epoch(rinex_nav, seconds = 0) :
+    return rinex_nav.wn * tf.WEEK_SECONDS + rinex_nav.tow + seconds
+
+def test_load_rinex3(rinex_nav, tmp_path) :
+    wn, toe = rinex_nav.wn, rinex_nav.tow
+
+    gps = rinex_nav.gps(1, 218, wn, toe)
+    fnav = rinex_nav.gal(11, 100, wn, toe, sources = 258)
+    fnav[0] = 9.0
+
+    filename = str(tmp_path / "nav.rnx")
+    rinex_nav.write(filename, [rinex_nav.record("G", 1, wn, toe, gps),
+                               rinex_nav.record("R", 3, wn, toe, [0.0] * 15),
+                               rinex_nav.record("E", 11, wn, toe, rinex_nav.gal(11, 100, wn, toe)),
+                               rinex_nav.record("E", 11, wn, toe, fnav),
+                               rinex_nav.record("G", 1, wn, toe, gps)])
+
+    df = rn.load_rinex_nav(filename)
+
+    # the GLONASS record is skipped
+    assert df["gnssID"].tolist() == [0, 2, 2, 0]
+    assert df["PRN"].tolist() == [1, 11, 11, 1]
+    assert df["IOD"].tolist() == [218, 100, 100, 218]
+    assert (df["t_oc"] == epoch(rinex_nav)).all()
+    assert (df["t_oe"] == epoch(rinex_nav)).all()
+    assert df["sqrtA"].iloc[0] == 5153.6
+    assert np.isnan(df["spare"].iloc[1])
+
+    # duplicates and F/NAV records are removed
+    nav = rn.ephemeris_store(filename)
+    assert len(nav) == 2
+    assert nav.get(nav.match(2, 11, 100, epoch(rinex_nav)))["af0"] == 5e-4
+
+    nav = rn.ephemeris_store(filename, galileo_source = "fnav")
+    assert nav.get(nav.match(2, 11, 100, epoch(rinex_nav)))["af0"] == 9.0
+
+def test_load_rinex4(rinex_nav, tmp_path) :
+    wn, toe = rinex_nav.wn, rinex_nav.tow
+
+    filename = str(tmp_path / "nav4.rnx")
+    rinex_nav.write(filename, ["> EPH G01 LNAV", rinex_nav.record("G", 1, wn, toe, rinex_nav.gps(1, 218, wn, toe)),
+                               "> EPH G01 CNAV", rinex_nav.record("G", 1, wn, toe, [9.0] * 35),
+                               "> STO G01 ", "    2026 01 08 00 00 00 GPUT  ", "     1.0 2.0",
+                               "> EPH E11 INAV", rinex_nav.record("E", 11, wn, toe, rinex_nav.gal(11, 100, wn, toe))], \
+                     version = "4.00")
+
+    df = rn.load_rinex_nav(filename)
+
+    assert df["gnssID"].tolist() == [0, 2]
+    assert df["af0"].tolist() == [1e-4, 5e-4]
+
+def test_match(nav, rinex_nav) :
+    t0 = epoch(rinex_nav)
+    iod = rinex_nav.iod(0, 1, 0)
+
+    rows = nav.match([0, 0, 0, 0, 2], [1, 1, 1, 9, 1], [iod, iod, -1, iod, rinex_nav.iod(2, 1, 3)], \
+                     [t0 + 100, t0 - 4 * 3600 - 1, t0, t0, t0 + 3 * rinex_nav.interval + 50])
+
+    assert rows[1:4].tolist() == [-1, -1, -1]
+    assert nav.get(rows[[0, 4]])["t_oe"].tolist() == [t0, t0 + 3 * rinex_nav.interval]
+
+def test_reused_iod(rinex_nav, tmp_path) :
+    wn, toe = rinex_nav.wn, rinex_nav.tow
+
+    # the same IOD one day later
+    filename = str(tmp_path / "nav.rnx")
+    rinex_nav.write(filename, [rinex_nav.record("G", 1, wn, toe, rinex_nav.gps(1, 218, wn, toe)),
+                               rinex_nav.record("G", 1, wn, toe + 86400, rinex_nav.gps(1, 218, wn, toe + 86400))])
+
+    nav = rn.ephemeris_store(filename)
+    t0 = epoch(rinex_nav)
+
+    rows = nav.match(0, 1, 218, [t0 + 600, t0 + 86400 - 600, t0 + 43200])
+    assert nav.get(rows[:2])["t_oe"].tolist() == [t0, t0 + 86400]
+    assert rows[2] == -1
+
+def test_broadcast_states(nav, rinex_nav) :
+    t0 = epoch(rinex_nav)
+
+    rows = nav.match([0, 2], [1, 1], [rinex_nav.iod(0, 1, 0), rinex_nav.iod(2, 1, 0)], t0)
+    eph = nav.get(rows)
+    t = np.array([t0 + 1234.5, t0 - 2000.25])
+
+    pos, vel, clock = ho.broadcast_states(eph, t)
+
+    radius = np.linalg.norm(pos, axis = 1)
+    assert radius == pytest.approx([26560e3, 29600e3], rel = 0.01)
+
+    # velocity consistent with the positions
+    pos_after, _, _ = ho.broadcast_states(eph, t + 0.5)
+    pos_before, _, _ = ho.broadcast_states(eph, t - 0.5)
+
+    assert np.abs(pos_after - pos_before - vel).max() < 1e-3
+
+    # clock polynomial, with the relativistic correction
+    assert clock == pytest.approx(eph["af0"] + eph["af1"] * (t - eph["t_oc"]), abs = 5e-8)
+
+def test_corrected_states(nav, rinex_nav) :
+    gnss = [0, 2, 0]
+    prn = [1, 1, 5]
+    iod = [rinex_nav.iod(0, 1, 0), rinex_nav.iod(2, 1, 0), 3]
+    tow = rinex_nav.tow + np.array([1234.5, -2000.25, 0])
+
+    states = ho.corrected_states(nav, gnss, prn, iod, rinex_nav.wn, tow, \
+                                 [1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, 0.5], \
+                                 [1, 2, 1], [0.3, np.nan, 1.0])
+
+    # no ephemeris for the third satellite, no clock correction for the second
+    assert states["valid"].tolist() == [True, False, False]
+    assert states["record"][2] == -1
+
+    delta = states["pos"] - states["pos_brdc"]
+    pos = states["pos_brdc"]
+    vel = states["vel"]
+
+    # the corrections are removed from the broadcast positions
+    assert np.linalg.norm(delta[:2], axis = 1) == pytest.approx([1.0, 2.0])
+    assert delta[0] @ pos[0] / np.linalg.norm(pos[0]) == pytest.approx(-1.0, abs = 1e-3)
+    assert delta[1] @ vel[1] / np.linalg.norm(vel[1]) == pytest.approx(-2.0)
+
+    assert (states["clock"][0] - states["clock_brdc"][0]) * ho.SPEED_OF_LIGHT == pytest.approx(0.3)
+
+def test_correct_epoch(nav, rinex_nav) :
+    iods = [rinex_nav.iod(0, 1, 0), rinex_nav.iod(2, 1, 0), rinex_nav.iod(2, 2, 0)]
+
+    orbits = pd.DataFrame({"gnssID" : [0, 2, 2], "PRN" : [1, 1, 2], "gnssIOD" : iods,
+                           "delta_radial" : [1.0, 0.0, 0.5], "delta_in_track" : [0.0, 2.0, 0.0],
+                           "delta_cross_track" : [0.0, 0.0, 0.0]})
+
+    # the clock of Galileo 1 refers to another IOD, the one of Galileo 2
+    # should not be used
+    clocks = pd.DataFrame({"gnssID" : [0, 2, 2], "PRN" : [1, 1, 2], \
+                           "gnssIOD" : [iods[0], iods[1] + 1, iods[2]], \
+                           "multiplier" : [1.0, 2.0, 1.0], "delta_clock_c0" : [0.3, 0.1, 0.2], \
+                           "status" : [0, 0, 1]})
+
+    out = ho.correct_epoch(nav, orbits, clocks, rinex_nav.wn, rinex_nav.tow + 30)
+
+    assert out[["gnssID", "PRN", "IOD"]].values.tolist() == [[0, 1, iods[0]]]
+    assert (out["clock"] - out["clock_brdc"]).iloc[0] * ho.SPEED_OF_LIGHT == pytest.approx(0.3)
+
+    # broadcast clocks
+    out = ho.correct_epoch(nav, orbits, None, rinex_nav.wn, rinex_nav.tow + 30)
+
+    assert out["PRN"].tolist() == [1, 1, 2]
+    assert (out["clock"] == out["clock_brdc"]).all()
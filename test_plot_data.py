@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:32:10 2026
+
+@author: daniele
+
+Summary :
+    Tests of the columnar data layer of the plot scripts on small
+    hand-written correction files.
+"""
+
+import os
+import importlib
+
+import numpy as np
+import pytest
+
+# folder of the plot scripts
+PLOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plot")
+
+CLK_HEADER = "ToW,WN,ToH,IOD,gnssIOD,validity,gnssID,PRN,multiplier,delta_clock_c0,status\n"
+
+# rows not sorted, a duplicated epoch of GPS 1 (reference time 345610) and
+# Galileo 3 across the end of the week 2400
+CLK_ROWS = ["345630,2400,20,1,20,60,0,2,1.0,0.5,0",
+            "345620,2400,10,1,10,60,0,1,1.0,0.1,0",
+            "604790,2400,3590,1,30,60,2,3,2.0,0.7,0",
+            "345625,2400,10,1,10,60,0,1,1.0,0.2,0",
+            "10,2401,0,1,31,60,2,3,1.0,0.8,1",
+            "345600,2400,0,1,10,60,0,1,1.0,0.05,0"]
+
+CB_HEADER = "ToW,WN,ToH,IOD,gnssIOD,validity,gnssID,PRN,signal,code_bias,av_flag\n"
+
+CB_ROWS = ["345621,2400,20,1,218,600,0,1,7,0.3,1.0",
+           "345621,2400,20,1,218,600,0,1,0,-0.3,1.0",
+           "345621,2400,20,1,90,600,2,5,1,0.2,1.0",
+           "345631,2400,30,1,218,600,0,4,0,0.1,1.0"]
+
+
+@pytest.fixture
+def pd_mod(monkeypatch) :
+    """
+    Summary :
+        The plot_data module of the plot scripts.
+    """
+    monkeypatch.syspath_prepend(PLOT_DIR)
+
+    return importlib.import_module("plot_data")
+
+def write_csv(filename, header, rows) :
+    with open(filename, "w") as fout :
+        fout.write(header + "\n".join(rows) + "\n")
+
+    return str(filename)
+
+def test_sorted_without_duplicates(pd_mod, tmp_path) :
+    filename = write_csv(tmp_path / "syn_has_clk.csv", CLK_HEADER, CLK_ROWS)
+
+    data = pd_mod.plot_data(filename, cache = False)
+
+    assert data.ctype == "clk"
+    assert data.gnss_list() == [0, 2]
+    assert data.satellites(0) == [1, 2]
+
+    # sorted by (gnss, signal, PRN, time)
+    assert data.arrays["gnssID"].tolist() == [0, 0, 0, 2, 2]
+    assert data.arrays["PRN"].tolist() == [1, 1, 2, 3, 3]
+    assert np.all(data.arrays["signal"] == -1)
+
+    # the first row of the file is kept for the duplicated epoch
+    gps = data.get(0, 1)
+    assert gps["tow"].tolist() == [345600, 345610]
+    assert gps["delta_clock_c0"].tolist() == [0.05, 0.1]
+
+    assert data.get(0, 2)["tow"].tolist() == [345620]
+
+    # times of the first week, continued in the next one
+    gal = data.get(2, 3)
+    assert gal["time"].tolist() == [2400 * 604800 + 604790, 2401 * 604800]
+    assert gal["tow"].tolist() == [604790, 604800]
+    assert gal["status"].tolist() == [0, 1]
+
+    # views on the sorted arrays
+    assert np.shares_memory(gal["multiplier"], data.arrays["multiplier"])
+
+    with pytest.raises(KeyError) :
+        data.get(0, 9)
+
+def test_signals(pd_mod, tmp_path) :
+    filename = write_csv(tmp_path / "syn_has_cb.csv", CB_HEADER, CB_ROWS)
+
+    data = pd_mod.plot_data(filename, cache = False)
+
+    assert data.signals(0) == [0, 7]
+    assert data.satellites(0, 0) == [1, 4]
+    assert data.satellites(0, 7) == [1]
+    assert data.get(0, 1, 7)["code_bias"].tolist() == [0.3]
+    assert data.get(2, 5, 1)["tow"].tolist() == [345620]
+
+def test_cache(pd_mod, tmp_path, monkeypatch) :
+    filename = write_csv(tmp_path / "syn_has_clk.csv", CLK_HEADER, CLK_ROWS)
+
+    data = pd_mod.plot_data(filename)
+    assert os.path.exists(filename + ".npz")
+
+    # the cache is used while the CSV file is not modified
+    def no_csv(self) :
+        raise AssertionError("CSV file read")
+
+    with monkeypatch.context() as mp :
+        mp.setattr(pd_mod.plot_data, "load_csv", no_csv)
+        cached = pd_mod.plot_data(filename)
+
+    assert cached.index == data.index
+    for key, val in data.arrays.items() :
+        assert np.array_equal(cached.arrays[key], val)
+
+    # modified file: the cache is rebuilt
+    write_csv(filename, CLK_HEADER, CLK_ROWS + ["345640,2400,30,1,20,60,0,2,1.0,0.6,0"])
+
+    data = pd_mod.plot_data(filename)
+    assert data.get(0, 2)["delta_clock_c0"].tolist() == [0.5, 0.6]
+
+    # no cache requested
+    os.remove(filename + ".npz")
+    pd_mod.plot_data(filename, cache = False)
+    assert not os.path.exists(filename + ".npz")
+
+def test_correction_type(pd_mod) :
+    assert pd_mod.get_correction_type("/data/SEPT267.sbf_has_orb.csv") == "orb"
+    assert pd_mod.get_correction_type("syn_has_cp") == "cp"
+
+    for filename in ("syn_has_ion.csv", "syn_has_err.csv", "syn.csv") :
+        with pytest.raises(Exception) :
+            pd_mod.get_correction_type(filename)
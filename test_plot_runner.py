@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:06:23 2026
+
+@author: daniele
+
+Summary :
+    Tests of the headless plot runner, rendering the figures of the
+    corrections decoded from a synthetic stream. They require matplotlib and
+    are skipped when it is not installed.
+"""
+
+import os
+import json
+import importlib
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")
+
+import process_cnav as pc
+
+# folder of the plot scripts
+PLOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plot")
+
+
+@pytest.fixture
+def pr(monkeypatch) :
+    """
+    Summary :
+        The plot_runner module, with the plot scripts importable.
+    """
+    monkeypatch.syspath_prepend(PLOT_DIR)
+
+    return importlib.import_module("plot_runner")
+
+def test_incremental_rendering(pr, pages, tmp_path) :
+    pc.decode_data(pages, str(tmp_path / "syn"))
+    basename = str(tmp_path / "syn_has")
+
+    num_rendered, num_skipped = pr.run(basename, processes = 2, max_points = 500)
+
+    with open(basename + "_plots.json") as fin :
+        manifest = json.load(fin)
+
+    assert num_rendered == len(manifest) > 0
+    assert num_skipped == 0
+    assert all(os.path.exists(name) for entry in manifest.values() for name in entry["outputs"])
+
+    # nothing changed
+    assert pr.run(basename, processes = 2, max_points = 500) == (0, num_rendered)
+
+    # new clock corrections: only the clock figures are redrawn
+    filename = basename + "_clk.csv"
+    df = pd.read_csv(filename)
+    df.iloc[: len(df) // 2].to_csv(filename, index = False)
+
+    num_clk = sum(1 for key in manifest if key.split("|")[1].endswith("_clk.csv"))
+    assert num_clk > 0
+
+    assert pr.run(basename, processes = 2, max_points = 500) == (num_clk, num_rendered - num_clk)
+
+    # a missing figure is redrawn
+    key = sorted(manifest)[0]
+    os.remove(manifest[key]["outputs"][0])
+
+    assert pr.run(basename, processes = 2, max_points = 500) == (1, num_rendered - 1)
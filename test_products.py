@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:10:31 2026
+
+@author: daniele
+
+Summary :
+    Tests of the SP3 and RINEX clock products computed from the HAS
+    corrections, from the CSV files and while decoding.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import has_correction_store as hcs
+import has_orbits as ho
+import has_products as hpr
+import process_cnav as pc
+import rinex_nav as rn
+import timefun as tf
+
+
+def read_sp3(filename) :
+    """
+    Summary :
+        Read the epochs and the P records of a SP3 file.
+
+    Returns :
+        Number of epochs of the header, list of the epochs (seconds since the
+        GPS epoch) and dictionary {(epoch, satellite) : [x, y, z, clock]}.
+    """
+    with open(filename) as fin :
+        lines = fin.read().splitlines()
+
+    epochs = []
+    records = {}
+    for line in lines :
+        if line[0] == "*" :
+            fields = line[1:].split()
+            tow, week = tf.DatesToGps(int(fields[0]), int(fields[1]), int(fields[2]), \
+                                      int(fields[3]) + int(fields[4]) / 60 + float(fields[5]) / 3600)
+            epochs.append(int(round(week * tf.WEEK_SECONDS + tow)))
+        elif line[0] == "P" :
+            records[(epochs[-1], line[1:4])] = [float(line[4 + 14 * ii:18 + 14 * ii]) for ii in range(4)]
+
+    assert lines[-1] == "EOF"
+
+    return int(lines[0].split()[6]), epochs, records
+
+def latest(cors, gnss, prn, t) :
+    """
+    Summary :
+        Latest correction of a satellite valid at t, None if there is none.
+    """
+    t_ref = tf.ToHToTow(cors["ToW"].values, cors["ToH"].values, cors["WN"].values)
+
+    sel = (cors["gnssID"].values == gnss) & (cors["PRN"].values == prn) & \
+          (t_ref <= t) & (t - t_ref <= cors["validity"].values)
+
+    return None if not np.any(sel) else cors[sel].iloc[-1]
+
+def test_products_from_csv(nav_file, correction_files, tmp_path) :
+    nav = rn.ephemeris_store(nav_file)
+    sp3 = str(tmp_path / "has.sp3")
+    clk = str(tmp_path / "has.clk")
+
+    num_epochs = hpr.products_from_csv(nav, correction_files, 30, sp3 = sp3, clk = clk, \
+                                       sp3_version = "c", block = 100)
+
+    num_header, epochs, records = read_sp3(sp3)
+
+    assert num_header == len(epochs) == num_epochs
+    assert np.all(np.diff(epochs) == 30)
+    assert len(records) == 16 * num_epochs
+
+    orbits = pd.read_csv(correction_files + "_has_orb.csv")
+    clocks = pd.read_csv(correction_files + "_has_clk.csv")
+
+    rng = np.random.default_rng(2)
+    t0 = epochs[0]
+
+    # random epochs and satellites, and the clock gap of GPS 3
+    checks = [(epochs[ii], 2 * int(gnss), int(prn)) for ii, gnss, prn in \
+              zip(rng.integers(0, len(epochs), 40), rng.integers(0, 2, 40), rng.integers(1, 9, 40))]
+    checks += [(t0 + 7200 + dt, 0, 3) for dt in range(0, 900, 120)]
+
+    num_bad_clocks = 0
+    for t, gnss, prn in checks :
+        sat = f"{'G' if gnss == 0 else 'E'}{prn:02d}"
+        values = records[(t, sat)]
+
+        orb = latest(orbits, gnss, prn, t)
+        cor = latest(clocks, gnss, prn, t)
+
+        # clocks used only if referred to the same ephemeris and to be used
+        if cor is not None and (cor["gnssIOD"] != orb["gnssIOD"] or cor["status"] != 0) :
+            cor = None
+
+        states = ho.corrected_states(nav, [gnss], [prn], [orb["gnssIOD"]], 0, [t], \
+                                     [orb["delta_radial"]], [orb["delta_in_track"]], \
+                                     [orb["delta_cross_track"]], \
+                                     [np.nan if cor is None else cor["multiplier"]], \
+                                     [np.nan if cor is None else cor["delta_clock_c0"]])
+
+        assert values[:3] == pytest.approx(states["pos"][0] / 1e3, abs = 1e-6)
+
+        if cor is None :
+            assert values[3] == hpr.SP3_BAD_CLOCK
+            num_bad_clocks += 1
+        else :
+            assert values[3] == pytest.approx(states["clock"][0] * 1e6, abs = 1e-6)
+
+    assert num_bad_clocks > 0
+
+    # clock records of the available clocks, as in the SP3 file
+    with open(clk) as fin :
+        lines = fin.read().splitlines()
+
+    end = lines.index(" " * 60 + "END OF HEADER")
+    assert all(line[60:] != "" for line in lines[:end])
+
+    clock_records = [line for line in lines[end + 1:] if line.startswith("AS ")]
+    sp3_clocks = [val[3] for val in records.values() if val[3] != hpr.SP3_BAD_CLOCK]
+
+    assert len(clock_records) == len(sp3_clocks)
+    assert float(clock_records[0].split()[-1]) * 1e6 == pytest.approx(sp3_clocks[0], abs = 1e-6)
+
+def test_stream_matches_csv(pages, rinex_nav, tmp_path) :
+    basename = str(tmp_path / "syn")
+    pc.decode_data(pages, basename)
+
+    # ephemerides with the IODs of the corrections
+    orbits = pd.read_csv(basename + "_has_orb.csv")
+    sats = orbits[["gnssID", "PRN", "gnssIOD"]].drop_duplicates()
+
+    wn, toe = rinex_nav.wn, rinex_nav.tow
+    records = []
+    for gnss, prn, iod in sats.values.tolist() :
+        if gnss == 0 :
+            records.append(rinex_nav.record("G", prn, wn, toe, rinex_nav.gps(prn, iod, wn, toe)))
+        else :
+            records.append(rinex_nav.record("E", prn, wn, toe, rinex_nav.gal(prn, iod, wn, toe)))
+
+    rinex_nav.write(str(tmp_path / "nav.rnx"), records)
+    nav = rn.ephemeris_store(str(tmp_path / "nav.rnx"))
+
+    # products while decoding
+    store = hcs.has_correction_store()
+    stream = hpr.product_stream(nav, store, 10, sp3 = str(tmp_path / "stream.sp3"), block = 7)
+
+    pc.decode_data(pages, str(tmp_path / "dec"), _store = store, _on_message = stream.on_message)
+    stream.close()
+
+    _, epochs, records = read_sp3(str(tmp_path / "stream.sp3"))
+    assert len(epochs) > 10
+    assert any(val[0] != 0 for val in records.values())
+
+    # same epochs from the CSV files
+    hpr.products_from_csv(nav, basename, 10, sp3 = str(tmp_path / "csv.sp3"), \
+                          start = epochs[0], stop = epochs[-1])
+
+    assert read_sp3(str(tmp_path / "csv.sp3"))[1:] == (epochs, records)
@@ -6,6 +6,9 @@ Created on Sat Jun 12 13:18:29 2021
 @author: daniele
 """
 
+import os
+import tempfile
+
 import galois
 import reed_solomon as rd
 import numpy as np
@@ -29,16 +32,21 @@ H =  rd.get_encoding_matrix(gf2m, p)
  
 enc_msg2 = np.flip(H @ gf2m(np.flip(message)))
 
-H1 = np.fliplr(np.flipud(H))
+H1 = rd.get_has_encoding_matrix(gf2m, k)
 
-# print the matrix to file
-fout = open("has_encoding_matrix.csv", "w")
+# Batch encoding through the encoding matrix
+enc_msg3 = rd.rs_encode_batch(gf2m, message, H1)[0]
 
-for ii in range(H1.shape[0]) :
-    for jj in range(H1.shape[1]) :
-        if jj != 0 :
-            fout.write(',')
-        fout.write(str(int(H1[ii,jj])))
-    fout.write('\n')
+if not (np.array_equal(enc_msg, enc_msg2) and np.array_equal(enc_msg, enc_msg3)) :
+    print("Inconsistent encoding")
 
-fout.close()
\ No newline at end of file
+# print the matrix to file
+rd.save_encoding_matrix(H1, "has_encoding_matrix.csv")
+
+# the binary format is only checked: the module uses the CSV file
+with tempfile.TemporaryDirectory() as tmp_dir :
+    npy_name = os.path.join(tmp_dir, "has_encoding_matrix.npy")
+    rd.save_encoding_matrix(H1, npy_name)
+    
+    if not np.array_equal(np.load(npy_name), H1) :
+        print("Inconsistent binary encoding matrix")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:05:12 2026
+
+@author: daniele
+
+Summary :
+    Tests of the bit layout of the RTCM SSR messages encoded from the HAS
+    corrections.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+import has_corrections as hc
+import has_rtcm as hr
+
+WN = 2400
+
+
+class bit_reader :
+    """
+    Summary :
+        Sequential reader of the fields of a RTCM payload.
+    """
+    def __init__(self, payload) :
+        self.body = np.frombuffer(payload, dtype = np.uint8)
+        self.byte_offset = 0
+        self.bit_offset = 0
+
+    def get(self, num_bits, signed = False) :
+        val, self.byte_offset, self.bit_offset = \
+            hc.get_bits(self.body, self.byte_offset, self.bit_offset, num_bits)
+
+        return int(hc.two_complement(val, num_bits)) if signed else int(val)
+
+def correction(gnss_ID, prn, **kwargs) :
+    """
+    Summary :
+        Correction with the attributes used by the encoder, received at ToW
+        345620 with ToH 10 (reference time 345610).
+    """
+    return SimpleNamespace(gnss_ID = gnss_ID, prn = prn, wn = WN, tow = 345620, toh = 10, \
+                           validity = 300, IOD = 19, **kwargs)
+
+def payloads(frames) :
+    """
+    Summary :
+        Check the framing and return the payloads of RTCM frames.
+    """
+    out = []
+    for frame in frames :
+        assert frame[0] == 0xD3
+        length = (frame[1] << 8) | frame[2]
+        assert len(frame) == length + 6
+        assert hr.crc24q(frame) == 0
+
+        out.append(frame[3:-3])
+
+    return out
+
+def test_crc24q() :
+    # check value of the CRC-24Q
+    assert hr.crc24q(b"123456789") == 0xCDE703
+
+    data = bytes(range(200))
+    assert hr.crc24q(data + hr.crc24q(data).to_bytes(3, "big")) == 0
+
+def test_quantize() :
+    assert hr.quantize(0.0123, 0.0025, 13) == 5
+    assert hr.quantize(-0.0123, 0.0025, 13) == -5
+
+    # saturation to the range of the fields, without the reserved codes
+    assert hr.quantize(100.0, 0.0025, 13) == 4095
+    assert hr.quantize(-100.0, 0.0025, 13) == -4095
+    assert hr.quantize(100.0, 0.0025, 13, reserved = 2) == 4094
+    assert hr.quantize(-100.0, 0.0025, 13, reserved = 2) == -4094
+
+def test_bit_writer_inverse_of_get_bits() :
+    fields = [(5, 3), (-2, 6), (1023, 10), (-70000, 22), (1, 1), (0x1FFFFFF, 25)]
+
+    bw = hc.bit_writer()
+    for val, num_bits in fields :
+        bw.put_bits(val, num_bits)
+
+    reader = bit_reader(bw.get_bytes(12).tobytes())
+    assert [reader.get(num_bits, val < 0) for val, num_bits in fields] == [val for val, _ in fields]
+
+def test_galileo_orbit_layout() :
+    cor = correction(hr.GAL_ID, 11, gnss_IOD = 700, delta_radial = 0.1234, \
+                     delta_in_track = -0.5, delta_cross_track = 0.0412)
+
+    payload, = payloads(hr.rtcm_ssr_encoder(provider_id = 7, solution_id = 2).encode("orbit", [cor]))
+    reader = bit_reader(payload)
+
+    assert reader.get(12) == 1240
+    assert reader.get(20) == 345610
+    assert hr.UPDATE_INTERVALS[reader.get(4)] == 300
+    assert reader.get(1) == 0            # multiple message
+    assert reader.get(1) == 0            # datum
+    assert reader.get(4) == 19 & 0xF     # IOD SSR
+    assert reader.get(16) == 7
+    assert reader.get(4) == 2
+    assert reader.get(6) == 1
+
+    assert reader.get(6) == 11
+    assert reader.get(10) == 700
+    assert reader.get(22, True) == 1234
+    assert reader.get(20, True) == -1250
+    assert reader.get(20, True) == 103
+    assert [reader.get(21), reader.get(19), reader.get(19)] == [0, 0, 0]
+
+def test_gps_clock_layout() :
+    cors = [correction(hr.GPS_ID, 3, multiplier = 2, delta_clock_c0 = -0.01, status = 0),
+            correction(hr.GPS_ID, 4, multiplier = 1, delta_clock_c0 = 0.2, status = 1)]
+
+    payload, = payloads(hr.rtcm_ssr_encoder().encode("clock", cors))
+    reader = bit_reader(payload)
+
+    assert reader.get(12) == 1058
+    reader.get(20 + 4 + 1 + 4 + 16 + 4)
+
+    # the satellite whose clock should not be used is not encoded
+    assert reader.get(6) == 1
+    assert reader.get(6) == 3
+    assert reader.get(22, True) == -200
+    assert len(payload) == (12 + 29 + 20 + 6 + 6 + 22 + 21 + 27 + 7) // 8
+
+def test_code_bias_signals() :
+    # E1-C, E5a-Q (not available), E6-C and a reserved signal
+    cor = correction(hr.GAL_ID, 5, signals = [1, 4, 13, 15], \
+                     biases = np.array([0.52, 1.0, -0.3, 0.1]), \
+                     availability_flags = np.array([1, 0, 1, 1]))
+
+    payload, = payloads(hr.rtcm_ssr_encoder().encode("code_bias", [cor]))
+    reader = bit_reader(payload)
+
+    assert reader.get(12) == 1242
+    reader.get(20 + 4 + 1 + 4 + 16 + 4 + 6)
+
+    assert reader.get(6) == 5
+    assert reader.get(5) == 2
+    assert [reader.get(5), reader.get(14, True)] == [2, 52]
+    assert [reader.get(5), reader.get(14, True)] == [16, -30]
+
+def test_multiple_messages() :
+    cors = [correction(hr.GAL_ID, prn % 36 + 1, multiplier = 1, delta_clock_c0 = 0.1, status = 0) \
+            for prn in range(70)]
+
+    frames = payloads(hr.rtcm_ssr_encoder().encode("clock", cors))
+    assert len(frames) == 2
+
+    sats = []
+    for ii, payload in enumerate(frames) :
+        reader = bit_reader(payload)
+        reader.get(12 + 20 + 4)
+
+        assert reader.get(1) == (1 if ii == 0 else 0)
+
+        reader.get(4 + 16 + 4)
+        sats.append(reader.get(6))
+
+    assert sats == [63, 7]
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:48:51 2026
+
+@author: daniele
+
+Summary :
+    Tests of the message notifications used by the correction server and of
+    its HTTP interface, queried with asyncio connections.
+"""
+
+import json
+import time
+import asyncio
+
+import pytest
+
+import has_correction_store as hcs
+import has_server as hs
+import process_cnav as pc
+
+
+def test_recovered_messages_are_notified(pages, tmp_path, capsys) :
+    # the stream starts after the first mask: the first messages wait for
+    # the next one
+    df = pages[pages["TOW"].values >= pages["TOW"].values[0] + 10]
+
+    released = []
+    notified = []
+
+    pc.decode_data(df, str(tmp_path / "syn"), _on_message = lambda *args : notified.append(args), \
+                   _before_message = lambda *args : released.append(args))
+
+    assert "Messages deferred waiting for their mask" in capsys.readouterr().out
+
+    # each message is notified once, when it is interpreted
+    assert len(notified) == len(released)
+    assert len(set(notified)) == len(notified)
+
+def test_corrections_stored_after_release(pages, tmp_path) :
+    store = hcs.has_correction_store()
+    events = []
+
+    def count() :
+        return sum(store.counts.values())
+
+    pc.decode_data(pages, str(tmp_path / "syn"), _store = store, \
+                   _on_message = lambda *args : events.append(("notified", count())), \
+                   _before_message = lambda *args : events.append(("released", count())))
+
+    # nothing is stored between the notification of a message and the
+    # release of the next one
+    for prev, event in zip(events[:-1], events[1:]) :
+        if event[0] == "released" :
+            assert event[1] == prev[1]
+
+    assert events[-1][1] == count() > 0
+
+def test_serve_realtime(stream_files) :
+    filename, _rx, _type = stream_files["sbf"]
+
+    t0 = time.monotonic()
+    server = hs.serve(filename, _rx, _type, port = 0, realtime = 1000)
+    try :
+        elapsed = time.monotonic() - t0
+
+        # the 240 s stream is released at 1000 times the real-time rate
+        assert elapsed >= 0.2
+        assert len(server.store) > 0
+
+        deadline = time.monotonic() + 5
+        while server.seq == 0 and time.monotonic() < deadline :
+            time.sleep(0.01)
+
+        assert server.seq > 0
+    finally :
+        server.stop()
+
+@pytest.fixture
+def server(pages, tmp_path) :
+    """
+    Summary :
+        Server started on a free port, with the corrections of the synthetic
+        stream and the notification of its last message.
+    """
+    store = hcs.has_correction_store()
+    messages = []
+
+    pc.decode_data(pages, str(tmp_path / "syn"), _store = store, \
+                   _on_message = lambda *args : messages.append(args))
+
+    server = hs.correction_server(store, port = 0)
+    server.start()
+
+    server.notify(*messages[-1])
+    wait_for(lambda : server.seq == 1)
+
+    yield server
+
+    server.stop()
+
+def wait_for(condition, timeout = 5) :
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline :
+        time.sleep(0.01)
+
+    assert condition()
+
+async def request(reader, writer, path, close = False) :
+    """
+    Summary :
+        Send a GET request on a connection and read the response.
+
+    Returns :
+        Status, headers (lower case names) and body of the response.
+    """
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n".encode("latin-1") + \
+                 (b"Connection: close\r\n" if close else b"") + b"\r\n")
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+
+    headers = {}
+    while True :
+        line = (await reader.readline()).decode("latin-1")
+        if line == "\r\n" :
+            break
+
+        key, _, val = line.partition(":")
+        headers[key.strip().lower()] = val.strip()
+
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+    return status, headers, body
+
+def expected_json(obj) :
+    return json.loads(json.dumps(hs._sanitize(obj)))
+
+def test_corrections(server) :
+    store = server.store
+    wn, tow = server.last_event["WN"], server.last_event["ToW"]
+
+    async def run() :
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+
+        # several requests on the same connection (keep-alive)
+        status, _, body = await request(reader, writer, "/status")
+        assert status == 200
+        assert json.loads(body)["messages"] == 1
+
+        status, _, body = await request(reader, writer, "/corrections/clock")
+        assert status == 200
+        assert json.loads(body) == expected_json(store.get_epoch("clock", wn, tow).to_dict("records"))
+
+        row = store.get_epoch("orbit", wn, tow).iloc[0]
+        status, _, body = await request(reader, writer, \
+                                        f"/corrections/orbit/{row['gnssID']}/{row['PRN']}")
+        assert status == 200
+        assert json.loads(body) == expected_json(store.get_values("orbit", int(row["gnssID"]), \
+                                                                  int(row["PRN"]), None, wn, tow))
+
+        # requested epoch, before the corrections
+        status, _, body = await request(reader, writer, f"/corrections/clock?wn={wn}&tow=0")
+        assert (status, json.loads(body)) == (200, [])
+
+        for path in ("/unknown", "/corrections/ionosphere", "/corrections/orbit/2/99") :
+            status, _, body = await request(reader, writer, path)
+            assert status == 404
+            assert "error" in json.loads(body)
+
+        # the server closes the connection when requested
+        status, headers, _ = await request(reader, writer, "/status", close = True)
+        assert (status, headers["connection"]) == (200, "close")
+        assert await reader.read() == b""
+
+        writer.close()
+
+    asyncio.run(run())
+
+def test_wait(server) :
+    async def run() :
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+
+        # no message after the last one within the timeout
+        status, _, _ = await request(reader, writer, "/wait?since=1&timeout=0.1")
+        assert status == 204
+
+        pending = asyncio.ensure_future(request(reader, writer, "/wait?since=1&timeout=10"))
+
+        await asyncio.sleep(0.2)
+        assert not pending.done()
+
+        # a new message is added to the store
+        store = server.store
+        num_clocks = store.counts["clock"]
+
+        row = store.get_epoch("clock", server.last_event["WN"], server.last_event["ToW"]).iloc[0]
+        store.add("clock", [store.latest("clock", int(row["gnssID"]), int(row["PRN"]))])
+        server.notify(server.last_event["ToW"] + 10, server.last_event["WN"], 7)
+
+        status, _, body = await asyncio.wait_for(pending, 5)
+        assert status == 200
+        assert json.loads(body)["seq"] == 2
+        assert json.loads(body)["MessageID"] == 7
+
+        # messages already notified are returned immediately
+        status, _, body = await request(reader, writer, "/wait?since=0")
+        assert (status, json.loads(body)["seq"]) == (200, 2)
+
+        status, _, body = await request(reader, writer, "/status")
+        assert json.loads(body)["corrections"]["clock"] == num_clocks + 1
+
+        writer.close()
+
+    asyncio.run(run())
+
+def test_events(server) :
+    async def read_event(reader) :
+        lines = []
+        while True :
+            line = (await reader.readline()).decode("latin-1").rstrip("\n")
+            if line == "" :
+                return lines
+
+            lines.append(line)
+
+    async def run() :
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+
+        writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        assert head.startswith("HTTP/1.1 200")
+        assert "text/event-stream" in head
+
+        # the last message is sent immediately, then the new ones
+        event = await asyncio.wait_for(read_event(reader), 5)
+        assert event[:2] == ["id: 1", "event: message"]
+        assert json.loads(event[2][len("data: "):]) == server.last_event
+
+        server.notify(server.last_event["ToW"] + 10, server.last_event["WN"], 7)
+
+        event = await asyncio.wait_for(read_event(reader), 5)
+        assert event[0] == "id: 2"
+        assert json.loads(event[2][len("data: "):])["MessageID"] == 7
+
+        writer.close()
+
+    asyncio.run(run())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:34:12 2026
+
+@author: daniele
+
+Summary :
+    Tests of the SISRE evaluation: reference products, interpolation, errors
+    of the HAS corrections and daily statistics. The reference products are
+    the SP3 and clock files computed from the corrections themselves, so the
+    errors are known.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import has_orbits as ho
+import has_products as hpr
+import has_sisre as hs
+import rinex_nav as rn
+
+
+@pytest.fixture(scope = "module")
+def nav(nav_file) :
+    return rn.ephemeris_store(nav_file)
+
+@pytest.fixture(scope = "module")
+def products(nav, correction_files, tmp_path_factory) :
+    """
+    Summary :
+        SP3 and clock files of the corrections, every 30 s.
+
+    Returns :
+        Pathnames of the SP3 and of the clock file.
+    """
+    folder = tmp_path_factory.mktemp("products")
+    sp3 = str(folder / "has.sp3")
+    clk = str(folder / "has.clk")
+
+    hpr.products_from_csv(nav, correction_files, 30, sp3 = sp3, clk = clk)
+
+    return sp3, clk
+
+def shift_clocks(clk, filename, system, offset) :
+    """
+    Summary :
+        Copy of a clock file with the clocks of a GNSS shifted by offset [s].
+    """
+    with open(clk) as fin :
+        lines = fin.read().splitlines()
+
+    for ii, line in enumerate(lines) :
+        if line[:3] == "AS " and line[3] == system :
+            fields = line.rsplit(None, 1)
+            lines[ii] = f"{fields[0]}  {float(fields[1]) + offset:19.12E}"
+
+    with open(filename, "w") as fout :
+        fout.write("\n".join(lines) + "\n")
+
+def test_load_products(products) :
+    sp3, clk = products
+
+    ref = hs.load_sp3(sp3)
+    ref_clk = hs.load_clk(clk)
+
+    assert list(ref["satellites"]) == sorted([f"G{prn:02d}" for prn in range(1, 9)] + \
+                                             [f"E{prn:02d}" for prn in range(1, 9)])
+    assert np.all(np.diff(ref["t"]) == 30)
+    assert ref["pos"].shape == (len(ref["t"]), 16, 3)
+
+    # the clocks without corrections are missing in both files
+    assert np.isnan(ref["clock"]).any()
+    assert not np.isnan(ref["pos"]).any()
+
+    rows = np.searchsorted(ref["t"], ref_clk["t"])
+    cols = [list(ref["satellites"]).index(sat) for sat in ref_clk["satellites"]]
+
+    assert np.array_equal(ref["t"][rows], ref_clk["t"])
+    assert np.allclose(ref["clock"][rows][:, cols], ref_clk["clock"], atol = 1e-12, \
+                       equal_nan = True)
+
+    with pytest.raises(Exception) :
+        hs.load_sp3(clk)
+
+def test_lagrange_interpolate() :
+    t_ref = 30.0 * np.arange(40)
+    t_ref = np.delete(t_ref, 30)
+
+    poly = lambda t : 1e-12 * (t - 500)**5 - 3e-6 * t**2 + 2.0
+    values = np.column_stack((poly(t_ref), -poly(t_ref)))
+    values[5, 1] = np.nan
+
+    t = np.array([0.0, 75.0, 123.4, 240.0, 600.5, 885.0, 905.0, 1169.0, 1170.0, -1.0])
+    out = hs.lagrange_interpolate(t_ref, values, t, order = 10)
+
+    # polynomials of degree 9 are interpolated exactly
+    assert out[:5, 0] == pytest.approx(poly(t[:5]), rel = 1e-10)
+
+    # the missing sample is used only when the epoch is not a sample
+    assert out[3, 1] == pytest.approx(-poly(t[3]), rel = 1e-10)
+    assert np.isnan(out[1:3, 1]).all()
+
+    # windows with the gap (even at the samples) and epochs outside the
+    # samples
+    assert np.isnan(out[5:]).all()
+
+    # linear interpolation
+    out = hs.lagrange_interpolate(t_ref, values, np.array([45.0]), order = 2)
+    assert out[0, 0] == pytest.approx((poly(30.0) + poly(60.0)) / 2)
+
+def test_evaluate(nav, correction_files, products) :
+    sp3, clk = products
+
+    errors = hs.evaluate(nav, correction_files, sp3, clk, rate = 300, clock_datum = False)
+
+    assert set(zip(errors["gnssID"], errors["PRN"])) == \
+           {(gnss, prn) for gnss in (0, 2) for prn in range(1, 9)}
+    assert np.all(errors["t"] % 300 == 0)
+
+    # the products round the positions to the mm and the clocks to the ps
+    for col in ["err_radial", "err_in_track", "err_cross_track", "sisre_orbit"] :
+        assert np.abs(errors[col]).max() < 2e-3
+
+    clock = errors["err_clock"].values
+    assert np.isnan(clock).any()
+    assert np.nanmax(np.abs(clock)) < 1e-3
+    assert np.isnan(errors["sisre"][np.isnan(clock)]).all()
+
+    # the clocks of the SP3 file (rounded to the ps)
+    sp3_errors = hs.evaluate(nav, correction_files, sp3, rate = 300, clock_datum = False)
+
+    pd.testing.assert_frame_equal(sp3_errors, errors, check_exact = False, atol = 1e-3)
+
+def test_clock_datum(nav, correction_files, products, tmp_path) :
+    sp3, clk = products
+
+    shifted = str(tmp_path / "shifted.clk")
+    shift_clocks(clk, shifted, "G", 1e-7)
+
+    offset = 1e-7 * ho.SPEED_OF_LIGHT
+
+    errors = hs.evaluate(nav, correction_files, sp3, shifted, rate = 600, clock_datum = False)
+    gps = (errors["gnssID"] == 0).values
+
+    assert errors["err_clock"][gps].dropna().values == pytest.approx(-offset, abs = 1e-3)
+    assert np.nanmax(np.abs(errors["err_clock"][~gps])) < 1e-3
+
+    # the offset of the time scale is removed
+    errors = hs.evaluate(nav, correction_files, sp3, shifted, rate = 600)
+    clock = errors["err_clock"].values
+
+    assert np.nanmax(np.abs(clock)) < 1e-3
+    assert errors["clock_datum"][gps & ~np.isnan(clock)].values == \
+           pytest.approx(-offset, abs = 1e-3)
+
+def test_phase_centre(nav, correction_files, products) :
+    sp3, clk = products
+
+    # reference positions moved by 1 m towards the Earth
+    pco = {f"G{prn:02d}" : (0.0, 0.0, 1.0) for prn in range(1, 9)}
+    errors = hs.evaluate(nav, correction_files, sp3, clk, rate = 900, pco = pco)
+
+    gps = (errors["gnssID"] == 0).values
+
+    assert errors["err_radial"][gps].values == pytest.approx(1.0, abs = 1e-2)
+    assert np.abs(errors["err_radial"][~gps]).max() < 2e-3
+    assert np.hypot(errors["err_in_track"], errors["err_cross_track"]).max() < 2e-2
+
+def test_processes(nav, correction_files, products) :
+    sp3, clk = products
+
+    errors = hs.evaluate(nav, correction_files, sp3, clk, rate = 120, chunk = 3600)
+    parallel = hs.evaluate(nav, correction_files, sp3, clk, rate = 120, chunk = 3600, \
+                           processes = 2)
+
+    pd.testing.assert_frame_equal(parallel, errors)
+
+def test_daily_stats() :
+    # two days of GPS 1, one epoch of Galileo 2
+    t = np.array([1, 2, 86400 * 3 + 5, 1]) + 2400 * 604800.0
+    errors = pd.DataFrame({"t" : t, "gnssID" : [0, 0, 0, 2], "PRN" : [1, 1, 1, 2], \
+                           "IOD" : [7, 7, 8, 3], "err_radial" : [1.0, -3.0, 2.0, 0.5], \
+                           "err_in_track" : 0.0, "err_cross_track" : 0.0, \
+                           "err_clock" : [1.0, np.nan, 0.0, 0.0], "clock_datum" : 0.0, \
+                           "sisre_orbit" : 0.0, "sisre" : [2.0, np.nan, 4.0, 1.0]})
+
+    stats = hs.daily_stats(errors)
+
+    assert stats[["gnssID", "PRN", "epochs"]].values.tolist() == [[0, 1, 2], [2, 2, 1], [0, 1, 1]]
+    assert stats["rms_err_radial"].iloc[0] == pytest.approx(np.sqrt(5))
+    assert stats["mean_radial"].iloc[0] == -1.0
+    assert stats["rms_err_clock"].iloc[0] == 1.0
+    assert stats["sisre_95"].iloc[0] == 2.0
+
+    stats = hs.daily_stats(errors, by_satellite = False)
+
+    assert stats[["gnssID", "epochs"]].values.tolist() == [[0, 2], [2, 1], [0, 1]]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:31:40 2026
+
+@author: daniele
+
+Summary :
+    Tests of the GPS time conversions.
+"""
+
+import datetime
+
+import numpy as np
+
+import timefun as tf
+
+
+def test_toh_to_tow() :
+    tow = np.array([345600, 345620, 349205, 349190])
+    toh = np.array([0, 10, 3590, 3595])
+
+    # a ToH ahead of the seconds of the current hour refers to the previous
+    # hour
+    assert tf.ToHToTow(tow, toh).tolist() == [345600, 345610, 349190, 345595]
+
+def test_toh_to_tow_week_rollover() :
+    # received at the beginning of the week, reference time at the end of the
+    # previous one
+    assert tf.ToHToTow(5, 3595) == -5
+    assert tf.ToHToTow(5, 3595, 2400) == 2400 * tf.WEEK_SECONDS - 5
+
+def test_gps_to_date() :
+    assert tf.GpsToDate(2400, 345600) == (2026, 1, 8, 0.0)
+    assert tf.DateToGPS(2026, 1, 1, 12.5) == (390600, 2399)
+
+def test_vectorized_conversions() :
+    times = ["2026-01-01 12:30:00", "2026-01-04 00:00:01"]
+
+    tow, week = tf.vecDT2Gps(times)
+    expected = [tf.datetimeToGps(datetime.datetime.fromisoformat(time)) for time in times]
+
+    assert list(zip(tow.tolist(), week.tolist())) == expected
+
+    tow, week = tf.DatesToGps([2026, 2026], [1, 1], [1, 4], [12.5, 1 / 3600])
+    assert list(zip(tow.tolist(), week.tolist())) == expected
+
+    assert tf.GpsToDatetime(2400, 345600.5) == np.datetime64("2026-01-08T00:00:00.5")
+    assert tf.DatetimeToGps(np.datetime64("2026-01-08T00:00:00.5"))[0] == 345600.5
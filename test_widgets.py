@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:52:06 2026
+
+@author: daniele
+
+Summary :
+    Headless tests of the background processing of the notebook widgets.
+    They require ipywidgets and are skipped when it is not installed.
+"""
+
+import queue
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("ipywidgets")
+
+import has_widgets as hw
+
+
+def drain(events) :
+    """
+    Summary :
+        Return the events left in a queue, by kind.
+    """
+    out = {}
+    while True :
+        try :
+            kind, _, payload = events.get_nowait()
+        except queue.Empty :
+            return out
+
+        out.setdefault(kind, []).append(payload)
+
+def test_process_file(stream_files) :
+    filename, _rx, _type = stream_files["sbf"]
+
+    events = queue.Queue()
+    metrics = hw.process_file(filename, _rx, _type, events, threading.Event(), interval = 0)
+
+    assert metrics["status"] == "completed"
+    assert metrics["messages"] > 0
+    assert metrics["epochs"] == metrics["total_epochs"] > 0
+
+    out = drain(events)
+    assert out["done"] == [metrics]
+    assert out["progress"][-1][:2] == (metrics["epochs"], metrics["total_epochs"])
+    assert len(out["corrections"]) > 0
+
+def test_process_file_cancelled(stream_files) :
+    filename, _rx, _type = stream_files["sbf"]
+
+    cancel = threading.Event()
+    cancel.set()
+
+    metrics = hw.process_file(filename, _rx, _type, queue.Queue(), cancel)
+
+    assert metrics["status"] == "cancelled"
+    assert metrics["messages"] == 0
+
+def test_process_button_single_file(stream_files) :
+    filename, _, _ = stream_files["sbf"]
+
+    widget = hw.process_button_widget(filename, ["Septentrio", "binary"])
+    widget.start()
+
+    deadline = time.monotonic() + 60
+    while widget.wb_process.disabled and time.monotonic() < deadline :
+        time.sleep(0.1)
+
+    assert widget.status.value.startswith("Processing completed")
+
+    bar, info = widget.file_widgets[filename]
+    assert bar.bar_style == "success"
+    assert "completed" in info.value
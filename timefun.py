@@ -9,6 +9,15 @@ import math
 import numpy as np
 import pandas as pd
 
+# Seconds in a GPS week
+WEEK_SECONDS = 604800
+
+# Modified Julian Day of the GPS epoch (6th January 1980)
+GPS_EPOCH_MJD = 44244.0
+
+# GPS epoch as datetime64
+GPS_EPOCH = np.datetime64("1980-01-06T00:00:00", "ns")
+
 def datetimeToGps( time ) :
     val = pd.to_datetime(time)
     
@@ -25,7 +34,10 @@ def datetimeToGps( time ) :
     return tow, gpsweek
     
 def vecDT2Gps( time ) :
-    return np.vectorize(datetimeToGps)(time)    
+    tow, gpsweek = DatetimeToGps( time )
+    
+    # as datetimeToGps, fractions of second are discarded
+    return np.floor( tow ).astype( np.int64 ), gpsweek
 
 """    
 DateToMjd - Converts a date into the modified julian day
@@ -71,7 +83,7 @@ def DateToGPS( year, month, day, hour ):
     mdj = DateToMjd( year, month, day, hour )
 
     # Compute the 'GPS days'
-    gpsDays = mdj - DateToMjd( 1980, 1, 6, 0.0 )
+    gpsDays = mdj - GPS_EPOCH_MJD
 
     # Get the GPS week
     GpsWeek = int( gpsDays / 7 )
@@ -119,17 +131,17 @@ def MjdToDate( Mjd ) :
     # Extract the hour from the fractional part of the day
     hour = jdf * 24.0    
     l = int( jdi + 68569 )
-    n = ( 4 * l ) / 146097
+    n = ( 4 * l ) // 146097
 
-    l = l - ((146097 * n + 3) / 4)
-    year = int(4000 * (l + 1) ) / 1461001
+    l = l - ((146097 * n + 3) // 4)
+    year = (4000 * (l + 1) ) // 1461001
 
-    l = l - (1461 * year ) / 4 + 31
-    month = int(80 * l ) / 2447
+    l = l - (1461 * year ) // 4 + 31
+    month = (80 * l ) // 2447
 
-    day = l - (2447 * month) / 80
+    day = l - (2447 * month) // 80
 
-    l = month / 11
+    l = month // 11
 
     month = month + 2 - 12 * l
     year = 100 * (n - 49) + year + l
@@ -146,7 +158,135 @@ def GpsToMjd ( GpsWeek, GpsSeconds ) :
 
 	GpsDays = 7 * float( GpsWeek ) + ( GpsSeconds / 86400)
 		
-	Mjd = DateToMjd( 1980, 1, 6, 0 ) + GpsDays
+	Mjd = GPS_EPOCH_MJD + GpsDays
 
 	return Mjd
 
+"""
+Vectorized conversions - the functions below operate on whole NumPy arrays
+(scalars are also accepted)
+"""
+
+"""    
+DatesToMjd - Vectorized version of DateToMjd
+
+    input:
+        year, month, day and hour - arrays (or scalars)
+    
+    output:
+        the modified julian days
+"""
+def DatesToMjd( year, month, day, hour ) :
+    
+    year = np.asarray( year, dtype = np.float64 )
+    month = np.asarray( month, dtype = np.float64 )
+    
+    # January and February are considered as months of the previous year
+    early = month <= 2
+    year = np.where( early, year - 1, year )
+    month = np.where( early, month + 12, month )
+    
+    julian = np.floor( 365.25 * ( year + 4716.0 ) ) + \
+             np.floor( 30.6001 * ( month + 1 ) ) + \
+             np.asarray( day, dtype = np.float64 ) + \
+             np.asarray( hour, dtype = np.float64 ) / 24 - 1537.5
+    
+    return julian - 2400000.5
+
+"""    
+DatesToGps - Vectorized version of DateToGPS
+
+    input:
+        year, month, day and hour - arrays (or scalars)
+    
+    output:
+        tow - the times of week (rounded to the second as in DateToGPS)
+        GpsWeek - the GPS weeks
+"""
+def DatesToGps( year, month, day, hour ) :
+    
+    gpsDays = DatesToMjd( year, month, day, hour ) - GPS_EPOCH_MJD
+    
+    GpsWeek = np.floor( gpsDays / 7 ).astype( np.int64 )
+    
+    tow = np.floor( ( gpsDays - 7 * GpsWeek ) * 86400 + 0.5 ).astype( np.int64 )
+    
+    return tow, GpsWeek
+
+"""    
+DatetimeToGps - Converts dates into GPS weeks and times of week
+
+    input:
+        time - array (or scalar) of datetime64, datetime or strings
+    
+    output:
+        tow - the times of week in seconds (with fractions of second)
+        GpsWeek - the GPS weeks
+"""
+def DatetimeToGps( time ) :
+    
+    time = np.asarray( time )
+    
+    if not np.issubdtype( time.dtype, np.datetime64 ) :
+        try :
+            parsed = pd.to_datetime( time.ravel() )
+        except ValueError :
+            # strings with different formats are parsed one by one
+            parsed = pd.to_datetime( time.ravel(), format = "mixed" )
+            
+        time = np.asarray( parsed, dtype = "datetime64[ns]" ).reshape( time.shape )
+    
+    # nanoseconds since the GPS epoch
+    ns = ( time.astype( "datetime64[ns]" ) - GPS_EPOCH ).astype( np.int64 )
+    
+    GpsWeek = ns // ( WEEK_SECONDS * 10**9 )
+    tow = ( ns - GpsWeek * WEEK_SECONDS * 10**9 ) / 1e9
+    
+    return tow, GpsWeek
+
+"""    
+GpsToDatetime - Converts GPS weeks and times of week into dates
+
+    input:
+        GpsWeek - the GPS weeks
+        tow - the times of week in seconds
+    
+    output:
+        array of datetime64[ns] (leap seconds are ignored)
+"""
+def GpsToDatetime( GpsWeek, tow ) :
+    
+    ns = np.asarray( GpsWeek, dtype = np.int64 ) * ( WEEK_SECONDS * 10**9 ) + \
+         np.round( np.asarray( tow, dtype = np.float64 ) * 1e9 ).astype( np.int64 )
+    
+    return GPS_EPOCH + ns.astype( "timedelta64[ns]" )
+
+"""    
+ToHToTow - Rebuilds the reference times of the HAS corrections from the times
+           of week of reception and the times of hour of the MT1 headers. The
+           reference time is the last time, not after the reception, with the
+           given time of hour: when the ToH is larger than the seconds of the
+           current hour, it refers to the previous hour.
+
+    input:
+        tow - the times of week of reception
+        toh - the times of hour
+        GpsWeek - optional GPS weeks. If provided, the output is in seconds
+                  since the GPS epoch, which handles the week rollover (a
+                  reference time at the end of the previous week)
+    
+    output:
+        the reference times of week (negative for the previous week) or the
+        seconds since the GPS epoch
+"""
+def ToHToTow( tow, toh, GpsWeek = None ) :
+    
+    tow = np.asarray( tow )
+    
+    time = tow - np.mod( np.mod( tow, 3600 ) - np.asarray( toh ), 3600 )
+    
+    if GpsWeek is not None :
+        time = time + np.asarray( GpsWeek, dtype = np.int64 ) * WEEK_SECONDS
+        
+    return time
+